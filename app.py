@@ -9,20 +9,40 @@
 #              4. Renders HTML templates and serves static files
 # ============================================================================
 
-from flask import Flask, render_template, Response, jsonify, request
-from datetime import datetime
+from flask import Flask, Response, jsonify, request
 from collections import deque
+from datetime import datetime
 import os
-import cv2
 import base64
 import atexit
+import threading
 import time
 
 # Import our custom modules
-from config import DEBUG, SECRET_KEY, GESTURE_LIST
-from database import initialize_database, save_prediction, get_all_predictions, get_recent_predictions, get_prediction_statistics, clear_all_predictions
+from config import (DEBUG, SECRET_KEY, PROFILING_DIR, PROFILING_SWITCH, PROFILING_DEFAULT_SECONDS,
+                    PROFILING_MAX_SECONDS)
+from app_logging import setup_logging, get_logger
+
+# Log through a background writer before other modules start logging
+# (slow consoles never block the frame threads)
+setup_logging()
+
+from database import initialize_database, save_prediction
 from camera_module import CameraManager
 from gesture_model import GestureRecognizer
+from stabilizer import GestureStabilizer
+from state_feed import StateFeed
+from metrics import REGISTRY, CONTENT_TYPE, GESTURES_COMMITTED, STREAM_BYTES_SENT, FRAME_AGE_SECONDS
+from profiling import Profiler, parse_profile_switch
+from runtime_config import runtime_config, RuntimeConfigError
+from stream_tiers import tier_from_args
+from http_cache import register_http_caching
+from web_routes import bp as web_routes, register_request_metrics, admin_required
+
+log = get_logger('app')
+frame_log = get_logger('frame')
+camera_log = get_logger('camera_control')
+stream_log = get_logger('video_feed')
 
 # ======================== FLASK APP INITIALIZATION =============================
 
@@ -34,6 +54,11 @@ app = Flask(__name__)
 app.config['DEBUG'] = DEBUG
 app.config['SECRET_KEY'] = SECRET_KEY
 
+# Page, history and statistics routes (shared with web_worker.py)
+app.register_blueprint(web_routes)
+register_request_metrics(app)
+register_http_caching(app)
+
 # ======================== GLOBAL VARIABLES =============================
 
 # Initialize camera manager
@@ -50,23 +75,103 @@ last_detected_gesture = None
 frame_counter = 0
 detection_threshold = 2  # Legacy quick confirmation (kept for logging, not main logic)
 
-# ======================== STABLE GESTURE DETECTION CONFIG =====================
+# ======================== STABLE GESTURE DETECTION =====================
+
+# Majority vote over recent frames + time threshold + state change detection
+# (runtime settings). Commits stable gestures (and motion signs) to the database.
+# A background thread samples the latest gesture every stabilizer_sample_seconds
+# (like capture_service.py), so commits do not depend on a browser polling.
+stabilizer = GestureStabilizer(
+    **runtime_config.settings.stabilizer_options(),
+    on_commit=lambda gesture, confidence: save_prediction(gesture, confidence=confidence)
+)
+# Settings change on request/reload threads while run_stabilizer updates:
+# configure() and update() never overlap (a new buffer_size swaps the buffer)
+stabilizer_lock = threading.Lock()
+
 
-# We will combine:
-# - Majority voting over recent frames (stabilization buffer)
-# - Time threshold (gesture must be stable for some seconds)
-# - State change detection (NO_GESTURE -> GESTURE) to avoid repeats
+def configure_stabilizer(settings, changed):
+    with stabilizer_lock:
+        stabilizer.configure(**settings.stabilizer_options())
 
-DETECTION_BUFFER_SIZE = 10          # ~2 seconds if /api/detect_gesture is called every 200ms
-MIN_SIGN_STABLE_SECONDS = 1.5       # How long a gesture must be stable before registering
-MIN_NO_GESTURE_SECONDS = 0.5        # How long "no gesture" must be stable to reset state
-BUFFER_MIN_CONFIDENCE = 0.6         # Minimum majority ratio to consider buffer stable
 
-# None is treated as "no gesture" in our logic
-detection_buffer = deque(maxlen=DETECTION_BUFFER_SIZE)
-stable_gesture_state = None         # Current stable gesture (or None for no gesture)
-last_registered_gesture = None      # Last gesture actually saved to DB
-state_start_time = None             # When the current stable_gesture_state started
+runtime_config.subscribe(configure_stabilizer)
+
+RECENT_COMMITS = 20             # Commits kept for /api/detect_gesture
+SAVED_WINDOW_SECONDS = 0.3      # Without after_commit: commits this recent count as "saved"
+recent_commits = deque(maxlen=RECENT_COMMITS)
+commit_seq = 0
+commit_lock = threading.Lock()
+
+
+def record_commit(gesture, kind):
+    """Count a committed sign and remember it for /api/detect_gesture"""
+    global commit_seq
+    GESTURES_COMMITTED.labels(kind).inc()
+    with commit_lock:
+        commit_seq += 1
+        recent_commits.append({'id': commit_seq, 'gesture': gesture, 'kind': kind, 'time': time.time()})
+    state_feed.data_changed()
+
+
+def run_stabilizer():
+    """Feed the latest gesture (and motion signs) to the stabilizer while the camera runs"""
+    while True:
+        time.sleep(runtime_config.settings.stabilizer_sample_seconds)
+        if not camera_active:
+            continue
+        try:
+            with camera_manager.frame_lock:
+                gesture, score = camera_manager.latest_gesture, camera_manager.latest_score
+            with stabilizer_lock:
+                update = stabilizer.update(gesture, score=score)
+                if update.saved:
+                    record_commit(update.stable_gesture, 'static')
+                for event in camera_manager.pop_motion_events():
+                    if stabilizer.submit_event(event.gesture, event.start_time, event.end_time, event.confidence):
+                        record_commit(event.gesture, 'motion')
+        except Exception as e:
+            log.exception("Stabilizer sampling failed: %s", e)
+
+
+# ======================== DASHBOARD STATE FEED =============================
+
+def read_live_state():
+    """
+    Camera status and latest gesture for /api/state (state_feed.py).
+    One process serves them, so the feed counts the versions itself (None).
+    """
+    running = camera_active and camera_manager.is_running
+    return None, {
+        'camera': {'running': running, 'index': camera_manager.index},
+        'gesture': {'gesture': camera_manager.latest_gesture if running else None}
+    }
+
+
+def wait_for_results(timeout):
+    """Sleep until the camera has new detection results (at most timeout seconds)"""
+    if camera_manager.is_running:
+        camera_manager.wait_for_result(camera_manager.result_seq, timeout)
+    else:
+        time.sleep(timeout)
+
+
+state_feed = StateFeed(read_live_state, wait_for_results, read_frame=camera_manager.frame_ages)
+app.extensions['state_feed'] = state_feed
+
+
+# On-demand profiling of the pipeline threads (see profiling.py)
+profiler = Profiler(PROFILING_DIR, max_seconds=PROFILING_MAX_SECONDS)
+
+
+def start_profiling(mode, seconds=None, trace_allocations=True):
+    """Start a profiling session over the camera's capture and processing steps"""
+    targets = {
+        'capture': (camera_manager, '_capture_step'),
+        'processing': (camera_manager, '_process_step'),
+    }
+    return profiler.start(mode, seconds or PROFILING_DEFAULT_SECONDS, targets=targets,
+                          trace_allocations=trace_allocations)
 
 
 # ======================== DATABASE AND APP STARTUP =============================
@@ -77,41 +182,26 @@ def startup():
     Initialize database and other resources.
     """
     initialize_database()
+    threading.Thread(target=run_stabilizer, name='stabilizer', daemon=True).start()
 
 # Initialize database once at import/startup (NOT on every request)
 startup()
 
+# Environment switch: profile from startup, e.g. SIGNLANG_PROFILE=cprofile:30
+_profile_switch = parse_profile_switch(PROFILING_SWITCH)
+if _profile_switch:
+    try:
+        start_profiling(*_profile_switch)
+    except ValueError as e:
+        log.warning(f"Ignoring SIGNLANG_PROFILE={PROFILING_SWITCH!r}: {e}")
+
 
 # Initialize on app startup - ensure clean state
-print("[INIT] Resetting camera state on startup...")
+log.info("Resetting camera state on startup...")
 camera_active = False
 if camera_manager:
     camera_manager.is_running = False
 
-# ======================== HOME PAGE ROUTE =============================
-
-@app.route('/')
-def index():
-    """
-    Main page route.
-    When user visits http://localhost:5000/ this function runs.
-    
-    PROCESS:
-    1. Render the HTML template (index.html)
-    2. Pass gesture list to template (for display)
-    3. Send HTML to browser
-    
-    RETURNS: Rendered HTML page
-    """
-    # Get statistics to show on dashboard
-    stats = get_prediction_statistics()
-    
-    # Render index.html template and pass data
-    return render_template('index.html', 
-                         gestures=GESTURE_LIST,
-                         stats=stats)
-
-
 # ======================== DIAGNOSTIC ROUTE =============================
 
 @app.route('/api/camera_status')
@@ -134,7 +224,12 @@ def get_current_frame():
     API endpoint to get current camera frame as base64 JPEG.
     Used by JavaScript to continuously update video display.
     
-    RETURNS: JSON with base64-encoded JPEG frame and status
+    QUERY PARAMETERS (optional):
+    - tier: 'full' (default), 'medium', 'small' or 'thumb' (STREAM_TIERS in config.py)
+    - width, quality: Explicit preview width (pixels) and JPEG quality
+    
+    RETURNS: JSON with base64-encoded JPEG frame and status, plus frame_seq,
+             frame_age_ms, result_seq, result_age_ms (the gesture's frame)
     """
     global camera_active
 
@@ -146,31 +241,40 @@ def get_current_frame():
             camera_active = False
             return jsonify({'frame': None, 'status': 'no_camera'}), 200
         
-        # Get current frame
-        frame, gesture = camera_manager.get_frame_with_gesture()
+        try:
+            tier, _ = tier_from_args(request.args, runtime_config.settings.frame_jpeg_quality)
+        except ValueError as e:
+            return jsonify({'frame': None, 'status': 'error', 'message': str(e)}), 400
+        
+        # Current frame in the requested tier (encoded once per frame, shared by all viewers)
+        encoded = camera_manager.get_encoded_frame(tier)
+        frame_bytes = encoded.data
+        gesture = camera_manager.latest_gesture
         
-        if frame is None:
+        if frame_bytes is None:
             # Camera is "on" but not providing frames
             return jsonify({'frame': None, 'status': 'no_frame'}), 200
         
-        # Encode frame as JPEG and convert to base64 (reduced quality for speed)
-        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 65])
-        frame_base64 = base64.b64encode(buffer).decode('utf-8')
+        STREAM_BYTES_SENT.labels(tier.name).inc(len(frame_bytes))
+        frame_base64 = base64.b64encode(frame_bytes).decode('utf-8')
+        
+        # How old the frame and the gesture's frame are (they can differ)
+        ages = camera_manager.frame_ages(encoded.seq, encoded.timestamp)
+        FRAME_AGE_SECONDS.labels('api_frame').observe(ages['frame_age_ms'] / 1000.0)
         
         # Log success once per 10 frames to track activity (not spam)
         if frame_counter % 10 == 0:
-            print(f"[FRAME] Successfully encoded frame at {datetime.now().isoformat()}")
+            frame_log.debug("Successfully encoded frame at %s", datetime.now().isoformat())
         
         return jsonify({
             'frame': frame_base64,
             'status': 'success',
-            'gesture': gesture
+            'gesture': gesture,
+            **ages
         }), 200
         
     except Exception as e:
-        print(f"[ERROR] Error getting frame: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error getting frame: %s", e)
         return jsonify({'frame': None, 'status': 'error', 'message': str(e)}), 200
 
 
@@ -193,11 +297,11 @@ def start_camera_route():
     global camera_active
     
     try:
-        print(f"[START_CAMERA] Request from {request.remote_addr} at {datetime.now().isoformat()}")
+        camera_log.info(f"Request from {request.remote_addr} at {datetime.now().isoformat()}")
         if camera_active:
             # Camera already running - that's OK, just return success
             # This makes the endpoint idempotent (safe to call multiple times)
-            print("[START_CAMERA] Camera already active; returning idempotent success")
+            camera_log.info("Camera already active; returning idempotent success")
             return jsonify({'status': 'success', 'message': 'Camera is already running', 'camera_index': camera_manager.index}), 200
         
         # Start the camera
@@ -210,7 +314,7 @@ def start_camera_route():
             return jsonify({'status': 'error', 'message': 'Failed to start camera', 'hint': 'Check if camera is connected or already in use', 'camera_index': camera_manager.index}), 200
             
     except Exception as e:
-        print(f"[ERROR] Error starting camera: {e}")
+        log.error(f"Error starting camera: {e}")
         return jsonify({'status': 'error', 'message': str(e), 'hint': 'Camera error. Try restarting the browser.'}), 200
 
 
@@ -231,12 +335,12 @@ def stop_camera_route():
     global camera_active
     
     try:
-        print(f"[STOP_CAMERA] Request from {request.remote_addr} at {datetime.now().isoformat()}")
+        camera_log.info(f"Request from {request.remote_addr} at {datetime.now().isoformat()}")
         if camera_active:
-            print("[STOP_CAMERA] Stopping active camera...")
+            camera_log.info("Stopping active camera...")
             camera_manager.stop_camera()
             camera_active = False
-            print("[STOP_CAMERA] ✅ Camera stopped successfully")
+            camera_log.info("Camera stopped successfully")
             return jsonify({
                 'status': 'success',
                 'message': 'Camera stopped!',
@@ -244,7 +348,7 @@ def stop_camera_route():
             }), 200
         else:
             # Camera not running - treat as success (idempotent)
-            print("[STOP_CAMERA] Camera already stopped; returning idempotent success")
+            camera_log.info("Camera already stopped; returning idempotent success")
             return jsonify({
                 'status': 'success',
                 'message': 'Camera not running (already stopped)',
@@ -252,9 +356,7 @@ def stop_camera_route():
             }), 200
             
     except Exception as e:
-        print(f"[ERROR] Exception stopping camera: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Exception stopping camera: %s", e)
         # Still return 200 to prevent UI errors
         return jsonify({
             'status': 'success',
@@ -264,6 +366,40 @@ def stop_camera_route():
         }), 200
 
 
+# ======================== LANDMARK RECORDING ROUTES =============================
+
+@app.route('/api/recording/start', methods=['POST'])
+def start_recording_route():
+    """
+    API endpoint to start recording landmarks of the live camera.
+    Recordings replay without MediaPipe (tools/replay_landmarks.py).
+    
+    JSON BODY (optional): {"name": "session1"} - folder name in LANDMARK_RECORDING_DIR
+    
+    RETURNS: JSON with status and the recording path
+    """
+    try:
+        name = (request.get_json(silent=True) or {}).get('name')
+        path = camera_manager.start_recording(name)
+        return jsonify({'status': 'success', 'path': path}), 200
+    except (ValueError, RuntimeError, FileExistsError) as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+
+@app.route('/api/recording/stop', methods=['POST'])
+def stop_recording_route():
+    """
+    API endpoint to stop recording landmarks.
+    
+    RETURNS: JSON with status, recording path and frame count
+    """
+    stopped = camera_manager.stop_recording()
+    if stopped is None:
+        return jsonify({'status': 'success', 'message': 'Not recording'}), 200
+    path, frames = stopped
+    return jsonify({'status': 'success', 'path': path, 'frames': frames}), 200
+
+
 # ======================== VIDEO STREAMING ROUTE =============================
 
 @app.route('/video_feed')
@@ -284,22 +420,32 @@ def video_feed():
     - Can handle continuous updates
     - Works with all modern browsers
     
+    QUERY PARAMETERS (optional):
+    - tier: 'full' (default), 'medium', 'small', 'thumb', or 'auto' to adapt
+      to the viewer's speed (max_tier: largest tier auto may use)
+    - width, quality: Explicit preview width (pixels) and JPEG quality
+    
     RETURNS: Stream of video frames in MJPEG format
     """
     if not camera_active:
-        print("[VIDEO_FEED] Camera not active, returning error")
+        stream_log.info("Camera not active, returning error")
         return "Camera not active", 400
     
     # Check if camera manager has valid camera
     if not camera_manager.camera or not camera_manager.is_running:
-        print("[VIDEO_FEED] Camera object not available")
+        stream_log.info("Camera object not available")
         return "Camera not initialized", 400
     
-    print("[VIDEO_FEED] Starting video stream...")
+    try:
+        tier, auto = tier_from_args(request.args, runtime_config.settings.stream_jpeg_quality)
+    except ValueError as e:
+        return str(e), 400
+    
+    stream_log.info("Starting video stream (tier %s%s)...", tier.name, ', auto' if auto else '')
     
     # Response with MJPEG format
     return Response(
-        camera_manager.get_frame_stream(),
+        camera_manager.get_frame_stream(tier=tier if auto or tier.name != 'full' else None, auto=auto),
         mimetype='multipart/x-mixed-replace; boundary=frame'
     )
 
@@ -309,20 +455,22 @@ def video_feed():
 @app.route('/api/detect_gesture', methods=['POST'])
 def detect_gesture_route():
     """
-    API endpoint to capture current frame and detect gesture.
-    Called periodically by JavaScript to get detected gesture.
+    API endpoint to get the detected gesture and whether a sign was saved.
+    (The dashboard now long-polls /api/state; this stays for other clients.)
     
     PROCESS:
-    1. Skip frames for faster processing (process every Nth frame)
-    2. Get current frame from camera
-    3. Detect gesture from frame
-    4. If gesture detected and confident, save to database
-    5. Return gesture data as JSON (ALWAYS returns 200, never 400)
+    1. Get current frame and gesture from camera
+    2. Report signs the stabilizer committed since the previous poll (the
+       stabilizer samples in its own thread, see run_stabilizer)
+    3. Return gesture data as JSON (ALWAYS returns 200, never 400)
+    
+    OPTIONAL (query or JSON): after_commit - commit_seq of the previous
+    response; without it, commits in the last SAVED_WINDOW_SECONDS count.
     
-    RETURNS: JSON with detected gesture and metadata
+    RETURNS: JSON with detected gesture and metadata (frame_age_ms: newest
+             frame, result_age_ms: the frame the gesture was detected on)
     """
     global last_detected_gesture, frame_counter, frame_skip_count
-    global detection_buffer, stable_gesture_state, last_registered_gesture, state_start_time
     
     try:
         # Check if camera is active - if not, return safe 200 response
@@ -335,11 +483,11 @@ def detect_gesture_route():
                 'timestamp': datetime.now().isoformat()
             }), 200
 
-        # Get current frame from server-side camera (optimized - no drawing for detection API)
-        frame, detected_gesture = camera_manager.get_frame_with_gesture(draw_landmarks=False)
+        # Latest gesture from the processing thread (no frame is read or copied)
+        has_frame, detected_gesture = camera_manager.get_latest_gesture()
 
-        # If frame is None (camera not ready), return safe 200 response
-        if frame is None:
+        # No frame yet (camera not ready): return safe 200 response
+        if not has_frame:
             return jsonify({
                 'status': 'success',
                 'gesture': None,
@@ -358,73 +506,34 @@ def detect_gesture_route():
             last_detected_gesture = detected_gesture
 
         # ---------------------------------------------------------------------
-        # 2. Stabilization buffer (majority voting over recent frames)
-        # ---------------------------------------------------------------------
-        detection_buffer.append(detected_gesture)
-
-        stable_candidate = None
-        buffer_confidence = 0.0
-
-        if detection_buffer:
-            counts = {}
-            for g in detection_buffer:
-                counts[g] = counts.get(g, 0) + 1
-
-            # Gesture with highest count in buffer
-            stable_candidate = max(counts, key=counts.get)
-            buffer_confidence = counts[stable_candidate] / len(detection_buffer)
-
-            # Require a minimum confidence; otherwise treat as "no stable gesture"
-            if buffer_confidence < BUFFER_MIN_CONFIDENCE:
-                stable_candidate = None
-
-        # ---------------------------------------------------------------------
-        # 3. State machine for stable gesture vs "no gesture"
-        # ---------------------------------------------------------------------
-        now_ts = time.time()
-
-        # If stable candidate changed, start timing this new state
-        if stable_candidate != stable_gesture_state:
-            stable_gesture_state = stable_candidate
-            state_start_time = now_ts
-
-        time_in_state = 0.0
-        if state_start_time is not None:
-            time_in_state = now_ts - state_start_time
-
-        # ---------------------------------------------------------------------
-        # 4. Registration logic (NO_GESTURE -> STABLE_GESTURE transitions only)
+        # 2. Signs committed since the caller's previous poll
         # ---------------------------------------------------------------------
-        saved = False
-
-        if stable_gesture_state is None:
-            # In a "no gesture" state; once stable long enough, allow next sign
-            if time_in_state >= MIN_NO_GESTURE_SECONDS:
-                last_registered_gesture = None
+        after = request.args.get('after_commit', type=int)
+        if after is None:
+            after = (request.get_json(silent=True) or {}).get('after_commit')
+        with commit_lock:
+            commits, current_seq = list(recent_commits), commit_seq
+        if isinstance(after, int):
+            new_commits = [c for c in commits if c['id'] > after]
         else:
-            # We have a stable gesture (e.g., "HELLO", "PLEASE", etc.)
-            # Register ONLY when:
-            #   - It has been stable for at least MIN_SIGN_STABLE_SECONDS
-            #   - It is different from the last registered gesture
-            if (
-                time_in_state >= MIN_SIGN_STABLE_SECONDS
-                and stable_gesture_state != last_registered_gesture
-            ):
-                if save_prediction(stable_gesture_state, confidence=buffer_confidence):
-                    saved = True
-                    last_registered_gesture = stable_gesture_state
+            recent = time.time() - SAVED_WINDOW_SECONDS
+            new_commits = [c for c in commits if c['time'] >= recent]
 
         # ALWAYS return 200 - never return error status for normal operation
+        # (frame/result ages: how stale the video behind this answer is)
         return jsonify({
             'status': 'success',
             'gesture': detected_gesture,
-            'saved': saved,
+            'saved': bool(new_commits),
+            'motion_signs': [c['gesture'] for c in new_commits if c['kind'] == 'motion'],
+            'commit_seq': current_seq,
+            **camera_manager.frame_ages(),
             'timestamp': datetime.now().isoformat()
         }), 200
         
     except Exception as e:
         # Even on error, return 200 with error info - prevents 400 spam
-        print(f"[ERROR] Error detecting gesture: {e}")
+        log.error("Error detecting gesture: %s", e)
         return jsonify({
             'status': 'success',
             'gesture': None,
@@ -434,97 +543,76 @@ def detect_gesture_route():
         }), 200
 
 
-# ======================== DATA RETRIEVAL ROUTES =============================
+# ======================== METRICS =============================
 
-@app.route('/api/predictions', methods=['GET'])
-def get_predictions():
+@app.route('/metrics')
+def metrics():
     """
-    API endpoint to get all stored predictions.
-    Called by JavaScript to display history on webpage.
-    
-    QUERY PARAMETERS:
-    - limit (optional): Number of recent predictions to retrieve
-    
-    RETURNS: JSON array of predictions
+    Prometheus text endpoint: per-stage latency histograms and pipeline
+    counters (see metrics.py for the list).
     """
-    try:
-        # Get limit from query parameters (default = all)
-        limit = request.args.get('limit', type=int)
-        
-        if limit:
-            predictions = get_recent_predictions(limit=limit)
-        else:
-            predictions = get_all_predictions()
-        
-        return jsonify({
-            'status': 'success',
-            'predictions': predictions
-        }), 200
-        
-    except Exception as e:
-        print(f"[ERROR] Error retrieving predictions: {e}")
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
 
+# ======================== ADMIN ROUTES =============================
 
-@app.route('/api/statistics', methods=['GET'])
-def get_stats():
+@app.route('/admin/profile', methods=['GET', 'POST'])
+@admin_required
+def profile_route():
     """
-    API endpoint to get prediction statistics.
-    Called by JavaScript to update dashboard.
+    Time-boxed profiling of the running pipeline.
     
-    RETURNS: JSON with statistics (total, unique, most detected)
+    GET: Status of the current/last session (report file paths when done)
+    POST JSON (all optional):
+    - mode: 'cprofile' (capture/processing threads) or 'sample' (all threads)
+    - seconds: Duration (default PROFILING_DEFAULT_SECONDS)
+    - allocations: Include tracemalloc top allocations (default true)
+    
+    Reports are written to PROFILING_DIR.
     """
+    if request.method == 'GET':
+        return jsonify({'status': 'success', 'session': profiler.status()}), 200
+    
+    options = request.get_json(silent=True) or {}
     try:
-        stats = get_prediction_statistics()
-        
-        return jsonify({
-            'status': 'success',
-            'statistics': stats
-        }), 200
-        
-    except Exception as e:
-        print(f"[ERROR] Error retrieving statistics: {e}")
-        return jsonify({'status': 'error', 'message': str(e)}), 500
-
-
-# ======================== CLEAR DATA ROUTE =============================
-
-@app.route('/api/clear_data', methods=['POST'])
-def clear_data():
+        session = start_profiling(options.get('mode', 'cprofile'),
+                                  float(options.get('seconds') or PROFILING_DEFAULT_SECONDS),
+                                  trace_allocations=bool(options.get('allocations', True)))
+    except (TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'status': 'error', 'message': str(e), 'session': profiler.status()}), 409
+    return jsonify({'status': 'success', 'session': session.status(), 'output_dir': PROFILING_DIR}), 202
+
+
+@app.route('/admin/runtime_config', methods=['GET', 'POST'])
+@admin_required
+def runtime_config_route():
     """
-    API endpoint to clear all predictions from database.
-    Called when user clicks "Clear History" button.
+    Show or change the runtime performance settings (runtime_config.py)
+    without restarting the camera.
     
-    RETURNS: JSON with status (always 200 for consistency)
+    GET: Active profile, current settings and where each value came from
+    POST JSON (all optional):
+    - profile: 'balanced', 'low-latency' or 'low-cpu'
+    - settings: {name: value} overrides, e.g. {"stream_jpeg_quality": 60}
+    - reset: true to drop earlier profile/overrides set through this endpoint
+    An empty POST re-reads the runtime config file and environment.
+    
+    RETURNS: 200 with the new settings, 400 (nothing changed) if invalid
     """
-    try:
-        print("[CLEAR_DATA] Request to clear all predictions...")
-        success = clear_all_predictions()
-        
-        if success:
-            print("[CLEAR_DATA] ✅ Data cleared successfully!")
-            return jsonify({
-                'status': 'success',
-                'message': 'All data cleared!',
-                'timestamp': datetime.now().isoformat()
-            }), 200
-        else:
-            print("[CLEAR_DATA] ❌ Failed to clear data - database error")
-            return jsonify({
-                'status': 'error',
-                'message': 'Failed to clear data - database error',
-                'timestamp': datetime.now().isoformat()
-            }), 200  # Return 200 to be consistent with other endpoints
-            
-    except Exception as e:
-        print(f"[ERROR] Exception clearing data: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({
-            'status': 'error',
-            'message': f'Exception: {str(e)}',
-            'timestamp': datetime.now().isoformat()
-        }), 200  # Return 200 to be consistent with other endpoints
+    if request.method == 'POST':
+        options = request.get_json(silent=True) or {}
+        settings = options.get('settings') or {}
+        if not isinstance(settings, dict):
+            return jsonify({'status': 'error', 'message': 'settings must be an object'}), 400
+        try:
+            _, changed = runtime_config.reload(profile=options.get('profile'), settings=settings,
+                                               reset=bool(options.get('reset')))
+        except RuntimeConfigError as e:
+            return jsonify({'status': 'error', 'message': str(e), 'config': runtime_config.status()}), 400
+        return jsonify({'status': 'success', 'changed': changed, 'config': runtime_config.status()}), 200
+    return jsonify({'status': 'success', 'config': runtime_config.status()}), 200
 
 
 # ======================== ERROR HANDLERS =============================
@@ -538,7 +626,7 @@ def not_found(error):
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors (server error)"""
-    print(f"[ERROR] Server error: {error}")
+    log.error(f"Server error: {error}")
     return jsonify({'status': 'error', 'message': 'Internal server error'}), 500
 
 
@@ -567,9 +655,9 @@ def cleanup_resources():
                 except Exception:
                     pass
 
-        print("[APP] Cleanup completed!")
+        log.info("Cleanup completed!")
     except Exception as e:
-        print(f"[ERROR] Error during cleanup: {e}")
+        log.error(f"Error during cleanup: {e}")
 
 # Ensure cleanup runs once when the Python process exits
 atexit.register(cleanup_resources)
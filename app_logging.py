@@ -0,0 +1,208 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Application Logging
+# PURPOSE: Queue-backed, rate-limited logging that never blocks the pipeline
+# EXPLANATION: The server used print() everywhere. print() writes to stdout
+#              synchronously, so a stalled terminal or a slow log pipe
+#              stalled the capture and processing threads with it.
+#              Now every module logs through get_logger():
+#              1. The calling thread only filters and formats the record
+#                 and puts it on a bounded queue (put_nowait: never waits;
+#                 if the queue is full the record is dropped and counted)
+#              2. A background listener thread does all the writing
+#                 (stdout and/or LOG_FILE)
+#              3. Repeats of the same message (same logger, level and
+#                 message template) beyond a small burst per time window
+#                 are suppressed; the next one that gets through says how
+#                 many were collapsed, e.g.
+#                 "Error in capture loop: ... (37 similar suppressed in 10 s)"
+#
+# USAGE:
+#     log = get_logger('camera')          # Lines are tagged [CAMERA]
+#     log.info("Camera started at index %s", index)
+#     log.error("Error in capture loop: %s", e, exc_info=True)
+#
+# Use %-style arguments (not f-strings) for messages that repeat with
+# changing values, so they share one template for rate limiting.
+# ============================================================================
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+
+from config import (LOG_LEVEL, LOG_LEVELS, LOG_FORMAT, LOG_FILE, LOG_QUEUE_SIZE,
+                    LOG_RATE_LIMIT_BURST, LOG_RATE_LIMIT_WINDOW)
+from metrics import LOG_RECORDS_DROPPED, LOG_RECORDS_SUPPRESSED
+
+ROOT_LOGGER = 'signlang'
+
+_listener = None
+_rate_limiter = None
+
+
+def get_logger(name):
+    """Logger for one module/subsystem, e.g. get_logger('camera') -> [CAMERA]"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+# ======================== RATE LIMITING =============================
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most `burst` records per message template every
+    `window` seconds; the rest are counted and reported on the next
+    record of that template that passes.
+
+    KEY: (logger name, level, unformatted message), so "Error: %s" with
+    different arguments counts as one message type.
+    """
+
+    def __init__(self, burst, window):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._states = {}            # key -> [window start, passed, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.burst <= 0:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            state = self._states.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state is not None else 0
+                self._states[key] = [now, 1, 0]
+                if len(self._states) > 10000:   # Forget old message types (unbounded templates)
+                    self._forget(now)
+            elif state[1] < self.burst:
+                state[1] += 1
+                suppressed = 0
+            else:
+                state[2] += 1
+                LOG_RECORDS_SUPPRESSED.inc()
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+    def _forget(self, now):
+        for key in [k for k, s in self._states.items() if now - s[0] >= self.window and not s[2]]:
+            del self._states[key]
+
+    def pending(self):
+        """[(logger name, level, message template, suppressed count)] not reported yet"""
+        with self._lock:
+            return [(name, level, msg, state[2]) for (name, level, msg), state in self._states.items() if state[2]]
+
+
+# ======================== NON-BLOCKING QUEUE HANDLER =============================
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records instead of waiting on a full queue"""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+    def prepare(self, record):
+        record = super().prepare(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar suppressed in {_rate_limiter.window:g} s)"
+        return record
+
+
+# ======================== FORMATTERS =============================
+
+class TagFormatter(logging.Formatter):
+    """Text lines in the project's tag style: '12:00:01 INFO  [CAMERA] message'"""
+
+    def format(self, record):
+        record.tag = record.name.rsplit('.', 1)[-1].upper()
+        return super().format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line (for log collectors); extra= fields are kept"""
+
+    STANDARD = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'tag'}
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in self.STANDARD:
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+# ======================== SETUP =============================
+
+def setup_logging(stream=None):
+    """
+    Route all 'signlang.*' loggers (and Werkzeug's request log) through the
+    queue to a background writer. Safe to call more than once.
+
+    PARAMETER: stream - Console stream to write to (default sys.stdout;
+               headless.py keeps stdout for its output and logs to stderr)
+    """
+    global _listener, _rate_limiter
+    if _listener is not None:
+        return
+
+    if LOG_FORMAT == 'json':
+        formatter = JsonFormatter()
+    else:
+        formatter = TagFormatter('%(asctime)s %(levelname)-7s [%(tag)s] %(message)s', '%H:%M:%S')
+
+    writers = [logging.StreamHandler(stream or sys.stdout)]
+    if LOG_FILE:
+        writers.append(logging.FileHandler(LOG_FILE, encoding='utf-8'))
+    for writer in writers:
+        writer.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _rate_limiter = RateLimitFilter(LOG_RATE_LIMIT_BURST, LOG_RATE_LIMIT_WINDOW)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(_rate_limiter)
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(handler)
+    root.propagate = False
+    for name, level in LOG_LEVELS.items():
+        logging.getLogger(name if name == 'werkzeug' else f"{ROOT_LOGGER}.{name}").setLevel(level)
+
+    # Flask's development server logs every request synchronously otherwise
+    werkzeug = logging.getLogger('werkzeug')
+    werkzeug.addHandler(handler)
+    werkzeug.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, *writers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Report still-suppressed message counts, then write out the queue"""
+    global _listener
+    if _listener is None:
+        return
+    log = get_logger('logging')
+    for name, level, msg, count in _rate_limiter.pending():
+        log.log(level, "%s: %d similar messages suppressed: %s", name, count, msg)
+    _listener.stop()
+    _listener = None
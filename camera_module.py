@@ -11,20 +11,47 @@
 # ============================================================================
 
 import cv2
-import mediapipe as mp
 import base64
 import io
 import numpy as np
 import threading
 import time
-from collections import deque
+import os
+from collections import deque, namedtuple
+from datetime import datetime
+from app_logging import get_logger
+from frame_ring import FrameRing, frame_ages
+from frame_sources import SourceStaleness, open_source
 from gesture_model import GestureRecognizer
-from config import WEBCAM_WIDTH, WEBCAM_HEIGHT, WEBCAM_FPS
+from jpeg_encoder import jpeg_encoder
+from landmark_recording import LandmarkRecorder
+from metrics import (CAPTURE_INTERVAL, PROCESS_FRAME_SECONDS, FRAMES_CAPTURED, FRAMES_DROPPED,
+                     INFERENCES_SKIPPED, STREAM_BYTES_SENT, FRAME_AGE_SECONDS, STREAM_FRAMES_STALE)
+from motion_recognizer import load_motion_recognizer
+from overlay import OverlayRenderer
+from runtime_config import runtime_config
+from stream_tiers import EncodedFrameCache, TierAdapter, TIER_LADDER, resolve_tier
+from config import (WEBCAM_FPS, CAMERA_SOURCE, MOTION_RECOGNITION_ENABLED, MOTION_TEMPLATE_PATH, MOTION_MAX_DISTANCE,
+                    LANDMARK_RECORDING_DIR)
 
-# Initialize gesture recognizer
+log = get_logger('camera')
+
+# Initialize gesture recognizer and overlay renderer
 gesture_recognizer = GestureRecognizer()
-mp_drawing = mp.solutions.drawing_utils
-mp_hands = mp.solutions.hands
+overlay_renderer = OverlayRenderer()
+
+# Labeled metric series used on every frame (looked up once)
+FRAMES_NOT_PROCESSED = FRAMES_DROPPED.labels('not_processed')
+FRAMES_RING_FULL = FRAMES_DROPPED.labels('ring_full')
+FRAMES_DRAINED = FRAMES_DROPPED.labels('drained')
+CAPTURE_FRAME_AGE = FRAME_AGE_SECONDS.labels('capture')
+RESULT_FRAME_AGE = FRAME_AGE_SECONDS.labels('result')
+STREAM_FRAME_AGE = FRAME_AGE_SECONDS.labels('stream')
+
+MAX_DRAINED_FRAMES = 8    # Low-latency capture: most buffered frames skipped per read
+
+# A frame encoded for viewers: sequence number, capture time (time.time()), JPEG bytes (None = no frame)
+EncodedFrame = namedtuple('EncodedFrame', ['seq', 'timestamp', 'data'])
 
 
 class CameraManager:
@@ -45,22 +72,50 @@ class CameraManager:
         self.startup_time = None
         self.time_module = time
         
-        # Performance optimization: Frame buffering and caching
-        self.latest_frame = None
+        # Performance optimization: Preallocated frame ring (no per-frame allocations)
+        # Capture writes into ring slots in place; processing and readers borrow by sequence
+        self.frame_ring = FrameRing(slot_count=4)
+        self._capture_buffer = None          # Reused target for camera.read(image=...)
+        self._last_read_time = None          # For the capture interval histogram
+        self.source_staleness = SourceStaleness()  # Time frames waited in the camera buffer
+        self.capture_staleness = None        # ...for the last frame read (None = source has no timestamps)
+        self._overlay_buffers = threading.local()  # Per-reader scratch frame for drawing
+        self.encoded_frames = EncodedFrameCache()  # JPEGs of the latest frame per stream tier
         self.latest_gesture = None
+        self.latest_score = 0.0               # How strongly the latest frame supports latest_gesture
         self.latest_detection_results = None  # Cache full detection results (landmarks + gesture)
-        self.frame_lock = threading.Lock()
+        self.last_processed_seq = 0           # Sequence number of the last frame sent to MediaPipe
+        self.frames_skipped = 0               # Frames overwritten before processing reached them
+        self.result_seq = 0                   # Frame sequence the latest detection results belong to
+        self.result_timestamp = 0.0           # Capture time of that frame
+        self.frame_lock = threading.Condition()  # Guards results; notified when new results arrive
         self.capture_thread = None
         self.processing_thread = None
         
-        # Frame rate control
-        self.target_fps = 30
-        self.last_frame_time = 0
-        self.frame_interval = 1.0 / self.target_fps
+        # Frame rate (stream_fps), JPEG qualities etc. are read from
+        # runtime_config.settings per frame, so they change without a restart
         
-        # Processing queue for async gesture detection
-        self.frame_queue = deque(maxlen=2)  # Keep only latest 2 frames
+        # Async gesture detection always works on the newest frame in the ring
         self.processing_enabled = True
+        self._next_inference = 0.0           # max_inference_fps: earliest next MediaPipe call
+        self._camera_settings_version = runtime_config.version  # Applied by the capture thread
+        self._detector_settings_version = runtime_config.version  # Applied by the processing thread
+        
+        # Motion signs: trajectory matcher fed by the processing thread (None if no templates)
+        self.motion_recognizer = None
+        if MOTION_RECOGNITION_ENABLED:
+            self.motion_recognizer = load_motion_recognizer(
+                MOTION_TEMPLATE_PATH,
+                max_distance=MOTION_MAX_DISTANCE,
+                match_every=runtime_config.settings.motion_match_every,
+                fps=WEBCAM_FPS
+            )
+        runtime_config.subscribe(self._on_settings_changed)
+        self.motion_events = deque(maxlen=32)  # Recognized motion signs not yet committed
+        
+        # Landmark recording (written by the processing thread while set)
+        self.recorder = None
+        self.recorder_lock = threading.Lock()
     
     # ======================== CAMERA INITIALIZATION =============================
     
@@ -75,7 +130,7 @@ class CameraManager:
         """
         # Clean up any existing camera first
         if self.camera is not None:
-            print("[CAMERA] Cleaning up existing camera object before starting new one...")
+            log.info("Cleaning up existing camera object before starting new one...")
             try:
                 if self.camera.isOpened():
                     self.camera.release()
@@ -86,19 +141,25 @@ class CameraManager:
             self.index = None
         
         try:
-            print("[CAMERA] Attempting to open camera (indices 0-5)...")
+            if CAMERA_SOURCE:
+                # Stand-in source (frame_sources.py), reported as index 0
+                log.info("Opening camera source %r...", CAMERA_SOURCE)
+                candidates = [0]
+            else:
+                log.info("Attempting to open camera (indices 0-5)...")
+                # Try multiple camera indices to increase chance of finding available device
+                candidates = range(0, 6)
 
-            # Try multiple camera indices to increase chance of finding available device
-            for idx in range(0, 6):
+            for idx in candidates:
                 try:
-                    print(f"[CAMERA] Trying index {idx}...")
-                    cap = cv2.VideoCapture(idx)
+                    log.info(f"Trying index {idx}...")
+                    cap = open_source(CAMERA_SOURCE) if CAMERA_SOURCE else cv2.VideoCapture(idx)
                     if not cap or not cap.isOpened():
                         try:
                             cap.release()
                         except Exception:
                             pass
-                        print(f"[CAMERA] Index {idx} not opened")
+                        log.info(f"Index {idx} not opened")
                         continue
 
                     # Successfully opened candidate camera; set properties
@@ -106,19 +167,14 @@ class CameraManager:
                     self.index = idx
                     
                     # Try to set properties (some cameras may not support all properties)
-                    try:
-                        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, WEBCAM_WIDTH)
-                        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, WEBCAM_HEIGHT)
-                        self.camera.set(cv2.CAP_PROP_FPS, WEBCAM_FPS)
-                    except Exception as prop_error:
-                        print(f"[CAMERA] Warning: Could not set some camera properties: {prop_error}")
+                    self._apply_camera_settings()
 
                     # Give camera a moment to initialize
                     import time
                     time.sleep(0.3)
 
                     # Warm up the camera (more lenient - allow some failures)
-                    print(f"[CAMERA] Warming up camera at index {idx}...")
+                    log.info(f"Warming up camera at index {idx}...")
                     warmup_success_count = 0
                     warmup_attempts = 5  # Reduced from 10 to 5
                     
@@ -130,7 +186,7 @@ class CameraManager:
 
                     # Require at least 3 successful frames out of 5 (more lenient)
                     if warmup_success_count < 3:
-                        print(f"[CAMERA] Warning: Warmup insufficient for index {idx} ({warmup_success_count}/{warmup_attempts} frames succeeded), trying next index")
+                        log.warning(f"Warmup insufficient for index {idx} ({warmup_success_count}/{warmup_attempts} frames succeeded), trying next index")
                         try:
                             self.camera.release()
                         except Exception:
@@ -141,7 +197,7 @@ class CameraManager:
 
                     # Final check - verify camera is still open and can read
                     if not self.camera or not self.camera.isOpened():
-                        print(f"[CAMERA] Camera at index {idx} closed unexpectedly after warmup")
+                        log.info(f"Camera at index {idx} closed unexpectedly after warmup")
                         try:
                             if self.camera:
                                 self.camera.release()
@@ -154,7 +210,7 @@ class CameraManager:
                     # One final test read to confirm it's working
                     ret, test_frame = self.camera.read()
                     if not ret or test_frame is None:
-                        print(f"[CAMERA] Camera at index {idx} cannot read frames after warmup")
+                        log.info(f"Camera at index {idx} cannot read frames after warmup")
                         try:
                             self.camera.release()
                         except Exception:
@@ -166,21 +222,22 @@ class CameraManager:
                     # Success! Camera is ready
                     self.is_running = True
                     self.startup_time = time.time()
+                    self.frame_ring.open()
                     
                     # Start background frame capture thread for better performance
-                    self.capture_thread = threading.Thread(target=self._frame_capture_loop, daemon=True)
+                    self.capture_thread = threading.Thread(target=self._frame_capture_loop, name='frame-capture', daemon=True)
                     self.capture_thread.start()
                     
                     # Start background processing thread
-                    self.processing_thread = threading.Thread(target=self._frame_processing_loop, daemon=True)
+                    self.processing_thread = threading.Thread(target=self._frame_processing_loop, name='frame-processing', daemon=True)
                     self.processing_thread.start()
                     
-                    print(f"[CAMERA] ✅ Camera started successfully at index {idx}! (Warmup: {warmup_success_count}/{warmup_attempts} frames)")
-                    print("[CAMERA] Background frame capture and processing threads started")
+                    log.info(f"Camera started successfully at index {idx}! (Warmup: {warmup_success_count}/{warmup_attempts} frames)")
+                    log.info("Background frame capture and processing threads started")
                     return True
 
                 except Exception as e:
-                    print(f"[CAMERA] Exception while trying index {idx}: {e}")
+                    log.error(f"Exception while trying index {idx}: {e}")
                     try:
                         if cap:
                             cap.release()
@@ -191,20 +248,45 @@ class CameraManager:
                     continue
 
             # If we get here, no camera could be opened
-            print("[CAMERA] ❌ Error: Could not open any camera index 0-5!")
-            print("[CAMERA] Troubleshooting tips:")
-            print("  1. Check if camera is physically connected")
-            print("  2. Check if another app is using the camera")
-            print("  3. Ensure OS camera permissions are granted to apps")
-            print("  4. Restart your computer")
+            log.error("Could not open any camera index 0-5!")
+            log.info("Troubleshooting tips:\n"
+                     "  1. Check if camera is physically connected\n"
+                     "  2. Check if another app is using the camera\n"
+                     "  3. Ensure OS camera permissions are granted to apps\n"
+                     "  4. Restart your computer")
             return False
             
         except Exception as e:
-            print(f"[CAMERA ERROR] ❌ Failed to start camera: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("Failed to start camera: %s", e)
             return False
     
+    def _apply_camera_settings(self):
+        """Request resolution and frame rate from runtime settings (camera may ignore some)"""
+        self._camera_settings_version = runtime_config.version
+        settings = runtime_config.settings
+        try:
+            self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, settings.camera_width)
+            self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, settings.camera_height)
+            self.camera.set(cv2.CAP_PROP_FPS, settings.camera_fps)
+        except Exception as prop_error:
+            log.warning(f"Could not set some camera properties: {prop_error}")
+        
+        # Low-latency capture: keep as few frames as possible in the driver's buffer
+        if settings.capture_low_latency:
+            try:
+                supported = self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            except Exception:
+                supported = False
+            log.info("Low-latency capture: driver buffer size %s",
+                     "set to 1" if supported else "not supported (stale frames are drained instead)")
+    
+    def _on_settings_changed(self, settings, changed):
+        """Runtime settings reloaded: apply what is safe to apply from any thread"""
+        if self.motion_recognizer is not None:
+            self.motion_recognizer.match_every = settings.motion_match_every
+        # Camera properties and the MediaPipe detector are changed by their own
+        # threads, which notice the new runtime_config.version on their next step
+    
     # ======================== BACKGROUND FRAME CAPTURE (PERFORMANCE OPTIMIZATION) =============================
     
     def _frame_capture_loop(self):
@@ -212,32 +294,87 @@ class CameraManager:
         Background thread that continuously captures frames from camera.
         This prevents blocking and ensures smooth frame rate.
         """
+        self._last_read_time = None
         while self.is_running:
             try:
-                if not self.camera or not self.camera.isOpened():
-                    time.sleep(0.1)
-                    continue
-                
-                # Read frame from camera (fast operation)
-                ret, frame = self.camera.read()
-                
-                if ret and frame is not None:
-                    # Flip frame horizontally (mirror effect)
-                    frame = cv2.flip(frame, 1)
-                    
-                    # Update latest frame atomically
-                    with self.frame_lock:
-                        self.latest_frame = frame.copy()
-                        # Add to processing queue if processing is enabled
-                        if self.processing_enabled:
-                            self.frame_queue.append(frame.copy())
-                else:
-                    time.sleep(0.01)  # Small delay if frame read fails
-                    
+                # One iteration per call (looked up each time so profiling can wrap it)
+                self._capture_step()
             except Exception as e:
-                print(f"[CAMERA ERROR] Error in capture loop: {e}")
+                log.error("Error in capture loop: %s", e, exc_info=True)
                 time.sleep(0.1)
     
+    def _capture_step(self):
+        """Read one frame from the camera into the frame ring"""
+        if not self.camera or not self.camera.isOpened():
+            time.sleep(0.1)
+            return
+        
+        # New runtime settings: change resolution/fps in place (same thread as read)
+        if self._camera_settings_version != runtime_config.version:
+            self._apply_camera_settings()
+        
+        # Read frame from camera into our reusable buffer (fast operation);
+        # low-latency mode skips frames that have been waiting in the driver's buffer
+        if runtime_config.settings.capture_low_latency:
+            ret, frame = self._read_newest()
+        elif self._capture_buffer is None:
+            ret, frame = self.camera.read()
+        else:
+            ret, frame = self.camera.read(image=self._capture_buffer)
+        
+        if ret and frame is not None:
+            now = time.perf_counter()
+            if self._last_read_time is not None:
+                CAPTURE_INTERVAL.observe(now - self._last_read_time)
+            self._last_read_time = now
+            FRAMES_CAPTURED.inc()
+            
+            # How long the frame waited before we read it (from the source's frame timestamps)
+            waited = self.source_staleness.update(self.camera.get(cv2.CAP_PROP_POS_MSEC), time.monotonic())
+            if waited is not None:
+                CAPTURE_FRAME_AGE.observe(waited)
+            self.capture_staleness = waited
+            
+            # First frame, or the camera changed resolution: (re)allocate buffers
+            if frame is not self._capture_buffer:
+                self._capture_buffer = frame
+                self.frame_ring.ensure_shape(frame.shape, frame.dtype)
+            
+            # Flip horizontally (mirror effect) straight into a free ring slot
+            slot_index, slot = self.frame_ring.begin_write()
+            if slot_index is not None:
+                cv2.flip(frame, 1, dst=slot)
+                self.frame_ring.commit_write(slot_index, time.time() - (waited or 0.0))
+            else:
+                FRAMES_RING_FULL.inc()
+        else:
+            time.sleep(0.01)  # Small delay if frame read fails
+    
+    def _read_newest(self):
+        """
+        Grab until the newest frame, then decode only that one.
+        
+        A grab that returns at once took a frame that was already waiting in
+        the driver's buffer; one that had to wait for the camera got the
+        newest frame. Skipped frames are never decoded (grab() only).
+        
+        RETURNS: (ret, frame) like camera.read()
+        """
+        fresh_wait = 0.25 / max(1, runtime_config.settings.camera_fps)
+        drained = -1
+        while drained < MAX_DRAINED_FRAMES:
+            started = time.perf_counter()
+            if not self.camera.grab():
+                return False, None
+            drained += 1
+            if time.perf_counter() - started >= fresh_wait:
+                break
+        if drained:
+            FRAMES_DRAINED.inc(drained)
+        if self._capture_buffer is None:
+            return self.camera.retrieve()
+        return self.camera.retrieve(image=self._capture_buffer)
+    
     def _frame_processing_loop(self):
         """
         Background thread that processes frames for gesture detection.
@@ -245,28 +382,177 @@ class CameraManager:
         """
         while self.is_running:
             try:
-                # Process frames from queue
-                if self.frame_queue:
-                    frame = self.frame_queue.popleft()
-                    
-                    # Process frame for gesture detection (heavy operation)
-                    detection_results = gesture_recognizer.process_frame(frame)
-                    
-                    detected_gesture = None
-                    if detection_results['hand_landmarks']:
-                        detected_gesture = detection_results['gestures'][0] if detection_results['gestures'] else None
-                    
-                    # Update latest gesture and detection results atomically (for drawing)
-                    with self.frame_lock:
-                        self.latest_gesture = detected_gesture
-                        self.latest_detection_results = detection_results
-                else:
-                    time.sleep(0.05)  # Small delay if queue is empty
-                    
+                # One iteration per call (looked up each time so profiling can wrap it)
+                self._process_step()
             except Exception as e:
-                print(f"[CAMERA ERROR] Error in processing loop: {e}")
+                log.error("Error in processing loop: %s", e, exc_info=True)
                 time.sleep(0.1)
     
+    def _process_step(self):
+        """Run gesture detection on the newest unprocessed frame (waits for one)"""
+        # New runtime settings: rebuild the detector here, the only thread using it
+        if self._detector_settings_version != runtime_config.version:
+            self._detector_settings_version = runtime_config.version
+            gesture_recognizer.apply_settings(runtime_config.settings)
+        
+        # Inference rate cap (low-CPU profiles): wait, then take the newest frame
+        max_fps = runtime_config.settings.max_inference_fps
+        if max_fps:
+            delay = self._next_inference - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_inference = time.monotonic() + 1.0 / max_fps
+        
+        # Sleep until capture commits a frame we have not processed yet
+        if not self.frame_ring.wait_for_frame(self.last_processed_seq):
+            return  # Ring closed (camera stopping); loop condition handles exit
+        
+        # Borrow the newest frame (no copy)
+        with self.frame_ring.borrow(after_seq=self.last_processed_seq) as view:
+            if view is None:
+                return
+            if not self.processing_enabled:
+                self.last_processed_seq = view.seq  # Mark as seen so we sleep again
+                INFERENCES_SKIPPED.inc()
+                return
+            
+            # Frames captured while we were busy are simply skipped
+            if self.last_processed_seq:
+                skipped = view.seq - self.last_processed_seq - 1
+                self.frames_skipped += skipped
+                if skipped:
+                    FRAMES_NOT_PROCESSED.inc(skipped)
+            self.last_processed_seq = view.seq
+            
+            # Process frame for gesture detection (heavy operation)
+            started = time.perf_counter()
+            detection_results = gesture_recognizer.process_frame(view.frame)
+            PROCESS_FRAME_SECONDS.observe(time.perf_counter() - started)
+        
+        # Two-hand sign first, then the dominant hand (independent of MediaPipe's hand order)
+        detected_gesture = detection_results['gesture']
+        
+        # Follow each hand's trajectory (timestamped with the frame's capture time)
+        motion_events = ()
+        if self.motion_recognizer is not None:
+            motion_events = self.motion_recognizer.update(
+                [(hand['handedness'], hand['points']) for hand in detection_results['hands']],
+                view.timestamp
+            )
+        
+        # Keep what the recognizer saw for offline replay
+        with self.recorder_lock:
+            if self.recorder is not None:
+                self.recorder.add_results(view.timestamp, detection_results)
+        
+        # Results say which frame they come from (the newest frame may be newer)
+        detection_results['frame_seq'] = view.seq
+        detection_results['frame_timestamp'] = view.timestamp
+        RESULT_FRAME_AGE.observe(time.time() - view.timestamp)
+        
+        # Update latest gesture and detection results atomically, then wake consumers
+        with self.frame_lock:
+            self.latest_gesture = detected_gesture
+            self.latest_score = detection_results['score']
+            self.latest_detection_results = detection_results
+            self.result_seq = view.seq
+            self.result_timestamp = view.timestamp
+            self.motion_events.extend(motion_events)
+            self.frame_lock.notify_all()
+    
+    def wait_for_result(self, after_seq, timeout=None):
+        """
+        Block until detection results for a frame newer than after_seq exist.
+        
+        PARAMETERS:
+        - after_seq: Frame sequence of the last result the caller has seen
+        - timeout: Seconds to wait (None = until results arrive or camera stops)
+        
+        RETURNS: Frame sequence of the latest results (unchanged on timeout)
+        """
+        with self.frame_lock:
+            self.frame_lock.wait_for(
+                lambda: not self.is_running or self.result_seq > after_seq,
+                timeout
+            )
+            return self.result_seq
+    
+    def frame_ages(self, frame_seq=None, frame_timestamp=None):
+        """
+        How old the newest frame and the latest detection results are.
+        
+        PARAMETERS: frame_seq, frame_timestamp - The frame a response sends
+                    (default: the newest captured frame)
+        RETURNS: dict with frame_seq, frame_age_ms, result_seq, result_age_ms
+        """
+        if frame_seq is None:
+            frame_seq, frame_timestamp = self.frame_ring.latest()
+        with self.frame_lock:
+            result_seq, result_timestamp = self.result_seq, self.result_timestamp
+        return frame_ages(frame_seq, frame_timestamp, result_seq, result_timestamp)
+    
+    def get_latest_gesture(self):
+        """
+        Latest detected gesture without touching any frame.
+        
+        RETURNS: (frame available, gesture or None)
+        """
+        if not self.camera or not self.is_running:
+            return False, None
+        with self.frame_lock:
+            gesture = self.latest_gesture
+        return self.frame_ring.latest()[0] > 0, gesture
+    
+    def pop_motion_events(self):
+        """
+        Take all motion signs recognized since the last call.
+        
+        RETURNS: List of MotionEvent (gesture, start_time, end_time, confidence, hand)
+        """
+        with self.frame_lock:
+            events = list(self.motion_events)
+            self.motion_events.clear()
+        return events
+    
+    # ======================== LANDMARK RECORDING =============================
+    
+    def start_recording(self, name=None):
+        """
+        Start recording detection results (landmarks, handedness, gestures).
+        
+        PARAMETER: name - Recording folder name inside LANDMARK_RECORDING_DIR
+                          (default: current date and time)
+        RETURNS: Path of the recording directory
+        """
+        name = name or datetime.now().strftime('%Y%m%d_%H%M%S')
+        if os.path.basename(name) != name or name in ('.', '..'):
+            raise ValueError(f"Invalid recording name: {name!r}")
+        path = os.path.join(LANDMARK_RECORDING_DIR, name)
+        with self.recorder_lock:
+            if self.recorder is not None:
+                raise RuntimeError(f"Already recording to {self.recorder.path}")
+            self.recorder = LandmarkRecorder(path, metadata={
+                'camera_index': self.index,
+                'fps': WEBCAM_FPS,
+                'engine': gesture_recognizer.engine
+            })
+        log.info(f"Recording landmarks to {path}")
+        return path
+    
+    def stop_recording(self):
+        """
+        Stop recording and write the remaining frames.
+        
+        RETURNS: (path, frames recorded), or None if nothing was being recorded
+        """
+        with self.recorder_lock:
+            recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return None
+        recorder.close()
+        log.info(f"Recorded {recorder.frame_count} frames to {recorder.path}")
+        return recorder.path, recorder.frame_count
+    
     # ======================== FRAME CAPTURE AND PROCESSING =============================
     
     def get_frame_with_gesture(self, draw_landmarks=True):
@@ -277,7 +563,10 @@ class CameraManager:
         OPTIMIZATION:
         - Returns cached frame/gesture from background threads
         - No blocking MediaPipe processing here
-        - Draws landmarks/text on demand for display
+        - Borrows the newest ring slot while reading it
+        - With an overlay, draws into a reused per-thread buffer (that copy is
+          the only one); without, returns a copy (the slot is reused once the
+          borrow ends). Callers that only need the gesture use get_latest_gesture()
         
         PARAMETER:
         - draw_landmarks: Whether to draw hand landmarks (default True for video feed)
@@ -288,68 +577,47 @@ class CameraManager:
             return None, None
         
         try:
-            # Get latest frame, gesture, and detection results from cache (fast, non-blocking)
+            # Get latest gesture and detection results from cache (fast, non-blocking)
             with self.frame_lock:
-                if self.latest_frame is None:
-                    return None, None
-                
-                frame = self.latest_frame.copy()
                 detected_gesture = self.latest_gesture
                 detection_results = self.latest_detection_results  # Use cached results
             
-            # Only draw landmarks/text if requested (for video feed)
-            # Skip drawing for detection API calls to save time
-            if draw_landmarks and detection_results:
-                # Draw hand skeleton and landmarks only if hands detected (using cached results)
-                if detection_results.get('hand_landmarks'):
-                    for hand_landmarks in detection_results['hand_landmarks']:
-                        mp_drawing.draw_landmarks(
-                            frame,
-                            hand_landmarks,
-                            mp_hands.HAND_CONNECTIONS,
-                            mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2),
-                            mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2)
-                        )
-                
-                # Display gesture on frame if detected
-                if detected_gesture:
-                    cv2.putText(
-                        frame,
-                        f"ISL: {detected_gesture}",
-                        (20, 50),
-                        cv2.FONT_HERSHEY_SIMPLEX,
-                        1.2,
-                        (0, 255, 0),
-                        2
-                    )
-                else:
-                    cv2.putText(
-                        frame,
-                        "No ISL gesture detected",
-                        (20, 50),
-                        cv2.FONT_HERSHEY_SIMPLEX,
-                        1.0,
-                        (0, 0, 255),
-                        2
-                    )
+            with self.frame_ring.borrow() as view:
+                if view is None:
+                    return None, None
                 
-                # Add instruction text
-                cv2.putText(
-                    frame,
-                    "Make hand gestures in front of camera",
-                    (20, frame.shape[0] - 20),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.6,
-                    (255, 255, 255),
-                    1
-                )
+                frame = view.frame
+                # Only draw landmarks/text if requested (for video feed)
+                # Skip drawing for detection API calls to save time
+                if draw_landmarks:
+                    frame = self._draw_overlay(frame, detection_results, detected_gesture)
+                if frame is view.frame:
+                    frame = frame.copy()    # Still the ring slot: the capture thread will overwrite it
             
             return frame, detected_gesture
             
         except Exception as e:
-            print(f"[CAMERA ERROR] Error getting frame: {e}")
+            log.error("Error getting frame: %s", e)
             return None, None
     
+    def _draw_overlay(self, frame, detection_results, detected_gesture):
+        """
+        Frame with landmarks and text drawn, in this thread's scratch buffer
+        (drawing modifies pixels, so the ring slot is copied first). Uses
+        the shared OverlayRenderer (drawing specs and markers built once).
+        
+        RETURNS: The scratch buffer, or frame itself if there is nothing to draw
+        """
+        if not detection_results:
+            return frame
+        scratch = getattr(self._overlay_buffers, 'frame', None)
+        if scratch is None or scratch.shape != frame.shape:
+            scratch = np.empty_like(frame)
+            self._overlay_buffers.frame = scratch
+        np.copyto(scratch, frame)
+        overlay_renderer.render(scratch, detection_results, detected_gesture)
+        return scratch
+    
     # ======================== FRAME TO BASE64 CONVERSION =============================
     
     def frame_to_base64(self, frame):
@@ -375,7 +643,7 @@ class CameraManager:
         try:
             # Encode frame as JPEG
             # Why JPEG? Small file size, good quality, web-compatible
-            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+            buffer = jpeg_encoder.encode(frame, runtime_config.settings.snapshot_jpeg_quality, site='base64')
             
             # Convert bytes to base64 string
             frame_base64 = base64.b64encode(buffer).decode('utf-8')
@@ -383,7 +651,7 @@ class CameraManager:
             return frame_base64
             
         except Exception as e:
-            print(f"[CAMERA ERROR] Error converting frame to base64: {e}")
+            log.error("Error converting frame to base64: %s", e)
             return None
 
     def process_uploaded_frame_bytes(self, file_bytes):
@@ -402,7 +670,7 @@ class CameraManager:
             frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
 
             if frame is None:
-                print("[CAMERA] Uploaded image could not be decoded")
+                log.info("Uploaded image could not be decoded")
                 return None, None
 
             # Mirror for consistency with webcam frames
@@ -410,64 +678,118 @@ class CameraManager:
 
             # Run gesture detection on the uploaded frame
             detection_results = gesture_recognizer.process_frame(frame)
-            detected_gesture = detection_results['gestures'][0] if detection_results['gestures'] else None
+            detected_gesture = detection_results['gesture']
 
             return frame, detected_gesture
         except Exception as e:
-            print(f"[CAMERA ERROR] Error processing uploaded image bytes: {e}")
+            log.error("Error processing uploaded image bytes: %s", e)
             return None, None
     
     # ======================== STREAM GENERATOR =============================
     
-    def get_frame_stream(self):
+    def get_encoded_frame(self, tier):
+        """
+        Latest frame (with overlay) as JPEG in the requested tier.
+        Each tier is encoded once per captured frame and shared by all callers.
+        
+        The newest ring slot stays borrowed while it is encoded, so the
+        pixels, the cache key and the reported capture time are one frame.
+        
+        PARAMETER: tier - stream_tiers.Tier (width, quality)
+        RETURNS: EncodedFrame(seq, capture timestamp, JPEG bytes); data is None if no frame
+        """
+        if not self.camera or not self.is_running:
+            return EncodedFrame(0, 0.0, None)
+        with self.frame_ring.borrow() as view:
+            if view is None:
+                return EncodedFrame(0, 0.0, None)
+            
+            def render(width):
+                with self.frame_lock:
+                    detection_results = self.latest_detection_results
+                    detected_gesture = self.latest_gesture
+                return self._draw_overlay(view.frame, detection_results, detected_gesture)
+            
+            data = self.encoded_frames.get(view.seq, tier, render)
+            return EncodedFrame(view.seq, view.timestamp, data)
+    
+    def get_frame_stream(self, tier=None, auto=False):
         """
         Generator function for continuous video streaming (OPTIMIZED).
         
         OPTIMIZATIONS:
         - Uses cached frames from background thread (no blocking)
-        - FPS control to prevent overwhelming browser
-        - Lower JPEG quality for faster encoding
+        - Sleeps until the capture thread commits a new frame (no polling)
+        - FPS cap per stream to prevent overwhelming browser
+        - Encodings shared between viewers of the same tier (encoded once per frame)
+        - Frames older than stream_max_frame_age (e.g. after a capture stall
+          or a slow encode) are skipped, not sent late
+        
+        PARAMETERS:
+        - tier: stream_tiers.Tier for this viewer (None = 'full')
+        - auto: Choose the tier from the viewer's speed (tier = the largest allowed)
         
         YIELDS: MJPEG-formatted frame data
         """
         frame_skip_count = 0
+        last_seq = 0
+        last_sent_time = 0.0
+        fixed_tier = tier
+        adapter = TierAdapter(largest=tier.name if tier is not None and tier.name in TIER_LADDER else 'full') \
+            if auto else None
         
         while self.is_running:
             try:
-                # FPS control: ensure we don't exceed target frame rate
-                current_time = time.time()
-                elapsed = current_time - self.last_frame_time
+                # Wake up exactly when a new frame is captured (1s timeout to re-check state)
+                if not self.frame_ring.wait_for_frame(last_seq, timeout=1.0):
+                    if not self.is_running:
+                        break
+                    frame_skip_count += 1
+                    if frame_skip_count > 3:
+                        log.warning("No frames captured for 3 seconds")
+                        frame_skip_count = 0
+                    continue
                 
-                if elapsed < self.frame_interval:
-                    time.sleep(self.frame_interval - elapsed)
+                # FPS control: ensure we don't exceed target frame rate
+                settings = runtime_config.settings
+                elapsed = time.time() - last_sent_time
+                if elapsed < 1.0 / settings.stream_fps:
+                    time.sleep(1.0 / settings.stream_fps - elapsed)
+                last_sent_time = time.time()
                 
-                self.last_frame_time = time.time()
+                # This viewer's tier ('full' follows the runtime stream quality)
+                if adapter is not None:
+                    tier = resolve_tier(adapter.tier_name, default_quality=settings.stream_jpeg_quality)
+                else:
+                    tier = fixed_tier or resolve_tier('full', default_quality=settings.stream_jpeg_quality)
                 
-                # Get frame with drawings (for video feed)
-                frame, gesture = self.get_frame_with_gesture(draw_landmarks=True)
+                # Frame with drawings, JPEG-encoded once per tier and frame
+                encoded = self.get_encoded_frame(tier)
+                last_seq, frame_bytes = encoded.seq, encoded.data
+                if frame_bytes is None:
+                    continue
                 
-                if frame is None:
-                    frame_skip_count += 1
-                    if frame_skip_count > 30:
-                        print("[CAMERA] Warning: No frames captured for 30 cycles")
-                        frame_skip_count = 0
-                    time.sleep(0.033)  # ~30 FPS fallback
+                # Too old to be worth showing: wait for the next frame instead
+                age = time.time() - encoded.timestamp
+                if settings.stream_max_frame_age and age > settings.stream_max_frame_age:
+                    STREAM_FRAMES_STALE.inc()
                     continue
+                STREAM_FRAME_AGE.observe(age)
                 
                 frame_skip_count = 0
+                STREAM_BYTES_SENT.labels(tier.name).inc(len(frame_bytes))
                 
-                # Encode frame as JPEG bytes (optimized quality for speed)
-                _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
-                frame_bytes = buffer.tobytes()
-                
-                # Yield in proper MJPEG format
+                # Yield in proper MJPEG format (resumes once the viewer took the frame)
+                sent = time.perf_counter()
                 yield (b'--frame\r\n'
                        b'Content-Type: image/jpeg\r\n'
                        b'Content-Length: ' + str(len(frame_bytes)).encode() + b'\r\n\r\n'
                        + frame_bytes + b'\r\n')
+                if adapter is not None:
+                    adapter.record(time.perf_counter() - sent, 1.0 / settings.stream_fps)
                        
             except Exception as e:
-                print(f"[CAMERA ERROR] Error in frame stream: {e}")
+                log.error("Error in frame stream: %s", e, exc_info=True)
                 time.sleep(0.1)
                 continue
     
@@ -481,38 +803,50 @@ class CameraManager:
         If you don't, the camera stays locked and you can't use it again
         until you restart Python.
         """
-        # Stop background threads first
+        # Stop background threads first (wake any thread sleeping on new frames/results)
         self.is_running = False
+        self.frame_ring.close()
+        with self.frame_lock:
+            self.frame_lock.notify_all()
         
         # Wait for threads to finish (with timeout)
         if self.capture_thread and self.capture_thread.is_alive():
             self.capture_thread.join(timeout=1.0)
         if self.processing_thread and self.processing_thread.is_alive():
             self.processing_thread.join(timeout=1.0)
+        self.stop_recording()
         
         if self.camera:
             elapsed = None
             if self.startup_time:
                 elapsed = time.time() - self.startup_time
-                print(f"[CAMERA] Camera was running for {elapsed:.2f} seconds")
+                log.info(f"Camera was running for {elapsed:.2f} seconds")
             
             try:
                 self.camera.release()
-                print(f"[CAMERA] Camera released successfully at index {self.index}")
+                log.info(f"Camera released successfully at index {self.index}")
             except Exception as e:
-                print(f"[CAMERA] Error releasing camera: {e}")
+                log.error(f"Error releasing camera: {e}")
             
             self.index = None
             self.startup_time = None
             
             # Clear frame cache
             with self.frame_lock:
-                self.latest_frame = None
                 self.latest_gesture = None
+                self.latest_score = 0.0
                 self.latest_detection_results = None
-                self.frame_queue.clear()
+                self.result_seq = 0
+                self.result_timestamp = 0.0
+                self.motion_events.clear()
+            self.frame_ring.clear()
+            self.encoded_frames.clear()
+            self.source_staleness.reset()
+            self.capture_staleness = None
+            if self.motion_recognizer is not None:
+                self.motion_recognizer.reset()
             
-            print("[CAMERA] Camera stopped and resources released!")
+            log.info("Camera stopped and resources released!")
     
     # ======================== STATUS CHECK =============================
     
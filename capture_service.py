@@ -0,0 +1,261 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Capture Service
+# PURPOSE: The one process that owns the camera and runs recognition
+# EXPLANATION: For multi-worker serving the camera, MediaPipe and the
+#              stabilizer must exist exactly once - a camera can only be
+#              opened by one process. This service runs them and publishes
+#              into shared memory (shared_state.py):
+#              1. Each new frame while someone watches (a worker asked for a
+#                 frame in the last SHARED_VIEWER_IDLE_SECONDS): overlay
+#                 drawn, JPEG encoded ONCE, published (every web worker and
+#                 every viewer reuses that encoding). Without viewers frames
+#                 are only recognized, never drawn or encoded.
+#              2. Each new detection result: gesture, hands, recent commits
+#                 (at least every STATE_REPUBLISH_SECONDS; its id is a time
+#                 in milliseconds that web workers use as the live version
+#                 of /api/state, see state_feed.py)
+#              3. Every stabilizer_sample_seconds: the stabilizer runs here
+#                 (not per browser poll), commits go to the database
+#              4. Once a second: its own /metrics text
+#              Web workers (web_worker.py) ask it to start/stop the camera
+#              through the shared header; it checks that every loop.
+#              SIGHUP reloads the runtime settings (runtime_config.py)
+#              between two loop steps.
+#
+# USAGE:
+#     python capture_service.py
+#     gunicorn -w 4 -k gthread --threads 8 'web_worker:create_app()'
+# ============================================================================
+
+import json
+import signal
+import threading
+import time
+from collections import deque
+
+from config import SHARED_VIEWER_IDLE_SECONDS
+from app_logging import setup_logging, get_logger
+
+setup_logging()
+
+from database import initialize_database, save_prediction
+from camera_module import CameraManager, gesture_recognizer
+from stabilizer import GestureStabilizer
+from shared_state import SharedState
+from metrics import REGISTRY, GESTURES_COMMITTED
+from stream_tiers import Tier
+from runtime_config import runtime_config, RuntimeConfigError
+
+log = get_logger('capture_service')
+
+RECENT_COMMITS = 20             # Commits kept in the shared state (workers report new ones)
+METRICS_INTERVAL = 1.0          # Seconds between /metrics text updates
+STATE_REPUBLISH_SECONDS = 1.0   # State published at least this often (a fresh id after a stall)
+CONTROL_INTERVAL = 0.05         # Longest wait for a frame before checking requests again
+
+
+# ======================== CAPTURE SERVICE =============================
+
+class CaptureService:
+    """
+    Runs the camera pipeline and publishes its output to shared memory.
+    run() loops until stop() is called (or SIGTERM/SIGINT in main()).
+    """
+
+    def __init__(self, shared, camera_manager=None):
+        self.shared = shared
+        self.camera_manager = camera_manager or CameraManager()
+        self.stabilizer = GestureStabilizer(
+            **runtime_config.settings.stabilizer_options(),
+            on_commit=lambda gesture, confidence: save_prediction(gesture, confidence=confidence)
+        )
+        runtime_config.subscribe(lambda settings, changed: self.stabilizer.configure(**settings.stabilizer_options()))
+        self.commits = deque(maxlen=RECENT_COMMITS)
+        self.commit_seq = 0
+        self.state_version = 0
+        self._state_published = 0.0
+        self._stop = threading.Event()
+        self._reload = threading.Event()
+        self._request_counter = None
+        self._frame_seq = 0
+        self._result_seq = 0
+        self._next_sample = 0.0
+        self._next_metrics = 0.0
+
+    def stop(self):
+        self._stop.set()
+
+    def request_reload(self):
+        """Reload the runtime settings before the next loop step (safe in a signal handler)"""
+        self._reload.set()
+
+    def _reload_now(self):
+        self._reload.clear()
+        try:
+            runtime_config.reload()
+        except RuntimeConfigError as e:
+            log.error("Runtime settings not reloaded: %s", e)
+
+    def run(self):
+        log.info("Capture service running, publishing to shared memory %r", self.shared.shm.name)
+        self._publish_state()
+        try:
+            while not self._stop.is_set():
+                self._step()
+        finally:
+            if self.camera_manager.is_running:
+                self.camera_manager.stop_camera()
+            self.shared.set_camera_status(False, None)
+            self._publish_state()
+            log.info("Capture service stopped")
+
+    def _step(self):
+        """One loop iteration: requests, then any new frame/results/commits"""
+        now = time.monotonic()
+        self.shared.heartbeat()
+        if self._reload.is_set():
+            self._reload_now()
+        self._handle_camera_request()
+
+        manager = self.camera_manager
+        if manager.is_running:
+            # Sleep until a new frame is captured (bounded, to keep answering requests)
+            if manager.frame_ring.wait_for_frame(self._frame_seq, timeout=CONTROL_INTERVAL):
+                if self.shared.viewer_age() < SHARED_VIEWER_IDLE_SECONDS:
+                    self._publish_frame()
+                else:
+                    self._frame_seq = manager.frame_ring.latest()[0]   # Nobody watching: seen, not encoded
+            if manager.result_seq > self._result_seq:
+                self._result_seq = manager.result_seq
+                self._publish_state()
+            if now >= self._next_sample:
+                self._next_sample = now + runtime_config.settings.stabilizer_sample_seconds
+                if self._run_stabilizer():
+                    self._publish_state()
+        else:
+            self._stop.wait(CONTROL_INTERVAL)
+        if now - self._state_published >= STATE_REPUBLISH_SECONDS:
+            self._publish_state()
+
+        if now >= self._next_metrics:
+            self._next_metrics = now + METRICS_INTERVAL
+            self.shared.publish_metrics(REGISTRY.render().encode('utf-8'))
+
+    def _handle_camera_request(self):
+        start, counter = self.shared.camera_request()
+        if counter == self._request_counter:
+            return
+        self._request_counter = counter
+        manager = self.camera_manager
+        if start and not manager.is_running:
+            log.info("Starting camera (requested by a web worker)")
+            if manager.start_camera():
+                self.stabilizer.reset()
+                self._frame_seq = self._result_seq = 0
+        elif not start and manager.is_running:
+            log.info("Stopping camera (requested by a web worker)")
+            manager.stop_camera()
+        self.shared.set_camera_status(manager.is_running, manager.index)
+        self._publish_state()
+
+    def _publish_frame(self):
+        """Encode the newest frame (with overlay) once and publish it"""
+        tier = Tier('shared', None, runtime_config.settings.stream_jpeg_quality)
+        seq, captured, data = self.camera_manager.get_encoded_frame(tier)
+        if data is not None:
+            self.shared.publish_frame(data, seq, captured)
+        self._frame_seq = max(self._frame_seq, seq)     # Not retried if it could not be encoded
+
+    def _run_stabilizer(self):
+        """
+        Feed the latest gesture (and motion signs) to the stabilizer.
+
+        RETURNS: True if anything was committed
+        """
+        manager = self.camera_manager
+        with manager.frame_lock:
+            gesture, score = manager.latest_gesture, manager.latest_score
+        committed = False
+        update = self.stabilizer.update(gesture, score=score)
+        if update.saved:
+            self._record_commit(update.stable_gesture, update.buffer_confidence, 'static')
+            committed = True
+        for event in manager.pop_motion_events():
+            if self.stabilizer.submit_event(event.gesture, event.start_time, event.end_time, event.confidence):
+                self._record_commit(event.gesture, event.confidence, 'motion')
+                committed = True
+        return committed
+
+    def _record_commit(self, gesture, confidence, kind):
+        GESTURES_COMMITTED.labels(kind).inc()
+        self.commit_seq += 1
+        self.commits.append({
+            'id': self.commit_seq,
+            'gesture': gesture,
+            'confidence': round(float(confidence), 3),
+            'kind': kind,
+            'time': time.time()
+        })
+
+    def _publish_state(self):
+        """Latest results, camera status and recent commits as JSON"""
+        manager = self.camera_manager
+        with manager.frame_lock:
+            results = manager.latest_detection_results if manager.is_running else None
+            result_timestamp = manager.result_timestamp
+        hands = []
+        if results:
+            hands = [{'handedness': hand['handedness'], 'gesture': hand['gesture'], 'role': hand.get('role')}
+                     for hand in results['hands']]
+        running, index = manager.is_running, manager.index
+        # Milliseconds, never repeating: comparable with other workers' and
+        # after a restart (web workers version /api/state with it)
+        self.state_version = max(self.state_version + 1, int(time.time() * 1000))
+        self._state_published = time.monotonic()
+        state = {
+            'camera_running': running,
+            'camera_index': index,
+            'result_seq': self._result_seq,
+            'result_timestamp': result_timestamp,      # Capture time of the results' frame
+            'gesture': results['gesture'] if results else None,
+            'joint_gesture': results['joint_gesture'] if results else None,
+            'gestures': results['gestures'] if results else [],
+            'hands': hands,
+            'commit_seq': self.commit_seq,
+            'commits': list(self.commits),
+            'timestamp': time.time()
+        }
+        self.shared.publish_state(json.dumps(state).encode('utf-8'), self.state_version, state['timestamp'])
+
+
+# ======================== MAIN =============================
+
+def main():
+    initialize_database()
+    shared = SharedState.create()
+    service = CaptureService(shared)
+
+    def handle_signal(signum, frame):
+        log.info("Signal %s received, shutting down", signum)
+        service.stop()
+
+    def handle_reload(signum, frame):
+        # Only a flag: the signal may interrupt the main thread anywhere,
+        # even inside a reload or a stabilizer update
+        service.request_reload()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, handle_reload)
+    try:
+        service.run()
+    finally:
+        if gesture_recognizer is not None:
+            gesture_recognizer.close()
+        shared.close()
+
+
+if __name__ == '__main__':
+    main()
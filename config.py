@@ -18,9 +18,14 @@ SECRET_KEY = 'sign_language_converter_secret_key_2024'  # Used for session secur
 
 # ======================== DATABASE CONFIGURATION =============================
 # SQLite database settings
-DATABASE_PATH = os.path.join(BASE_DIR, 'sign_language_database.db')
+DATABASE_PATH = os.environ.get('SIGNLANG_DATABASE', os.path.join(BASE_DIR, 'sign_language_database.db'))
 # SQLite is lightweight and doesn't need a server - perfect for college projects
 
+# Bulk upload of signs committed on edge devices: POST /api/ingest (ingest.py)
+INGEST_TOKEN = os.environ.get('SIGNLANG_INGEST_TOKEN')  # X-Ingest-Token header; unset = local uploads only
+INGEST_MAX_BYTES = 32 * 1024 * 1024     # Largest request body
+INGEST_CHUNK_ROWS = 5000                # Rows per transaction
+
 # ======================== UPLOAD FOLDER CONFIGURATION =============================
 # Folder where captured frames will be stored (optional)
 UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
@@ -52,3 +57,139 @@ GESTURE_LIST = [
 WEBCAM_WIDTH = 640   # Resolution width
 WEBCAM_HEIGHT = 480  # Resolution height
 WEBCAM_FPS = 30      # Frames per second
+CAMERA_SOURCE = os.environ.get('SIGNLANG_CAMERA_SOURCE', '')  # '' = webcam; 'synthetic' or 'file:PATH' (frame_sources.py)
+CAPTURE_LOW_LATENCY = 0         # 1 = smallest driver buffer, skip frames that waited in it (grab/retrieve)
+STREAM_FPS = 30                 # Most frames per second sent to each /video_feed viewer
+STREAM_MAX_FRAME_AGE = 0.5      # /video_feed skips frames captured longer ago than this (seconds, 0 = never)
+STREAM_JPEG_QUALITY = 70        # /video_feed (and the shared frame in capture_service.py)
+FRAME_JPEG_QUALITY = 65         # /api/frame
+SNAPSHOT_JPEG_QUALITY = 90      # Single snapshots (CameraManager.frame_to_base64)
+MAX_INFERENCE_FPS = 0           # Most frames per second sent to MediaPipe (0 = every new frame)
+HAND_MODEL_COMPLEXITY = 1       # MediaPipe hand model: 0 = lite (faster), 1 = full
+
+# Preview tiers viewers can ask for: /video_feed?tier=thumb, /api/frame?tier=small
+# (or ?width=&quality=, or ?tier=auto on /video_feed). Each tier is encoded at
+# most once per frame, however many viewers use it (stream_tiers.py).
+STREAM_TIERS = {
+    'full': {'width': None, 'quality': None},   # Camera resolution, quality from runtime settings
+    'medium': {'width': 480, 'quality': 60},
+    'small': {'width': 320, 'quality': 55},
+    'thumb': {'width': 160, 'quality': 50},
+}
+STREAM_MIN_WIDTH = 64            # Smallest width a viewer may ask for
+STREAM_AUTO_DOWN_BUSY = 0.8      # tier=auto: step down when sending takes this share of the frame interval
+STREAM_AUTO_UP_BUSY = 0.3        # ...and step up again when below this share...
+STREAM_AUTO_UP_SECONDS = 3.0     # ...for this many seconds
+
+# JPEG encoding of every streamed/snapshot frame (jpeg_encoder.py).
+# Compare on the target machine: python tools/bench_jpeg_encoder.py
+JPEG_ENCODER_BACKEND = os.environ.get('SIGNLANG_JPEG_BACKEND', 'auto')  # 'auto', 'turbojpeg' (PyTurboJPEG) or 'opencv'
+JPEG_SUBSAMPLING = '420'         # Chroma subsampling: '420' (smallest), '422', '444' (sharpest colour edges)
+JPEG_FAST_DCT = False            # Faster, slightly less accurate DCT (turbojpeg backend only)
+JPEG_ENCODER_THREADS = 0         # Encode on a pool of N threads (0 = in request threads, -1 = min(4, CPUs))
+
+# ======================== TWO-HAND SIGN CONFIGURATION =============================
+# Signer's dominant hand as MediaPipe reports it ('Right' or 'Left').
+# Hands are listed dominant first, and the dominant hand's gesture is used
+# when no two-hand sign (two_hand_rules.py) matches.
+DOMINANT_HAND = 'Right'
+
+# ======================== CLASSIFIER ENGINE CONFIGURATION =============================
+# Which engine turns hand landmarks into gesture names:
+# 'rules'     - Hand-written rule table (gesture_rules.py), needs no data
+# 'templates' - Nearest labeled example (template_classifier.py), scales to
+#               hundreds of signs; build the file with tools/build_templates.py
+CLASSIFIER_ENGINE = 'rules'
+TEMPLATE_LIBRARY_PATH = os.path.join(BASE_DIR, 'gesture_templates.npz')
+TEMPLATE_MIN_CONFIDENCE = 0.5  # Matches below this confidence count as "no gesture"
+TEMPLATE_INDEX = 'numpy'       # 'numpy' (flat, fastest for hand features) or 'kdtree' (needs SciPy)
+
+# ======================== MOTION SIGN CONFIGURATION =============================
+# Signs defined by a movement are matched over landmark trajectories
+# (motion_recognizer.py). Disabled automatically if the template file is missing.
+MOTION_RECOGNITION_ENABLED = True
+MOTION_TEMPLATE_PATH = os.path.join(BASE_DIR, 'motion_templates.npz')
+MOTION_MAX_DISTANCE = 0.6      # Average per-step trajectory distance allowed for a match
+MOTION_MATCH_EVERY = 3         # Try matching every Nth frame per hand (bounds CPU use)
+
+# ======================== STABLE GESTURE DETECTION CONFIGURATION =============================
+# A sign is committed to the history when it wins a majority vote over recent
+# samples AND stays stable long enough (stabilizer.py); "no gesture" must
+# last a moment before the same sign can be committed again.
+# Compare settings on simulated signing: python tools/simulate_stabilizer.py
+DETECTION_BUFFER_SIZE = 10          # ~2 seconds at one sample every 200ms
+MIN_SIGN_STABLE_SECONDS = 1.5       # How long a gesture must be stable before registering
+MIN_NO_GESTURE_SECONDS = 0.5        # How long "no gesture" must be stable to reset state
+BUFFER_MIN_CONFIDENCE = 0.6         # Minimum majority ratio to consider buffer stable
+EARLY_COMMIT_EVIDENCE = 4.5         # Commit a clearly held sign early at this evidence (0 = off; see stabilizer.py)
+STABILIZER_SAMPLE_SECONDS = 0.2     # app.py and capture_service.py sample the latest gesture this often
+
+# ======================== LANDMARK RECORDING CONFIGURATION =============================
+# Live sessions can be recorded as landmarks (landmark_recording.py) and
+# replayed later without MediaPipe: tools/replay_landmarks.py
+LANDMARK_RECORDING_DIR = os.path.join(BASE_DIR, 'recordings')
+
+# ======================== PROFILING CONFIGURATION =============================
+# Time-boxed profiling of the live pipeline (profiling.py), started with
+# POST /admin/profile or at startup with the environment switch, e.g.
+#   SIGNLANG_PROFILE=cprofile:30 python app.py   (or 'sample', 'sample:10')
+PROFILING_DIR = os.environ.get('SIGNLANG_PROFILING_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILING_SWITCH = os.environ.get('SIGNLANG_PROFILE', '')
+PROFILING_DEFAULT_SECONDS = 15
+PROFILING_MAX_SECONDS = 120
+
+# Admin endpoints (/admin/...) need this token in the X-Admin-Token header.
+# Without a token they only answer requests from this machine.
+ADMIN_TOKEN = os.environ.get('SIGNLANG_ADMIN_TOKEN')
+
+# ======================== LOGGING CONFIGURATION =============================
+# All server logging goes through a queue to a background writer
+# (app_logging.py), so slow terminals or log pipes never block the camera
+# or recognition threads.
+LOG_LEVEL = os.environ.get('SIGNLANG_LOG_LEVEL', 'INFO')   # DEBUG, INFO, WARNING, ERROR
+LOG_LEVELS = {                  # Per-subsystem overrides (logger name -> level)
+    'database': 'INFO',         # DEBUG also logs every saved prediction
+    'frame': 'INFO',            # DEBUG logs periodic /api/frame activity
+    'werkzeug': 'INFO',         # Flask request log
+}
+LOG_FORMAT = 'text'             # 'text' ([TAG] lines) or 'json' (one object per line)
+LOG_FILE = None                 # Also write to this file (None = stdout only)
+LOG_QUEUE_SIZE = 10000          # Records waiting for the writer; more are dropped, not waited for
+LOG_RATE_LIMIT_BURST = 5        # Same message passes this many times per window...
+LOG_RATE_LIMIT_WINDOW = 10.0    # ...seconds; further repeats are counted and summarized
+
+# ======================== HTTP CACHING CONFIGURATION =============================
+# Read APIs answer 304 Not Modified while the database is unchanged; JSON,
+# HTML, CSS and JS are compressed; static files get fingerprinted URLs that
+# browsers cache without asking again (http_cache.py).
+HTTP_COMPRESS_MIN_BYTES = 512    # Smaller responses are sent uncompressed
+HTTP_GZIP_LEVEL = 6              # 1 (fastest) .. 9 (smallest)
+STATIC_MAX_AGE = 365 * 24 * 3600  # Seconds browsers keep fingerprinted static files
+
+# ======================== DASHBOARD STATE (LONG-POLL) CONFIGURATION =============================
+# The dashboard waits on GET /api/state?since=<version> (state_feed.py)
+# instead of polling the frame, gesture, history and statistics routes
+STATE_POLL_TIMEOUT = 25.0        # Longest a /api/state request is held without changes (seconds)
+STATE_DATA_CHECK_SECONDS = 0.5   # How often the database's data version is checked while clients wait
+STATE_RECENT_PREDICTIONS = 10    # History entries sent with the state
+STATE_IDLE_SECONDS = 60.0        # No /api/state request for this long: stop checking the database
+
+# ======================== MULTI-PROCESS SERVING CONFIGURATION =============================
+# capture_service.py (one process: camera + recognition) publishes frames and
+# results into shared memory; web_worker.py processes serve them, e.g.
+#   python capture_service.py &
+#   gunicorn -w 4 -k gthread --threads 8 'web_worker:create_app()'
+SHARED_STATE_NAME = os.environ.get('SIGNLANG_SHARED_STATE', 'signlang')
+SHARED_FRAME_BYTES = 4 * 1024 * 1024      # Largest encoded (JPEG) frame
+SHARED_STATE_BYTES = 256 * 1024           # Detection results + recent commits (JSON)
+SHARED_METRICS_BYTES = 256 * 1024         # Capture service's /metrics text
+SHARED_VIEWER_IDLE_SECONDS = 2.0          # No frame requested for this long: the service stops encoding
+
+# ======================== RUNTIME PERFORMANCE PROFILES =============================
+# The camera, stream, inference and stabilizer settings above are the
+# 'balanced' profile. runtime_config.py applies a profile plus overrides on
+# top and can change them while the server runs (POST /admin/runtime_config):
+#   SIGNLANG_PERF_PROFILE=low-cpu python app.py     ('balanced', 'low-latency', 'low-cpu')
+#   SIGNLANG_STREAM_JPEG_QUALITY=60 python app.py   (any setting: SIGNLANG_<NAME>)
+RUNTIME_PROFILE = 'balanced'
+RUNTIME_CONFIG_FILE = os.environ.get('SIGNLANG_RUNTIME_CONFIG', os.path.join(BASE_DIR, 'runtime_config.json'))
@@ -11,8 +11,13 @@
 # ============================================================================
 
 import sqlite3
+import time
 from datetime import datetime
-from config import DATABASE_PATH
+from config import DATABASE_PATH, INGEST_CHUNK_ROWS
+from metrics import DB_WRITE_SECONDS, DB_WRITE_ERRORS
+from app_logging import get_logger
+
+log = get_logger('database')
 
 # ======================== DATABASE INITIALIZATION =============================
 
@@ -41,12 +46,85 @@ def initialize_database():
             )
         ''')
         
+        # Create 'meta' table: one row per setting
+        # - data_version: increases on every write to predictions, so read
+        #   APIs can answer "nothing changed" (HTTP 304) without querying
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0)")
+        
+        # Bring older database files up to date (columns and indexes added later)
+        _migrate(cursor)
+        
         connection.commit()
         connection.close()
-        print("[DATABASE] Database initialized successfully!")
+        log.info("Database initialized successfully!")
+        
+    except sqlite3.Error as e:
+        log.error(f"Failed to initialize database: {e}")
+
+
+# ======================== SCHEMA MIGRATIONS =============================
+# Applied in order by initialize_database(); meta.schema_version counts how
+# many have run, so each runs once per database file. The INSERT into meta
+# takes the write lock first, so processes starting together (capture
+# service and web workers) cannot run the same migration twice.
+
+MIGRATIONS = [
+    # 1: Signs uploaded by edge devices (POST /api/ingest). device_id and
+    #    event_id are NULL for signs committed by this server; the unique
+    #    index makes re-uploads idempotent (NULLs never collide). The
+    #    timestamp index keeps "latest N" queries fast as uploads grow the table.
+    (
+        "ALTER TABLE predictions ADD COLUMN device_id TEXT",
+        "ALTER TABLE predictions ADD COLUMN event_id TEXT",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_predictions_device_event ON predictions (device_id, event_id)",
+        "CREATE INDEX IF NOT EXISTS idx_predictions_device_time ON predictions (device_id, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions (timestamp)",
+    ),
+]
+
+
+def _migrate(cursor):
+    """Run the migrations this database has not had yet (inside the caller's transaction)"""
+    cursor.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', 0)")
+    version = cursor.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()[0]
+    for number, statements in enumerate(MIGRATIONS[version:], version + 1):
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.execute("UPDATE meta SET value = ? WHERE key = 'schema_version'", (number,))
+        log.info("Database migrated to schema version %d", number)
+
+
+# ======================== DATA VERSION =============================
+
+def _bump_data_version(cursor):
+    """Increase data_version (call inside the transaction that changes predictions)"""
+    cursor.execute("UPDATE meta SET value = value + 1 WHERE key = 'data_version'")
+
+
+def get_data_version():
+    """
+    Current data version: changes whenever predictions are added or cleared,
+    by any process using this database.
+    
+    RETURNS: int, or None if it could not be read
+    """
+    try:
+        connection = sqlite3.connect(DATABASE_PATH)
+        try:
+            row = connection.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+        finally:
+            connection.close()
+        return row[0] if row else None
         
     except sqlite3.Error as e:
-        print(f"[DATABASE ERROR] Failed to initialize database: {e}")
+        log.error("Failed to read data version: %s", e)
+        return None
 
 
 # ======================== INSERT OPERATIONS =============================
@@ -61,6 +139,7 @@ def save_prediction(gesture, confidence=None):
     
     RETURNS: True if saved successfully, False otherwise
     """
+    started = time.perf_counter()
     try:
         connection = sqlite3.connect(DATABASE_PATH)
         cursor = connection.cursor()
@@ -70,18 +149,61 @@ def save_prediction(gesture, confidence=None):
             INSERT INTO predictions (gesture, confidence)
             VALUES (?, ?)
         ''', (gesture, confidence))
+        _bump_data_version(cursor)
         
         connection.commit()
         connection.close()
+        DB_WRITE_SECONDS.observe(time.perf_counter() - started)
         
-        print(f"[DATABASE] Saved gesture: {gesture}")
+        log.debug("Saved gesture: %s", gesture)
         return True
         
     except sqlite3.Error as e:
-        print(f"[DATABASE ERROR] Failed to save prediction: {e}")
+        DB_WRITE_ERRORS.inc()
+        log.error("Failed to save prediction: %s", e)
         return False
 
 
+def ingest_events(rows, chunk_size=INGEST_CHUNK_ROWS):
+    """
+    Bulk-insert signs uploaded by edge devices.
+    
+    Rows are written with executemany, chunk_size rows per transaction, on
+    one connection. A row whose (device_id, event_id) is already stored is
+    skipped, so a device can upload the same batch again after a failure.
+    
+    PARAMETERS:
+    - rows: List of (device_id, event_id, gesture, timestamp, confidence);
+      timestamp as 'YYYY-MM-DD HH:MM:SS[.SSS]' UTC text (like CURRENT_TIMESTAMP)
+    - chunk_size: Rows per transaction
+    
+    RETURNS: Number of rows inserted (the others were already stored)
+    RAISES: sqlite3.Error if a chunk could not be written (earlier chunks stay)
+    """
+    started = time.perf_counter()
+    inserted = 0
+    connection = sqlite3.connect(DATABASE_PATH)
+    try:
+        for start in range(0, len(rows), chunk_size):
+            with connection:        # One transaction per chunk (rolled back on error)
+                cursor = connection.executemany('''
+                    INSERT OR IGNORE INTO predictions (device_id, event_id, gesture, timestamp, confidence)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', rows[start:start + chunk_size])
+                if cursor.rowcount > 0:
+                    inserted += cursor.rowcount
+                    _bump_data_version(cursor)
+    except sqlite3.Error as e:
+        DB_WRITE_ERRORS.inc()
+        log.error("Failed to ingest events (%d of %d rows inserted): %s", inserted, len(rows), e)
+        raise
+    finally:
+        connection.close()
+    
+    log.debug("Ingested %d of %d rows in %.3f s", inserted, len(rows), time.perf_counter() - started)
+    return inserted
+
+
 # ======================== RETRIEVE OPERATIONS =============================
 
 def get_all_predictions():
@@ -97,7 +219,7 @@ def get_all_predictions():
         
         # Select all predictions ordered by newest first
         cursor.execute('''
-            SELECT id, gesture, timestamp, confidence
+            SELECT id, gesture, timestamp, confidence, device_id
             FROM predictions
             ORDER BY timestamp DESC
         ''')
@@ -108,16 +230,17 @@ def get_all_predictions():
         return predictions
         
     except sqlite3.Error as e:
-        print(f"[DATABASE ERROR] Failed to retrieve predictions: {e}")
+        log.error(f"Failed to retrieve predictions: {e}")
         return []
 
 
-def get_recent_predictions(limit=10):
+def get_recent_predictions(limit=10, device_id=None):
     """
     Retrieve recent predictions (last N records).
     
     PARAMETERS:
     - limit (int): How many recent records to retrieve
+    - device_id (str): Only signs uploaded by this edge device (optional)
     
     RETURNS: List of recent predictions
     """
@@ -126,12 +249,21 @@ def get_recent_predictions(limit=10):
         connection.row_factory = sqlite3.Row
         cursor = connection.cursor()
         
-        cursor.execute('''
-            SELECT id, gesture, timestamp, confidence
-            FROM predictions
-            ORDER BY timestamp DESC
-            LIMIT ?
-        ''', (limit,))
+        if device_id is None:
+            cursor.execute('''
+                SELECT id, gesture, timestamp, confidence, device_id
+                FROM predictions
+                ORDER BY timestamp DESC
+                LIMIT ?
+            ''', (limit,))
+        else:
+            cursor.execute('''
+                SELECT id, gesture, timestamp, confidence, device_id
+                FROM predictions
+                WHERE device_id = ?
+                ORDER BY timestamp DESC
+                LIMIT ?
+            ''', (device_id, limit))
         
         predictions = [dict(row) for row in cursor.fetchall()]
         connection.close()
@@ -139,7 +271,7 @@ def get_recent_predictions(limit=10):
         return predictions
         
     except sqlite3.Error as e:
-        print(f"[DATABASE ERROR] Failed to retrieve recent predictions: {e}")
+        log.error(f"Failed to retrieve recent predictions: {e}")
         return []
 
 
@@ -181,7 +313,7 @@ def get_prediction_statistics():
         }
         
     except sqlite3.Error as e:
-        print(f"[DATABASE ERROR] Failed to get statistics: {e}")
+        log.error(f"Failed to get statistics: {e}")
         return {}
 
 
@@ -198,15 +330,16 @@ def clear_all_predictions():
         # Delete all records
         cursor.execute('DELETE FROM predictions')
         rows_deleted = cursor.rowcount
+        _bump_data_version(cursor)
         connection.commit()
         connection.close()
         
-        print(f"[DATABASE] All predictions cleared! ({rows_deleted} rows deleted)")
+        log.info(f"All predictions cleared! ({rows_deleted} rows deleted)")
         return True
         
     except sqlite3.Error as e:
-        print(f"[DATABASE ERROR] Failed to clear predictions: {e}")
+        log.error(f"Failed to clear predictions: {e}")
         return False
     except Exception as e:
-        print(f"[DATABASE ERROR] Unexpected error clearing predictions: {e}")
+        log.error(f"Unexpected error clearing predictions: {e}")
         return False
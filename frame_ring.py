@@ -0,0 +1,234 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Preallocated Frame Ring Buffer
+# PURPOSE: Share camera frames between threads without copying them
+# EXPLANATION: The capture thread used to allocate a brand new ~900 KB array
+#              for every flip and every copy it handed out. This module keeps
+#              a small, fixed set of NumPy "slots" instead:
+#              1. Capture writes each new frame straight into a free slot
+#              2. Every committed frame gets an increasing sequence number
+#              3. Processing and readers "borrow" a slot by sequence number
+#              4. A borrowed (pinned) slot is never overwritten
+#              5. Consumers sleep on a condition variable until a newer
+#                 sequence number is committed (no polling)
+#              After warm-up the ring allocates nothing per frame.
+#              Every frame keeps its capture time, so results, API
+#              responses and streams can report how old their frame is.
+# ============================================================================
+
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+
+# A borrowed frame: sequence number, capture timestamp and a read-only view
+FrameView = namedtuple('FrameView', ['seq', 'timestamp', 'frame'])
+
+
+def frame_ages(frame_seq, frame_timestamp, result_seq, result_timestamp, now=None):
+    """
+    Staleness fields for API responses.
+
+    PARAMETERS:
+    - frame_seq, frame_timestamp: Frame being returned (sequence, capture time)
+    - result_seq, result_timestamp: Frame the detection results come from
+    - now: Current time (default time.time(); capture times are time.time())
+
+    RETURNS: dict with frame_seq, frame_age_ms, result_seq, result_age_ms
+             (age = time since capture; None when there is no such frame)
+    """
+    if now is None:
+        now = time.time()
+    return {
+        'frame_seq': frame_seq or None,
+        'frame_age_ms': round((now - frame_timestamp) * 1000, 1) if frame_seq else None,
+        'result_seq': result_seq or None,
+        'result_age_ms': round((now - result_timestamp) * 1000, 1) if result_seq else None,
+    }
+
+
+class FrameRing:
+    """
+    Fixed-size ring of preallocated frame slots.
+
+    HOW IT WORKS:
+    - begin_write() hands the capture thread a free slot to fill in place
+    - commit_write() publishes the slot with the next sequence number
+    - borrow() pins the newest slot while a reader uses it (no copy)
+    - wait_for_frame() blocks until a frame newer than a given sequence exists
+
+    The writer always picks the oldest slot that is neither pinned nor the
+    latest frame, so a slot released by a reader survives at least
+    (slot_count - 1) more captured frames before it can be reused.
+    """
+
+    def __init__(self, slot_count=4):
+        """Create an empty ring; buffers are allocated on the first frame"""
+        if slot_count < 2:
+            raise ValueError("FrameRing needs at least 2 slots")
+
+        self.slot_count = slot_count
+        self.lock = threading.Condition()  # Guards slots; notified on every commit
+        self.closed = False
+
+        self._buffers = None
+        self._shape = None
+        self._seqs = [0] * slot_count        # 0 = empty or being written
+        self._timestamps = [0.0] * slot_count
+        self._pins = [0] * slot_count
+        self._latest_index = -1
+        self._next_seq = 1
+
+        # Statistics (reported by the benchmark and diagnostics)
+        self.latest_seq = 0
+        self.buffer_allocations = 0   # How many slot arrays were ever allocated
+        self.frames_dropped = 0       # Frames discarded because every slot was pinned
+
+    # ======================== SLOT ALLOCATION =============================
+
+    def ensure_shape(self, shape, dtype=np.uint8):
+        """
+        Make sure the slots match the frame shape, (re)allocating if needed.
+        Only happens on the first frame or when the camera resolution changes.
+        """
+        shape = tuple(shape)
+        with self.lock:
+            if self._buffers is not None and self._shape == shape:
+                return
+
+            self._buffers = [np.empty(shape, dtype=dtype) for _ in range(self.slot_count)]
+            self._shape = shape
+            self._seqs = [0] * self.slot_count
+            self._timestamps = [0.0] * self.slot_count
+            self._latest_index = -1
+            self.buffer_allocations += self.slot_count
+
+    # ======================== WRITER SIDE (CAPTURE THREAD) =============================
+
+    def begin_write(self):
+        """
+        Reserve a slot for the next frame.
+
+        RETURNS: (slot_index, buffer) to fill in place, or (None, None) if
+                 every usable slot is currently pinned by readers
+        """
+        with self.lock:
+            if self._buffers is None:
+                return None, None
+
+            best_index = None
+            for i in range(self.slot_count):
+                if self._pins[i] or i == self._latest_index:
+                    continue
+                if best_index is None or self._seqs[i] < self._seqs[best_index]:
+                    best_index = i
+
+            if best_index is None:
+                self.frames_dropped += 1
+                return None, None
+
+            # Mark as "being written" so nobody borrows a half-written frame
+            self._seqs[best_index] = 0
+            return best_index, self._buffers[best_index]
+
+    def commit_write(self, index, timestamp):
+        """
+        Publish a filled slot as the newest frame.
+
+        RETURNS: Sequence number assigned to the frame
+        """
+        with self.lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._seqs[index] = seq
+            self._timestamps[index] = timestamp
+            self._latest_index = index
+            self.latest_seq = seq
+            self.lock.notify_all()
+            return seq
+
+    # ======================== READER SIDE =============================
+
+    def latest(self):
+        """(sequence, capture timestamp) of the newest frame, (0, 0.0) if none"""
+        with self.lock:
+            if self._latest_index < 0:
+                return 0, 0.0
+            return self._seqs[self._latest_index], self._timestamps[self._latest_index]
+
+    def wait_for_frame(self, after_seq, timeout=None):
+        """
+        Block until a frame newer than after_seq is committed.
+
+        PARAMETERS:
+        - after_seq: Sequence number the caller has already seen
+        - timeout: Seconds to wait (None = until a frame arrives or close())
+
+        RETURNS: True if a newer frame is available, False on timeout/close
+        """
+        with self.lock:
+            self.lock.wait_for(
+                lambda: self.closed or (self._latest_index >= 0 and self.latest_seq > after_seq),
+                timeout
+            )
+            return not self.closed and self._latest_index >= 0 and self.latest_seq > after_seq
+
+    @contextmanager
+    def borrow(self, after_seq=0):
+        """
+        Pin the newest frame for the duration of a "with" block.
+
+        PARAMETER:
+        - after_seq: Only return a frame newer than this sequence number
+
+        YIELDS: FrameView (seq, timestamp, read-only frame view) or None if
+                there is no frame newer than after_seq
+        """
+        with self.lock:
+            index = self._latest_index
+            if index < 0 or self._seqs[index] <= after_seq:
+                view = None
+            else:
+                self._pins[index] += 1
+                frame = self._buffers[index].view()
+                frame.flags.writeable = False
+                view = FrameView(self._seqs[index], self._timestamps[index], frame)
+
+        try:
+            yield view
+        finally:
+            if view is not None:
+                with self.lock:
+                    self._pins[index] -= 1
+
+    def open(self):
+        """Allow consumers to wait again (used when the camera starts)"""
+        with self.lock:
+            self.closed = False
+
+    def close(self):
+        """Wake up every waiting consumer (used when the camera stops)"""
+        with self.lock:
+            self.closed = True
+            self.lock.notify_all()
+
+    def clear(self):
+        """Forget all published frames (buffers are kept for reuse)"""
+        with self.lock:
+            self._seqs = [0] * self.slot_count
+            self._timestamps = [0.0] * self.slot_count
+            self._latest_index = -1
+
+    def stats(self):
+        """Return ring statistics as a dictionary"""
+        with self.lock:
+            return {
+                'slot_count': self.slot_count,
+                'frame_shape': self._shape,
+                'latest_seq': self.latest_seq,
+                'buffer_allocations': self.buffer_allocations,
+                'frames_dropped': self.frames_dropped,
+                'pinned_slots': sum(1 for p in self._pins if p)
+            }
@@ -0,0 +1,289 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Frame Sources
+# PURPOSE: Camera stand-ins with the cv2.VideoCapture interface
+# EXPLANATION: CameraManager normally opens a webcam (indices 0-5). For load
+#              tests and machines without a camera, CAMERA_SOURCE in
+#              config.py (or SIGNLANG_CAMERA_SOURCE) selects a source from
+#              here instead:
+#              - 'synthetic': generated frames at the requested resolution
+#                and frame rate (a moving shape over a gradient), so the
+#                whole pipeline - capture, MediaPipe, encoding, streaming -
+#                runs as with a real camera
+#              - 'file:PATH': a video file played in real time like a
+#                webcam with a driver buffer: frames arrive at the file's
+#                frame rate, wait in a small queue until read, and are
+#                dropped while the queue is full (as V4L2 does), so the
+#                low-latency capture mode can be tested without a camera
+#
+#              Sources implement what CameraManager uses of VideoCapture:
+#              isOpened(), read(image=None), grab(), retrieve(image=None),
+#              set(), get() (including CAP_PROP_POS_MSEC, the source's
+#              frame timestamp), release().
+#
+#              SourceStaleness turns those source timestamps into how long
+#              each frame waited before it was read.
+# ============================================================================
+
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from app_logging import get_logger
+
+log = get_logger('camera')
+
+
+# ======================== SYNTHETIC CAMERA =============================
+
+class SyntheticCapture:
+    """
+    Generated frames paced like a camera: read() blocks until the next
+    frame is due at the set frame rate.
+    """
+
+    def __init__(self, width=640, height=480, fps=30):
+        self.width, self.height, self.fps = int(width), int(height), float(fps)
+        self._opened = True
+        self._count = 0
+        self._next_frame = None
+        self._frame_time = 0.0          # When the grabbed frame was due (time.monotonic())
+        self._background = None
+
+    def isOpened(self):
+        return self._opened
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        elif prop == cv2.CAP_PROP_FPS:
+            self.fps = float(value)
+        else:
+            return False
+        return True
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_WIDTH: self.width, cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+                cv2.CAP_PROP_FPS: self.fps, cv2.CAP_PROP_POS_FRAMES: self._count,
+                cv2.CAP_PROP_POS_MSEC: self._frame_time * 1000.0}.get(prop, 0.0)
+
+    def _make_background(self):
+        x = np.linspace(0, 1, self.width, dtype=np.float32)
+        y = np.linspace(0, 1, self.height, dtype=np.float32)[:, None]
+        background = np.empty((self.height, self.width, 3), np.uint8)
+        background[..., 0] = 60 + 120 * x
+        background[..., 1] = 80 + 90 * y
+        background[..., 2] = 140 + 60 * (x * y)
+        return background
+
+    def grab(self):
+        """Wait until the next frame is due (paced like a camera)"""
+        if not self._opened:
+            return False
+        now = time.monotonic()
+        if self._next_frame is None or now - self._next_frame > 1.0:
+            self._next_frame = now
+        elif self._next_frame > now:
+            time.sleep(self._next_frame - now)
+        self._frame_time = self._next_frame
+        self._next_frame += 1.0 / self.fps
+        self._count += 1
+        return True
+
+    def retrieve(self, image=None):
+        """Draw the grabbed frame"""
+        if not self._opened or not self._count:
+            return False, None
+        shape = (self.height, self.width, 3)
+        if self._background is None or self._background.shape != shape:
+            self._background = self._make_background()
+        if image is None or image.shape != shape:
+            image = self._background.copy()
+        else:
+            np.copyto(image, self._background)
+
+        # A circle moving along an ellipse, so consecutive frames differ
+        angle = self._count * 2 * np.pi / (4 * self.fps)
+        center = (int(self.width * (0.5 + 0.3 * np.cos(angle))), int(self.height * (0.5 + 0.3 * np.sin(angle))))
+        cv2.circle(image, center, max(4, self.height // 10), (40, 170, 230), -1)
+        cv2.putText(image, str(self._count), (10, self.height - 12), cv2.FONT_HERSHEY_SIMPLEX,
+                    0.6, (255, 255, 255), 1)
+        return True, image
+
+    def read(self, image=None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def release(self):
+        self._opened = False
+
+
+# ======================== FILE-BACKED DEVICE =============================
+
+class FileCapture:
+    """
+    A video file played back in real time like a webcam with a driver buffer.
+
+    Frame i arrives at start + i / fps. Arrived frames queue up to
+    buffer_size (CAP_PROP_BUFFERSIZE); while the queue is full, newly
+    arriving frames are dropped, so a reader that falls behind gets old
+    frames, as from a real device. grab() takes the oldest queued frame
+    (waiting for one if none has arrived yet), retrieve() decodes it.
+    CAP_PROP_POS_MSEC is the frame's arrival time (time.monotonic(), in ms).
+    The file loops. buffer_control=False ignores CAP_PROP_BUFFERSIZE, like
+    camera backends that do not support it.
+    """
+
+    def __init__(self, path, buffer_size=4, fps=None, buffer_control=True):
+        self.path = path
+        self.buffer_control = buffer_control
+        self._video = cv2.VideoCapture(path)
+        self.fps = float(fps or self._video.get(cv2.CAP_PROP_FPS) or 30.0)
+        self.buffer_size = buffer_size
+        self._queue = deque()           # Indices of arrived, unread frames (oldest first)
+        self._start = None
+        self._arrived = 0               # Frames that have arrived so far
+        self._file_pos = 0              # Index of the next frame the decoder produces
+        self._grabbed = None            # Index of the grabbed frame
+        self.frames_dropped = 0         # Frames that arrived while the buffer was full
+
+    def isOpened(self):
+        return self._video is not None and self._video.isOpened()
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_BUFFERSIZE and self.buffer_control:
+            self.buffer_size = max(1, int(value))
+            while len(self._queue) > self.buffer_size:
+                self._queue.popleft()
+                self.frames_dropped += 1
+            return True
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            if self._grabbed is None:
+                return 0.0
+            return (self._start + self._grabbed / self.fps) * 1000.0
+        if prop == cv2.CAP_PROP_BUFFERSIZE:
+            return self.buffer_size
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return self._grabbed or 0
+        return self._video.get(prop)
+
+    def _arrive(self, now):
+        due = int((now - self._start) * self.fps) + 1
+        for i in range(self._arrived, due):
+            if len(self._queue) < self.buffer_size:
+                self._queue.append(i)
+            else:
+                self.frames_dropped += 1
+        self._arrived = max(self._arrived, due)
+
+    def grab(self):
+        """Take the oldest buffered frame, waiting for the next one if none is buffered"""
+        if not self.isOpened():
+            return False
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        self._arrive(now)
+        while not self._queue:
+            time.sleep(max(0.0, self._start + self._arrived / self.fps - now))
+            now = time.monotonic()
+            self._arrive(now)
+        self._grabbed = self._queue.popleft()
+        return True
+
+    def _decoder_grab(self):
+        if self._video.grab():
+            return True
+        self._video.set(cv2.CAP_PROP_POS_FRAMES, 0)     # End of file: loop
+        return self._video.grab()
+
+    def retrieve(self, image=None):
+        """Decode the grabbed frame (frames skipped since the last one are never converted)"""
+        if self._grabbed is None:
+            return False, None
+        while self._file_pos <= self._grabbed:
+            if not self._decoder_grab():
+                return False, None
+            self._file_pos += 1
+        if image is None:
+            return self._video.retrieve()
+        return self._video.retrieve(image=image)
+
+    def read(self, image=None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def release(self):
+        if self._video is not None:
+            self._video.release()
+
+
+# ======================== SOURCE TIMESTAMPS =============================
+
+class SourceStaleness:
+    """
+    How long each frame waited (in the driver's buffer) before it was read,
+    from the source's own frame timestamps (CAP_PROP_POS_MSEC).
+
+    Source clocks differ (device clock, monotonic time, file position), so
+    only the offset between read time and source time is used: the smallest
+    offset seen belongs to a frame read as soon as it existed, and anything
+    above it is time spent waiting. The baseline creeps up slowly
+    (`creep` seconds per second) to follow clock drift.
+    """
+
+    def __init__(self, creep=0.001):
+        self.creep = creep
+        self.baseline = None
+        self._last_source = None
+        self._last_read = None
+
+    def update(self, source_msec, read_time):
+        """
+        PARAMETERS:
+        - source_msec: CAP_PROP_POS_MSEC of the frame just read
+        - read_time: When it was read (any steady clock, in seconds)
+
+        RETURNS: Seconds the frame waited, or None if the source has no
+                 usable timestamps (zero, negative or not increasing)
+        """
+        if not source_msec or source_msec <= 0 or (self._last_source is not None
+                                                   and source_msec <= self._last_source):
+            return None
+        offset = read_time - source_msec / 1000.0
+        if self.baseline is None or self._last_read is None:
+            self.baseline = offset
+        else:
+            self.baseline = min(offset, self.baseline + self.creep * (read_time - self._last_read))
+        self._last_source = source_msec
+        self._last_read = read_time
+        return offset - self.baseline
+
+    def reset(self):
+        self.baseline = self._last_source = self._last_read = None
+
+
+def open_source(name):
+    """
+    PARAMETER: name - CAMERA_SOURCE value other than '' (webcam)
+    RETURNS: Capture object with the VideoCapture interface
+    RAISES: ValueError for unknown sources
+    """
+    if name == 'synthetic':
+        log.info("Using the synthetic frame source (no camera)")
+        return SyntheticCapture()
+    if name.startswith('file:'):
+        log.info("Playing %s as a buffered camera", name[5:])
+        return FileCapture(name[5:])
+    raise ValueError(f"Unknown camera source {name!r} (expected '' for a webcam, 'synthetic' or 'file:PATH')")
@@ -14,7 +14,16 @@
 import mediapipe as mp
 import cv2
 import math
-from config import MIN_DETECTION_CONFIDENCE, MIN_TRACKING_CONFIDENCE
+import time
+import numpy as np
+from config import (GESTURE_LIST, DOMINANT_HAND, CLASSIFIER_ENGINE, TEMPLATE_LIBRARY_PATH,
+                    TEMPLATE_MIN_CONFIDENCE, TEMPLATE_INDEX)
+from runtime_config import runtime_config
+from gesture_rules import ISL_RULES, compile_rules, as_points, finger_bits, FINGER_NAMES
+from template_classifier import load_template_classifier
+from two_hand_rules import TWO_HAND_RULES, compile_two_hand_rules
+from metrics import CLASSIFY_SECONDS
+from app_logging import get_logger
 
 # ======================== INITIALIZE MEDIAPIPE =============================
 # MediaPipe is a Google framework for building ML pipelines
@@ -23,6 +32,9 @@ from config import MIN_DETECTION_CONFIDENCE, MIN_TRACKING_CONFIDENCE
 mp_hands = mp.solutions.hands  # Solution for hand tracking
 mp_drawing = mp.solutions.drawing_utils  # Utilities to draw landmarks
 
+log = get_logger('gesture')
+rules_log = get_logger('gesture rules')
+
 
 class GestureRecognizer:
     """
@@ -35,15 +47,81 @@ class GestureRecognizer:
     4. Returns the recognized gesture name
     """
     
-    def __init__(self):
-        """Initialize the gesture recognizer with MediaPipe Hands"""
-        self.hands = mp_hands.Hands(
+    def __init__(self, engine=None, detect_hands=True):
+        """
+        Initialize the gesture recognizer with MediaPipe Hands.
+        
+        PARAMETERS:
+        - engine: 'rules' or 'templates' (default: CLASSIFIER_ENGINE in config.py)
+        - detect_hands: Create the MediaPipe detector. Pass False to only
+          classify landmarks that are already known (e.g. replaying a
+          recording), which skips loading the hand model entirely.
+        """
+        self.hands = self._create_hands() if detect_hands else None
+        
+        # Reused RGB conversion target (avoids allocating a new frame per call)
+        self._rgb_buffer = None
+        
+        # Compile the gesture rule table once (reports rules that can never fire)
+        self.rules = compile_rules(ISL_RULES, known_gestures=GESTURE_LIST)
+        for issue in self.rules.issues:
+            rules_log.warning(issue)
+        
+        # Two-hand signs (STOP, HELP, ...) are checked on the pair of hands
+        self.two_hand_rules = compile_two_hand_rules(TWO_HAND_RULES, known_gestures=GESTURE_LIST)
+        for issue in self.two_hand_rules.issues:
+            rules_log.warning(issue)
+        
+        # Pick the classifier engine (template engine falls back to rules if no data)
+        self.engine = engine or CLASSIFIER_ENGINE
+        self.classifier = self.rules
+        if self.engine == 'templates':
+            templates = load_template_classifier(TEMPLATE_LIBRARY_PATH,
+                                                 min_confidence=TEMPLATE_MIN_CONFIDENCE,
+                                                 index=TEMPLATE_INDEX)
+            if templates is not None:
+                self.classifier = templates
+            else:
+                log.warning("Falling back to the rule engine")
+                self.engine = 'rules'
+        elif self.engine != 'rules':
+            raise ValueError(f"Unknown classifier engine: {self.engine!r}")
+    
+    def _create_hands(self, settings=None):
+        """Create the MediaPipe hand detector (video mode: tracks hands across frames)"""
+        settings = settings or runtime_config.settings
+        self.detector_settings = (settings.hand_model_complexity, settings.min_detection_confidence,
+                                  settings.min_tracking_confidence)
+        return mp_hands.Hands(
             static_image_mode=False,  # Process video, not static images
             max_num_hands=2,  # Detect up to 2 hands
-            min_detection_confidence=MIN_DETECTION_CONFIDENCE,
-            min_tracking_confidence=MIN_TRACKING_CONFIDENCE
+            model_complexity=settings.hand_model_complexity,
+            min_detection_confidence=settings.min_detection_confidence,
+            min_tracking_confidence=settings.min_tracking_confidence
         )
     
+    def apply_settings(self, settings):
+        """
+        Rebuild the hand detector if its runtime settings changed (model
+        complexity, confidences). Call from the thread that runs
+        process_frame; hands being tracked are detected again.
+        """
+        wanted = (settings.hand_model_complexity, settings.min_detection_confidence,
+                  settings.min_tracking_confidence)
+        if self.hands is not None and wanted != self.detector_settings:
+            self.hands.close()
+            self.hands = self._create_hands(settings)
+            log.info("Hand detector rebuilt (model complexity %s, confidences %s/%s)", *wanted)
+    
+    def reset_tracking(self):
+        """
+        Forget tracked hands, e.g. before processing frames that do not
+        follow the previous ones (another video, or a jump within a video).
+        """
+        if self.hands is not None:
+            self.hands.close()
+            self.hands = self._create_hands()
+    
     # ======================== FINGER STATE DETECTION =============================
     
     def get_finger_state(self, landmarks):
@@ -63,19 +141,8 @@ class GestureRecognizer:
         RETURNS: Dictionary showing which fingers are extended
         """
         # Check if each finger is extended (tip beyond PIP joint)
-        thumb_extended = landmarks[4].x < landmarks[3].x  # Thumb opens to side
-        index_extended = landmarks[8].y < landmarks[6].y   # Index extends up
-        middle_extended = landmarks[12].y < landmarks[10].y
-        ring_extended = landmarks[16].y < landmarks[14].y
-        pinky_extended = landmarks[20].y < landmarks[18].y
-        
-        return {
-            'thumb': thumb_extended,
-            'index': index_extended,
-            'middle': middle_extended,
-            'ring': ring_extended,
-            'pinky': pinky_extended
-        }
+        bits = finger_bits(as_points(landmarks))
+        return {name: bool(bits & (1 << i)) for i, name in enumerate(FINGER_NAMES)}
     
     # ======================== DISTANCE CALCULATION =============================
     
@@ -102,7 +169,8 @@ class GestureRecognizer:
     def detect_gesture(self, landmarks):
         """
         Main gesture detection function for Indian Sign Language (ISL).
-        Analyzes finger positions and returns the detected gesture.
+        Uses the selected engine: the compiled rule table (finger state lookup
+        plus predicates, see gesture_rules.ISL_RULES) or template matching.
         
         INDIAN SIGN LANGUAGE (ISL) CONVENTIONS:
         - YES: Closed fist
@@ -111,110 +179,35 @@ class GestureRecognizer:
         - BAD: Thumbs down
         - OK: Thumb and index circle with open fingers
         - HELLO: Open palm raised (all fingers extended)
-        - STOP: Vertical blocking horizontal hand (requires 2 hands)
-        - HELP: Thumbs up on open palm
+        - STOP: Vertical blocking horizontal hand (two hands, see process_frame)
+        - HELP: Thumbs up on open palm (two hands, see process_frame)
         - THANK YOU: Flat hand near chin
         - PLEASE: Flat hand on chest
         
-        PARAMETER: landmarks - 21 hand landmark points
+        WHY A TABLE? Classification is one dictionary hit on the 5-bit finger
+        state plus a few predicate checks, however many signs we add.
+        
+        PARAMETER: landmarks - 21 hand landmark points (MediaPipe list or (21, 3) array)
         RETURNS: Gesture name (string) or None if no gesture detected
         """
+        return self.classifier.classify(as_points(landmarks))
+    
+    def match_gesture(self, landmarks):
+        """
+        Like detect_gesture, plus how strongly this frame supports the result.
         
-        # Get which fingers are extended
-        fingers = self.get_finger_state(landmarks)
-        
-        # Get important landmark positions
-        thumb_tip = landmarks[4]
-        index_tip = landmarks[8]
-        middle_tip = landmarks[12]
-        ring_tip = landmarks[16]
-        pinky_tip = landmarks[20]
-        wrist = landmarks[0]
-        
-        # ==================== INDIAN SIGN LANGUAGE (ISL) DETECTION ====================
-        
-        # ---------------------- ISL GESTURE 1: YES ----------------------
-        # ISL YES = Closed fist (all fingers folded)
-        if (not fingers['index'] and not fingers['middle'] and 
-            not fingers['ring'] and not fingers['pinky'] and not fingers['thumb']):
-            return "YES"
-        
-        # ---------------------- ISL GESTURE 2: NO ----------------------
-        # ISL NO = Pinched fingers (index and thumb touching, others closed)
-        thumb_index_dist = self.calculate_distance(thumb_tip, index_tip)
-        if thumb_index_dist < 0.05:  # Index and thumb touching
-            if (not fingers['middle'] and not fingers['ring'] and not fingers['pinky']):
-                return "NO"
-        
-        # ---------------------- ISL GESTURE 3: GOOD ----------------------
-        # GOOD = Thumbs up (thumb extended upward, others closed)
-        if (fingers['thumb'] and not fingers['index'] and 
-            not fingers['middle'] and not fingers['ring'] and not fingers['pinky']):
-            if thumb_tip.y < landmarks[3].y:  # Thumb tip above thumb PIP (pointing up)
-                return "GOOD"
-        
-        # ---------------------- ISL GESTURE 4: BAD ----------------------
-        # BAD = Thumbs down (thumb extended downward, others closed)
-        if (fingers['thumb'] and not fingers['index'] and 
-            not fingers['middle'] and not fingers['ring'] and not fingers['pinky']):
-            if thumb_tip.y > landmarks[3].y:  # Thumb tip below thumb PIP (pointing down)
-                return "BAD"
-        
-        # ---------------------- ISL GESTURE 5: OK ----------------------
-        # OK = Index and thumb forming circle with other fingers open/extended
-        if thumb_index_dist < 0.05:  # Index and thumb touching forming circle
-            if (fingers['middle'] and fingers['ring'] and fingers['pinky']):
-                return "OK"
-        
-        # ---------------------- ISL GESTURE 6: HELLO ----------------------
-        # HELLO = Open palm raised (all fingers fully extended, palm facing forward)
-        if (fingers['index'] and fingers['middle'] and 
-            fingers['ring'] and fingers['pinky'] and fingers['thumb']):
-            # Check if palm is relatively horizontal (fingers facing up)
-            if index_tip.y < wrist.y and middle_tip.y < wrist.y:
-                return "HELLO"
-        
-        # ---------------------- ISL GESTURE 7: STOP ----------------------
-        # STOP = One vertical hand blocking horizontal hand (palm facing forward, fingers up)
-        # Detected as: Open hand with specific orientation (all fingers extended)
-        # Note: Ideally requires 2-hand detection, here we detect hand orientation
-        if (fingers['index'] and fingers['middle'] and 
-            fingers['ring'] and fingers['pinky'] and fingers['thumb']):
-            # Check if fingers are pointing upward (vertical stop hand)
-            avg_finger_y = (index_tip.y + middle_tip.y + ring_tip.y + pinky_tip.y) / 4
-            if avg_finger_y < wrist.y and wrist.y > landmarks[0].y:
-                return "STOP"
-        
-        # ---------------------- ISL GESTURE 8: HELP ----------------------
-        # HELP = Thumbs up hand resting on open palm (requires both hands)
-        # Detected as: Thumbs up gesture
-        if (fingers['thumb'] and not fingers['index'] and 
-            not fingers['middle'] and not fingers['ring'] and not fingers['pinky']):
-            if thumb_tip.y < landmarks[3].y:
-                # This is similar to GOOD, but HELP is when thumb is on another palm
-                # For single hand detection, we identify it as thumb-up orientation
-                return "HELP"
-        
-        # ---------------------- ISL GESTURE 9: THANK YOU ----------------------
-        # THANK YOU = Flat hand moved from chin area downward
-        # Detected as: Flat open hand with palm facing to the side
-        if (fingers['index'] and fingers['middle'] and 
-            fingers['ring'] and fingers['pinky'] and fingers['thumb']):
-            # Check if hand is near face/chin level (upper half of image)
-            if wrist.y < 0.5:  # Upper portion of image (near head)
-                return "THANK YOU"
-        
-        # ---------------------- ISL GESTURE 10: PLEASE ----------------------
-        # PLEASE = Flat hand on chest (palm placed on chest)
-        # Detected as: Flat open hand in middle-lower area of image
-        if (fingers['index'] and fingers['middle'] and 
-            fingers['ring'] and fingers['pinky'] and fingers['thumb']):
-            # Check if hand is in chest area (middle of body)
-            if 0.3 < wrist.y < 0.7:  # Middle portion of image (chest area)
-                return "PLEASE"
+        The score is confidence x margin of the engine's match (rules: how
+        far the hand is from the deciding thresholds; templates: similarity
+        to the nearest template times its lead over other gestures). The
+        stabilizer uses it to commit clear signs early.
         
-        # If no gesture matched, return None
-        return None
+        PARAMETER: landmarks - 21 hand landmark points
+        RETURNS: (gesture or None, score 0..1)
+        """
+        match = self.classifier.match(as_points(landmarks))
+        if match.gesture is None:
+            return None, 0.0
+        return match.gesture, match.confidence * match.margin
     
     # ======================== PROCESS FRAME =============================
     
@@ -225,48 +218,119 @@ class GestureRecognizer:
         STEPS:
         1. Convert frame from BGR (OpenCV) to RGB (MediaPipe)
         2. Run MediaPipe hand detection
-        3. For each detected hand, get landmarks
-        4. Detect gesture from landmarks
-        5. Return gesture and landmarks for drawing
+        3. Order hands dominant hand first (by handedness, not MediaPipe's order)
+        4. Detect each hand's gesture, and a two-hand sign if both hands are visible
+        5. Pick the final gesture: two-hand sign, else dominant hand, else other hand
         
         PARAMETER: frame - Video frame from webcam (numpy array)
-        RETURNS: Dictionary with gestures and landmarks for drawing
+        RETURNS: Dictionary with:
+        - 'gesture': Final gesture (or None)
+        - 'score': How strongly this frame supports it (0..1; None for two-hand signs)
+        - 'joint_gesture': Two-hand sign (or None)
+        - 'gestures': Per-hand gestures that were found, dominant hand first
+        - 'hands': Per hand (dominant first): handedness label, (21, 3) points,
+                   gesture, score and role ('dominant'/'support' when a two-hand sign matched)
+        - 'hand_landmarks': MediaPipe landmarks for drawing (same order as 'hands')
         """
         
         # Convert BGR (OpenCV format) to RGB (MediaPipe format)
         # WHY? MediaPipe was trained on RGB images
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # The result is written into a reused buffer instead of a new array
+        if self._rgb_buffer is None or self._rgb_buffer.shape != frame.shape:
+            self._rgb_buffer = np.empty_like(frame)
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
         
         # Run MediaPipe hand detection
         # This returns a list of detected hands and their landmarks
         results = self.hands.process(rgb_frame)
+        classify_started = time.perf_counter()
         
-        detected_gestures = []
+        hands = []
         landmarks_list = []
         
         # Process each detected hand
         if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
+            handedness = results.multi_handedness or []
+            for i, hand_landmarks in enumerate(results.multi_hand_landmarks):
                 # Extract landmarks (21 points on hand)
-                landmarks = hand_landmarks.landmark
-                
-                # Detect gesture from these landmarks
-                gesture = self.detect_gesture(landmarks)
-                
-                if gesture:
-                    detected_gestures.append(gesture)
-                
+                points = as_points(hand_landmarks.landmark)
+                label = handedness[i].classification[0].label if i < len(handedness) else f"Hand{i}"
+                gesture, score = self.match_gesture(points)  # Single-hand gesture
+                hands.append({
+                    'handedness': label,
+                    'points': np.array(points, dtype=np.float32),
+                    'gesture': gesture,
+                    'score': score,
+                    'role': None
+                })
                 # Store landmarks for drawing skeleton
                 landmarks_list.append(hand_landmarks)
         
+        order = self.order_hands(hands)
+        hands = [hands[i] for i in order]
+        
+        # Two-hand signs use the landmark arrays we already have (no extra inference)
+        detection_results = self.combine_hands(hands)
+        detection_results['hand_landmarks'] = [landmarks_list[i] for i in order]
+        detection_results['raw_results'] = results
+        CLASSIFY_SECONDS.observe(time.perf_counter() - classify_started)
+        return detection_results
+    
+    # ======================== COMBINING HANDS =============================
+    # Shared by process_frame and by replaying recorded landmarks
+    
+    def order_hands(self, hands):
+        """
+        Order in which to list hands: dominant hand first (DOMINANT_HAND in
+        config.py). If both hands carry the same label, the one on the
+        dominant side of the (mirrored) image comes first.
+        
+        PARAMETER: hands - List of hand dicts ('handedness', 'points', ...)
+        RETURNS: List of indices into hands
+        """
+        side = -1.0 if DOMINANT_HAND == 'Right' else 1.0
+        return sorted(range(len(hands)), key=lambda i: (hands[i]['handedness'] != DOMINANT_HAND,
+                                                        side * float(hands[i]['points'][0][0])))
+    
+    def combine_hands(self, hands, joint_match=None):
+        """
+        Pick the final gesture from already classified, ordered hands.
+        
+        PARAMETERS:
+        - hands: Hand dicts in order_hands() order, each with a 'gesture'
+          (and optionally a 'score')
+        - joint_match: Two-hand result if already computed (e.g. in a batch);
+          otherwise the first two hands are checked here
+        
+        RETURNS: Result dictionary ('gesture', 'score', 'joint_gesture', 'gestures', 'hands');
+                 two-hand signs have no per-frame score yet (None: the
+                 stabilizer uses its time rule for them)
+        """
+        joint_gesture = None
+        if joint_match is None and len(hands) >= 2 and len(self.two_hand_rules):
+            joint_match = self.two_hand_rules.classify(hands[0]['points'], hands[1]['points'])
+        if joint_match is not None and joint_match.gesture:
+            joint_gesture = joint_match.gesture
+            hands[joint_match.dominant]['role'] = 'dominant'
+            hands[joint_match.support]['role'] = 'support'
+        
+        detected_gestures = [hand['gesture'] for hand in hands if hand['gesture']]
+        final_gesture = joint_gesture or (detected_gestures[0] if detected_gestures else None)
+        score = 0.0 if final_gesture is None else None
+        if final_gesture is not None and joint_gesture is None:
+            score = next(hand.get('score') for hand in hands if hand['gesture'])
+        
         return {
+            'gesture': final_gesture,
+            'score': score,
+            'joint_gesture': joint_gesture,
             'gestures': detected_gestures,
-            'hand_landmarks': landmarks_list,
-            'raw_results': results
+            'hands': hands
         }
     
     # ======================== CLEANUP =============================
     
     def close(self):
         """Close the hand detector and release resources"""
-        self.hands.close()
+        if self.hands is not None:
+            self.hands.close()
@@ -0,0 +1,418 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Gesture Rule Table and Rule Compiler
+# PURPOSE: Describe gestures as data and classify them with a table lookup
+# EXPLANATION: Gestures used to be an ordered chain of "if" blocks, so every
+#              new sign made classification slower and it was easy to write
+#              a rule that could never fire. Here each gesture is a row in a
+#              table:
+#              1. Finger pattern (which fingers are extended, '?' = any)
+#              2. Geometric predicates (e.g. thumb tip above thumb IP joint)
+#              3. Priority (lower number is checked first)
+#              The compiler turns the table into a dictionary keyed on the
+#              5-bit finger state, so classifying a hand is one dictionary
+#              hit plus a few predicate checks. It also reports rules that
+#              can never fire or that overlap earlier rules.
+# ============================================================================
+
+import math
+import operator
+import re
+from collections import namedtuple
+
+# ======================== HAND LANDMARK NAMES =============================
+# MediaPipe gives 21 points per hand, always in this order
+
+LANDMARK_NAMES = [
+    'WRIST',
+    'THUMB_CMC', 'THUMB_MCP', 'THUMB_IP', 'THUMB_TIP',
+    'INDEX_MCP', 'INDEX_PIP', 'INDEX_DIP', 'INDEX_TIP',
+    'MIDDLE_MCP', 'MIDDLE_PIP', 'MIDDLE_DIP', 'MIDDLE_TIP',
+    'RING_MCP', 'RING_PIP', 'RING_DIP', 'RING_TIP',
+    'PINKY_MCP', 'PINKY_PIP', 'PINKY_DIP', 'PINKY_TIP'
+]
+LANDMARK_INDEX = {name: i for i, name in enumerate(LANDMARK_NAMES)}
+COORD_INDEX = {'x': 0, 'y': 1, 'z': 2}
+
+# Finger order used in patterns and bitmasks: Thumb, Index, Middle, Ring, Pinky
+FINGER_NAMES = ['thumb', 'index', 'middle', 'ring', 'pinky']
+
+# ======================== RULE TABLE FORMAT =============================
+# Rule(name, fingers, predicates, priority)
+# - fingers: 5 characters in T I M R P order; '1' extended, '0' folded, '?' either
+# - predicates: (left, op, right) where each side is a number or an expression:
+#     'THUMB_TIP.y'                    one coordinate of a landmark
+#     'dist(THUMB_TIP,INDEX_TIP)'      3D distance between two landmarks
+#     'mean(INDEX_TIP.y,MIDDLE_TIP.y)' average of several coordinates
+# - priority: rules sharing a finger state are tried in ascending priority
+
+Rule = namedtuple('Rule', ['name', 'fingers', 'predicates', 'priority'], defaults=((), 100))
+
+# Result of CompiledRules.match(), shaped like template_classifier.TemplateMatch:
+# - confidence: 1.0 when a rule matched (rules are yes/no), else 0.0
+# - margin: How far the hand is from flipping the decision, 0 (on a
+#   threshold) .. 1 (clear); see CompiledRules.match()
+RuleMatch = namedtuple('RuleMatch', ['gesture', 'confidence', 'margin'])
+
+# Palm lengths (wrist to middle finger MCP) at which the margin reaches 1 - 1/e
+RULE_MARGIN_SCALE = 0.15
+
+# Indian Sign Language (ISL) rules, in the order the original detector checked them
+# (STOP and HELP need both hands, see two_hand_rules.TWO_HAND_RULES)
+ISL_RULES = [
+    # YES: Closed fist (all fingers folded)
+    Rule('YES', '00000', priority=10),
+    # NO: Pinched fingers (index and thumb touching, others closed)
+    Rule('NO', '??000', [('dist(THUMB_TIP,INDEX_TIP)', '<', 0.05)], priority=20),
+    # GOOD: Thumbs up (thumb tip above thumb IP joint)
+    Rule('GOOD', '10000', [('THUMB_TIP.y', '<', 'THUMB_IP.y')], priority=30),
+    # BAD: Thumbs down (thumb tip below thumb IP joint)
+    Rule('BAD', '10000', [('THUMB_TIP.y', '>', 'THUMB_IP.y')], priority=40),
+    # OK: Index and thumb circle, other fingers open
+    Rule('OK', '??111', [('dist(THUMB_TIP,INDEX_TIP)', '<', 0.05)], priority=50),
+    # HELLO: Open palm raised (fingers above the wrist)
+    Rule('HELLO', '11111', [('INDEX_TIP.y', '<', 'WRIST.y'),
+                            ('MIDDLE_TIP.y', '<', 'WRIST.y')], priority=60),
+    # THANK YOU: Flat hand near chin (upper half of image)
+    Rule('THANK YOU', '11111', [('WRIST.y', '<', 0.5)], priority=90),
+    # PLEASE: Flat hand on chest (middle of image)
+    Rule('PLEASE', '11111', [('WRIST.y', '>', 0.3), ('WRIST.y', '<', 0.7)], priority=100),
+]
+
+# ======================== LANDMARK HELPERS =============================
+
+def as_points(landmarks):
+    """
+    Convert hand landmarks into a list of (x, y, z) tuples.
+
+    Accepts MediaPipe landmark lists, NumPy arrays of shape (21, 3) and
+    plain nested lists, so recorded landmarks classify exactly like live ones.
+    """
+    if hasattr(landmarks, 'tolist'):
+        return landmarks.tolist()
+    if hasattr(landmarks, 'landmark'):
+        landmarks = landmarks.landmark
+    first = landmarks[0]
+    if hasattr(first, 'x'):
+        return [(lm.x, lm.y, lm.z) for lm in landmarks]
+    return landmarks
+
+
+def finger_bits(points):
+    """
+    Finger state as a 5-bit number (bit 0 = thumb ... bit 4 = pinky).
+
+    A finger is "extended" if its tip is beyond its PIP joint; the thumb
+    opens sideways, the other fingers point up.
+    """
+    bits = 0
+    if points[4][0] < points[3][0]:
+        bits |= 1
+    if points[8][1] < points[6][1]:
+        bits |= 2
+    if points[12][1] < points[10][1]:
+        bits |= 4
+    if points[16][1] < points[14][1]:
+        bits |= 8
+    if points[20][1] < points[18][1]:
+        bits |= 16
+    return bits
+
+
+# The comparisons finger_bits() makes: (tip, joint, coordinate) per finger
+FINGER_TESTS = ((4, 3, 0), (8, 6, 1), (12, 10, 1), (16, 14, 1), (20, 18, 1))
+
+
+def pattern_mask(pattern):
+    """Bits of the fingers a pattern fixes (not '?')"""
+    return sum(1 << i for i, char in enumerate(pattern) if char != '?')
+
+
+def bits_to_pattern(bits):
+    """5-bit finger state -> 'TIMRP' pattern string (e.g. 17 -> '10001')"""
+    return ''.join('1' if bits & (1 << i) else '0' for i in range(5))
+
+
+def expand_pattern(pattern):
+    """All 5-bit finger states matching a pattern with '?' wildcards"""
+    if len(pattern) != 5 or set(pattern) - set('01?'):
+        raise ValueError(f"Finger pattern must be 5 characters of 0/1/?: {pattern!r}")
+    states = [0]
+    for i, char in enumerate(pattern):
+        bit = 1 << i
+        if char == '1':
+            states = [s | bit for s in states]
+        elif char == '?':
+            states = states + [s | bit for s in states]
+    return sorted(states)
+
+
+# ======================== EXPRESSION COMPILER =============================
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+_CALL = re.compile(r'^(dist|mean)\((.*)\)$')
+
+
+def _parse_coord(text):
+    """'THUMB_TIP.y' -> (landmark index, coordinate index)"""
+    name, _, coord = text.strip().partition('.')
+    if name not in LANDMARK_INDEX or coord not in COORD_INDEX:
+        raise ValueError(f"Unknown landmark coordinate: {text!r}")
+    return LANDMARK_INDEX[name], COORD_INDEX[coord]
+
+
+def compile_operand(operand):
+    """
+    Turn one side of a predicate into (canonical text, function(points) -> float).
+    The canonical text is used by the analysis to recognize identical operands.
+    """
+    if isinstance(operand, (int, float)):
+        value = float(operand)
+        return repr(value), (lambda points: value)
+
+    text = operand.replace(' ', '')
+    match = _CALL.match(text)
+    if match is None:
+        i, c = _parse_coord(text)
+        return text, (lambda points: points[i][c])
+
+    func, args = match.group(1), match.group(2).split(',')
+    if func == 'dist':
+        if len(args) != 2:
+            raise ValueError(f"dist() takes two landmarks: {operand!r}")
+        a, b = (LANDMARK_INDEX[name] for name in args)
+        return text, (lambda points: math.dist(points[a], points[b]))
+
+    coords = [_parse_coord(arg) for arg in args]
+    count = float(len(coords))
+    return text, (lambda points: sum(points[i][c] for i, c in coords) / count)
+
+
+class CompiledPredicate:
+    """One geometric check of a rule, ready to evaluate on landmark points"""
+
+    def __init__(self, spec):
+        left, op, right = spec
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator {op!r} in predicate {spec!r}")
+        self.left, self._left = compile_operand(left)
+        self.right, self._right = compile_operand(right)
+        self.op = op
+        self._compare = OPERATORS[op]
+        self.left_is_const = isinstance(left, (int, float))
+        self.right_is_const = isinstance(right, (int, float))
+
+    def __call__(self, points):
+        return self._compare(self._left(points), self._right(points))
+
+    def difference(self, points):
+        """left - right: how far the points are from this predicate's threshold"""
+        return self._left(points) - self._right(points)
+
+    def key(self):
+        """Canonical form used to compare predicates between rules"""
+        return (self.left, self.op, self.right)
+
+    def bound(self):
+        """
+        If this predicate compares an expression with a constant, return
+        (expression, lower, upper) describing the allowed open interval.
+        """
+        if self.right_is_const and not self.left_is_const:
+            expr, value, op = self.left, float(self.right), self.op
+        elif self.left_is_const and not self.right_is_const:
+            # Flip "0.3 < x" into "x > 0.3"
+            flipped = {'<': '>', '<=': '>=', '>': '<', '>=': '<='}
+            expr, value, op = self.right, float(self.left), flipped[self.op]
+        else:
+            return None
+        if op in ('<', '<='):
+            return expr, -math.inf, value
+        return expr, value, math.inf
+
+    def __repr__(self):
+        return f"{self.left} {self.op} {self.right}"
+
+
+# ======================== RULE ANALYSIS =============================
+
+def _intervals(predicates):
+    """Combine constant bounds per expression: {expr: (lower, upper)}"""
+    ranges = {}
+    for pred in predicates:
+        b = pred.bound()
+        if b is None:
+            continue
+        expr, low, high = b
+        old_low, old_high = ranges.get(expr, (-math.inf, math.inf))
+        ranges[expr] = (max(old_low, low), min(old_high, high))
+    return ranges
+
+
+def _impossible(predicates):
+    """Reason string if the predicates can never all be true, else None"""
+    for pred in predicates:
+        if pred.left == pred.right and pred.op in ('<', '>'):
+            return f"predicate '{pred}' can never be true"
+    for expr, (low, high) in _intervals(predicates).items():
+        if low >= high:
+            return f"'{expr}' cannot be both > {low} and < {high}"
+    return None
+
+
+def _implies(predicates, condition):
+    """True if a set of predicates guarantees that 'condition' holds"""
+    keys = {p.key() for p in predicates}
+    if condition.key() in keys:
+        return True
+    b = condition.bound()
+    if b is None:
+        return False
+    expr, low, high = b
+    have_low, have_high = _intervals(predicates).get(expr, (-math.inf, math.inf))
+    return have_low >= low and have_high <= high
+
+
+def _disjoint(first, second):
+    """True if two predicate sets can provably never hold at the same time"""
+    if _impossible(list(first) + list(second)):
+        return True
+    opposite = {'<': ('>', '>='), '<=': ('>',), '>': ('<', '<='), '>=': ('<',)}
+    for a in first:
+        for b in second:
+            if a.left == b.left and a.right == b.right and b.op in opposite[a.op]:
+                return True
+    return False
+
+
+# ======================== COMPILED RULE TABLE =============================
+
+class CompiledRules:
+    """
+    Rule table compiled into a lookup keyed on the 5-bit finger state.
+
+    ATTRIBUTES:
+    - lookup: {finger_bits: ((name, predicates), ...)} in priority order
+    - issues: Human-readable problems found while compiling
+    - unreachable: Names of rules that can never fire
+    - finger_masks: {name: bits of the fingers the rule's pattern fixes}
+    """
+
+    def __init__(self, lookup, issues, unreachable, rule_count, finger_masks=None):
+        self.lookup = lookup
+        self.issues = issues
+        self.unreachable = unreachable
+        self.rule_count = rule_count
+        self.finger_masks = finger_masks or {}
+
+    def classify(self, points):
+        """Return the gesture name for one hand's points, or None"""
+        for name, predicates in self.lookup.get(finger_bits(points), ()):
+            for pred in predicates:
+                if not pred(points):
+                    break
+            else:
+                return name
+        return None
+
+    def match(self, points):
+        """
+        Classify one hand and measure how clear the decision was.
+
+        The margin is the smallest distance, in palm lengths, between the
+        hand and any threshold that decided the result: the finger tests
+        the matched rule fixes, its predicates, and the failed predicates of
+        higher-priority rules in the same finger state (a rejected rule
+        needs all its failed predicates to flip). It is mapped to 0..1 with
+        RULE_MARGIN_SCALE. A hand that matches no rule gets margin 0.
+
+        RETURNS: RuleMatch(gesture or None, confidence, margin)
+        """
+        bits = finger_bits(points)
+        palm = max(math.dist(points[0], points[9]), 1e-6)
+        closest = math.inf
+        for name, predicates in self.lookup.get(bits, ()):
+            failed = [abs(pred.difference(points)) for pred in predicates if not pred(points)]
+            if failed:
+                closest = min(closest, max(failed))
+                continue
+            for pred in predicates:
+                closest = min(closest, abs(pred.difference(points)))
+            mask = self.finger_masks.get(name, 0b11111)
+            for finger, (tip, joint, coord) in enumerate(FINGER_TESTS):
+                if mask & (1 << finger):
+                    closest = min(closest, abs(points[tip][coord] - points[joint][coord]))
+            return RuleMatch(name, 1.0, 1.0 - math.exp(-closest / palm / RULE_MARGIN_SCALE))
+        return RuleMatch(None, 0.0, 0.0)
+
+
+def compile_rules(rules, known_gestures=None):
+    """
+    Compile a rule table.
+
+    STEPS:
+    1. Sort rules by priority (table order breaks ties)
+    2. Expand each finger pattern into the finger states it matches
+    3. Drop rules whose predicates can never be true
+    4. In each finger state, drop rules fully shadowed by an earlier rule and
+       note rules that only fire when an earlier, overlapping rule does not
+
+    PARAMETERS:
+    - rules: List of Rule entries
+    - known_gestures: Optional list of valid gesture names (e.g. GESTURE_LIST)
+
+    RETURNS: CompiledRules
+    """
+    issues = []
+    ordered = sorted(enumerate(rules), key=lambda item: (item[1].priority, item[0]))
+
+    compiled = []
+    for _, rule in ordered:
+        predicates = tuple(CompiledPredicate(spec) for spec in rule.predicates)
+        states = expand_pattern(rule.fingers)
+        if known_gestures is not None and rule.name not in known_gestures:
+            issues.append(f"{rule.name}: not listed in GESTURE_LIST")
+        compiled.append((rule, predicates, states))
+
+    buckets = {}
+    unreachable = []
+    for rule, predicates, states in compiled:
+        reason = _impossible(predicates)
+        if reason:
+            issues.append(f"{rule.name}: unreachable, {reason}")
+            unreachable.append(rule.name)
+            continue
+
+        live_states = 0
+        shadowed_by = set()
+        overlaps = set()
+        for state in states:
+            earlier = buckets.get(state, [])
+            blocker = next(
+                (name for name, preds in earlier if all(_implies(predicates, p) for p in preds)),
+                None
+            )
+            if blocker is not None:
+                shadowed_by.add(blocker)
+                continue
+            overlaps.update(name for name, preds in earlier if not _disjoint(preds, predicates))
+            buckets.setdefault(state, []).append((rule.name, predicates))
+            live_states += 1
+
+        if live_states == 0:
+            issues.append(f"{rule.name}: unreachable, shadowed by {', '.join(sorted(shadowed_by))}")
+            unreachable.append(rule.name)
+        elif shadowed_by:
+            issues.append(f"{rule.name}: partly shadowed by {', '.join(sorted(shadowed_by))}")
+        if live_states and overlaps:
+            issues.append(f"{rule.name}: overlaps {', '.join(sorted(overlaps))} "
+                          f"(only fires when those do not)")
+
+    lookup = {state: tuple(entries) for state, entries in buckets.items()}
+    finger_masks = {rule.name: pattern_mask(rule.fingers) for rule in rules}
+    return CompiledRules(lookup, issues, unreachable, len(rules), finger_masks)
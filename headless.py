@@ -0,0 +1,344 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Headless Recognition Daemon
+# PURPOSE: Turn the camera into committed signs without Flask or a browser
+# EXPLANATION: Some deployments only need the text. app.py also loads the
+#              web framework and templates, a second GestureRecognizer, and
+#              draws and JPEG-encodes frames for every viewer. This daemon
+#              runs only what produces text:
+#              1. CameraManager's capture and processing threads (the same
+#                 GestureRecognizer and motion recognizer as the web app)
+#              2. The stabilizer, sampled every stabilizer_sample_seconds
+#                 (like capture_service.py)
+#              3. Sinks that receive each committed sign:
+#                 stdout       one line per sign (the default)
+#                 file:PATH    appended, one line per sign
+#                 unix:PATH    a UNIX socket; every connected reader gets
+#                              each line (a reader whose socket buffer is
+#                              full is dropped; sending never waits)
+#                 db           the predictions table (like the web app)
+#              Frames are never annotated or encoded.
+#              SIGTERM / SIGINT stop it cleanly (camera released, files
+#              closed, socket removed). SIGHUP reloads the runtime settings
+#              and reopens file sinks (for log rotation) between two samples.
+#
+# OUTPUT (--format json, the default): one JSON object per line, e.g.
+#     {"gesture": "HELLO", "confidence": 0.93, "kind": "static", "early": true,
+#      "time": "2026-10-19T10:15:02.512Z"}
+# --format text writes only the gesture name.
+#
+# USAGE:
+#     python headless.py
+#     python headless.py --sink file:signs.jsonl --sink db
+#     python headless.py --sink unix:/tmp/signlang.sock --format text
+#     SIGNLANG_CAMERA_SOURCE=file:session.mp4 python headless.py --seconds 60
+#     (SIGNLANG_PERF_PROFILE picks a runtime profile, as for the web app)
+# ============================================================================
+
+import argparse
+import contextlib
+import json
+import os
+import signal
+import socket
+import stat
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from app_logging import setup_logging, get_logger
+
+# stdout is a sink here: logs go to stderr
+setup_logging(stream=sys.stderr)
+
+from runtime_config import runtime_config, RuntimeConfigError
+from stabilizer import GestureStabilizer
+from metrics import GESTURES_COMMITTED
+
+log = get_logger('headless')
+
+
+# ======================== SINKS =============================
+
+class StreamSink:
+    """Lines to an open text stream (stdout)"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, line, sign):
+        self.stream.write(line + '\n')
+        self.stream.flush()
+
+    def reopen(self):
+        pass
+
+    def close(self):
+        self.stream.flush()
+
+
+class FileSink(StreamSink):
+    """Lines appended to a file; reopen() starts a new file after log rotation"""
+
+    def __init__(self, path):
+        self.path = path
+        super().__init__(open(path, 'a', encoding='utf-8'))
+
+    def reopen(self):
+        self.stream.close()
+        self.stream = open(self.path, 'a', encoding='utf-8')
+
+    def close(self):
+        self.stream.close()
+
+
+class UnixSocketSink:
+    """
+    Listening UNIX socket: every connected reader gets each line.
+    Sends never block recognition: a reader that is gone, or too slow to
+    have room for the whole line in its socket buffer, is dropped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.exists(path):
+            if not stat.S_ISSOCK(os.stat(path).st_mode):
+                raise OSError(f"{path} exists and is not a socket")
+            os.unlink(path)               # Left over from a daemon that was killed
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen()
+        self.clients = []
+        self.lock = threading.Lock()
+        threading.Thread(target=self._accept_loop, name='unix-sink', daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                return                    # Closed
+            client.setblocking(False)
+            with self.lock:
+                self.clients.append(client)
+            log.info("Socket reader connected (%d)", len(self.clients))
+
+    def write(self, line, sign):
+        data = (line + '\n').encode('utf-8')
+        with self.lock:
+            for client in list(self.clients):
+                try:
+                    if client.send(data) != len(data):
+                        raise BlockingIOError("socket buffer full")
+                except OSError:             # BlockingIOError is an OSError
+                    self.clients.remove(client)
+                    client.close()
+                    log.info("Socket reader dropped (%d left)", len(self.clients))
+
+    def reopen(self):
+        pass
+
+    def close(self):
+        self.server.close()
+        with self.lock:
+            for client in self.clients:
+                client.close()
+            self.clients.clear()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class DatabaseSink:
+    """Committed signs saved to the predictions table"""
+
+    def __init__(self):
+        from database import initialize_database, save_prediction
+        initialize_database()
+        self.save_prediction = save_prediction
+
+    def write(self, line, sign):
+        if not self.save_prediction(sign['gesture'], confidence=sign['confidence']):
+            raise OSError("database write failed")
+
+    def reopen(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def open_sink(spec):
+    """
+    Build a sink from its command line form.
+
+    PARAMETER: spec - 'stdout', 'file:PATH', 'unix:PATH' or 'db'
+    RETURNS: sink object
+    RAISES: ValueError for an unknown form, OSError if it cannot be opened
+    """
+    kind, _, path = spec.partition(':')
+    if spec == 'stdout':
+        return StreamSink(sys.stdout)
+    if spec == 'db':
+        return DatabaseSink()
+    if kind == 'file' and path:
+        return FileSink(path)
+    if kind == 'unix' and path:
+        return UnixSocketSink(path)
+    raise ValueError(f"unknown sink {spec!r} (expected stdout, file:PATH, unix:PATH or db)")
+
+
+# ======================== DAEMON =============================
+
+class HeadlessRecognizer:
+    """
+    Camera -> recognizer -> stabilizer -> sinks, no web server.
+    run() loops until stop() is called, the time limit passes or the
+    camera stops.
+
+    PARAMETERS:
+    - sinks: Objects with write(line, sign), reopen() and close()
+    - text: Write only the gesture name instead of a JSON object
+    - camera_manager: CameraManager to use (default: a new one)
+    """
+
+    def __init__(self, sinks, text=False, camera_manager=None):
+        if camera_manager is None:
+            from camera_module import CameraManager
+            camera_manager = CameraManager()
+        self.camera_manager = camera_manager
+        self.sinks = sinks
+        self.text = text
+        self.committed = 0
+        self._stop = threading.Event()
+        self._reload = threading.Event()
+        self._last_commit = None              # (gesture, confidence) of the stabilizer's last commit
+        self.stabilizer = GestureStabilizer(**runtime_config.settings.stabilizer_options(),
+                                            on_commit=self._on_commit)
+        runtime_config.subscribe(lambda settings, changed: self.stabilizer.configure(**settings.stabilizer_options()))
+
+    def stop(self):
+        self._stop.set()
+
+    def request_reload(self):
+        """Reload runtime settings and reopen sinks before the next sample (safe in a signal handler)"""
+        self._reload.set()
+
+    def _reload_now(self):
+        self._reload.clear()
+        try:
+            runtime_config.reload()
+        except RuntimeConfigError as e:
+            log.error("Runtime settings not reloaded: %s", e)
+        for sink in self.sinks:
+            try:
+                sink.reopen()
+            except OSError as e:
+                log.error("Reopening %s failed: %s", type(sink).__name__, e)
+
+    def run(self, seconds=None):
+        """
+        Recognize until stopped.
+
+        RETURNS: True if the camera could be started
+        """
+        manager = self.camera_manager
+        if not manager.start_camera():
+            log.error("Camera could not be started")
+            return False
+        log.info("Recognizing (camera %s); committed signs go to %d sink(s)", manager.index, len(self.sinks))
+        deadline = time.monotonic() + seconds if seconds else None
+        try:
+            while not self._stop.is_set() and manager.is_running:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                self._stop.wait(runtime_config.settings.stabilizer_sample_seconds)
+                if self._reload.is_set():
+                    self._reload_now()
+                self._sample()
+        finally:
+            manager.stop_camera()
+            for sink in self.sinks:
+                try:
+                    sink.close()
+                except OSError as e:
+                    log.error("Closing a sink failed: %s", e)
+            log.info("Stopped after %d committed signs", self.committed)
+        return True
+
+    def _on_commit(self, gesture, confidence):
+        self._last_commit = (gesture, confidence)
+        return True
+
+    def _sample(self):
+        """Feed the latest gesture (and motion signs) to the stabilizer, emit what it commits"""
+        manager = self.camera_manager
+        with manager.frame_lock:
+            gesture, score = manager.latest_gesture, manager.latest_score
+        update = self.stabilizer.update(gesture, score=score)
+        if update.saved:
+            self._emit(*self._last_commit, kind='static', early=update.early)
+        for event in manager.pop_motion_events():
+            if self.stabilizer.submit_event(event.gesture, event.start_time, event.end_time, event.confidence):
+                self._emit(*self._last_commit, kind='motion', early=False)
+
+    def _emit(self, gesture, confidence, kind, early):
+        GESTURES_COMMITTED.labels(kind).inc()
+        self.committed += 1
+        sign = {
+            'gesture': gesture,
+            'confidence': round(float(confidence), 3),
+            'kind': kind,
+            'early': early,
+            'time': datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+        }
+        line = gesture if self.text else json.dumps(sign)
+        for sink in self.sinks:
+            try:
+                sink.write(line, sign)
+            except (OSError, ValueError) as e:
+                log.error("Sign %s not written to %s: %s", gesture, type(sink).__name__, e)
+
+
+# ======================== MAIN =============================
+
+def main():
+    parser = argparse.ArgumentParser(description='Recognize signs from the camera without the web app')
+    parser.add_argument('--sink', action='append', default=[],
+                        help="stdout (default), file:PATH, unix:PATH or db; may be repeated")
+    parser.add_argument('--format', choices=('json', 'text'), default='json', help='Output line format')
+    parser.add_argument('--seconds', type=float, default=None, help='Stop after this many seconds')
+    args = parser.parse_args()
+
+    sinks = []
+    try:
+        for spec in args.sink or ['stdout']:
+            sinks.append(open_sink(spec))
+    except (ValueError, OSError) as e:
+        for sink in sinks:
+            sink.close()
+        parser.error(str(e))
+
+    # MediaPipe start-up chatter must not end up in the stdout sink
+    with contextlib.redirect_stdout(sys.stderr):
+        daemon = HeadlessRecognizer(sinks, text=args.format == 'text')
+
+    def handle_signal(signum, frame):
+        log.info("Signal %s received, shutting down", signum)
+        daemon.stop()
+
+    def handle_reload(signum, frame):
+        # Only a flag: the signal may arrive in the middle of writing a sign
+        log.info("Signal %s received, reloading before the next sample", signum)
+        daemon.request_reload()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, handle_reload)
+
+    sys.exit(0 if daemon.run(args.seconds) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: HTTP Caching and Compression
+# PURPOSE: Make idle dashboard polls and repeat page loads nearly free
+# EXPLANATION: The dashboard polls /api/statistics and /api/predictions,
+#              but the answers only change when a sign is saved or the
+#              history is cleared. So:
+#              1. Read routes send an ETag built from the database's data
+#                 version (database.get_data_version(), bumped by every
+#                 write). A poll with a matching If-None-Match gets an empty
+#                 304 - no queries, no JSON. Browsers send If-None-Match by
+#                 themselves (Cache-Control: no-cache = always revalidate).
+#              2. JSON, HTML, CSS and JS are gzip (or brotli, if installed
+#                 and accepted) compressed
+#              3. Templates link static files with static_url(), which adds
+#                 a content fingerprint (?v=...); fingerprinted URLs are
+#                 cached by browsers for STATIC_MAX_AGE without revalidating
+#
+#              Works across processes: the data version lives in the
+#              database, so web workers see commits of the capture service.
+# ============================================================================
+
+import gzip
+import hashlib
+import os
+from functools import wraps
+
+from flask import current_app, request, url_for
+
+from config import HTTP_COMPRESS_MIN_BYTES, HTTP_GZIP_LEVEL, STATIC_MAX_AGE
+from database import get_data_version
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install Brotli
+    brotli = None
+
+COMPRESSIBLE_TYPES = {'application/json', 'text/html', 'text/css', 'text/javascript',
+                      'application/javascript', 'image/svg+xml', 'text/plain'}
+
+_fingerprints = {}          # static path -> (mtime_ns, size, fingerprint)
+_compressed_static = {}     # (filename, fingerprint, encoding) -> compressed bytes
+
+
+# ======================== CONDITIONAL RESPONSES =============================
+
+def cached_by_data_version(extra=None):
+    """
+    Decorator: ETag the route's 200 responses with the data version and
+    answer 304 Not Modified while it has not changed.
+
+    PARAMETER: extra - Optional callable returning a string that also
+               changes the response (e.g. static file fingerprints of a page)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = get_data_version()
+            if version is None:
+                return view(*args, **kwargs)        # Cannot tell; never send a stale 304
+            etag = f"d{version}" + (f"-{extra()}" if extra is not None else '')
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            # Weak: the same data may be sent gzip, brotli or uncompressed
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+
+# ======================== STATIC FILE FINGERPRINTS =============================
+
+def static_fingerprint(filename):
+    """Short content hash of a static file (recomputed when the file changes), None if missing"""
+    path = os.path.join(current_app.static_folder, filename)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    cached = _fingerprints.get(path)
+    if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+        with open(path, 'rb') as f:
+            cached = (stat.st_mtime_ns, stat.st_size, hashlib.md5(f.read()).hexdigest()[:12])
+        _fingerprints[path] = cached
+    return cached[2]
+
+
+def static_url(filename):
+    """url_for('static') with a ?v= content fingerprint (template global)"""
+    fingerprint = static_fingerprint(filename)
+    if fingerprint is None:
+        return url_for('static', filename=filename)
+    return url_for('static', filename=filename, v=fingerprint)
+
+
+def static_assets_token(*filenames):
+    """Combined fingerprint of static files, for ETags of pages that link them"""
+    return hashlib.md5(''.join(static_fingerprint(name) or '-' for name in filenames).encode()).hexdigest()[:8]
+
+
+# ======================== COMPRESSION =============================
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=HTTP_GZIP_LEVEL, mtime=0)
+
+
+def _compress_response(response):
+    if (response.status_code != 200 or response.mimetype not in COMPRESSIBLE_TYPES
+            or 'Content-Encoding' in response.headers):
+        return response
+    static = request.endpoint == 'static'
+    if response.is_streamed and not static:
+        return response                     # Generators (streams) are sent as they come
+    response.vary.add('Accept-Encoding')
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    if static:
+        # Static files are sent straight from disk; read them (they are small)
+        # and keep the compressed version until the file changes
+        response.direct_passthrough = False
+        filename = request.view_args.get('filename', '')
+        key = (filename, static_fingerprint(filename), encoding)
+        data = _compressed_static.get(key)
+        if data is None:
+            raw = response.get_data()
+            if len(raw) < HTTP_COMPRESS_MIN_BYTES:
+                return response
+            data = _compressed_static[key] = _compress(raw, encoding)
+        elif hasattr(response.response, 'close'):
+            response.response.close()       # The file was opened but is not needed
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+    else:
+        raw = response.get_data()
+        if len(raw) < HTTP_COMPRESS_MIN_BYTES:
+            return response
+        data = _compress(raw, encoding)
+
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+# ======================== REGISTRATION =============================
+
+def register_http_caching(app):
+    """Compression, static_url() for templates and long caching of fingerprinted static files"""
+    app.add_template_global(static_url)
+
+    @app.after_request
+    def cache_and_compress(response):
+        """Immutable caching for current fingerprinted static URLs, then compression"""
+        if request.endpoint == 'static' and response.status_code in (200, 304):
+            version = request.args.get('v')
+            if version and version == static_fingerprint(request.view_args.get('filename', '')):
+                response.cache_control.no_cache = None
+                response.cache_control.public = True
+                response.cache_control.max_age = STATIC_MAX_AGE
+                response.cache_control.immutable = True
+        return _compress_response(response)
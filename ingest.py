@@ -0,0 +1,267 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Bulk Event Ingestion
+# PURPOSE: Parse batches of signs uploaded by edge devices (POST /api/ingest)
+# EXPLANATION: Edge units keep the signs they commit while offline and
+#              upload thousands at once. A batch is parsed and checked
+#              here, then written by database.ingest_events() with
+#              executemany in chunked transactions (save_prediction opens a
+#              connection and commits once per row).
+#              Every event carries a client-chosen event id, unique per
+#              device: uploading the same batch twice stores it once, so a
+#              device can simply retry a batch whose response it never got.
+#              Bad events are rejected one by one; the rest of the batch
+#              is still stored.
+#
+# FORMATS (picked by the first bytes of the body):
+#
+#   NDJSON - one JSON object per line:
+#       {"device_id": "unit-7", "event_id": 1042, "gesture": "HELLO",
+#        "timestamp": 1760000000.25, "confidence": 0.93}
+#       timestamp: epoch seconds or ISO 8601 (naive = UTC);
+#       event_id: string or integer; confidence: optional (0..1)
+#
+#   Binary (compact, ~22 bytes per event), little-endian:
+#       b'SLB1'
+#       u1  device id length, then the device id (UTF-8)
+#       u2  gesture name count, then per name: u1 length + UTF-8 name
+#       u4  event count, then per event (RECORD_DTYPE, packed):
+#           u8 event id | f8 epoch seconds | u2 gesture index | f4 confidence (NaN = none)
+#       encode_binary() builds this format for clients and tools.
+#
+# Stored timestamps are UTC text 'YYYY-MM-DD HH:MM:SS.SSS', which sorts
+# together with the server's own CURRENT_TIMESTAMP values.
+# ============================================================================
+
+import json
+import math
+import struct
+import time
+from datetime import datetime, timezone
+from itertools import repeat
+
+import numpy as np
+
+BINARY_MAGIC = b'SLB1'
+
+# One binary event (numpy packs structured dtypes without padding)
+RECORD_DTYPE = np.dtype([('event_id', '<u8'), ('timestamp', '<f8'),
+                         ('gesture', '<u2'), ('confidence', '<f4')])
+
+MAX_ID_LENGTH = 64             # device_id, event_id and gesture names
+MIN_TIMESTAMP = 946684800.0    # 2000-01-01: older means an unset device clock
+MAX_CLOCK_AHEAD = 86400.0      # Allowed device clock drift into the future
+MAX_ERRORS_REPORTED = 20       # Rejected events listed in a response
+
+
+class IngestError(ValueError):
+    """The batch as a whole cannot be read (bad header, truncated data)"""
+
+
+# ======================== TIMESTAMPS =============================
+
+def format_timestamps(epochs):
+    """Epoch seconds (sequence or array) -> list of 'YYYY-MM-DD HH:MM:SS.SSS' UTC strings"""
+    millis = np.round(np.asarray(epochs, dtype=np.float64) * 1000.0).astype('datetime64[ms]')
+    return [stamp.replace('T', ' ') for stamp in np.datetime_as_string(millis, unit='ms').tolist()]
+
+
+def _parse_timestamp(value):
+    """Epoch seconds or ISO 8601 text -> epoch seconds (ValueError if invalid)"""
+    if isinstance(value, bool):
+        raise ValueError("timestamp must be a number or ISO 8601 text")
+    if isinstance(value, (int, float)):
+        try:
+            epoch = float(value)
+        except OverflowError:          # A JSON integer too large for a float
+            raise ValueError("timestamp is out of range")
+    elif isinstance(value, str):
+        moment = datetime.fromisoformat(value)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        epoch = moment.timestamp()
+    else:
+        raise ValueError("timestamp must be a number or ISO 8601 text")
+    if not math.isfinite(epoch) or epoch < MIN_TIMESTAMP:
+        raise ValueError("timestamp is before 2000 (device clock not set?)")
+    if epoch > time.time() + MAX_CLOCK_AHEAD:
+        raise ValueError("timestamp is in the future")
+    return epoch
+
+
+# ======================== FIELD CHECKS =============================
+
+def _text(event, field):
+    """Required short text field (integers accepted for event_id)"""
+    value = event.get(field)
+    if field == 'event_id' and isinstance(value, int) and not isinstance(value, bool):
+        value = str(value)
+    if not isinstance(value, str) or not value or len(value) > MAX_ID_LENGTH:
+        raise ValueError(f"{field} must be text of 1-{MAX_ID_LENGTH} characters")
+    return value
+
+
+def _confidence(value):
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0.0 <= value <= 1.0:
+        raise ValueError("confidence must be a number from 0 to 1")
+    return float(value)
+
+
+# ======================== NDJSON =============================
+
+def parse_ndjson(body):
+    """
+    Parse an NDJSON batch (blank lines are skipped).
+
+    PARAMETERS:
+    - body: Request body (bytes or str)
+
+    RETURNS: (rows, errors, received)
+    - rows: (device_id, event_id, gesture, timestamp, confidence) tuples
+      for database.ingest_events()
+    - errors: (line number, message) of each rejected line
+    - received: Number of non-blank lines
+    """
+    if isinstance(body, bytes):
+        try:
+            body = body.decode('utf-8')
+        except UnicodeDecodeError as e:
+            raise IngestError(f"NDJSON body is not UTF-8: {e}")
+
+    parsed, epochs, errors = [], [], []
+    received = 0
+    for number, line in enumerate(body.splitlines(), 1):
+        if not line.strip():
+            continue
+        received += 1
+        try:
+            event = json.loads(line)
+            if not isinstance(event, dict):
+                raise ValueError("line is not a JSON object")
+            row = (_text(event, 'device_id'), _text(event, 'event_id'),
+                   _text(event, 'gesture'), _confidence(event.get('confidence')))
+            epoch = _parse_timestamp(event.get('timestamp'))
+        except (ValueError, OverflowError) as e:   # json.JSONDecodeError is a ValueError
+            errors.append((number, str(e)))
+            continue
+        parsed.append(row)
+        epochs.append(epoch)
+
+    rows = [(device_id, event_id, gesture, stamp, confidence)
+            for (device_id, event_id, gesture, confidence), stamp
+            in zip(parsed, format_timestamps(epochs))]
+    return rows, errors, received
+
+
+# ======================== BINARY =============================
+
+def _read_text(body, offset, length_format):
+    """Length-prefixed UTF-8 string at offset; returns (text, next offset)"""
+    size = struct.calcsize(length_format)
+    if offset + size > len(body):
+        raise IngestError("binary batch is truncated")
+    (length,) = struct.unpack_from(length_format, body, offset)
+    offset += size
+    if offset + length > len(body):
+        raise IngestError("binary batch is truncated")
+    try:
+        return body[offset:offset + length].decode('utf-8'), offset + length
+    except UnicodeDecodeError as e:
+        raise IngestError(f"binary batch has invalid UTF-8 text: {e}")
+
+
+def parse_binary(body):
+    """
+    Parse a binary batch (see FORMATS). Events are checked as whole columns
+    with NumPy, so a batch costs little more than the database insert.
+
+    RETURNS: (rows, errors, received) like parse_ndjson (errors give the
+             event's position in the batch, counting from 1)
+    RAISES: IngestError if the header or the event table is malformed
+    """
+    if not body.startswith(BINARY_MAGIC):
+        raise IngestError("binary batch must start with %r" % BINARY_MAGIC)
+    device_id, offset = _read_text(body, len(BINARY_MAGIC), '<B')
+    if not device_id or len(device_id) > MAX_ID_LENGTH:
+        raise IngestError(f"binary batch device id must be text of 1-{MAX_ID_LENGTH} characters")
+
+    if offset + 2 > len(body):
+        raise IngestError("binary batch is truncated")
+    (name_count,) = struct.unpack_from('<H', body, offset)
+    offset += 2
+    names = []
+    for _ in range(name_count):
+        name, offset = _read_text(body, offset, '<B')
+        names.append(name)
+
+    if offset + 4 > len(body):
+        raise IngestError("binary batch is truncated")
+    (count,) = struct.unpack_from('<I', body, offset)
+    offset += 4
+    if len(body) - offset != count * RECORD_DTYPE.itemsize:
+        raise IngestError(f"binary batch announces {count} events but holds "
+                          f"{(len(body) - offset) / RECORD_DTYPE.itemsize:g}")
+    records = np.frombuffer(body, dtype=RECORD_DTYPE, count=count, offset=offset)
+
+    # Check whole columns at once
+    stamps = records['timestamp']
+    confidences = records['confidence']
+    with np.errstate(invalid='ignore'):
+        bad_time = ~np.isfinite(stamps) | (stamps < MIN_TIMESTAMP) | (stamps > time.time() + MAX_CLOCK_AHEAD)
+        bad_confidence = ~np.isnan(confidences) & ~((confidences >= 0.0) & (confidences <= 1.0))
+    bad_gesture = records['gesture'] >= len(names)
+    bad_name = np.array([not name or len(name) > MAX_ID_LENGTH for name in names] + [True])
+    bad_gesture |= bad_name[np.minimum(records['gesture'], len(names))]
+
+    errors = []
+    for problem, mask in (("timestamp out of range", bad_time),
+                          ("confidence must be NaN or from 0 to 1", bad_confidence),
+                          ("gesture index has no valid name", bad_gesture)):
+        errors.extend((int(index) + 1, problem) for index in np.flatnonzero(mask))
+    errors.sort()
+
+    good = records[~(bad_time | bad_confidence | bad_gesture)]
+    confidence_values = [None if math.isnan(c) else c for c in good['confidence'].tolist()]
+    rows = list(zip(repeat(device_id), map(str, good['event_id'].tolist()),
+                    [names[i] for i in good['gesture'].tolist()],
+                    format_timestamps(good['timestamp']), confidence_values))
+    return rows, errors, count
+
+
+def encode_binary(device_id, events):
+    """
+    Build a binary batch.
+
+    PARAMETERS:
+    - device_id: Device the events come from
+    - events: Iterable of (event_id (int), epoch seconds, gesture, confidence or None)
+
+    RETURNS: bytes
+    """
+    events = list(events)
+    names = sorted({gesture for _, _, gesture, _ in events})
+    index = {name: i for i, name in enumerate(names)}
+
+    records = np.empty(len(events), dtype=RECORD_DTYPE)
+    for i, (event_id, stamp, gesture, confidence) in enumerate(events):
+        records[i] = (event_id, stamp, index[gesture], np.nan if confidence is None else confidence)
+
+    parts = [BINARY_MAGIC]
+    device = device_id.encode('utf-8')
+    parts.append(struct.pack('<B', len(device)) + device)
+    parts.append(struct.pack('<H', len(names)))
+    for name in names:
+        encoded = name.encode('utf-8')
+        parts.append(struct.pack('<B', len(encoded)) + encoded)
+    parts.append(struct.pack('<I', len(records)))
+    parts.append(records.tobytes())
+    return b''.join(parts)
+
+
+def parse_batch(body):
+    """Parse a binary or NDJSON batch (see FORMATS); returns (rows, errors, received)"""
+    if body.startswith(BINARY_MAGIC):
+        return parse_binary(body)
+    return parse_ndjson(body)
@@ -0,0 +1,190 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: JPEG Encoder
+# PURPOSE: One JPEG encoding path for every frame the server sends
+# EXPLANATION: Stream tiers (/video_feed, /api/frame), snapshots
+#              (frame_to_base64) and the shared frame of capture_service.py
+#              all encode through `jpeg_encoder.encode(frame, quality)`.
+#              Behind it:
+#              1. A backend: libjpeg-turbo through PyTurboJPEG when it is
+#                 installed ('turbojpeg'), otherwise OpenCV ('opencv')
+#              2. Chroma subsampling ('444', '422', '420') and fast DCT
+#                 settings (fast DCT: TurboJPEG only; OpenCV has no switch)
+#              3. Optionally a thread pool: with many viewers, encodes run
+#                 on at most JPEG_ENCODER_THREADS threads instead of one per
+#                 request thread (both backends release the GIL)
+#
+#              Compare backends and settings on the target machine with
+#              tools/bench_jpeg_encoder.py.
+# ============================================================================
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from config import JPEG_ENCODER_BACKEND, JPEG_SUBSAMPLING, JPEG_FAST_DCT, JPEG_ENCODER_THREADS
+from metrics import JPEG_ENCODE_SECONDS
+from app_logging import get_logger
+
+try:
+    import turbojpeg
+except ImportError:  # PyTurboJPEG is optional (pip install PyTurboJPEG, needs libturbojpeg)
+    turbojpeg = None
+
+log = get_logger('jpeg')
+
+SUBSAMPLING_MODES = ('444', '422', '420')
+BACKENDS = ('auto', 'opencv', 'turbojpeg')
+
+
+# ======================== BACKENDS =============================
+
+class OpenCVBackend:
+    """cv2.imencode (OpenCV's bundled libjpeg(-turbo); no fast DCT switch)"""
+
+    name = 'opencv'
+
+    def __init__(self, subsampling='420', fast_dct=False):
+        self._params = []
+        factor = getattr(cv2, f'IMWRITE_JPEG_SAMPLING_FACTOR_{subsampling}', None)
+        if factor is not None and hasattr(cv2, 'IMWRITE_JPEG_SAMPLING_FACTOR'):
+            self._params = [cv2.IMWRITE_JPEG_SAMPLING_FACTOR, factor]
+        elif subsampling != '420':
+            log.warning("This OpenCV cannot set JPEG subsampling; using its default (4:2:0)")
+        if fast_dct:
+            log.info("Fast DCT is not available with the OpenCV backend; ignored")
+
+    def encode(self, frame, quality):
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, int(quality)] + self._params)
+        if not ok:
+            raise ValueError("OpenCV could not encode the frame as JPEG")
+        return buffer.tobytes()
+
+
+class TurboJPEGBackend:
+    """libjpeg-turbo's TurboJPEG API (PyTurboJPEG); takes BGR frames directly"""
+
+    name = 'turbojpeg'
+
+    def __init__(self, subsampling='420', fast_dct=False):
+        if turbojpeg is None:
+            raise RuntimeError("The 'turbojpeg' backend needs PyTurboJPEG (pip install PyTurboJPEG)")
+        if not hasattr(turbojpeg, 'TurboJPEG'):
+            # Another distribution (e.g. the pybind11 'turbojpeg' wheel) uses the same import name
+            raise RuntimeError(f"The installed 'turbojpeg' module ({getattr(turbojpeg, '__file__', '?')}) "
+                               "is not PyTurboJPEG")
+        self._jpeg = turbojpeg.TurboJPEG()      # Raises if libturbojpeg is not found
+        self._subsample = {'444': turbojpeg.TJSAMP_444, '422': turbojpeg.TJSAMP_422,
+                           '420': turbojpeg.TJSAMP_420}[subsampling]
+        self._flags = turbojpeg.TJFLAG_FASTDCT if fast_dct else 0
+
+    def encode(self, frame, quality):
+        if not frame.flags.c_contiguous:
+            frame = np.ascontiguousarray(frame)
+        return self._jpeg.encode(frame, quality=int(quality), pixel_format=turbojpeg.TJPF_BGR,
+                                 jpeg_subsample=self._subsample, flags=self._flags)
+
+
+def create_backend(backend='auto', subsampling='420', fast_dct=False):
+    """
+    PARAMETERS:
+    - backend: 'turbojpeg', 'opencv', or 'auto' (TurboJPEG if usable, else OpenCV)
+    - subsampling: '444', '422' or '420'
+    - fast_dct: Faster, slightly less accurate DCT (TurboJPEG only)
+
+    RETURNS: Backend object with encode(frame, quality) -> bytes
+    RAISES: ValueError for unknown settings, RuntimeError if 'turbojpeg' is
+            requested explicitly but cannot be loaded
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown JPEG encoder backend {backend!r} (expected one of {BACKENDS})")
+    if subsampling not in SUBSAMPLING_MODES:
+        raise ValueError(f"Unknown JPEG subsampling {subsampling!r} (expected one of {SUBSAMPLING_MODES})")
+    if backend in ('auto', 'turbojpeg'):
+        try:
+            return TurboJPEGBackend(subsampling, fast_dct)
+        except (RuntimeError, OSError, ImportError, AttributeError) as e:
+            if backend == 'turbojpeg':
+                raise RuntimeError(f"TurboJPEG backend unavailable: {e}") from e
+            log.debug("TurboJPEG not available (%s); using OpenCV", e)
+    return OpenCVBackend(subsampling, fast_dct)
+
+
+# ======================== ENCODER =============================
+
+class JpegEncoder:
+    """
+    Encodes frames with one backend, timed into JPEG_ENCODE_SECONDS.
+
+    PARAMETERS:
+    - backend, subsampling, fast_dct: See create_backend()
+    - threads: Encode on a pool of this many threads (0 = in the caller's thread)
+    """
+
+    def __init__(self, backend='auto', subsampling='420', fast_dct=False, threads=0):
+        self.backend = create_backend(backend, subsampling, fast_dct)
+        self.subsampling = subsampling
+        self.fast_dct = fast_dct
+        self.threads = threads
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    def _executor(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='jpeg-encode')
+        return self._pool
+
+    def _timed_encode(self, frame, quality, site):
+        with JPEG_ENCODE_SECONDS.labels(site).time():
+            return self.backend.encode(frame, quality)
+
+    def encode(self, frame, quality, site='other'):
+        """
+        PARAMETERS:
+        - frame: BGR uint8 image
+        - quality: JPEG quality 1-100
+        - site: Label for the encode time histogram (e.g. tier name)
+
+        RETURNS: JPEG bytes
+        """
+        if not self.threads:
+            return self._timed_encode(frame, quality, site)
+        return self._executor().submit(self._timed_encode, frame, quality, site).result()
+
+    def encode_many(self, jobs, site='other'):
+        """
+        Encode several frames at once (in parallel on the pool if enabled).
+
+        PARAMETER: jobs - Iterable of (frame, quality)
+        RETURNS: List of JPEG bytes in the same order
+        """
+        jobs = list(jobs)
+        if not self.threads or len(jobs) < 2:
+            return [self._timed_encode(frame, quality, site) for frame, quality in jobs]
+        futures = [self._executor().submit(self._timed_encode, frame, quality, site) for frame, quality in jobs]
+        return [future.result() for future in futures]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+def _default_threads():
+    return JPEG_ENCODER_THREADS if JPEG_ENCODER_THREADS >= 0 else min(4, os.cpu_count() or 1)
+
+
+# Shared by every module of this process
+jpeg_encoder = JpegEncoder(JPEG_ENCODER_BACKEND, JPEG_SUBSAMPLING, JPEG_FAST_DCT, _default_threads())
+log.info("JPEG encoder: %s (subsampling %s%s, %s)", jpeg_encoder.name, JPEG_SUBSAMPLING,
+         ', fast DCT' if JPEG_FAST_DCT else '',
+         f"{jpeg_encoder.threads} encode threads" if jpeg_encoder.threads else "encodes in request threads")
@@ -0,0 +1,337 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Landmark Recording and Replay
+# PURPOSE: Save what the recognizer saw, and replay it without MediaPipe
+# EXPLANATION: MediaPipe is by far the slowest step of recognition. A
+#              recording keeps its output (per-frame hand landmarks,
+#              handedness, timestamps and raw gestures) so classifier and
+#              stabilizer changes can be re-checked on real sessions in
+#              seconds instead of re-running the hand model on video.
+#
+# FORMAT: A recording is a directory of flat little-endian column files
+#         plus index.json (counts, dtypes, gesture names, metadata):
+#
+#   Per frame:  times.bin        <f8  capture time in seconds
+#               hand_counts.bin  u1   hands detected in the frame
+#               gestures.bin     <i2  final gesture (index into 'gestures', -1 = none)
+#   Per hand:   points.bin       <f4  (21, 3) landmarks, in the frame's hand order
+#               handedness.bin   u1   0 = Left, 1 = Right, 255 = unknown
+#               hand_gestures.bin <i2 single-hand gesture (-1 = none)
+#
+#   Hands of frame i are rows hand_offsets[i]:hand_offsets[i + 1] of the
+#   per-hand columns. Columns are opened with np.memmap, so opening an
+#   hour-long recording reads nothing but the index.
+#
+# WHY COLUMNS? Appending is a plain file write per column, replay reads
+# whole columns as arrays, and the files are ~260 bytes per hand.
+# index.json is replaced atomically on every flush, so a recording cut
+# short by a crash is still readable up to its last flush.
+# ============================================================================
+
+import json
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from stabilizer import TranscriptBuilder
+from two_hand_rules import JointMatch
+
+FORMAT_NAME = 'landmark-recording'
+FORMAT_VERSION = 1
+INDEX_FILE = 'index.json'
+
+HANDEDNESS_LABELS = ('Left', 'Right')
+UNKNOWN_HAND = 255
+NO_GESTURE = -1
+
+# name: (file, dtype, row shape, per-frame or per-hand)
+COLUMNS = {
+    'times': ('times.bin', '<f8', (), 'frame'),
+    'hand_counts': ('hand_counts.bin', 'u1', (), 'frame'),
+    'gestures': ('gestures.bin', '<i2', (), 'frame'),
+    'points': ('points.bin', '<f4', (21, 3), 'hand'),
+    'handedness': ('handedness.bin', 'u1', (), 'hand'),
+    'hand_gestures': ('hand_gestures.bin', '<i2', (), 'hand'),
+}
+
+
+# ======================== RECORDER =============================
+
+class LandmarkRecorder:
+    """
+    Appends recognizer output to a recording directory.
+
+    USAGE:
+        with LandmarkRecorder('recordings/session1') as recorder:
+            recorder.add_results(timestamp, gesture_recognizer.process_frame(frame))
+    """
+
+    def __init__(self, path, metadata=None, flush_every=300):
+        """
+        PARAMETERS:
+        - path: Recording directory (created; must not already hold a recording)
+        - metadata: JSON-serializable dict stored in the index (camera, fps, ...)
+        - flush_every: Frames buffered in memory between writes to disk
+        """
+        if os.path.exists(os.path.join(path, INDEX_FILE)):
+            raise FileExistsError(f"Recording already exists: {path}")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.metadata = dict(metadata or {})
+        self.flush_every = flush_every
+        self.created = time.time()
+
+        self.gesture_names = []     # Index -> gesture name ('gestures' in index.json)
+        self._gesture_codes = {}
+        self.frame_count = 0
+        self.hand_count = 0
+        self._pending = {name: [] for name in COLUMNS}
+        self._files = {name: open(os.path.join(path, spec[0]), 'wb') for name, spec in COLUMNS.items()}
+        self._write_index()
+
+    def _code(self, gesture):
+        if gesture is None:
+            return NO_GESTURE
+        code = self._gesture_codes.get(gesture)
+        if code is None:
+            code = self._gesture_codes[gesture] = len(self.gesture_names)
+            self.gesture_names.append(gesture)
+        return code
+
+    def add_frame(self, timestamp, hands, gesture=None):
+        """
+        Record one processed frame.
+
+        PARAMETERS:
+        - timestamp: Capture time in seconds
+        - hands: Hand dicts as in process_frame()['hands'] ('handedness',
+          'points' (21, 3), 'gesture'), in the recognizer's order
+        - gesture: Final gesture of the frame (or None)
+        """
+        pending = self._pending
+        pending['times'].append(timestamp)
+        pending['hand_counts'].append(len(hands))
+        pending['gestures'].append(self._code(gesture))
+        for hand in hands:
+            pending['points'].append(np.asarray(hand['points'], np.float32))
+            label = hand.get('handedness')
+            pending['handedness'].append(HANDEDNESS_LABELS.index(label) if label in HANDEDNESS_LABELS
+                                         else UNKNOWN_HAND)
+            pending['hand_gestures'].append(self._code(hand.get('gesture')))
+
+        if len(pending['times']) >= self.flush_every:
+            self.flush()
+
+    def add_results(self, timestamp, detection_results):
+        """Record the output of GestureRecognizer.process_frame()"""
+        self.add_frame(timestamp, detection_results['hands'], detection_results['gesture'])
+
+    def flush(self):
+        """Write buffered frames and publish them in the index"""
+        frames = len(self._pending['times'])
+        hands = len(self._pending['handedness'])
+        if not frames:
+            return
+        for name, (_, dtype, shape, _) in COLUMNS.items():
+            rows = self._pending[name]
+            if rows:
+                self._files[name].write(np.asarray(rows, dtype=dtype).reshape((-1,) + shape).tobytes())
+                self._files[name].flush()
+            rows.clear()
+        self.frame_count += frames
+        self.hand_count += hands
+        self._write_index()
+
+    def _write_index(self):
+        index = {
+            'format': FORMAT_NAME,
+            'version': FORMAT_VERSION,
+            'frames': self.frame_count,
+            'hands': self.hand_count,
+            'gestures': self.gesture_names,
+            'handedness': list(HANDEDNESS_LABELS),
+            'columns': {name: {'file': spec[0], 'dtype': spec[1], 'shape': list(spec[2]), 'per': spec[3]}
+                        for name, spec in COLUMNS.items()},
+            'created': self.created,
+            'metadata': self.metadata,
+        }
+        # Replace atomically: readers never see a half-written index
+        tmp_path = os.path.join(self.path, INDEX_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp_path, os.path.join(self.path, INDEX_FILE))
+
+    def close(self):
+        """Flush remaining frames and close the column files"""
+        if not self._files:
+            return
+        self.flush()
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# ======================== READER =============================
+
+class LandmarkRecording:
+    """
+    Read-only view of a recording. Columns are memory-mapped arrays
+    (see FORMAT at the top of this file); only the frames listed in the
+    index are exposed, even if a writer appended more since.
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, INDEX_FILE), encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('format') != FORMAT_NAME or index.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Not a version {FORMAT_VERSION} landmark recording: {path}")
+
+        self.path = path
+        self.index = index
+        self.metadata = index.get('metadata', {})
+        self.gesture_names = list(index['gestures'])
+        self.handedness_labels = list(index['handedness'])
+
+        counts = {'frame': index['frames'], 'hand': index['hands']}
+        for name, column in index['columns'].items():
+            rows = counts[column['per']]
+            shape = (rows,) + tuple(column['shape'])
+            if rows:
+                array = np.memmap(os.path.join(path, column['file']), dtype=column['dtype'],
+                                  mode='r', shape=shape)
+            else:
+                array = np.zeros(shape, dtype=column['dtype'])   # np.memmap refuses empty files
+            setattr(self, name, array)
+
+        self.hand_offsets = np.zeros(len(self.hand_counts) + 1, np.int64)
+        np.cumsum(self.hand_counts, out=self.hand_offsets[1:])
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def duration(self):
+        """Seconds from the first to the last frame"""
+        return float(self.times[-1] - self.times[0]) if len(self) else 0.0
+
+    def gesture_name(self, code):
+        """Gesture code from a column -> name (or None)"""
+        return self.gesture_names[code] if code >= 0 else None
+
+    def hand_label(self, code, position=0):
+        """Handedness code -> label; unknown hands get process_frame's 'Hand<i>' label"""
+        return self.handedness_labels[code] if code < len(self.handedness_labels) else f"Hand{position}"
+
+    def frame(self, i):
+        """
+        One recorded frame.
+
+        RETURNS: (timestamp, hand dicts like process_frame()['hands'], gesture)
+        """
+        start, end = self.hand_offsets[i], self.hand_offsets[i + 1]
+        hands = [{
+            'handedness': self.hand_label(int(self.handedness[j]), j - start),
+            'points': np.array(self.points[j]),
+            'gesture': self.gesture_name(int(self.hand_gestures[j])),
+            'role': None
+        } for j in range(start, end)]
+        return float(self.times[i]), hands, self.gesture_name(int(self.gestures[i]))
+
+
+# ======================== REPLAY =============================
+
+ReplayResult = namedtuple('ReplayResult', ['gestures', 'hand_gestures', 'transcript', 'frames', 'hands', 'seconds'])
+
+
+def replay(recording, recognizer, builder=None, motion=None, block_frames=8192, jitter=0.0, seed=0):
+    """
+    Run recorded landmarks through the recognizer and the stabilizer
+    exactly like live frames, minus MediaPipe.
+
+    PARAMETERS:
+    - recording: LandmarkRecording
+    - recognizer: GestureRecognizer (create with detect_hands=False)
+    - builder: stabilizer.TranscriptBuilder fed on the recording's clock
+      (default: a fresh one with the app's stabilizer settings)
+    - motion: Optional MotionRecognizer (slower: it dominates replay time)
+    - block_frames: Frames converted from the memory map at a time
+    - jitter: Standard deviation of Gaussian noise added to every landmark
+      coordinate (0 = replay as recorded); simulates a noisier hand model
+    - seed: Random seed of the jitter
+
+    PROCESS (per block of frames):
+    1. match_gesture (gesture and score) on every recorded hand
+    2. order_hands per frame, then one batched two-hand check over every
+       frame that has two hands (CompiledTwoHandRules.classify_many)
+    3. combine_hands picks each frame's gesture; the builder samples it
+
+    RETURNS: ReplayResult(gestures per frame, gestures per recorded hand,
+             transcript entries, frame count, hand count, wall seconds)
+    """
+    builder = builder or TranscriptBuilder()
+    rng = np.random.default_rng(seed)
+    two_hand = recognizer.two_hand_rules
+    no_match = JointMatch(None, None, None)
+    gestures, hand_gestures = [], []
+    started = time.perf_counter()
+
+    for first in range(0, len(recording), block_frames):
+        last = min(first + block_frames, len(recording))
+        offsets = recording.hand_offsets[first:last + 1]
+        base = int(offsets[0])
+        times = recording.times[first:last].tolist()
+        points = np.asarray(recording.points[base:offsets[-1]])
+        if jitter:
+            points = points + rng.normal(0.0, jitter, points.shape).astype(np.float32)
+        handedness = recording.handedness[base:offsets[-1]].tolist()
+
+        # 1. Single-hand gestures (and their scores, for the stabilizer's early commit)
+        matches = [recognizer.match_gesture(p) for p in points.tolist()]
+        block_gestures = [gesture for gesture, _ in matches]
+        hand_gestures.extend(block_gestures)
+
+        # 2. Hands in recognizer order, and the first two of each frame for the joint check
+        frames = []
+        pair_frames, pair_first, pair_second = [], [], []
+        for i, (start, end) in enumerate(zip(offsets[:-1].tolist(), offsets[1:].tolist())):
+            hands = [{
+                'handedness': recording.hand_label(handedness[j - base], j - start),
+                'points': points[j - base],
+                'gesture': block_gestures[j - base],
+                'score': matches[j - base][1],
+                'role': None
+            } for j in range(start, end)]
+            hands = [hands[k] for k in recognizer.order_hands(hands)]
+            frames.append(hands)
+            if len(hands) >= 2 and len(two_hand):
+                pair_frames.append(i)
+                pair_first.append(hands[0]['points'])
+                pair_second.append(hands[1]['points'])
+
+        joint = [no_match] * len(frames)
+        if pair_frames:
+            rules, dominant = two_hand.classify_many(np.array(pair_first), np.array(pair_second))
+            for i, rule, dom in zip(pair_frames, rules.tolist(), dominant.tolist()):
+                if rule >= 0:
+                    joint[i] = JointMatch(two_hand.names[rule], dom, 1 - dom)
+
+        # 3. Final gesture, stabilizer (and motion signs) on the recording clock
+        for t, hands, match in zip(times, frames, joint):
+            combined = recognizer.combine_hands(hands, joint_match=match)
+            gesture = combined['gesture']
+            gestures.append(gesture)
+            events = ()
+            if motion is not None and hands:
+                events = motion.update([(hand['handedness'], hand['points']) for hand in hands], t)
+            builder.add_frame(t, gesture, events, score=combined['score'])
+
+    return ReplayResult(gestures, hand_gestures, builder.transcript(), len(recording),
+                        len(hand_gestures), time.perf_counter() - started)
@@ -0,0 +1,321 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Pipeline Metrics
+# PURPOSE: Latency histograms and counters, exported at /metrics
+# EXPLANATION: Prometheus (or curl) reads /metrics as plain text, e.g.
+#                  signlang_process_frame_seconds_bucket{le="0.05"} 1234
+#              Every stage of the pipeline (capture, MediaPipe, classifying,
+#              JPEG encoding, HTTP requests, database writes) records into
+#              the metrics defined at the bottom of this file.
+#
+# WHY NOT A LOCK PER METRIC? The capture, processing and streaming threads
+# record on every frame. Each thread gets its own counter shard instead
+# (a plain list), so recording is a list increment with no lock at all;
+# /metrics adds the shards up when it is scraped. Recording costs about a
+# microsecond, against tens of milliseconds for one processed frame.
+# ============================================================================
+
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+
+SWEEP_MIN_SHARDS = 64           # Shards of ended threads are folded in once a series has this many
+
+# Default buckets for request-like latencies (seconds)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# ======================== SERIES (ONE LABEL COMBINATION) =============================
+
+class _Series:
+    """
+    Values of one metric for one set of label values, sharded per thread.
+
+    A shard is a list owned by one thread; only that thread writes to it,
+    and readers only sum the shards, so no lock is needed while recording.
+    Shards of threads that ended (e.g. one per HTTP request) are folded
+    into a retired total, so their number stays that of live threads.
+    """
+
+    def __init__(self, size):
+        self._size = size
+        self._local = threading.local()
+        self._shards = []                      # (weak reference to the owning thread, shard)
+        self._retired = [0] * size             # Sum of the shards of threads that ended
+        self._shards_lock = threading.Lock()   # Taken once per thread, not per record
+        self._sweep_at = SWEEP_MIN_SHARDS
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = [0] * self._size
+            with self._shards_lock:
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+                if len(self._shards) >= self._sweep_at:
+                    self._sweep()
+                    self._sweep_at = max(SWEEP_MIN_SHARDS, 2 * len(self._shards))
+        return shard
+
+    def _sweep(self):
+        """Fold the shards of ended threads into the retired total (call with _shards_lock held)"""
+        live = []
+        for owner, shard in self._shards:
+            thread = owner()
+            if thread is not None and thread.is_alive():
+                live.append((owner, shard))
+            else:
+                # The thread is gone, so nothing writes to this shard any more
+                for i, value in enumerate(shard):
+                    self._retired[i] += value
+        self._shards = live
+
+    def totals(self):
+        """Element-wise sum of all thread shards"""
+        with self._shards_lock:
+            self._sweep()
+            shards = [shard for _, shard in self._shards]
+            totals = list(self._retired)
+        for shard in shards:
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class _CounterSeries(_Series):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount=1):
+        """Add amount (must not be negative)"""
+        try:
+            self._local.shard[0] += amount
+        except AttributeError:
+            self._shard()[0] += amount
+
+
+class _HistogramSeries(_Series):
+    # Shard layout: [count per bucket ..., count above the last bucket, sum]
+
+    def __init__(self, buckets):
+        super().__init__(len(buckets) + 2)
+        self._buckets = buckets
+
+    def observe(self, value):
+        """Record one value"""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        shard[bisect_left(self._buckets, value)] += 1
+        shard[-1] += value
+
+    @contextmanager
+    def time(self):
+        """Observe the duration of a with-block (seconds)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+# ======================== METRICS =============================
+
+class _Metric:
+    """A named metric with optional labels; records on the unlabeled series directly"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._series_lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """Series for these label values (created on first use, then cached)"""
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._series_lock:
+                series = self._series.setdefault(values, self._new_series())
+        return series
+
+    def _label_text(self, values, extra=()):
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ''
+        escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+        return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, series in sorted(self._series.items()):
+            lines.extend(self._render_series(values, series.totals()))
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count (name should end in _total)"""
+
+    kind = 'counter'
+
+    def _new_series(self):
+        return _CounterSeries()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def _render_series(self, values, totals):
+        return [f"{self.name}{self._label_text(values)} {_format_value(totals[0])}"]
+
+
+class Histogram(_Metric):
+    """Distribution of values in cumulative buckets (Prometheus histogram)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_series(self):
+        return _HistogramSeries(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+    def _render_series(self, values, totals):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), totals[:-1]):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else _format_value(bound)
+            lines.append(f"{self.name}_bucket{self._label_text(values, [('le', le)])} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(values)} {_format_value(totals[-1])}")
+        lines.append(f"{self.name}_count{self._label_text(values)} {cumulative}")
+        return lines
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ======================== REGISTRY =============================
+
+class Registry:
+    """All metrics exported together by /metrics"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self, names=None):
+        """Prometheus text exposition format (version 0.0.4), optionally only the named metrics"""
+        with self._lock:
+            metrics = [metric for name, metric in self._metrics.items() if names is None or name in names]
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def merge_texts(*texts):
+    """
+    Combine the /metrics texts of several processes into one exposition:
+    each metric keeps one HELP/TYPE header with the samples of all texts.
+    The processes must record different label values (or different
+    metrics); identical series would be listed twice.
+    """
+    families = {}                       # metric name -> (header lines, sample lines)
+    current = None
+    for text in texts:
+        for line in text.splitlines():
+            if line.startswith('# '):
+                kind, name = line.split(' ', 3)[1:3]
+                current = families.setdefault(name, ({}, []))
+                current[0].setdefault(kind, line)
+            elif line and current is not None:
+                current[1].append(line)
+    lines = []
+    for headers, samples in families.values():
+        lines.extend(headers.values())
+        lines.extend(samples)
+    return '\n'.join(lines) + '\n'
+
+
+def counter(name, documentation, labelnames=()):
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+# ======================== PIPELINE METRICS =============================
+
+CAPTURE_INTERVAL = histogram(
+    'signlang_capture_interval_seconds', 'Time between frames read from the camera',
+    buckets=(0.005, 0.01, 0.02, 0.03, 0.035, 0.04, 0.05, 0.075, 0.1, 0.2, 0.5, 1.0))
+PROCESS_FRAME_SECONDS = histogram(
+    'signlang_process_frame_seconds', 'GestureRecognizer.process_frame time (MediaPipe and classification)',
+    buckets=(0.005, 0.01, 0.02, 0.03, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1.0))
+CLASSIFY_SECONDS = histogram(
+    'signlang_classify_seconds', 'Time to classify the hands of one frame (after MediaPipe)',
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025))
+JPEG_ENCODE_SECONDS = histogram(
+    'signlang_jpeg_encode_seconds', 'JPEG encoding time per frame', ['site'],
+    buckets=(0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1))
+REQUEST_SECONDS = histogram(
+    'signlang_http_request_seconds', 'HTTP request latency (streams: until the response starts)',
+    ['route', 'method'])
+FRAME_AGE_SECONDS = histogram(
+    'signlang_frame_age_seconds',
+    'Time since capture of the frame used: waited in the camera buffer when read (capture, from source '
+    'timestamps), detection result ready (result), sent to a viewer (stream, api_frame)',
+    ['stage'])
+DB_WRITE_SECONDS = histogram(
+    'signlang_db_write_seconds', 'Time to save one prediction to the database',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0))
+
+FRAMES_CAPTURED = counter('signlang_frames_captured_total', 'Frames read from the camera')
+FRAMES_DROPPED = counter(
+    'signlang_frames_dropped_total',
+    'Captured frames never processed: newer frame arrived first (not_processed), every ring slot pinned '
+    '(ring_full) or skipped in the camera buffer by low-latency capture (drained)',
+    ['reason'])
+STREAM_FRAMES_STALE = counter(
+    'signlang_stream_frames_stale_total', 'Frames not sent to a viewer because they were older than stream_max_frame_age')
+INFERENCES_SKIPPED = counter('signlang_inferences_skipped_total', 'Frames not sent to MediaPipe (processing disabled)')
+GESTURES_COMMITTED = counter('signlang_gestures_committed_total', 'Signs committed by the stabilizer', ['kind'])
+DB_WRITE_ERRORS = counter('signlang_db_write_errors_total', 'Failed prediction writes')
+EVENTS_INGESTED = counter(
+    'signlang_events_ingested_total',
+    'Events uploaded by edge devices: stored (inserted), already stored (duplicate) or invalid (rejected)',
+    ['result'])
+STREAM_BYTES_SENT = counter('signlang_stream_bytes_total', 'JPEG bytes sent to viewers', ['tier'])
+LOG_RECORDS_DROPPED = counter('signlang_log_records_dropped_total', 'Log records dropped because the log queue was full')
+LOG_RECORDS_SUPPRESSED = counter('signlang_log_records_suppressed_total', 'Repeated log records collapsed by rate limiting')
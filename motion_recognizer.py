@@ -0,0 +1,460 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Motion (Dynamic) Sign Recognition
+# PURPOSE: Recognize signs that are defined by a movement, not a single pose
+# EXPLANATION: The frame classifiers look at one frame at a time, so signs
+#              that need a movement cannot be recognized. This module:
+#              1. Keeps a short ring buffer of landmarks per hand
+#              2. Turns the recent trajectory into a fixed-length sequence of
+#                 small feature vectors (hand path + fingertip shape)
+#              3. Compares it with motion templates using Dynamic Time Warping
+#                 (DTW) inside a Sakoe-Chiba band, so signs performed a bit
+#                 faster or slower still match
+#              4. Skips templates cheaply with the LB_Keogh lower bound and
+#                 stops DTW early once no template can match any more
+#              Matches are reported as MotionEvent(gesture, start, end, ...)
+#              and committed through GestureStabilizer.submit_event().
+# ============================================================================
+
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from app_logging import get_logger
+
+log = get_logger('motion')
+
+WRIST = 0
+MIDDLE_MCP = 9
+FINGERTIPS = (4, 8, 12, 16, 20)
+FEATURE_SIZE = 2 + 3 * len(FINGERTIPS)   # Wrist path (x, y) + fingertip shape
+
+# A recognized motion sign
+MotionEvent = namedtuple('MotionEvent', ['gesture', 'start_time', 'end_time', 'confidence', 'hand'])
+
+
+# ======================== TRAJECTORY FEATURES =============================
+
+def hand_features(points):
+    """
+    Per-frame values the trajectory features are built from.
+
+    PARAMETER: points - (21, 3) landmarks, or (N, 21, 3) for several frames
+    RETURNS: (wrist_xy, palm, shape)
+    - wrist_xy: wrist position in the image (..., 2)
+    - palm: palm size, wrist -> middle finger MCP (...)
+    - shape: fingertips relative to the wrist, in palm sizes (..., 15)
+    """
+    pts = np.asarray(points, dtype=np.float32)
+    wrist = pts[..., WRIST, :]
+    palm = np.linalg.norm(pts[..., MIDDLE_MCP, :] - wrist, axis=-1)
+    tips = (pts[..., FINGERTIPS, :] - wrist[..., None, :]) / np.maximum(palm, 1e-6)[..., None, None]
+    return wrist[..., :2], palm, tips.reshape(pts.shape[:-2] + (3 * len(FINGERTIPS),))
+
+
+def resample_trajectories(times, wrist, palm, shape, starts, length, shape_weight=0.5):
+    """
+    Build fixed-length feature sequences for several windows ending at the
+    newest frame, all in one vectorized pass.
+
+    PROCESS (per window):
+    1. Wrist path: wrist position relative to the window's first frame,
+       divided by the average palm size in the window (so where the sign
+       starts and how far the user stands do not matter)
+    2. Shape: fingertip positions (weighted by shape_weight)
+    3. Linear interpolation onto `length` steps evenly spaced in time (so the
+       camera frame rate does not matter)
+
+    PARAMETERS:
+    - times: (N,) capture times in seconds, oldest first
+    - wrist, palm, shape: per-frame values from hand_features()
+    - starts: (W,) earliest capture time of each window
+
+    RETURNS: (sequences (W, length, FEATURE_SIZE), first frame index per window (W,))
+    """
+    count = len(times)
+    first = np.minimum(np.searchsorted(times, starts), count - 1)
+    start_times = times[first]
+    grid = start_times[:, None] + (times[-1] - start_times)[:, None] * np.linspace(0.0, 1.0, length)
+
+    upper = np.clip(np.searchsorted(times, grid, side='right'), 1, count - 1)
+    lower = np.maximum(upper - 1, 0)
+    span = times[upper] - times[lower]
+    weight = np.clip((grid - times[lower]) / np.where(span > 0, span, 1.0), 0.0, 1.0)[..., None]
+
+    frames = np.concatenate([wrist, shape_weight * shape], axis=1)
+    sequences = frames[lower] * (1.0 - weight) + frames[upper] * weight
+
+    # Average palm size per window from a running sum
+    palm_sums = np.concatenate([[0.0], np.cumsum(palm, dtype=np.float64)])
+    scale = (palm_sums[count] - palm_sums[first]) / (count - first)
+    scale[scale < 1e-6] = 1.0
+    sequences[..., :2] = (sequences[..., :2] - wrist[first][:, None, :]) / scale[:, None, None]
+    return sequences, first
+
+
+def trajectory_features(points, timestamps, length, shape_weight=0.5):
+    """
+    Turn one landmark trajectory into a fixed-length feature sequence
+    (see resample_trajectories).
+
+    PARAMETERS:
+    - points: (N, 21, 3) landmarks, oldest first
+    - timestamps: (N,) capture times in seconds
+    - length: Number of steps in the output sequence
+
+    RETURNS: float32 array (length, FEATURE_SIZE)
+    """
+    times = np.asarray(timestamps, dtype=np.float64)
+    wrist, palm, shape = hand_features(points)
+    sequences, _ = resample_trajectories(times, wrist, palm, shape, times[:1], length, shape_weight)
+    return sequences[0].astype(np.float32)
+
+
+# ======================== DTW WITH PRUNING =============================
+
+def keogh_envelope(sequences, band):
+    """
+    Upper/lower envelope of each template within +-band steps (for LB_Keogh).
+
+    PARAMETER: sequences - (T, L, D) templates
+    RETURNS: (upper, lower), each (T, L, D)
+    """
+    length = sequences.shape[1]
+    upper = sequences.copy()
+    lower = sequences.copy()
+    for shift in range(1, band + 1):
+        np.maximum(upper[:, shift:], sequences[:, :length - shift], out=upper[:, shift:])
+        np.maximum(upper[:, :length - shift], sequences[:, shift:], out=upper[:, :length - shift])
+        np.minimum(lower[:, shift:], sequences[:, :length - shift], out=lower[:, shift:])
+        np.minimum(lower[:, :length - shift], sequences[:, shift:], out=lower[:, :length - shift])
+    return upper, lower
+
+
+def lb_keogh(query, upper, lower):
+    """
+    LB_Keogh lower bound of the squared DTW cost between query and each template.
+
+    Any warping path inside the band pays at least the distance from each
+    query step to its template's envelope, so a template whose bound is
+    already too large cannot match and needs no DTW.
+
+    PARAMETER: query - (L, D) sequence, or (T, L, D) with one query per template
+    RETURNS: (T,) lower bounds
+    """
+    queries = query if query.ndim == 3 else query[None]
+    above = np.maximum(queries - upper, 0.0)
+    below = np.maximum(lower - queries, 0.0)
+    return np.einsum('tld,tld->t', above, above) + np.einsum('tld,tld->t', below, below)
+
+
+def dtw_banded(query, templates, band, abandon_above=np.inf):
+    """
+    Squared-distance DTW between queries and several templates at once.
+
+    WHY ANTI-DIAGONALS? Every cell on an anti-diagonal (i + j = d) depends only
+    on the two previous anti-diagonals, so a whole diagonal - for all
+    (query, template) pairs - is one NumPy update. That is 2L - 1 vector
+    steps instead of one Python step per cell in the band.
+
+    EARLY ABANDONING: a warping path visits at least one of any two
+    neighbouring anti-diagonals, so once both of them cost more than
+    abandon_above for a pair, that pair can no longer match and is dropped
+    (its cost is inf).
+
+    PARAMETERS:
+    - query: (L, D) sequence, or (T, L, D) with one query per template
+    - templates: (T, L, D) sequences of the same length
+    - band: Sakoe-Chiba band half-width (max time shift in steps)
+    - abandon_above: Cost above which a template can no longer match
+
+    RETURNS: (T,) accumulated squared costs (inf if abandoned)
+    """
+    count, length, _ = templates.shape
+    result = np.full(count, np.inf)
+    alive = np.arange(count)
+
+    # Pairwise squared distances |q|^2 - 2 q.t + |t|^2 (only the band is ever read)
+    queries = query if query.ndim == 3 else query[None]
+    cost = queries @ templates.transpose(0, 2, 1)
+    cost *= -2.0
+    cost += np.einsum('tld,tld->tl', queries, queries)[:, :, None] if query.ndim == 3 \
+        else np.einsum('ld,ld->l', query, query)[None, :, None]
+    cost += np.einsum('tld,tld->tl', templates, templates)[:, None, :]
+    np.maximum(cost, 0.0, out=cost)
+
+    # Diagonal arrays are indexed by i (row); D[0, 0] = 0 starts every path
+    before = np.full((count, length + 1), np.inf)   # Anti-diagonal d - 2
+    before[:, 0] = 0.0
+    last = np.full((count, length + 1), np.inf)     # Anti-diagonal d - 1
+    for d in range(2, 2 * length + 1):
+        lo = max(1, d - length, (d - band + 1) // 2)
+        hi = min(length, d - 1, (d + band) // 2)
+        rows = np.arange(lo, hi + 1)
+        current = np.full((len(alive), length + 1), np.inf)
+        best = np.minimum(np.minimum(before[:, lo - 1:hi], last[:, lo - 1:hi]), last[:, lo:hi + 1])
+        current[:, lo:hi + 1] = cost[:, rows - 1, d - rows - 1] + best
+
+        # Early abandon on the two newest diagonals
+        keep = np.minimum(current[:, lo:hi + 1].min(axis=1), last.min(axis=1)) <= abandon_above
+        if not keep.all():
+            if not keep.any():
+                return result
+            alive, cost, current, last = alive[keep], cost[keep], current[keep], last[keep]
+        before, last = last, current
+
+    result[alive] = last[:, length]
+    return result
+
+
+# ======================== MOTION TEMPLATES =============================
+
+class MotionTemplateLibrary:
+    """
+    Recorded motion signs, resampled to a common sequence length.
+
+    FILE FORMAT (.npz):
+    - sequences: float16 array (T, length, FEATURE_SIZE)
+    - durations: float32 array (T,) seconds each recording took
+    - names: array of gesture names, one per template
+    """
+
+    def __init__(self, length=32, sequences=None, durations=None, names=None):
+        self.length = length
+        self.sequences = (np.zeros((0, length, FEATURE_SIZE), np.float32) if sequences is None
+                          else np.asarray(sequences, np.float32))
+        self.durations = np.zeros(0, np.float32) if durations is None else np.asarray(durations, np.float32)
+        self.names = [] if names is None else list(names)
+
+    def __len__(self):
+        return len(self.sequences)
+
+    def add(self, gesture, points, timestamps):
+        """Add one recording: landmarks (N, 21, 3) with capture times (N,)"""
+        sequence = trajectory_features(points, timestamps, self.length)
+        self.sequences = np.concatenate([self.sequences, sequence[None]])
+        self.durations = np.append(self.durations, np.float32(timestamps[-1] - timestamps[0]))
+        self.names.append(gesture)
+
+    def save(self, path):
+        """Write the library to a compact .npz file"""
+        np.savez_compressed(
+            path,
+            sequences=self.sequences.astype(np.float16),
+            durations=self.durations,
+            names=np.array(self.names)
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Read a library written by save()"""
+        with np.load(path) as data:
+            sequences = data['sequences']
+            return cls(sequences.shape[1], sequences, data['durations'], [str(n) for n in data['names']])
+
+
+# ======================== PER-HAND HISTORY =============================
+
+class HandHistory:
+    """
+    Fixed-size ring buffer of one hand's per-frame features (no per-frame
+    allocation; features are computed once when a frame arrives, not once
+    per matching window).
+    """
+
+    def __init__(self, capacity):
+        self.times = np.zeros(capacity, np.float64)
+        self.wrist = np.zeros((capacity, 2), np.float32)
+        self.palm = np.zeros(capacity, np.float32)
+        self.shape = np.zeros((capacity, 3 * len(FINGERTIPS)), np.float32)
+        self.capacity = capacity
+        self.count = 0
+        self.head = 0           # Next slot to write
+        self.frames_since_match = 0
+
+    def append(self, points, timestamp):
+        wrist, palm, shape = hand_features(points)
+        self.times[self.head] = timestamp
+        self.wrist[self.head] = wrist
+        self.palm[self.head] = palm
+        self.shape[self.head] = shape
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.frames_since_match += 1
+
+    def last_time(self):
+        return self.times[(self.head - 1) % self.capacity] if self.count else None
+
+    def frames(self):
+        """(times, wrist, palm, shape) of the stored frames, oldest first"""
+        order = (self.head - self.count + np.arange(self.count)) % self.capacity
+        return self.times[order], self.wrist[order], self.palm[order], self.shape[order]
+
+    def clear(self):
+        self.count = 0
+        self.head = 0
+        self.frames_since_match = 0
+
+
+# ======================== RECOGNIZER =============================
+
+class MotionRecognizer:
+    """
+    Matches each hand's recent trajectory against motion templates.
+
+    HOW IT WORKS:
+    1. update() stores the landmarks of every visible hand
+    2. Every `match_every` frames, for each template duration group, the last
+       duration seconds (times each of `window_scales`, for signs performed
+       faster or slower than recorded) are resampled to the template length
+    3. LB_Keogh bounds every (window, template) pair; only pairs whose bound
+       is below the match threshold go through (vectorized, early-abandoning) DTW
+    4. The best template under the threshold becomes a MotionEvent, and that
+       hand's history is cleared so the same movement is not reported twice
+
+    CONFIDENCE:
+    d = sqrt(DTW cost / length) (average per-step distance);
+    confidence = exp(-(d / distance_scale)^2); matches need d <= max_distance.
+    """
+
+    def __init__(self, library, band_ratio=0.15, max_distance=0.6, distance_scale=0.6,
+                 match_every=3, window_scales=(0.8, 1.0, 1.25), history_seconds=4.0,
+                 max_gap_seconds=0.3, fps=30):
+        if not len(library):
+            raise ValueError("Motion template library is empty")
+        self.library = library
+        self.length = library.length
+        self.band = max(1, int(round(band_ratio * self.length)))
+        self.max_distance = max_distance
+        self.distance_scale = distance_scale
+        self.match_every = match_every
+        self.window_scales = window_scales
+        self.max_gap_seconds = max_gap_seconds
+        self.capacity = int(history_seconds * fps)
+        self.histories = {}
+
+        # Precompute per-template data once
+        self.templates = np.ascontiguousarray(library.sequences, dtype=np.float64)
+        self.upper, self.lower = keogh_envelope(self.templates, self.band)
+        self.max_cost = max_distance ** 2 * self.length
+
+        # Query windows: each template duration (rounded to 0.1 s) times each scale.
+        # Every (window, template) pair to check is listed once, up front.
+        durations = np.round(library.durations, 1)
+        self.window_seconds = []
+        pair_windows, pair_templates = [], []
+        for duration in np.unique(durations):
+            group = np.flatnonzero(durations == duration)
+            for scale in window_scales:
+                pair_windows.append(np.full(len(group), len(self.window_seconds)))
+                pair_templates.append(group)
+                self.window_seconds.append(float(duration) * scale)
+        self.window_seconds = np.array(self.window_seconds)
+        self.pair_windows = np.concatenate(pair_windows)
+        self.pair_templates = np.concatenate(pair_templates)
+        self.pair_upper = self.upper[self.pair_templates]
+        self.pair_lower = self.lower[self.pair_templates]
+
+        self.templates_checked = 0     # Statistics: templates considered
+        self.templates_pruned = 0      # ...skipped by LB_Keogh
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Load motion templates from disk and build the recognizer"""
+        return cls(MotionTemplateLibrary.load(path), **kwargs)
+
+    def update(self, hands, timestamp):
+        """
+        Feed the hands seen in one frame.
+
+        PARAMETERS:
+        - hands: Iterable of (hand_label, points) with points as (21, 3) arrays;
+                 hand_label is MediaPipe handedness ('Left'/'Right')
+        - timestamp: Capture time of the frame (seconds)
+
+        RETURNS: List of MotionEvent recognized on this frame
+        """
+        events = []
+        for hand, points in hands:
+            history = self.histories.get(hand)
+            if history is None:
+                history = self.histories[hand] = HandHistory(self.capacity)
+
+            # The hand left the frame for a while: a new movement starts
+            last = history.last_time()
+            if last is not None and timestamp - last > self.max_gap_seconds:
+                history.clear()
+
+            history.append(points, timestamp)
+            if history.frames_since_match >= self.match_every:
+                history.frames_since_match = 0
+                event = self._match(history, hand)
+                if event is not None:
+                    events.append(event)
+                    history.clear()
+        return events
+
+    def _match(self, history, hand):
+        """
+        Best template match for one hand's history (or None).
+
+        All windows are resampled together, every (window, template) pair is
+        bounded with one LB_Keogh call, and the pairs that survive go through
+        a single DTW pass.
+        """
+        times, wrist, palm, shape = history.frames()
+        if len(times) < 2:
+            return None
+
+        # Windows the history is long enough for
+        elapsed = times[-1] - times[0]
+        windows = np.flatnonzero(self.window_seconds * 0.9 <= elapsed)
+        if not len(windows):
+            return None
+        queries = np.zeros((len(self.window_seconds), self.length, FEATURE_SIZE))
+        queries[windows], first = resample_trajectories(
+            times, wrist, palm, shape, times[-1] - self.window_seconds[windows], self.length)
+        start_times = np.zeros(len(self.window_seconds))
+        start_times[windows] = times[first]
+
+        # Lower-bound pruning: skip pairs that cannot get under the threshold
+        usable = np.zeros(len(self.window_seconds), bool)
+        usable[windows] = True
+        pairs = np.flatnonzero(usable[self.pair_windows])
+        bounds = lb_keogh(queries[self.pair_windows[pairs]], self.pair_upper[pairs], self.pair_lower[pairs])
+        survivors = pairs[bounds <= self.max_cost]
+        self.templates_checked += len(pairs)
+        self.templates_pruned += len(pairs) - len(survivors)
+        if not len(survivors):
+            return None
+
+        costs = dtw_banded(queries[self.pair_windows[survivors]], self.templates[self.pair_templates[survivors]],
+                           self.band, abandon_above=self.max_cost)
+        winner = int(np.argmin(costs))
+        if not costs[winner] <= self.max_cost:
+            return None
+
+        pair = survivors[winner]
+        distance = float(np.sqrt(costs[winner] / self.length))
+        confidence = float(np.exp(-(distance / self.distance_scale) ** 2))
+        return MotionEvent(self.library.names[self.pair_templates[pair]],
+                           float(start_times[self.pair_windows[pair]]), float(times[-1]), confidence, hand)
+
+    def reset(self):
+        """Forget all hand histories (e.g. when the camera restarts)"""
+        self.histories.clear()
+
+
+def load_motion_recognizer(path, **kwargs):
+    """
+    Load the motion recognizer, or return None (with a message) if the
+    motion template file does not exist yet.
+    """
+    if not os.path.exists(path):
+        log.info("Motion template file not found: %s", path)
+        return None
+    recognizer = MotionRecognizer.from_file(path, **kwargs)
+    log.info("Loaded %d motion templates (%d signs, band=%d)",
+             len(recognizer.library), len(set(recognizer.library.names)), recognizer.band)
+    return recognizer
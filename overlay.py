@@ -0,0 +1,181 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Overlay Rendering for Annotated Frames
+# PURPOSE: Draw hand skeletons and text on frames at a small, constant cost
+# EXPLANATION: Annotating a frame used to build two new DrawingSpec objects,
+#              walk every landmark in Python and make two cv2.circle calls
+#              per landmark. This module:
+#              1. Builds the drawing specs once
+#              2. Draws all hand connections with one cv2.polylines call
+#              3. Renders the landmark marker (white ring + colored dot) once
+#                 and stamps it at every landmark with one indexed copy
+#              4. Caches each text line per gesture name and frame height and
+#                 draws it with cv2.putText (stamping cached text measured
+#                 slower than putText, see tools/bench_overlay.py)
+#              The output is pixel-identical to mp_drawing.draw_landmarks.
+# ============================================================================
+
+import math
+import threading
+from collections import namedtuple
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+mp_drawing = mp.solutions.drawing_utils
+mp_hands = mp.solutions.hands
+
+# Text shown on annotated frames: (origin, font scale, BGR color, thickness)
+FOOTER_TEXT = "Make hand gestures in front of camera"
+NO_GESTURE_TEXT = "No ISL gesture detected"
+GESTURE_LABEL_STYLE = ((20, 50), 1.2, (0, 255, 0), 2)
+NO_GESTURE_STYLE = ((20, 50), 1.0, (0, 0, 255), 2)
+FOOTER_STYLE = (0.6, (255, 255, 255), 1)   # Origin depends on frame height
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+# Same cut-offs mp_drawing.draw_landmarks uses to skip hidden landmarks
+VISIBILITY_THRESHOLD = 0.5
+PRESENCE_THRESHOLD = 0.5
+
+
+# One line of overlay text, ready to hand to cv2.putText
+TextLine = namedtuple('TextLine', ['text', 'origin', 'scale', 'color', 'thickness'])
+
+
+class OverlayRenderer:
+    """
+    Draws the annotation overlay (hand skeleton, gesture label, footer).
+
+    Drawing specs and the landmark marker are built once and text lines are
+    cached per gesture name and frame height, so annotation is one polylines
+    call and one indexed copy per hand plus two putText calls.
+    """
+
+    def __init__(self):
+        """Build the drawing specs and landmark marker once and prepare an empty text cache"""
+        self.landmark_spec = mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2)
+        self.connection_spec = mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2)
+        self.connections = np.array(sorted(mp_hands.HAND_CONNECTIONS), dtype=np.intp)
+        spec = self.landmark_spec
+        self.marker_border_radius = max(spec.circle_radius + 1, int(spec.circle_radius * 1.2))
+        self._marker_offsets, self._marker_colors, self._marker_reach = self._build_marker()
+        self._lines = {}
+        self._lock = threading.Lock()
+
+    def _build_marker(self):
+        """
+        Rasterize one landmark marker exactly as mp_drawing does it.
+
+        RETURNS:
+        - (offsets, colors, reach): (N, 2) pixel offsets (dy, dx) from the
+          landmark, the (N, 3) BGR color of each pixel, and how far the
+          marker reaches from its center
+        """
+        spec = self.landmark_spec
+        border_radius = self.marker_border_radius
+        reach = border_radius + spec.thickness + 1
+        size = 2 * reach + 1
+
+        # Paint palette indices instead of colors so black markers still show up
+        canvas = np.zeros((size, size), dtype=np.uint8)
+        cv2.circle(canvas, (reach, reach), border_radius, 1, spec.thickness)
+        cv2.circle(canvas, (reach, reach), spec.circle_radius, 2, spec.thickness)
+
+        ys, xs = np.nonzero(canvas)
+        palette = np.array([(0, 0, 0), mp_drawing.WHITE_COLOR, spec.color], dtype=np.uint8)
+        return np.stack([ys - reach, xs - reach], axis=1), palette[canvas[ys, xs]], reach
+
+    @staticmethod
+    def _landmark_pixels(hand_landmarks, width, height):
+        """
+        Pixel position of every landmark, plus which ones get drawn.
+
+        Mirrors mp_drawing: landmarks outside [0, 1] or below the visibility
+        or presence threshold are skipped (their position is left at 0, 0).
+        """
+        pixels = []
+        shown = []
+        for lm in hand_landmarks.landmark:
+            x, y = lm.x, lm.y
+            visible = (
+                not (lm.HasField('visibility') and lm.visibility < VISIBILITY_THRESHOLD) and
+                not (lm.HasField('presence') and lm.presence < PRESENCE_THRESHOLD) and
+                0 <= x and 0 <= y and
+                (x <= 1 or math.isclose(1, x)) and (y <= 1 or math.isclose(1, y))
+            )
+            shown.append(visible)
+            pixels.append((min(math.floor(x * width), width - 1),
+                           min(math.floor(y * height), height - 1)) if visible else (0, 0))
+        return np.array(pixels, dtype=np.int32), np.array(shown, dtype=bool)
+
+    def draw_hand(self, frame, hand_landmarks):
+        """Draw one hand's connections and landmark markers (in place)"""
+        height, width = frame.shape[:2]
+        pixels, shown = self._landmark_pixels(hand_landmarks, width, height)
+        if not shown.any():
+            return
+
+        # Connections first, so the markers are drawn on top of them
+        connections = self.connections[shown[self.connections].all(axis=1)]
+        if len(connections):
+            spec = self.connection_spec
+            cv2.polylines(frame, pixels[connections], False, spec.color, spec.thickness)
+
+        # Stamp the marker at every shown landmark with one indexed copy; later
+        # landmarks overwrite earlier ones, same as drawing them in order
+        centers = pixels[shown]
+        offsets = self._marker_offsets
+        reach = self._marker_reach
+        if (frame.flags.c_contiguous and centers.min() >= reach and
+                centers[:, 0].max() < width - reach and centers[:, 1].max() < height - reach):
+            starts = centers[:, 1] * width + centers[:, 0]
+            flat = (starts[:, None] + (offsets[:, 0] * width + offsets[:, 1])).ravel()
+            frame.reshape(-1, 3)[flat] = np.tile(self._marker_colors, (len(centers), 1))
+            return
+
+        # A marker touches the frame edge, where OpenCV clips circles its own
+        # way: draw them like mp_drawing does
+        spec = self.landmark_spec
+        for x, y in centers.tolist():
+            cv2.circle(frame, (x, y), self.marker_border_radius, mp_drawing.WHITE_COLOR, spec.thickness)
+            cv2.circle(frame, (x, y), spec.circle_radius, spec.color, spec.thickness)
+
+    def _line(self, key, text, origin, style):
+        """Return a cached TextLine, building it on first use"""
+        line = self._lines.get(key)
+        if line is None:
+            scale, color, thickness = style
+            line = TextLine(text, origin, scale, color, thickness)
+            with self._lock:
+                self._lines[key] = line
+        return line
+
+    def label_line(self, gesture):
+        """Gesture label ("ISL: HELLO" or "No ISL gesture detected")"""
+        if gesture:
+            origin, *style = GESTURE_LABEL_STYLE
+            return self._line(('label', gesture), f"ISL: {gesture}", origin, style)
+        origin, *style = NO_GESTURE_STYLE
+        return self._line(('label', None), NO_GESTURE_TEXT, origin, style)
+
+    def footer_line(self, frame_height):
+        """Static instruction footer, anchored to the bottom of the frame"""
+        return self._line(('footer', frame_height), FOOTER_TEXT,
+                          (20, frame_height - 20), FOOTER_STYLE)
+
+    def render(self, frame, detection_results, gesture):
+        """
+        Draw the full overlay onto a frame (in place).
+
+        PARAMETERS:
+        - frame: Writable BGR frame that is about to be encoded
+        - detection_results: Result dictionary from GestureRecognizer.process_frame
+        - gesture: Gesture name shown in the label (or None)
+        """
+        for hand_landmarks in detection_results.get('hand_landmarks') or ():
+            self.draw_hand(frame, hand_landmarks)
+
+        for line in (self.label_line(gesture), self.footer_line(frame.shape[0])):
+            cv2.putText(frame, line.text, line.origin, FONT, line.scale, line.color, line.thickness)
+        return frame
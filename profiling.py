@@ -0,0 +1,295 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: On-Demand Profiling
+# PURPOSE: Profile the running pipeline for a fixed time, without a restart
+# EXPLANATION: A profiling session runs for a few seconds in the live
+#              server and writes its report to PROFILING_DIR. Two modes:
+#
+#   'cprofile' - Exact per-function times for each pipeline thread. The
+#                capture and processing loops call one step method per
+#                iteration (CameraManager._capture_step/_process_step);
+#                the session swaps in a wrapped step that runs under its
+#                own cProfile.Profile, and removes it afterwards.
+#   'sample'   - Statistical profile of ALL threads (Flask requests too):
+#                a sampler thread snapshots every thread's stack every few
+#                milliseconds via sys._current_frames().
+#
+# Both modes can also record tracemalloc's top allocations, filtered to
+# the frame path modules.
+#
+# WHY THIS DESIGN? When no session is running nothing is installed: no
+# trace function, no flag checked per frame. The loops already look up
+# their step method each iteration, so there is zero extra overhead.
+# ============================================================================
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+from app_logging import get_logger
+
+log = get_logger('profiling')
+
+PROFILING_MODES = ('cprofile', 'sample')
+
+# Modules on the frame path (tracemalloc report is limited to these)
+FRAME_PATH_FILES = (
+    'camera_module.py', 'frame_ring.py', 'gesture_model.py', 'gesture_rules.py', 'two_hand_rules.py',
+    'template_classifier.py', 'motion_recognizer.py', 'overlay.py', 'landmark_recording.py', 'metrics.py',
+)
+
+
+# ======================== PROFILING SESSION =============================
+
+class ProfilingSession:
+    """
+    One time-boxed profiling run. Starts in start(), stops by itself after
+    `seconds` (or on stop()), then writes the report files.
+
+    ATTRIBUTES (after it finished):
+    - files: Paths of the written reports
+    - error: Error message if writing the report failed
+    """
+
+    def __init__(self, mode, seconds, output_dir, targets=None, trace_allocations=True,
+                 sample_interval=0.005, top=40):
+        """
+        PARAMETERS:
+        - mode: 'cprofile' or 'sample'
+        - seconds: How long to profile
+        - output_dir: Directory for the report files (created if needed)
+        - targets: cprofile mode: {name: (object, step method name)} to wrap
+        - trace_allocations: Also report tracemalloc top allocations
+        - sample_interval: Seconds between stack samples (sample mode)
+        - top: Lines per report table
+        """
+        if mode not in PROFILING_MODES:
+            raise ValueError(f"Unknown profiling mode {mode!r} (expected one of {PROFILING_MODES})")
+        if mode == 'cprofile' and not targets:
+            raise ValueError("cprofile mode needs at least one step method to wrap")
+        self.mode = mode
+        self.seconds = seconds
+        self.output_dir = output_dir
+        self.targets = targets or {}
+        self.trace_allocations = trace_allocations
+        self.sample_interval = sample_interval
+        self.top = top
+
+        self.started_at = None
+        self.finished = threading.Event()
+        self.files = []
+        self.error = None
+
+        self._stop = threading.Event()
+        self._profiles = {}             # cprofile mode: target name -> cProfile.Profile
+        self._in_step = {}              # cprofile mode: target name -> step running now
+        self._stacks = Counter()        # sample mode: collapsed stack -> sample count
+        self._samples = 0
+        self._started_tracemalloc = False
+        self._thread = None
+
+    def start(self):
+        self.started_at = time.time()
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._started_tracemalloc = True
+        if self.mode == 'cprofile':
+            for name, (owner, method_name) in self.targets.items():
+                self._install(name, owner, method_name)
+        self._thread = threading.Thread(target=self._run, name='profiling-session', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """End the session early (the report is still written)"""
+        self._stop.set()
+
+    def wait(self, timeout=None):
+        return self.finished.wait(timeout)
+
+    def status(self):
+        return {
+            'mode': self.mode,
+            'seconds': self.seconds,
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            'running': self.started_at is not None and not self.finished.is_set(),
+            'files': self.files,
+            'error': self.error,
+        }
+
+    def _install(self, name, owner, method_name):
+        """Shadow owner.<method_name> with a profiled wrapper (instance attribute)"""
+        original = getattr(owner, method_name)
+        profile = self._profiles[name] = cProfile.Profile()
+
+        def profiled_step(*args, **kwargs):
+            self._in_step[name] = True
+            profile.enable()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                profile.disable()
+                self._in_step[name] = False
+
+        setattr(owner, method_name, profiled_step)
+
+    def _uninstall(self, timeout=2.0):
+        for owner, method_name in self.targets.values():
+            # Removing the instance attribute exposes the class method again
+            owner.__dict__.pop(method_name, None)
+        # A step that started before removal still records; let it finish
+        deadline = time.monotonic() + timeout
+        while any(self._in_step.values()) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def _sample(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        me = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self._stacks[';'.join(reversed(stack))] += 1
+        self._samples += 1
+
+    def _run(self):
+        deadline = time.monotonic() + self.seconds
+        try:
+            if self.mode == 'sample':
+                while not self._stop.is_set() and time.monotonic() < deadline:
+                    self._sample()
+                    self._stop.wait(self.sample_interval)
+            else:
+                self._stop.wait(self.seconds)
+        finally:
+            self._uninstall()
+            snapshot = None
+            if self.trace_allocations and tracemalloc.is_tracing():
+                snapshot = tracemalloc.take_snapshot()
+                if self._started_tracemalloc:
+                    tracemalloc.stop()
+            try:
+                self._write_report(snapshot)
+            except Exception as e:
+                self.error = str(e)
+                log.error(f"Failed to write report: {e}")
+            self.finished.set()
+
+    def _write_report(self, snapshot):
+        os.makedirs(self.output_dir, exist_ok=True)
+        stem = os.path.join(self.output_dir, f"profile_{datetime.fromtimestamp(self.started_at):%Y%m%d_%H%M%S}_{self.mode}")
+        elapsed = time.time() - self.started_at
+        out = io.StringIO()
+        out.write(f"Profiling session: mode={self.mode}, {elapsed:.1f} s, started "
+                  f"{datetime.fromtimestamp(self.started_at).isoformat()}\n")
+
+        if self.mode == 'cprofile':
+            for name, profile in self._profiles.items():
+                # Binary stats per thread, for snakeviz / pstats
+                path = f"{stem}_{name}.prof"
+                profile.dump_stats(path)
+                self.files.append(path)
+                out.write(f"\n======== {name} (cumulative time) ========\n")
+                try:
+                    stats = pstats.Stats(profile, stream=out)
+                except TypeError:   # Nothing was recorded (thread never ran a step)
+                    out.write("(no calls recorded)\n")
+                    continue
+                stats.sort_stats('cumulative').print_stats(self.top)
+        else:
+            # Collapsed stacks, one per line: input for flamegraph.pl / speedscope
+            path = f"{stem}.folded"
+            with open(path, 'w', encoding='utf-8') as f:
+                for stack, count in self._stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            self.files.append(path)
+            out.write(f"\n======== {self._samples} samples every {self.sample_interval * 1000:.0f} ms ========\n")
+            self._write_sample_tables(out)
+
+        if snapshot is not None:
+            out.write("\n======== tracemalloc: top allocations on the frame path ========\n")
+            filters = [tracemalloc.Filter(True, f"*{os.sep}{name}") for name in FRAME_PATH_FILES]
+            statistics = snapshot.filter_traces(filters).statistics('lineno')
+            for stat in statistics[:self.top]:
+                out.write(f"{stat}\n")
+            if not statistics:
+                out.write("(no live allocations from frame path modules)\n")
+
+        path = f"{stem}.txt"
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(out.getvalue())
+        self.files.insert(0, path)
+        log.info(f"Report written: {path}")
+
+    def _write_sample_tables(self, out):
+        """Per-thread busiest functions: own samples (self) and samples on the stack (total)"""
+        per_thread = {}
+        for stack, count in self._stacks.items():
+            thread, *frames = stack.split(';')
+            own, total = per_thread.setdefault(thread, (Counter(), Counter()))
+            if frames:
+                own[frames[-1]] += count
+                for func in set(frames):
+                    total[func] += count
+        for thread, (own, total) in sorted(per_thread.items()):
+            samples = sum(own.values()) or 1
+            out.write(f"\n-- thread {thread} --\n{'self%':>7} {'total%':>7}  function\n")
+            for func, count in total.most_common(self.top):
+                out.write(f"{own[func] / samples:7.1%} {count / samples:7.1%}  {func}\n")
+
+
+# ======================== ONE SESSION AT A TIME =============================
+
+class Profiler:
+    """Starts sessions and remembers the current/last one"""
+
+    def __init__(self, output_dir, max_seconds=120):
+        self.output_dir = output_dir
+        self.max_seconds = max_seconds
+        self.session = None
+        self._lock = threading.Lock()
+
+    def start(self, mode, seconds, targets=None, trace_allocations=True):
+        """
+        Start a session unless one is already running.
+
+        RETURNS: The new ProfilingSession
+        RAISES: RuntimeError if busy, ValueError for a bad mode or duration
+        """
+        if not 0 < seconds <= self.max_seconds:
+            raise ValueError(f"Profiling duration must be between 0 and {self.max_seconds} seconds")
+        with self._lock:
+            if self.session is not None and not self.session.finished.is_set():
+                raise RuntimeError("A profiling session is already running")
+            self.session = ProfilingSession(mode, seconds, self.output_dir, targets=targets,
+                                            trace_allocations=trace_allocations).start()
+        log.info(f"Started {mode} session for {seconds} s")
+        return self.session
+
+    def status(self):
+        return self.session.status() if self.session is not None else None
+
+
+def parse_profile_switch(value):
+    """
+    Parse the environment switch, e.g. 'sample', 'cprofile:30'.
+
+    RETURNS: (mode, seconds or None), or None if the switch is empty/off
+    """
+    value = (value or '').strip().lower()
+    if value in ('', '0', 'off', 'false', 'no'):
+        return None
+    mode, _, seconds = value.partition(':')
+    return mode, float(seconds) if seconds else None
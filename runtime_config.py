@@ -0,0 +1,315 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Runtime Configuration
+# PURPOSE: Performance settings that can be changed while the server runs
+# EXPLANATION: config.py holds fixed settings (paths, gesture list, ...).
+#              The knobs that trade latency against CPU - camera mode,
+#              stream frame rate, JPEG qualities, inference rate, hand
+#              model size, stabilizer timing - live here instead, as one
+#              typed RuntimeSettings value:
+#
+#              1. A named profile: 'balanced' (the config.py values),
+#                 'low-latency' or 'low-cpu'
+#              2. Overridden by the runtime config file (JSON), then by
+#                 environment variables (SIGNLANG_<SETTING>, e.g.
+#                 SIGNLANG_STREAM_FPS=20), then by admin requests
+#              3. Every value is type-checked and range-checked; a bad
+#                 value is rejected and the old settings stay in place
+#
+#              reload() builds a new RuntimeSettings and swaps it in with
+#              one assignment. Loops read runtime_config.settings on every
+#              iteration, so new values apply from the next frame; work
+#              that must happen on a specific thread (camera properties,
+#              the MediaPipe detector) is done there when `version` changes.
+#
+# RUNTIME CONFIG FILE (all keys optional):
+#     {"profile": "low-cpu", "settings": {"stream_jpeg_quality": 60}}
+# ============================================================================
+
+import json
+import os
+import threading
+from typing import NamedTuple
+
+from config import (RUNTIME_PROFILE, RUNTIME_CONFIG_FILE, WEBCAM_WIDTH, WEBCAM_HEIGHT, WEBCAM_FPS,
+                    CAPTURE_LOW_LATENCY, STREAM_FPS, STREAM_MAX_FRAME_AGE, STREAM_JPEG_QUALITY,
+                    FRAME_JPEG_QUALITY, SNAPSHOT_JPEG_QUALITY, MAX_INFERENCE_FPS, HAND_MODEL_COMPLEXITY,
+                    MIN_DETECTION_CONFIDENCE, MIN_TRACKING_CONFIDENCE, MOTION_MATCH_EVERY, DETECTION_BUFFER_SIZE,
+                    MIN_SIGN_STABLE_SECONDS, MIN_NO_GESTURE_SECONDS, BUFFER_MIN_CONFIDENCE,
+                    EARLY_COMMIT_EVIDENCE, STABILIZER_SAMPLE_SECONDS)
+from app_logging import get_logger
+
+log = get_logger('runtime_config')
+
+ENV_PREFIX = 'SIGNLANG_'
+
+
+# ======================== SETTINGS =============================
+
+class RuntimeSettings(NamedTuple):
+    camera_width: int                   # Requested capture resolution
+    camera_height: int
+    camera_fps: int                     # Requested capture frame rate
+    capture_low_latency: int            # 1 = minimal driver buffer, read only the newest frame (grab/retrieve)
+    stream_fps: float                   # Most frames per second sent per /video_feed viewer
+    stream_max_frame_age: float         # /video_feed skips frames older than this (seconds, 0 = never)
+    stream_jpeg_quality: int            # /video_feed (and the shared frame of capture_service.py)
+    frame_jpeg_quality: int             # /api/frame
+    snapshot_jpeg_quality: int          # frame_to_base64 (single snapshots)
+    max_inference_fps: float            # Most frames per second sent to MediaPipe (0 = every new frame)
+    hand_model_complexity: int          # MediaPipe hand model: 0 = lite (faster), 1 = full
+    min_detection_confidence: float
+    min_tracking_confidence: float
+    motion_match_every: int             # Try motion sign matching every Nth frame per hand
+    detection_buffer_size: int          # Stabilizer: samples in the majority vote
+    min_sign_stable_seconds: float      # Stabilizer: hold time before a sign is committed
+    min_no_gesture_seconds: float       # Stabilizer: "no gesture" time before a repeat counts
+    buffer_min_confidence: float        # Stabilizer: majority ratio needed
+    early_commit_evidence: float        # Stabilizer: evidence for an early commit (0 = hold time only)
+    stabilizer_sample_seconds: float    # capture_service.py: stabilizer sampling period
+
+    def stabilizer_options(self):
+        """Keyword arguments for GestureStabilizer() and GestureStabilizer.configure()"""
+        return {
+            'buffer_size': self.detection_buffer_size,
+            'min_sign_stable_seconds': self.min_sign_stable_seconds,
+            'min_no_gesture_seconds': self.min_no_gesture_seconds,
+            'buffer_min_confidence': self.buffer_min_confidence,
+            'early_commit_evidence': self.early_commit_evidence,
+        }
+
+
+# Allowed range per setting (inclusive)
+LIMITS = {
+    'camera_width': (160, 3840),
+    'camera_height': (120, 2160),
+    'camera_fps': (1, 120),
+    'capture_low_latency': (0, 1),
+    'stream_fps': (1, 60),
+    'stream_max_frame_age': (0.0, 10.0),
+    'stream_jpeg_quality': (10, 100),
+    'frame_jpeg_quality': (10, 100),
+    'snapshot_jpeg_quality': (10, 100),
+    'max_inference_fps': (0, 120),
+    'hand_model_complexity': (0, 1),
+    'min_detection_confidence': (0.0, 1.0),
+    'min_tracking_confidence': (0.0, 1.0),
+    'motion_match_every': (1, 30),
+    'detection_buffer_size': (1, 100),
+    'min_sign_stable_seconds': (0.0, 10.0),
+    'min_no_gesture_seconds': (0.0, 10.0),
+    'buffer_min_confidence': (0.0, 1.0),
+    'early_commit_evidence': (0.0, 50.0),
+    'stabilizer_sample_seconds': (0.02, 2.0),
+}
+
+# 'balanced' is config.py as it is
+BALANCED = RuntimeSettings(
+    camera_width=WEBCAM_WIDTH,
+    camera_height=WEBCAM_HEIGHT,
+    camera_fps=WEBCAM_FPS,
+    capture_low_latency=CAPTURE_LOW_LATENCY,
+    stream_fps=STREAM_FPS,
+    stream_max_frame_age=STREAM_MAX_FRAME_AGE,
+    stream_jpeg_quality=STREAM_JPEG_QUALITY,
+    frame_jpeg_quality=FRAME_JPEG_QUALITY,
+    snapshot_jpeg_quality=SNAPSHOT_JPEG_QUALITY,
+    max_inference_fps=MAX_INFERENCE_FPS,
+    hand_model_complexity=HAND_MODEL_COMPLEXITY,
+    min_detection_confidence=MIN_DETECTION_CONFIDENCE,
+    min_tracking_confidence=MIN_TRACKING_CONFIDENCE,
+    motion_match_every=MOTION_MATCH_EVERY,
+    detection_buffer_size=DETECTION_BUFFER_SIZE,
+    min_sign_stable_seconds=MIN_SIGN_STABLE_SECONDS,
+    min_no_gesture_seconds=MIN_NO_GESTURE_SECONDS,
+    buffer_min_confidence=BUFFER_MIN_CONFIDENCE,
+    early_commit_evidence=EARLY_COMMIT_EVIDENCE,
+    stabilizer_sample_seconds=STABILIZER_SAMPLE_SECONDS,
+)
+
+# Profiles only list what differs from 'balanced'
+PROFILES = {
+    'balanced': {},
+    # Fastest feedback: newest camera frame only, lite hand model (shorter
+    # inference), shorter hold time, stabilizer sampled twice as often;
+    # smaller JPEGs to send
+    'low-latency': {
+        'capture_low_latency': 1,
+        'hand_model_complexity': 0,
+        'stream_jpeg_quality': 60,
+        'frame_jpeg_quality': 60,
+        'stream_max_frame_age': 0.25,
+        'min_sign_stable_seconds': 1.0,
+        'min_no_gesture_seconds': 0.3,
+        'stabilizer_sample_seconds': 0.1,
+    },
+    # Weak or shared machines: smaller, slower capture, capped inference
+    # rate, lite model, fewer motion matches
+    'low-cpu': {
+        'camera_width': 480,
+        'camera_height': 360,
+        'camera_fps': 15,
+        'stream_fps': 15,
+        'stream_jpeg_quality': 60,
+        'frame_jpeg_quality': 55,
+        'max_inference_fps': 8,
+        'hand_model_complexity': 0,
+        'motion_match_every': 5,
+        'detection_buffer_size': 8,
+    },
+}
+
+
+class RuntimeConfigError(ValueError):
+    """Invalid profile or setting values (lists every problem found)"""
+
+
+def validate(values):
+    """
+    Check types and ranges and build RuntimeSettings.
+
+    PARAMETER: values - {setting name: value}; strings are converted
+               (environment variables), all settings must be present
+    RETURNS: RuntimeSettings
+    RAISES: RuntimeConfigError listing every invalid or unknown setting
+    """
+    errors = []
+    checked = {}
+    unknown = set(values) - set(RuntimeSettings._fields)
+    if unknown:
+        errors.append(f"unknown settings: {', '.join(sorted(unknown))}")
+    for name, kind in RuntimeSettings.__annotations__.items():
+        value = values.get(name)
+        try:
+            if isinstance(value, bool):
+                raise ValueError
+            if isinstance(value, str):
+                converted = kind(value.strip())     # int('2.5') fails too
+            elif kind is int and not float(value).is_integer():
+                raise ValueError
+            else:
+                converted = kind(value)
+        except (TypeError, ValueError):
+            errors.append(f"{name}: expected {kind.__name__}, got {value!r}")
+            continue
+        low, high = LIMITS[name]
+        if not low <= converted <= high:
+            errors.append(f"{name}: {converted} is outside {low}..{high}")
+            continue
+        checked[name] = converted
+    if errors:
+        raise RuntimeConfigError('; '.join(errors))
+    return RuntimeSettings(**checked)
+
+
+# ======================== RUNTIME CONFIG =============================
+
+class RuntimeConfig:
+    """
+    The current RuntimeSettings plus where they came from.
+
+    ATTRIBUTES:
+    - settings: Current RuntimeSettings (replaced as a whole on reload)
+    - profile: Name of the active profile
+    - version: Increases on every change (threads compare it to react)
+    - sources: {setting: 'profile' | 'file' | 'env' | 'admin'} for non-default values
+    """
+
+    def __init__(self, profile=None, path=None, environ=None):
+        self.default_profile = profile or RUNTIME_PROFILE
+        self.path = path if path is not None else RUNTIME_CONFIG_FILE
+        self.environ = os.environ if environ is None else environ
+        self.settings = None
+        self.profile = None
+        self.version = 0
+        self.sources = {}
+        self._admin_profile = None
+        self._admin_settings = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self.reload()
+
+    def subscribe(self, callback):
+        """Call callback(settings, changed setting names) after every change"""
+        self._subscribers.append(callback)
+
+    def _read_file(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise RuntimeConfigError(f"{self.path}: {e}")
+        if not isinstance(data, dict) or not isinstance(data.get('settings', {}), dict):
+            raise RuntimeConfigError(f"{self.path}: expected {{\"profile\": ..., \"settings\": {{...}}}}")
+        return data
+
+    def reload(self, profile=None, settings=None, reset=False):
+        """
+        Rebuild settings from profile, file, environment and admin choices.
+
+        PARAMETERS:
+        - profile: Switch to this profile (kept for later reloads)
+        - settings: {name: value} admin overrides (merged, kept for later reloads)
+        - reset: Forget earlier admin profile and overrides first
+        RETURNS: (RuntimeSettings, changed setting names)
+        RAISES: RuntimeConfigError - nothing changes then
+        """
+        with self._lock:
+            admin_profile = None if reset else self._admin_profile
+            admin_settings = {} if reset else dict(self._admin_settings)
+            if profile is not None:
+                admin_profile = profile
+            if settings:
+                admin_settings.update(settings)
+
+            data = self._read_file()
+            name = (admin_profile or self.environ.get(ENV_PREFIX + 'PERF_PROFILE')
+                    or data.get('profile') or self.default_profile)
+            if name not in PROFILES:
+                raise RuntimeConfigError(f"unknown profile {name!r} (expected one of {', '.join(PROFILES)})")
+
+            values = BALANCED._asdict()
+            sources = {}
+            layers = [('profile', PROFILES[name]), ('file', data.get('settings', {})),
+                      ('env', {field: self.environ[ENV_PREFIX + field.upper()] for field in RuntimeSettings._fields
+                               if ENV_PREFIX + field.upper() in self.environ}),
+                      ('admin', admin_settings)]
+            for source, layer in layers:
+                values.update(layer)
+                sources.update(dict.fromkeys(layer, source))
+            new = validate(values)
+
+            old = self.settings
+            changed = [field for field in RuntimeSettings._fields
+                       if old is None or getattr(old, field) != getattr(new, field)]
+            self._admin_profile, self._admin_settings = admin_profile, admin_settings
+            self.settings, self.profile, self.sources = new, name, sources
+            if changed:
+                self.version += 1
+
+        if old is not None and changed:
+            log.info("Runtime settings changed (profile %s): %s", name,
+                     ', '.join(f"{field}={getattr(new, field)}" for field in changed))
+            for callback in self._subscribers:
+                try:
+                    callback(new, changed)
+                except Exception as e:
+                    log.error("Runtime settings subscriber failed: %s", e, exc_info=True)
+        return new, changed
+
+    def status(self):
+        """JSON-friendly description for the admin endpoint"""
+        return {
+            'profile': self.profile,
+            'profiles': list(PROFILES),
+            'version': self.version,
+            'settings': self.settings._asdict(),
+            'sources': self.sources,
+            'file': self.path,
+        }
+
+
+# Shared by every module of this process; validated at import (bad values stop startup)
+runtime_config = RuntimeConfig()
@@ -0,0 +1,313 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Shared Frame State
+# PURPOSE: Latest frame, detection results and commits in shared memory
+# EXPLANATION: capture_service.py (the only process with the camera and
+#              MediaPipe) writes here; web_worker.py processes only read.
+#              One shared memory block holds a small header plus three slots:
+#
+#              header   magic, version, camera request (written by workers),
+#                       camera running + index, service pid, heartbeat,
+#                       last viewer request (written by workers)
+#              frame    latest JPEG (already encoded, with overlay), frame seq
+#              state    latest detection results + recent commits (JSON)
+#              metrics  capture service's Prometheus text (for /metrics)
+#
+# SEQLOCK: Each slot starts with a sequence counter. The writer makes it
+#          odd, writes the payload, then makes it even again. A reader
+#          copies the payload and accepts it only if the counter was even
+#          and unchanged across the copy - otherwise it copies again.
+#          Readers never block the writer, and there is no cross-process
+#          lock that a crashed worker could leave held.
+# ============================================================================
+
+import os
+import struct
+import sys
+import time
+from collections import namedtuple
+from multiprocessing import resource_tracker, shared_memory
+
+from config import SHARED_STATE_NAME, SHARED_FRAME_BYTES, SHARED_STATE_BYTES, SHARED_METRICS_BYTES
+
+MAGIC = b'SIGNLANG'
+VERSION = 2
+
+# magic, version, camera request, request counter, camera running, camera index, service pid, heartbeat,
+# last viewer request
+_HEADER = struct.Struct('<8sIIIIiIdd')
+# Header fields written separately (by different processes)
+_REQUEST, _REQUEST_OFFSET = struct.Struct('<II'), 12
+_STATUS, _STATUS_OFFSET = struct.Struct('<Ii'), 20
+_HEARTBEAT, _HEARTBEAT_OFFSET = struct.Struct('<d'), 32
+_VIEWER, _VIEWER_OFFSET = struct.Struct('<d'), 40
+# seq, payload length, id (frame seq / commit seq), timestamp
+_SLOT = struct.Struct('<QQQd')
+_SEQ = struct.Struct('<Q')
+
+CAMERA_STOP = 0
+CAMERA_START = 1
+
+FRAME_WAIT_POLL = 0.005         # wait_for_frame(): how often the frame id is checked (no cross-process wakeup)
+
+# A slot read: payload bytes, id written with it, timestamp written with it
+SlotValue = namedtuple('SlotValue', ['payload', 'id', 'timestamp'])
+
+
+def _round_up(size, alignment=64):
+    return (size + alignment - 1) // alignment * alignment
+
+
+# ======================== SEQLOCK SLOT =============================
+
+class _Slot:
+    """One seqlocked payload area inside the shared block (one writer, any readers)"""
+
+    def __init__(self, buf, offset, capacity):
+        self.buf = buf
+        self.offset = offset
+        self.capacity = capacity
+        self.data_offset = offset + _SLOT.size
+
+    def write(self, payload, item_id=0, timestamp=0.0):
+        size = len(payload)
+        if size > self.capacity:
+            raise ValueError(f"Payload of {size} bytes exceeds slot capacity ({self.capacity})")
+        seq = _SEQ.unpack_from(self.buf, self.offset)[0]
+        _SEQ.pack_into(self.buf, self.offset, seq + 1)          # Odd: write in progress
+        self.buf[self.data_offset:self.data_offset + size] = payload
+        _SLOT.pack_into(self.buf, self.offset, seq + 1, size, item_id, timestamp)
+        _SEQ.pack_into(self.buf, self.offset, seq + 2)          # Even: consistent again
+
+    def read(self, after_id=None, retries=100):
+        """
+        Consistent copy of the slot.
+
+        PARAMETERS:
+        - after_id: Return None without copying if the slot's id is not newer
+        - retries: Attempts before giving up while the writer keeps writing
+
+        RETURNS: SlotValue, or None if empty, not newer, or never consistent
+        """
+        for attempt in range(retries):
+            seq, size, item_id, timestamp = _SLOT.unpack_from(self.buf, self.offset)
+            if seq & 1 or size > self.capacity:
+                time.sleep(0 if attempt < 10 else 0.0005)
+                continue
+            if seq == 0 or (after_id is not None and item_id <= after_id):
+                return None
+            payload = bytes(self.buf[self.data_offset:self.data_offset + size])
+            if _SEQ.unpack_from(self.buf, self.offset)[0] == seq:
+                return SlotValue(payload, item_id, timestamp)
+        return None
+
+    def peek_id(self):
+        """Id of the last completed write, without copying the payload"""
+        return _SLOT.unpack_from(self.buf, self.offset)[2]
+
+    def peek_stamp(self, retries=100):
+        """(id, timestamp) of the last completed write, without copying the payload"""
+        for _ in range(retries):
+            seq, size, item_id, timestamp = _SLOT.unpack_from(self.buf, self.offset)
+            if not seq & 1 and _SEQ.unpack_from(self.buf, self.offset)[0] == seq:
+                return item_id, timestamp
+        return self.peek_id(), 0.0
+
+
+# ======================== SHARED STATE =============================
+
+class SharedState:
+    """
+    The shared memory block. Create it in the capture service, attach to it
+    in web workers:
+
+        state = SharedState.create()          # capture_service.py
+        state = SharedState.attach()          # web_worker.py
+        frame = state.read_frame(after_seq=last_seq)
+    """
+
+    def __init__(self, shm, owner, frame_bytes, state_bytes, metrics_bytes):
+        self.shm = shm
+        self.owner = owner
+        buf = shm.buf
+        offset = _round_up(_HEADER.size)
+        self.frame = _Slot(buf, offset, frame_bytes)
+        offset = _round_up(self.frame.data_offset + frame_bytes)
+        self.state = _Slot(buf, offset, state_bytes)
+        offset = _round_up(self.state.data_offset + state_bytes)
+        self.metrics = _Slot(buf, offset, metrics_bytes)
+
+    @staticmethod
+    def _layout_size(frame_bytes, state_bytes, metrics_bytes):
+        return sum(_round_up(_SLOT.size + size) for size in (frame_bytes, state_bytes, metrics_bytes)) \
+            + _round_up(_HEADER.size)
+
+    @classmethod
+    def create(cls, name=None, frame_bytes=SHARED_FRAME_BYTES, state_bytes=SHARED_STATE_BYTES,
+               metrics_bytes=SHARED_METRICS_BYTES):
+        """
+        Create the block (replacing a stale one left by a crashed service).
+
+        RAISES: FileExistsError if a live capture service already owns the name
+        """
+        name = name or SHARED_STATE_NAME
+        size = cls._layout_size(frame_bytes, state_bytes, metrics_bytes)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            try:
+                old = cls.attach(name)
+                pid = old.service_pid()
+                old.close()
+            except ValueError:      # Left by an older version: stale
+                pid = None
+            if pid and _process_alive(pid):
+                raise FileExistsError(f"Shared state {name!r} is in use by capture service pid {pid}")
+            stale = shared_memory.SharedMemory(name=name)
+            stale.unlink()
+            stale.close()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        shm.buf[:_HEADER.size] = bytes(_HEADER.size)
+        state = cls(shm, True, frame_bytes, state_bytes, metrics_bytes)
+        _HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, CAMERA_STOP, 0, 0, -1, os.getpid(), time.time(), 0.0)
+        return state
+
+    @classmethod
+    def attach(cls, name=None, frame_bytes=SHARED_FRAME_BYTES, state_bytes=SHARED_STATE_BYTES,
+               metrics_bytes=SHARED_METRICS_BYTES):
+        """
+        Attach to the block of a running capture service.
+
+        RAISES: FileNotFoundError if no capture service created it,
+                ValueError if it was created by an incompatible version
+        """
+        name = name or SHARED_STATE_NAME
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            # Before 3.13 every attach is tracked and the block is unlinked
+            # when this process exits - only the capture service may do that
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        magic, version = _HEADER.unpack_from(shm.buf, 0)[:2]
+        if (magic, version) != (MAGIC, VERSION) or shm.size < cls._layout_size(frame_bytes, state_bytes, metrics_bytes):
+            shm.close()
+            raise ValueError(f"Shared state {name!r} has an unexpected layout (version {version})")
+        return cls(shm, False, frame_bytes, state_bytes, metrics_bytes)
+
+    def close(self):
+        """Detach (and remove the block if this process created it)"""
+        self.frame = self.state = self.metrics = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    # ======================== HEADER =============================
+
+    def _header(self):
+        return _HEADER.unpack_from(self.shm.buf, 0)
+
+    def request_camera(self, start):
+        """Worker side: ask the capture service to start (True) or stop (False) the camera"""
+        counter = self._header()[3]
+        _REQUEST.pack_into(self.shm.buf, _REQUEST_OFFSET, CAMERA_START if start else CAMERA_STOP,
+                           (counter + 1) & 0xFFFFFFFF)
+
+    def camera_request(self):
+        """Service side: (start requested, request counter - changes on every request)"""
+        request, counter = self._header()[2:4]
+        return request == CAMERA_START, counter
+
+    def set_camera_status(self, running, index):
+        """Service side: publish whether the camera runs, and which device"""
+        _STATUS.pack_into(self.shm.buf, _STATUS_OFFSET, 1 if running else 0, -1 if index is None else index)
+
+    def camera_status(self):
+        """(camera running, camera index or None)"""
+        running, index = self._header()[4:6]
+        return bool(running), None if index < 0 else index
+
+    def heartbeat(self):
+        """Service side: record that the capture service is alive"""
+        _HEARTBEAT.pack_into(self.shm.buf, _HEARTBEAT_OFFSET, time.time())
+
+    def service_pid(self):
+        return self._header()[6]
+
+    def service_age(self):
+        """Seconds since the capture service's last heartbeat"""
+        return time.time() - self._header()[7]
+
+    def viewer_heartbeat(self):
+        """
+        Worker side: a viewer wants frames (the service encodes only while
+        viewers ask).
+
+        RETURNS: Seconds since the previous viewer request (any worker)
+        """
+        now = time.time()
+        previous = self._header()[8]
+        _VIEWER.pack_into(self.shm.buf, _VIEWER_OFFSET, now)
+        return now - previous
+
+    def viewer_age(self):
+        """Seconds since a worker last asked for a frame"""
+        return time.time() - self._header()[8]
+
+    # ======================== SLOTS =============================
+
+    def publish_frame(self, jpeg, frame_seq, timestamp):
+        self.frame.write(jpeg, frame_seq, timestamp)
+
+    def read_frame(self, after_seq=None):
+        """Latest frame as SlotValue(jpeg bytes, frame seq, capture time), None if not newer"""
+        return self.frame.read(after_seq)
+
+    def frame_seq(self):
+        return self.frame.peek_id()
+
+    def wait_for_frame(self, after_seq, timeout):
+        """
+        Wait until a frame newer than after_seq is published (checks the
+        frame id every FRAME_WAIT_POLL without copying the frame).
+
+        RETURNS: True if there is one, False on timeout
+        """
+        deadline = time.monotonic() + timeout
+        while self.frame.peek_id() <= after_seq:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(remaining, FRAME_WAIT_POLL))
+        return True
+
+    def frame_stamp(self):
+        """(frame seq, capture time) of the latest frame, without copying it"""
+        return self.frame.peek_stamp()
+
+    def publish_state(self, state_json, frame_seq, timestamp):
+        self.state.write(state_json, frame_seq, timestamp)
+
+    def read_state(self, after_seq=None):
+        """Latest results as SlotValue(JSON bytes, frame seq, time), None if not newer"""
+        return self.state.read(after_seq)
+
+    def publish_metrics(self, text):
+        self.metrics.write(text, 1, time.time())
+
+    def read_metrics(self):
+        value = self.metrics.read()
+        return value.payload if value is not None else b''
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,297 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Gesture Stabilizer
+# PURPOSE: Turn noisy per-frame detections into committed (saved) gestures
+# EXPLANATION: Raw detections flicker from frame to frame. The stabilizer
+#              combines:
+#              1. Majority voting over recent detections (stabilization buffer)
+#              2. A time threshold (gesture must stay stable for a while)
+#              3. State change detection (NO_GESTURE -> GESTURE) to avoid repeats
+#              4. Early commit: with per-frame scores from the classifier, a
+#                 sequential probability ratio test commits a clearly held
+#                 sign as soon as the evidence is strong enough, instead of
+#                 waiting out the hold time; unclear signs still use 2.
+#              Motion signs, which are recognized over a whole trajectory,
+#              enter through submit_event() and share the same commit path.
+#
+# EARLY COMMIT (SPRT):
+#     Each sample tests "the signer holds gesture g" against "g is flicker".
+#     A sample detecting g with score s adds s * log(hit_rate / flicker_rate)
+#     to g's log-likelihood ratio; a sample detecting anything else adds
+#     log((1 - hit_rate) / (1 - flicker_rate)) (negative). The ratio never
+#     drops below 0 (so old misses do not delay a new sign) and is capped
+#     at twice the threshold (so a released sign fades quickly). At
+#     early_commit_evidence = log((1 - beta) / alpha) Wald's test keeps the
+#     false commit rate near alpha for a miss rate beta: 4.5 ~ alpha 1%,
+#     beta 10%.
+# ============================================================================
+
+import math
+import time
+from collections import deque, namedtuple
+
+# What one update() call decided (early: committed by the evidence test, not the hold time)
+StabilizerUpdate = namedtuple('StabilizerUpdate', ['saved', 'stable_gesture', 'buffer_confidence', 'early'],
+                              defaults=(False,))
+
+
+class GestureStabilizer:
+    """
+    Majority-vote + time-threshold state machine for committing gestures.
+
+    PARAMETERS:
+    - buffer_size: How many recent detections take part in the vote
+    - min_sign_stable_seconds: How long a gesture must be stable before registering
+    - min_no_gesture_seconds: How long "no gesture" must be stable to reset state
+    - buffer_min_confidence: Minimum majority ratio to consider the buffer stable
+    - early_commit_evidence: Log-likelihood ratio at which a scored sign is
+      committed early (0 = always use the hold time)
+    - hit_rate, flicker_rate: Evidence model - how often a held sign is
+      detected, and how often a sign is detected while not held
+    - on_commit: Called as on_commit(gesture, confidence) to save a gesture;
+                 returns True if it was saved
+    - clock: Returns the current time in seconds when update() gets no
+             `now` (default time.time; simulations pass a virtual clock)
+    """
+
+    def __init__(self, buffer_size=10, min_sign_stable_seconds=1.5, min_no_gesture_seconds=0.5,
+                 buffer_min_confidence=0.6, early_commit_evidence=4.5, hit_rate=0.9, flicker_rate=0.2,
+                 on_commit=None, clock=time.time):
+        self.min_sign_stable_seconds = min_sign_stable_seconds
+        self.min_no_gesture_seconds = min_no_gesture_seconds
+        self.buffer_min_confidence = buffer_min_confidence
+        self.early_commit_evidence = early_commit_evidence
+        self.hit_weight = math.log(hit_rate / flicker_rate)
+        self.miss_weight = math.log((1.0 - hit_rate) / (1.0 - flicker_rate))
+        self.on_commit = on_commit
+        self.clock = clock
+
+        # None is treated as "no gesture" in our logic
+        self.detection_buffer = deque(maxlen=buffer_size)
+        self.stable_gesture_state = None     # Current stable gesture (or None for no gesture)
+        self.last_registered_gesture = None  # Last gesture actually saved to DB
+        self.state_start_time = None         # When the current stable_gesture_state started
+        self.last_event = None               # (gesture, end_time) of the last committed motion sign
+        self.evidence = {}                   # gesture -> log-likelihood ratio (early commit test)
+
+    def configure(self, buffer_size, min_sign_stable_seconds, min_no_gesture_seconds, buffer_min_confidence,
+                  early_commit_evidence):
+        """Change the thresholds while running (keeps the current state and recent detections)"""
+        self.min_sign_stable_seconds = min_sign_stable_seconds
+        self.min_no_gesture_seconds = min_no_gesture_seconds
+        self.buffer_min_confidence = buffer_min_confidence
+        self.early_commit_evidence = early_commit_evidence
+        if buffer_size != self.detection_buffer.maxlen:
+            self.detection_buffer = deque(self.detection_buffer, maxlen=buffer_size)
+
+    def _commit(self, gesture, confidence):
+        """Save a gesture through the commit callback"""
+        if self.on_commit is None:
+            return True
+        return bool(self.on_commit(gesture, confidence))
+
+    def _accumulate(self, detected_gesture, score):
+        """
+        Add one sample to the evidence of every gesture (see EARLY COMMIT).
+
+        RETURNS: Gesture with the most evidence if it reached early_commit_evidence, else None
+        """
+        threshold = self.early_commit_evidence
+        if threshold <= 0:
+            return None
+        for gesture in list(self.evidence):
+            if gesture != detected_gesture:
+                self.evidence[gesture] += self.miss_weight
+                if self.evidence[gesture] <= 0:
+                    del self.evidence[gesture]
+        if detected_gesture is not None and score:
+            total = self.evidence.get(detected_gesture, 0.0) + score * self.hit_weight
+            self.evidence[detected_gesture] = min(total, 2 * threshold)
+        if not self.evidence:
+            return None
+        strongest = max(self.evidence, key=self.evidence.get)
+        return strongest if self.evidence[strongest] >= threshold else None
+
+    # ======================== PER-FRAME DETECTIONS =============================
+
+    def update(self, detected_gesture, now=None, score=None):
+        """
+        Feed one raw detection (gesture name or None) into the stabilizer.
+
+        PARAMETERS:
+        - detected_gesture: Gesture of the latest frame, or None
+        - now: Sample time (default: the stabilizer's clock)
+        - score: How strongly the frame supports the gesture (0..1, from
+          GestureRecognizer.match_gesture); None = unknown (time rule only)
+
+        RETURNS: StabilizerUpdate(saved, stable_gesture, buffer_confidence, early)
+        """
+        if now is None:
+            now = self.clock()
+
+        # 1. Stabilization buffer (majority voting over recent frames)
+        self.detection_buffer.append(detected_gesture)
+
+        stable_candidate = None
+        buffer_confidence = 0.0
+
+        if self.detection_buffer:
+            counts = {}
+            for g in self.detection_buffer:
+                counts[g] = counts.get(g, 0) + 1
+
+            # Gesture with highest count in buffer
+            stable_candidate = max(counts, key=counts.get)
+            buffer_confidence = counts[stable_candidate] / len(self.detection_buffer)
+
+            # Require a minimum confidence; otherwise treat as "no stable gesture"
+            if buffer_confidence < self.buffer_min_confidence:
+                stable_candidate = None
+
+        # Enough per-frame evidence counts as stable, before the vote agrees
+        proven = self._accumulate(detected_gesture, score)
+        if proven is not None:
+            stable_candidate = proven
+
+        # 2. State machine for stable gesture vs "no gesture"
+        # If stable candidate changed, start timing this new state
+        if stable_candidate != self.stable_gesture_state:
+            self.stable_gesture_state = stable_candidate
+            self.state_start_time = now
+
+        time_in_state = 0.0
+        if self.state_start_time is not None:
+            time_in_state = now - self.state_start_time
+
+        # 3. Registration logic (NO_GESTURE -> STABLE_GESTURE transitions only)
+        saved = False
+        early = False
+
+        if self.stable_gesture_state is None:
+            # In a "no gesture" state; once stable long enough, allow next sign
+            if time_in_state >= self.min_no_gesture_seconds:
+                self.last_registered_gesture = None
+        elif self.stable_gesture_state != self.last_registered_gesture:
+            # Register ONLY when it differs from the last registered gesture and:
+            #   - the evidence test proved it (early commit), or
+            #   - it has been stable for at least min_sign_stable_seconds
+            early = proven == self.stable_gesture_state and time_in_state < self.min_sign_stable_seconds
+            if early or time_in_state >= self.min_sign_stable_seconds:
+                confidence = buffer_confidence
+                if early:
+                    # Probability of "held" from the evidence (even prior odds)
+                    confidence = 1.0 / (1.0 + math.exp(-self.evidence[proven]))
+                if self._commit(self.stable_gesture_state, confidence):
+                    saved = True
+                    self.last_registered_gesture = self.stable_gesture_state
+            early = early and saved
+
+        return StabilizerUpdate(saved, self.stable_gesture_state, buffer_confidence, early)
+
+    # ======================== WHOLE-SIGN EVENTS (MOTION SIGNS) =============================
+
+    def submit_event(self, gesture, start_time, end_time, confidence):
+        """
+        Commit a sign recognized over a time span (e.g. a motion sign).
+
+        The recognizer already required the whole movement, so no hold time
+        is needed; we only skip a repeat of the same sign whose time span
+        overlaps the previous one.
+
+        RETURNS: True if the gesture was saved
+        """
+        if self.last_event is not None:
+            last_gesture, last_end = self.last_event
+            if gesture == last_gesture and start_time <= last_end:
+                return False
+
+        if not self._commit(gesture, confidence):
+            return False
+        self.last_event = (gesture, end_time)
+        self.last_registered_gesture = gesture
+        return True
+
+    def reset(self):
+        """Forget all state (e.g. when the camera restarts)"""
+        self.detection_buffer.clear()
+        self.stable_gesture_state = None
+        self.last_registered_gesture = None
+        self.state_start_time = None
+        self.last_event = None
+        self.evidence.clear()
+
+
+# ======================== RECORDED TIMELINES =============================
+
+class TranscriptBuilder:
+    """
+    Drives a GestureStabilizer from timestamped detections (a video or a
+    landmark recording) instead of live polling, and collects the signs it
+    commits with start/end times.
+
+    WHY SAMPLE? The stabilizer's buffer size and time thresholds were tuned
+    for the web page polling every 0.2 s, so recorded frames are sampled at
+    the same interval on the recording's own clock.
+    """
+
+    def __init__(self, stabilizer=None, sample_interval=0.2):
+        self.stabilizer = stabilizer or GestureStabilizer()
+        self.sample_interval = sample_interval
+        self.entries = []
+        self.next_sample = None
+        self.latest_gesture = None
+        self.latest_score = None
+        self.open_entry = None   # Static sign still being held
+
+    def add_frame(self, timestamp, gesture, motion_events=(), score=None):
+        """
+        One analyzed frame, in time order.
+
+        PARAMETERS:
+        - timestamp: Frame time in seconds (recording clock)
+        - gesture: Raw detected gesture for this frame (or None)
+        - motion_events: MotionEvent list recognized on this frame
+        - score: Per-frame score of the gesture (see GestureStabilizer.update)
+        """
+        for event in motion_events:
+            if self.stabilizer.submit_event(event.gesture, event.start_time,
+                                            event.end_time, event.confidence):
+                self.entries.append({
+                    'gesture': event.gesture, 'start': round(event.start_time, 3),
+                    'end': round(event.end_time, 3), 'confidence': round(event.confidence, 3),
+                    'kind': 'motion'
+                })
+
+        # Sample the latest detection like the web page polls the server
+        self.latest_gesture = gesture
+        self.latest_score = score
+        if self.next_sample is None:
+            self.next_sample = timestamp
+        while timestamp >= self.next_sample:
+            self._sample(self.next_sample)
+            self.next_sample += self.sample_interval
+
+    def _sample(self, now):
+        update = self.stabilizer.update(self.latest_gesture, now=now, score=self.latest_score)
+
+        # Extend the sign being held, close it once the stable state changes
+        if self.open_entry is not None:
+            if update.stable_gesture == self.open_entry['gesture']:
+                self.open_entry['end'] = round(now, 3)
+            else:
+                self.open_entry = None
+        if update.saved:
+            self.open_entry = {
+                'gesture': update.stable_gesture,
+                'start': round(self.stabilizer.state_start_time, 3),
+                'end': round(now, 3),
+                'committed': round(now, 3),
+                'confidence': round(update.buffer_confidence, 3),
+                'kind': 'static',
+                'early': update.early
+            }
+            self.entries.append(self.open_entry)
+
+    def transcript(self):
+        """Committed signs ordered by start time"""
+        return sorted(self.entries, key=lambda entry: entry['start'])
@@ -0,0 +1,195 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Dashboard State Feed (Long-Polling)
+# PURPOSE: One request that waits for changes instead of four polling timers
+# EXPLANATION: The dashboard used to poll /api/frame, /api/detect_gesture,
+#              /api/predictions and /api/statistics on separate timers -
+#              hundreds of requests per minute per open tab, most of them
+#              answering "nothing changed". Now it asks
+#              GET /api/state?since=<version> and the server holds the
+#              request until something changed or STATE_POLL_TIMEOUT
+#              passes, then answers with only the sections that changed:
+#              - camera:      {running, index}
+#              - gesture:     {gesture} (raw detection of the latest frame)
+#              - predictions: last STATE_RECENT_PREDICTIONS signs
+#              - statistics:  as /api/statistics
+#              plus the latest frame's sequence number and age (never a
+#              reason to answer by themselves). The video itself comes from
+#              the /video_feed MJPEG stream (one long-lived connection).
+#
+# HOW IT WORKS: One background thread per process (not per client) watches
+#              the live results and, while clients are waiting, checks the
+#              database's data version every STATE_DATA_CHECK_SECONDS -
+#              predictions and statistics are queried only when it changed
+#              (any process may write: commits, ingest, clear). Each section
+#              remembers the version at which it last changed, so a client
+#              gets exactly the sections newer than its `since`.
+#
+# VERSIONS: "<live>.<data>", comparable between web worker processes (a
+#              client's next request may reach any of them):
+#              - live: version of the live results the camera/gesture
+#                sections were read from. Web workers pass the capture
+#                service's shared state id; app.py (one process) lets the
+#                feed count its own changes. Both start from a boot time in
+#                milliseconds, so after a restart every section is newer.
+#              - data: the database's data version (shared by all processes)
+#              A worker records a change at the version of the snapshot it
+#              read, never earlier than where it really happened, so at
+#              worst it repeats a section the client already shows.
+# ============================================================================
+
+import threading
+import time
+from collections import namedtuple
+
+from config import STATE_DATA_CHECK_SECONDS, STATE_IDLE_SECONDS, STATE_RECENT_PREDICTIONS
+from database import get_data_version, get_recent_predictions, get_prediction_statistics
+from app_logging import get_logger
+
+log = get_logger('state_feed')
+
+LIVE_WAIT_SECONDS = 0.2         # Longest the feed thread waits for live results before checking again
+LIVE_SECTIONS = ('camera', 'gesture')
+DATA_SECTIONS = ('predictions', 'statistics')
+
+# A client's `since`: (live version, data version); -1 = has nothing yet
+Since = namedtuple('Since', ['live', 'data'])
+EVERYTHING = Since(-1, -1)
+
+
+def parse_version(text):
+    """'<live>.<data>' from a previous answer -> Since (EVERYTHING if missing or malformed)"""
+    live, _, data = (text or '').partition('.')
+    try:
+        return Since(int(live), int(data))
+    except ValueError:
+        return EVERYTHING
+
+
+class StateFeed:
+    """
+    Versioned dashboard state that requests can wait on.
+
+    PARAMETERS:
+    - read_live: Returns (version, {'camera': {...}, 'gesture': {...}}); the
+                 version of those results shared by all processes serving
+                 them, or None to let the feed count changes itself
+    - wait_live: wait_live(timeout) blocks until new live results may exist
+                 (at most timeout seconds); default: sleep
+    - read_frame: Returns the frame fields (frame_seq, frame_age_ms, ...)
+                  added to every answer; default: none
+    """
+
+    def __init__(self, read_live, wait_live=None, read_frame=None):
+        self.read_live = read_live
+        self.wait_live = wait_live or time.sleep
+        self.read_frame = read_frame or dict
+        self.lock = threading.Condition()   # Guards versions/sections; notified on every change
+        self.live_version = int(time.time() * 1000)
+        self.data_version = None            # Database data version the data sections were read at
+        self.sections = {}                  # name -> (live or data version when it last changed, value)
+        self._next_data_check = 0.0
+        self._last_request = time.monotonic()
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    # ======================== PUBLISHING =============================
+
+    def publish(self, sections, live_version=None, data_version=None):
+        """
+        Store new section values, read at live_version / data_version
+        (live_version None: this feed's own counter increases on a change)
+        """
+        with self.lock:
+            changed = [name for name, value in sections.items()
+                       if name not in self.sections or self.sections[name][1] != value]
+            if live_version is None:
+                if any(name in LIVE_SECTIONS for name in changed):
+                    self.live_version += 1
+            else:
+                self.live_version = live_version
+            if data_version is not None:
+                self.data_version = data_version
+            for name in changed:
+                version = self.live_version if name in LIVE_SECTIONS else self.data_version or 0
+                self.sections[name] = (version, sections[name])
+            if changed:
+                self.lock.notify_all()
+
+    def refresh(self, force_data=False):
+        """Read the live state, and the database if its data version changed (or force_data)"""
+        with self._refresh_lock:
+            live_version, sections = self.read_live()
+            sections = dict(sections)
+            data_version = None
+            now = time.monotonic()
+            if force_data or now >= self._next_data_check:
+                self._next_data_check = now + STATE_DATA_CHECK_SECONDS
+                data_version = get_data_version()
+                if force_data or data_version is None or data_version != self.data_version:
+                    sections['predictions'] = get_recent_predictions(limit=STATE_RECENT_PREDICTIONS)
+                    sections['statistics'] = get_prediction_statistics()
+            self.publish(sections, live_version, data_version)
+
+    def data_changed(self):
+        """Check the database on the next refresh (call after writing to it)"""
+        self._next_data_check = 0.0
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.wait_live(LIVE_WAIT_SECONDS)
+            if time.monotonic() - self._last_request > STATE_IDLE_SECONDS:
+                self._stop.wait(LIVE_WAIT_SECONDS)   # Nobody is watching: no database checks
+                continue
+            try:
+                self.refresh()
+            except Exception as e:
+                log.exception("State feed refresh failed: %s", e)
+                self._stop.wait(1.0)
+
+    def stop(self):
+        self._stop.set()
+        with self.lock:
+            self.lock.notify_all()
+
+    # ======================== WAITING CLIENTS =============================
+
+    def _newer(self, since):
+        """Sections the client with `since` does not show yet (call with self.lock held)"""
+        # Data version lower than the client's: the database was recreated
+        data_reset = self.data_version is not None and since.data > self.data_version
+        return {name: value for name, (version, value) in self.sections.items()
+                if version > (since.live if name in LIVE_SECTIONS else since.data)
+                or (data_reset and name in DATA_SECTIONS)}
+
+    def changes(self, since, timeout):
+        """
+        Wait until the state is newer than `since` (or timeout), then return it.
+
+        PARAMETERS:
+        - since: Version of the client's last answer, as text (missing or
+                 malformed = everything)
+        - timeout: Longest wait in seconds
+
+        RETURNS: dict with version, changed (sections newer than since) and
+                 the frame fields
+        """
+        since = parse_version(since)
+        idle = time.monotonic() - self._last_request > STATE_IDLE_SECONDS
+        self._last_request = time.monotonic()
+        # Never answered here, idle, or the client saw newer data through another worker
+        behind = self.data_version is None or since.data > self.data_version
+        if self._thread is None or idle or not self.sections or behind:
+            self.refresh(force_data=idle or not self.sections or behind)
+        if self._thread is None:
+            with self._refresh_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='state-feed', daemon=True)
+                    self._thread.start()
+
+        with self.lock:
+            self.lock.wait_for(lambda: self._newer(since) or self._stop.is_set(), timeout)
+            changed = self._newer(since)
+            version = f"{self.live_version}.{self.data_version or 0}"
+        return {'version': version, 'changed': changed, **self.read_frame()}
@@ -22,79 +22,77 @@ let cameraRunning = false;
 
 // Track gesture detection
 let lastDetectedGesture = null;
-let detectionUpdateInterval = null;
 
-// Video stream update interval
-let videoStreamInterval = null;
+// Dashboard state (long-polling /api/state)
+// version: what the page has already shown; the server answers only with
+// the sections that changed since then (camera, gesture, predictions,
+// statistics), or after ~25 seconds with nothing changed. Opaque text
+// ('' = nothing shown yet); any server worker understands it
+let stateVersion = '';
+let stateLoopRunning = false;
+const STATE_MIN_INTERVAL_MS = 250;   // At most 4 answers per second, even while gestures flicker
+const STATE_RETRY_MS = 2000;         // Wait after a failed request (server restarting, network down)
+
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
 
 /* ========================================================================
    2. CAMERA CONTROL FUNCTIONS
    ======================================================================== */
 
 /**
- * START VIDEO STREAM - Continuously update video display
+ * START VIDEO STREAM - Show the camera as one MJPEG stream (/video_feed)
+ * 
+ * The browser keeps a single connection open and draws every frame the
+ * server pushes - no request per frame. tier=auto lets the server send
+ * smaller frames when this connection is slow.
  */
 function startVideoStream() {
-    console.log("[VIDEO] Starting video stream updates...");
+    console.log("[VIDEO] Starting video stream...");
 
     const videoFeed = document.getElementById('videoFeed');
-    const videoStatus = document.getElementById('videoStatus');
-    
-    // Stop any existing stream
-    if (videoStreamInterval) {
-        clearInterval(videoStreamInterval);
+    if (!videoFeed.src.includes('/video_feed')) {
+        videoFeed.src = '/video_feed?tier=auto&t=' + Date.now();   // t: never reuse a finished stream
     }
-    
-    // Update video frame every 150ms (~7 FPS) - smooth but not overloading
-    videoStreamInterval = setInterval(async () => {
-        try {
-            const response = await fetch('/api/frame');
-            if (!response.ok) return;
-            
-            const data = await response.json();
-
-            if (data && data.frame) {
-                // We have a valid frame → show it
-                videoFeed.src = 'data:image/jpeg;base64,' + data.frame;
-                if (!cameraRunning) {
-                    cameraRunning = true;
-                    videoStatus.textContent = '🟢 Camera is running...';
-                }
-            } else {
-                // No frame – inspect backend status
-                if (data && data.status === 'no_camera') {
-                    console.log("[VIDEO] Backend reports no camera available");
-                    cameraRunning = false;
-
-                    // Stop polling for frames
-                    stopVideoStream();
-
-                    // Reset UI to stopped state
-                    videoFeed.src = '/static/placeholder.svg';
-                    videoStatus.textContent = '🔴 Camera not available or stopped';
-
-                    document.getElementById('startBtn').disabled = false;
-                    document.getElementById('stopBtn').disabled = true;
-                } else if (data && data.status === 'no_frame') {
-                    // Camera is “on” but not giving frames – show a warning
-                    videoStatus.textContent = '⚠️ No frame from camera (check permissions or other apps using camera)';
-                }
-            }
-        } catch (error) {
-            console.error("[VIDEO] Error updating frame:", error.message);
+    videoFeed.onerror = () => {
+        // Stream ended or could not start (camera stopped, server restarted)
+        if (cameraRunning) {
+            document.getElementById('videoStatus').textContent =
+                '⚠️ No frame from camera (check permissions or other apps using camera)';
         }
-    }, 150);
+    };
 }
 
 /**
- * STOP VIDEO STREAM
+ * STOP VIDEO STREAM - Show the placeholder (closes the stream connection)
  */
 function stopVideoStream() {
-    console.log("[VIDEO] Stopping video stream updates...");
-    if (videoStreamInterval) {
-        clearInterval(videoStreamInterval);
-        videoStreamInterval = null;
-    }
+    console.log("[VIDEO] Stopping video stream...");
+    const videoFeed = document.getElementById('videoFeed');
+    videoFeed.onerror = null;
+    videoFeed.src = '/static/placeholder.svg';
+}
+
+/**
+ * SHOW CAMERA RUNNING / STOPPED - Buttons, status text and video
+ */
+function showCameraRunning() {
+    cameraRunning = true;
+    document.getElementById('startBtn').disabled = true;
+    document.getElementById('startBtn').textContent = '▶ Start Camera';
+    document.getElementById('stopBtn').disabled = false;
+    document.getElementById('videoStatus').textContent = '🟢 Camera is running...';
+    startVideoStream();
+}
+
+function showCameraStopped(message) {
+    cameraRunning = false;
+    stopVideoStream();
+    document.getElementById('startBtn').disabled = false;
+    document.getElementById('stopBtn').disabled = true;
+    document.getElementById('stopBtn').textContent = '⏹ Stop Camera';
+    document.getElementById('videoStatus').textContent = message;
+    document.getElementById('currentGesture').textContent = 'No gesture detected';
+    document.getElementById('confidenceLevel').textContent = 'Confidence: 0%';
 }
 
 /**
@@ -103,9 +101,8 @@ function stopVideoStream() {
  * PROCESS:
  * 1. Send POST request to Flask /start_camera endpoint
  * 2. If successful, update UI (buttons, status)
- * 3. Start the video stream
- * 4. Begin gesture detection loop
- * 5. Show error message if failed
+ * 3. Start the video stream (the state loop shows gestures)
+ * 4. Show error message if failed
  */
 async function startCamera() {
     try {
@@ -149,29 +146,9 @@ async function startCamera() {
             // Success! Update UI
             console.log("[SUCCESS] Camera started!", data.message);
             
-            cameraRunning = true;
-            
-            // Update button states
-            document.getElementById('startBtn').disabled = true;
-            document.getElementById('stopBtn').disabled = false;
-            
-            // Update status message
-            document.getElementById('videoStatus').textContent = '🟢 Camera is running...';
-            
-            // Start video stream updates (fetch frames every 150ms)
-            startVideoStream();
-            
-            // Start detecting gestures periodically
-            startGestureDetection();
-            
-            // Update predictions and statistics once on start
-            updatePredictions();
-            updateStatistics();
-            
-            // Refresh data every 3 seconds (less frequent to reduce load)
-            setInterval(() => {
-                updateStatistics();  // Just update stats, predictions update on gesture detection
-            }, 3000);
+            // Buttons, status and video stream; gestures, history and
+            // statistics arrive through the state loop (/api/state)
+            showCameraRunning();
             
         } else {
             // Error response from backend
@@ -199,7 +176,6 @@ async function startCamera() {
  * 1. Send POST request to Flask /stop_camera endpoint
  * 2. Stop video stream
  * 3. Update UI (buttons, status)
- * 4. Stop gesture detection loop
  */
 async function stopCamera() {
     try {
@@ -223,26 +199,7 @@ async function stopCamera() {
         if (response.ok) {
             console.log("[SUCCESS] Camera stopped!");
             
-            cameraRunning = false;
-            
-            // Stop the video stream updates
-            stopVideoStream();
-            
-            // Stop gesture detection
-            if (detectionUpdateInterval) {
-                clearInterval(detectionUpdateInterval);
-            }
-            
-            // Reset video display to static placeholder
-            const videoFeed = document.getElementById('videoFeed');
-            videoFeed.src = '/static/placeholder.svg';
-            
-            // Update button states
-            document.getElementById('startBtn').disabled = false;
-            document.getElementById('stopBtn').disabled = true;
-            
-            // Update status message
-            document.getElementById('videoStatus').textContent = '🔴 Camera stopped';
+            showCameraStopped('🔴 Camera stopped');
             
         } else {
             console.error("Error:", data.message);
@@ -256,157 +213,151 @@ async function stopCamera() {
 }
 
 /* ========================================================================
-   3. GESTURE DETECTION FUNCTION
+   3. DASHBOARD STATE LOOP
    ======================================================================== */
 
 /**
- * START GESTURE DETECTION - Continuously detect gestures
+ * RUN STATE LOOP - One long-polling request at a time, for the whole page
  * 
  * PROCESS:
- * 1. Call /api/detect_gesture every 100ms
- * 2. Get current gesture from camera
- * 3. Update UI with detected gesture
- * 4. If gesture saved successfully, update predictions list
+ * 1. Ask /api/state for everything newer than stateVersion
+ * 2. The server holds the request until something changes (or ~25 s)
+ * 3. Show the sections that changed, remember the new version
+ * 4. Ask again (at most every STATE_MIN_INTERVAL_MS)
+ * 
+ * Replaces four timers (/api/frame every 150ms, /api/detect_gesture every
+ * 200ms, /api/predictions and /api/statistics): an idle page now sends
+ * about 2 requests per minute instead of ~700.
  */
-function startGestureDetection() {
-    console.log("Starting gesture detection...");
-    
-    // Call gesture detection every 200ms (~5 FPS) - good balance between responsiveness and performance
-    detectionUpdateInterval = setInterval(async () => {
-        try {
-            // Send request to Flask backend (no body required when using server camera)
-            const response = await fetch('/api/detect_gesture', {
-                method: 'POST'
-            });
+async function runStateLoop() {
+    if (stateLoopRunning) return;
+    stateLoopRunning = true;
 
-            // Check if response is OK (200-299)
+    while (stateLoopRunning) {
+        const started = Date.now();
+        try {
+            const response = await fetch('/api/state?since=' + stateVersion);
             if (!response.ok) {
                 console.error(`[WARNING] Unexpected HTTP status: ${response.status}`);
-                return; // Skip this frame
+                await sleep(STATE_RETRY_MS);
+                continue;
             }
-
             const data = await response.json();
-            
-            // Handle successful response (ALL responses from backend are now 200)
-            if (data && data.status === 'success') {
-                if (data.gesture) {
-                    // Gesture detected
-                    lastDetectedGesture = data.gesture;
-                    document.getElementById('currentGesture').textContent = data.gesture;
-                    document.getElementById('confidenceLevel').textContent = 'Confidence: 90%';
-                    
-                    // If gesture was saved, ONLY update predictions (not stats every time)
-                    if (data.saved) {
-                        console.log("[SAVED] Gesture saved:", data.gesture);
-                        updatePredictions();
-                        // Statistics will be updated every 3 seconds in main interval
-                    }
-                } else {
-                    // No gesture in this frame (normal, no hand visible)
-                    document.getElementById('currentGesture').textContent = 'No gesture detected';
-                    document.getElementById('confidenceLevel').textContent = 'Confidence: 0%';
-                }
-            } else {
-                // Unexpected response format
-                console.warn("[WARNING] Unexpected response format:", data);
-            }
-            
+            stateVersion = data.version;
+            applyState(data);
         } catch (error) {
-            // Network or parsing error (log once, don't spam)
-            console.error("[ERROR] Exception in gesture detection:", error.message);
-            // Don't update UI to prevent showing repeated errors
+            // Network error or server restarting: try again shortly
+            console.error("[ERROR] Exception in state loop:", error.message);
+            await sleep(STATE_RETRY_MS);
+            continue;
+        }
+
+        const elapsed = Date.now() - started;
+        if (elapsed < STATE_MIN_INTERVAL_MS) {
+            await sleep(STATE_MIN_INTERVAL_MS - elapsed);
         }
-    }, 200);  // Poll every 200ms
+    }
+}
+
+/**
+ * APPLY STATE - Update the page with the sections that changed
+ */
+function applyState(data) {
+    const changed = data.changed || {};
+
+    if (changed.camera) {
+        if (changed.camera.running && !cameraRunning) {
+            showCameraRunning();          // Started by another tab (or before this page loaded)
+        } else if (!changed.camera.running && cameraRunning) {
+            console.log("[VIDEO] Backend reports no camera available");
+            showCameraStopped('🔴 Camera not available or stopped');
+        }
+    }
+
+    if (changed.gesture && cameraRunning) {
+        const gesture = changed.gesture.gesture;
+        if (gesture) {
+            // Gesture detected
+            lastDetectedGesture = gesture;
+            document.getElementById('currentGesture').textContent = gesture;
+            document.getElementById('confidenceLevel').textContent = 'Confidence: 90%';
+        } else {
+            // No gesture in this frame (normal, no hand visible)
+            document.getElementById('currentGesture').textContent = 'No gesture detected';
+            document.getElementById('confidenceLevel').textContent = 'Confidence: 0%';
+        }
+    }
+
+    if (changed.predictions) {
+        renderPredictions(changed.predictions);
+    }
+    if (changed.statistics) {
+        renderStatistics(changed.statistics);
+    }
+
+    // Camera "on" but not giving frames (frame_seq: newest captured frame)
+    if (cameraRunning) {
+        document.getElementById('videoStatus').textContent = data.frame_seq
+            ? '🟢 Camera is running...'
+            : '⚠️ No frame from camera (check permissions or other apps using camera)';
+    }
 }
 
 /* ========================================================================
-   4. DATA UPDATE FUNCTIONS
+   4. DATA DISPLAY FUNCTIONS
    ======================================================================== */
 
 /**
- * UPDATE PREDICTIONS - Fetch and display detected gestures
+ * RENDER PREDICTIONS - Display the recently detected gestures
  * 
  * PROCESS:
- * 1. Call /api/predictions to get last 10 predictions
- * 2. Loop through predictions
- * 3. Create HTML for each prediction
- * 4. Display in predictions list
+ * 1. Loop through predictions (newest first, from /api/state)
+ * 2. Create HTML for each prediction
+ * 3. Display in predictions list
  */
-async function updatePredictions() {
-    try {
-        // Fetch last 10 predictions from database
-        const response = await fetch('/api/predictions?limit=10');
-        const data = await response.json();
-        
-        if (response.ok) {
-            const predictions = data.predictions;
-            const predictionsList = document.getElementById('predictionsList');
-            
-            // Check if there are any predictions
-            if (predictions.length === 0) {
-                predictionsList.innerHTML = 
-                    '<p class="empty-message">No predictions yet. Start camera to detect signs!</p>';
-                return;
-            }
-            
-            // Create HTML for each prediction
-            let html = '';
-            predictions.forEach((prediction, index) => {
-                // Format timestamp to readable format
-                const date = new Date(prediction.timestamp);
-                const timeStr = date.toLocaleTimeString();
-                const dateStr = date.toLocaleDateString();
-                
-                html += `
-                    <div class="prediction-item">
-                        <div>
-                            <span class="prediction-gesture">${index + 1}. ${prediction.gesture}</span>
-                        </div>
-                        <span class="prediction-time">${timeStr}</span>
-                    </div>
-                `;
-            });
-            
-            // Update the list
-            predictionsList.innerHTML = html;
-            
-            // Auto-scroll to newest (bottom)
-            predictionsList.scrollTop = predictionsList.scrollHeight;
-            
-        }
-        
-    } catch (error) {
-        console.error("[ERROR] Error updating predictions:", error);
+function renderPredictions(predictions) {
+    const predictionsList = document.getElementById('predictionsList');
+    
+    // Check if there are any predictions
+    if (predictions.length === 0) {
+        predictionsList.innerHTML = 
+            '<p class="empty-message">No predictions yet. Start camera to detect signs!</p>';
+        return;
     }
+    
+    // Create HTML for each prediction
+    let html = '';
+    predictions.forEach((prediction, index) => {
+        // Format timestamp to readable format (stored as UTC)
+        const date = new Date(prediction.timestamp.replace(' ', 'T') + 'Z');
+        const timeStr = date.toLocaleTimeString();
+        
+        html += `
+            <div class="prediction-item">
+                <div>
+                    <span class="prediction-gesture">${index + 1}. ${prediction.gesture}</span>
+                </div>
+                <span class="prediction-time">${timeStr}</span>
+            </div>
+        `;
+    });
+    
+    // Update the list
+    predictionsList.innerHTML = html;
+    
+    // Auto-scroll to newest (bottom)
+    predictionsList.scrollTop = predictionsList.scrollHeight;
 }
 
 /**
- * UPDATE STATISTICS - Fetch and display dashboard statistics
- * 
- * PROCESS:
- * 1. Call /api/statistics to get prediction stats
- * 2. Update the stat cards with new values
- * 3. Display total, unique gestures, most detected
+ * RENDER STATISTICS - Update the dashboard stat cards
+ * (total, unique gestures, most detected)
  */
-async function updateStatistics() {
-    try {
-        // Fetch statistics from backend
-        const response = await fetch('/api/statistics');
-        const data = await response.json();
-        
-        if (response.ok) {
-            const stats = data.statistics;
-            
-            // Update stat cards
-            document.getElementById('totalPredictions').textContent = stats.total_predictions || 0;
-            document.getElementById('uniqueGestures').textContent = stats.unique_gestures || 0;
-            document.getElementById('mostDetected').textContent = 
-                stats.most_detected || '--';
-        }
-        
-    } catch (error) {
-        console.error("[ERROR] Error updating statistics:", error);
-    }
+function renderStatistics(stats) {
+    document.getElementById('totalPredictions').textContent = stats.total_predictions || 0;
+    document.getElementById('uniqueGestures').textContent = stats.unique_gestures || 0;
+    document.getElementById('mostDetected').textContent = 
+        stats.most_detected || '--';
 }
 
 /* ========================================================================
@@ -478,7 +429,7 @@ async function clearData() {
  * PROCESS:
  * 1. Wait for HTML to fully load
  * 2. Initialize UI (buttons, status)
- * 3. Load initial predictions and statistics
+ * 3. Start the state loop (camera status, predictions, statistics)
  */
 document.addEventListener('DOMContentLoaded', function() {
     console.log("[INIT] Page loaded, initializing...");
@@ -487,11 +438,9 @@ document.addEventListener('DOMContentLoaded', function() {
     document.getElementById('startBtn').disabled = false;
     document.getElementById('stopBtn').disabled = true;
     
-    // Load initial predictions
-    updatePredictions();
-    
-    // Load initial statistics
-    updateStatistics();
+    // Camera status, predictions and statistics arrive with the first
+    // answer of the state loop, then whenever they change
+    runStateLoop();
     
     console.log("[INIT] Initialization complete!");
 });
@@ -510,15 +459,13 @@ document.addEventListener('DOMContentLoaded', function() {
    5. JavaScript updates UI: video shows /video_feed stream
    6. /video_feed endpoint continuously sends camera frames to browser
    7. Browser displays frames as video
-   8. startGestureDetection() begins polling /api/detect_gesture
-   9. Each poll:
-      - camera_module gets frame
-      - gesture_model detects gesture from frame
-      - If gesture detected, database.py saves it to SQLite
-      - JSON response sent back to JavaScript
-      - JavaScript updates the detected gesture display
-   10. updatePredictions() shows all saved gestures
-   11. updateStatistics() shows summary statistics
+   8. On the server, gesture_model detects the gesture of each frame and
+      the stabilizer saves stable signs to SQLite (database.py)
+   9. runStateLoop() (started on page load) waits on /api/state; the
+      server answers whenever something changed:
+      - the detected gesture -> current gesture display
+      - the camera status   -> buttons and video
+      - saved signs         -> renderPredictions() and renderStatistics()
    
    WHY THIS ARCHITECTURE?
    - Separation of concerns (each module has one job)
@@ -0,0 +1,229 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Stream Quality Tiers
+# PURPOSE: Per-viewer preview size/quality, encoded once per frame per tier
+# EXPLANATION: A thumbnail in a monitoring grid does not need the full
+#              640x480 frame. Viewers ask for a tier (?tier=thumb) or an
+#              explicit ?width=&quality=, and:
+#              1. Each (width, quality) is scaled and JPEG-encoded at most
+#                 ONCE per camera frame; every viewer asking for the same
+#                 tier gets the cached bytes (EncodedFrameCache)
+#              2. ?tier=auto lets the stream pick the tier itself from how
+#                 fast the viewer takes the frames (TierAdapter): a slow
+#                 link or busy browser steps down, a fast one steps back up
+#
+#              Tiers are defined in config.py (STREAM_TIERS). The 'full'
+#              tier keeps the camera resolution and the route's own quality
+#              setting (runtime settings).
+# ============================================================================
+
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+
+from config import (STREAM_TIERS, STREAM_MIN_WIDTH, STREAM_AUTO_DOWN_BUSY, STREAM_AUTO_UP_BUSY,
+                    STREAM_AUTO_UP_SECONDS)
+from jpeg_encoder import jpeg_encoder
+
+# One requested encoding: tier name (for metrics), width (None = source width), JPEG quality
+Tier = namedtuple('Tier', ['name', 'width', 'quality'])
+
+# Tier names from largest to smallest ('full' first)
+TIER_LADDER = tuple(sorted(STREAM_TIERS, key=lambda name: -(STREAM_TIERS[name]['width'] or float('inf'))))
+
+
+def resolve_tier(name=None, width=None, quality=None, default_quality=70):
+    """
+    Turn request parameters into a Tier.
+
+    PARAMETERS:
+    - name: Tier name from STREAM_TIERS (default 'full'); 'auto' is handled
+      by the stream (TierAdapter) and not accepted here
+    - width, quality: Explicit values; override the tier's
+    - default_quality: Quality of tiers without their own (the 'full' tier)
+
+    RETURNS: Tier
+    RAISES: ValueError for an unknown tier name or a width/quality out of range
+    """
+    name = name or 'full'
+    if name not in STREAM_TIERS:
+        raise ValueError(f"Unknown tier {name!r} (expected one of {', '.join(TIER_LADDER)} or auto)")
+    spec = STREAM_TIERS[name]
+    if width is not None or quality is not None:
+        name = 'custom'
+    width = width if width is not None else spec['width']
+    quality = quality if quality is not None else (spec['quality'] or default_quality)
+    if width is not None and not STREAM_MIN_WIDTH <= width <= 4096:
+        raise ValueError(f"width must be between {STREAM_MIN_WIDTH} and 4096")
+    if not 10 <= quality <= 100:
+        raise ValueError("quality must be between 10 and 100")
+    return Tier(name, width, int(quality))
+
+
+def tier_from_args(args, default_quality):
+    """
+    Tier from request query parameters: tier, width, quality and, for
+    tier=auto, max_tier (largest tier the stream may choose).
+
+    PARAMETER: args - request.args
+    RETURNS: (Tier, auto); with auto the Tier is the largest allowed
+    RAISES: ValueError for bad values
+    """
+    name = args.get('tier') or None
+    width = args.get('width', type=int)
+    quality = args.get('quality', type=int)
+    if name == 'auto':
+        return resolve_tier(args.get('max_tier') or None, default_quality=default_quality), True
+    return resolve_tier(name, width, quality, default_quality), False
+
+
+def scale_to_width(frame, width):
+    """Downscale keeping the aspect ratio (never upscales)"""
+    height, source_width = frame.shape[:2]
+    if width is None or width >= source_width:
+        return frame
+    size = (width, max(1, round(height * width / source_width)))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+# ======================== ENCODED FRAME CACHE =============================
+
+class EncodedFrameCache:
+    """
+    JPEG bytes of the current frame per (width, quality).
+
+    get(seq, tier, source) returns the cached encoding for this frame
+    sequence, or renders and encodes it once. When several threads ask for
+    the same missing encoding, one encodes and the others wait for it.
+    A newer seq drops everything cached for the previous frame; a caller
+    still asking for an older frame gets it encoded without touching the
+    cache. clear() forgets the seq (the source restarted its numbering).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seq = None
+        self._source = None             # (frame, width it was requested for) of self._seq
+        self._encodings = {}            # (width, quality) -> bytes, or Event while encoding
+
+    def get(self, seq, tier, source):
+        """
+        PARAMETERS:
+        - seq: Sequence number of the frame source() returns
+        - tier: Tier to encode
+        - source: source(width) -> BGR frame at least `width` wide (None =
+          no frame); called at most once per seq
+
+        RETURNS: JPEG bytes, or None if source() had no frame
+        """
+        key = (tier.width, tier.quality)
+        while True:
+            with self._lock:
+                if self._seq is not None and seq < self._seq:
+                    pending = frame = None      # Older frame: encode it, keep the newer one cached
+                    break
+                if seq != self._seq:
+                    self._seq, self._source, self._encodings = seq, None, {}
+                entry = self._encodings.get(key)
+                if entry is None:
+                    pending = self._encodings[key] = threading.Event()
+                    frame = self._reusable_source(tier.width)
+                    break
+            if isinstance(entry, bytes):
+                return entry
+            entry.wait(1.0)             # Another thread is encoding this one
+
+        data = None
+        try:
+            if frame is None:
+                frame = source(tier.width)
+                if frame is not None:
+                    frame = frame.copy()    # source() may hand out a reused buffer
+            if frame is not None:
+                scaled = scale_to_width(frame, tier.width)
+                try:
+                    data = jpeg_encoder.encode(scaled, tier.quality, site=tier.name)
+                except ValueError:
+                    data = None
+        finally:
+            if pending is not None:
+                with self._lock:
+                    if self._seq == seq:
+                        if data is not None:
+                            self._encodings[key] = data
+                            if frame is not None and self._reusable_source(tier.width) is None:
+                                self._source = (frame, tier.width)
+                        else:
+                            self._encodings.pop(key, None)
+                pending.set()
+        return data
+
+    def clear(self):
+        """Drop the cached frame and its seq (e.g. the camera restarted at seq 1)"""
+        with self._lock:
+            self._seq, self._source, self._encodings = None, None, {}
+
+    def _reusable_source(self, width):
+        """Cached source frame if it was rendered at least `width` wide"""
+        if self._source is None:
+            return None
+        frame, rendered_for = self._source
+        if rendered_for is None or (width is not None and rendered_for >= width):
+            return frame
+        return None
+
+
+# ======================== AUTOMATIC TIER SELECTION =============================
+
+class TierAdapter:
+    """
+    Picks a stream tier from how long the viewer takes to receive frames.
+
+    A streaming response resumes the generator only after the previous
+    frame was handed to the connection, so the time from yield to resume
+    is the time the viewer needed to take one frame. Busy = that time as
+    a share of the frame interval (smoothed). Above STREAM_AUTO_DOWN_BUSY
+    the next smaller tier is used; below STREAM_AUTO_UP_BUSY for
+    STREAM_AUTO_UP_SECONDS the next larger one is tried again.
+    """
+
+    def __init__(self, largest='full', smoothing=0.3):
+        self.ladder = TIER_LADDER[TIER_LADDER.index(largest):]
+        self.index = 0
+        self.busy = 0.0
+        self.smoothing = smoothing
+        self._calm_since = None
+
+    @property
+    def tier_name(self):
+        return self.ladder[self.index]
+
+    def record(self, send_seconds, frame_interval, now=None):
+        """
+        Record one delivered frame.
+
+        PARAMETERS:
+        - send_seconds: Time from yielding the frame to the generator resuming
+        - frame_interval: Seconds between frames the stream aims for
+
+        RETURNS: Tier name to use for the next frame
+        """
+        now = time.monotonic() if now is None else now
+        share = min(send_seconds / frame_interval, 2.0) if frame_interval > 0 else 0.0
+        self.busy += self.smoothing * (share - self.busy)
+
+        if self.busy > STREAM_AUTO_DOWN_BUSY and self.index < len(self.ladder) - 1:
+            self.index += 1
+            self.busy = STREAM_AUTO_UP_BUSY     # Judge the smaller tier afresh
+            self._calm_since = None
+        elif self.busy < STREAM_AUTO_UP_BUSY and self.index > 0:
+            if self._calm_since is None:
+                self._calm_since = now
+            elif now - self._calm_since >= STREAM_AUTO_UP_SECONDS:
+                self.index -= 1
+                self._calm_since = None
+        else:
+            self._calm_since = None
+        return self.tier_name
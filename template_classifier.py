@@ -0,0 +1,205 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Template-Matching Gesture Classifier
+# PURPOSE: Recognize hundreds of signs by comparing hands to labeled examples
+# EXPLANATION: Hand-written rules do not scale to a full ISL vocabulary.
+#              This engine instead:
+#              1. Normalizes the 21 landmarks (wrist at the origin, scaled by
+#                 palm size) into a feature vector
+#              2. Looks up the nearest labeled templates through an index
+#                 (flat NumPy index by default, SciPy KD-tree optional)
+#              3. Turns the distance into a confidence score
+#              Templates are stored in a small .npz file (float16 features).
+# ============================================================================
+
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from app_logging import get_logger
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # SciPy is optional; fall back to a NumPy search
+    cKDTree = None
+
+log = get_logger('templates')
+
+WRIST = 0
+MIDDLE_MCP = 9
+FEATURE_SIZE = 20 * 3   # 21 landmarks minus the wrist (always at the origin)
+
+# Result of a template match
+TemplateMatch = namedtuple('TemplateMatch', ['gesture', 'confidence', 'distance', 'margin'])
+
+
+# ======================== FEATURE EXTRACTION =============================
+
+def normalize_landmarks(points):
+    """
+    Convert hand landmarks into a wrist-relative, scale-invariant feature vector.
+
+    PROCESS:
+    1. Move the wrist to (0, 0, 0)
+    2. Divide by palm size (wrist -> middle finger MCP), so hand size and
+       distance from the camera do not matter
+    3. Drop the wrist and flatten to FEATURE_SIZE values
+
+    PARAMETER: points - (21, 3) array/list, or (N, 21, 3) for a batch
+    RETURNS: float32 array of shape (FEATURE_SIZE,) or (N, FEATURE_SIZE)
+    """
+    pts = np.asarray(points, dtype=np.float32)
+    single = pts.ndim == 2
+    if single:
+        pts = pts[None]
+
+    rel = pts - pts[:, WRIST:WRIST + 1, :]
+    scale = np.linalg.norm(rel[:, MIDDLE_MCP, :], axis=1)
+    scale[scale < 1e-6] = 1.0
+    features = (rel[:, 1:, :] / scale[:, None, None]).reshape(len(pts), FEATURE_SIZE)
+    return features[0] if single else features
+
+
+# ======================== TEMPLATE LIBRARY =============================
+
+class TemplateLibrary:
+    """
+    Labeled gesture templates (feature vectors + gesture names).
+
+    FILE FORMAT (.npz):
+    - features: float16 array (N, FEATURE_SIZE)
+    - labels: uint16 array (N,) indexing into names
+    - names: array of gesture names
+    """
+
+    def __init__(self, features=None, labels=None, names=None):
+        self.features = np.zeros((0, FEATURE_SIZE), np.float32) if features is None else np.asarray(features, np.float32)
+        self.labels = np.zeros(0, np.int64) if labels is None else np.asarray(labels, np.int64)
+        self.names = [] if names is None else list(names)
+
+    def __len__(self):
+        return len(self.features)
+
+    def add(self, gesture, landmarks):
+        """Add one or more examples (landmarks of shape (21, 3) or (N, 21, 3))"""
+        features = normalize_landmarks(landmarks).reshape(-1, FEATURE_SIZE)
+        if gesture not in self.names:
+            self.names.append(gesture)
+        label = self.names.index(gesture)
+        self.features = np.vstack([self.features, features])
+        self.labels = np.concatenate([self.labels, np.full(len(features), label)])
+
+    def save(self, path):
+        """Write the library to a compact .npz file"""
+        np.savez_compressed(
+            path,
+            features=self.features.astype(np.float16),
+            labels=self.labels.astype(np.uint16),
+            names=np.array(self.names)
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Read a library written by save()"""
+        with np.load(path) as data:
+            return cls(data['features'], data['labels'], [str(n) for n in data['names']])
+
+
+# ======================== CLASSIFIER =============================
+
+class TemplateClassifier:
+    """
+    Nearest-template classifier over a TemplateLibrary.
+
+    INDEXES:
+    - 'numpy': all squared distances from one matrix-vector product with
+      precomputed template norms, then a partial sort for the k nearest
+    - 'kdtree': SciPy cKDTree (needs SciPy). With 60-dimensional features a
+      KD-tree cannot prune much, so it is slower than 'numpy' up to at
+      least 5,000 templates (see tools/bench_template_classifier.py)
+    
+    CONFIDENCE:
+    confidence = exp(-(d / distance_scale)^2) for the nearest template at
+    distance d; matches below min_confidence are treated as "no gesture".
+    margin compares d with the nearest template of a *different* gesture
+    (0 = ambiguous, 1 = clear winner).
+    """
+
+    def __init__(self, library, k=5, distance_scale=0.6, min_confidence=0.5, index='numpy'):
+        if not len(library):
+            raise ValueError("Template library is empty")
+        self.library = library
+        self.k = min(k, len(library))
+        self.distance_scale = distance_scale
+        self.min_confidence = min_confidence
+        self.names = library.names
+        self.labels = library.labels
+
+        # Build the spatial index once
+        self.features = np.ascontiguousarray(library.features, dtype=np.float32)
+        if index == 'kdtree':
+            if cKDTree is None:
+                raise ValueError("The 'kdtree' index needs SciPy (pip install scipy)")
+            self._tree = cKDTree(self.features)
+        elif index == 'numpy':
+            self._norms = np.einsum('ij,ij->i', self.features, self.features)
+        else:
+            raise ValueError(f"Unknown template index: {index!r}")
+        self.index_type = index
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Load templates from disk and build the classifier"""
+        return cls(TemplateLibrary.load(path), **kwargs)
+
+    def _nearest(self, feature):
+        """(distances, template indices) of the k nearest templates, closest first"""
+        if self.index_type == 'kdtree':
+            distances, indices = self._tree.query(feature, k=self.k)
+            return np.atleast_1d(distances), np.atleast_1d(indices)
+
+        # |a - b|^2 = |a|^2 - 2 a.b + |b|^2 (one matrix-vector product)
+        sq = self._norms - 2.0 * (self.features @ feature) + float(feature @ feature)
+        if self.k < len(sq):
+            indices = np.argpartition(sq, self.k - 1)[:self.k]
+        else:
+            indices = np.arange(len(sq))
+        indices = indices[np.argsort(sq[indices])]
+        return np.sqrt(np.maximum(sq[indices], 0.0)), indices
+
+    def match(self, points):
+        """
+        Find the best matching gesture for one hand.
+
+        RETURNS: TemplateMatch (gesture is None if confidence is too low)
+        """
+        distances, indices = self._nearest(normalize_landmarks(points))
+        labels = self.labels[indices]
+        best_distance = float(distances[0])
+        best_label = labels[0]
+
+        others = distances[labels != best_label]
+        margin = 1.0 if not len(others) else float(1.0 - best_distance / max(others[0], 1e-9))
+        confidence = float(np.exp(-(best_distance / self.distance_scale) ** 2))
+
+        gesture = self.names[best_label] if confidence >= self.min_confidence else None
+        return TemplateMatch(gesture, confidence, best_distance, margin)
+
+    def classify(self, points):
+        """Return the gesture name for one hand's points, or None"""
+        return self.match(points).gesture
+
+
+def load_template_classifier(path, **kwargs):
+    """
+    Load the template engine, or return None (with a message) if the
+    template file does not exist yet.
+    """
+    if not os.path.exists(path):
+        log.info("Template file not found: %s", path)
+        return None
+    classifier = TemplateClassifier.from_file(path, **kwargs)
+    log.info("Loaded %d templates for %d gestures (%s index)",
+             len(classifier.library), len(classifier.names), classifier.index_type)
+    return classifier
@@ -0,0 +1,112 @@
+"""
+Benchmark: how old captured frames are when the capture thread falls behind,
+with the normal read() loop versus low-latency capture (capture_low_latency:
+minimal driver buffer, grab() until the newest frame, retrieve() only that).
+
+Plays a video file through frame_sources.FileCapture, which behaves like a
+webcam with a driver buffer (frames arrive at the file's frame rate and
+queue up while nobody reads them), and runs CameraManager's capture step
+with `--work` seconds of extra work per frame, like a capture thread slowed
+down by recognition. For each mode it reports:
+- waited: how long frames sat in the buffer (true value, from the file
+  clock) and as CameraManager estimates it from source timestamps
+- frames read, frames drained (skipped in the buffer without decoding)
+
+--fixed-buffer makes the source ignore CAP_PROP_BUFFERSIZE (many camera
+backends do), so only draining keeps frames fresh. Without a video a test
+clip is written first.
+
+Usage:
+    python tools/bench_capture_latency.py [video.mp4] [--seconds 5] [--work 0.045] [--buffer 4] [--fixed-buffer]
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from frame_sources import FileCapture  # noqa: E402
+from runtime_config import runtime_config  # noqa: E402
+
+
+def write_test_clip(path, seconds=4, fps=30, width=640, height=480):
+    """Short MJPEG clip with the frame number drawn on each frame"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    if not writer.isOpened():
+        sys.exit(f"Cannot write a test clip to {path}; pass a video file instead")
+    for i in range(int(seconds * fps)):
+        frame = np.full((height, width, 3), (i * 7) % 255, np.uint8)
+        cv2.putText(frame, str(i), (20, height // 2), cv2.FONT_HERSHEY_SIMPLEX, 3, (255, 255, 255), 5)
+        writer.write(frame)
+    writer.release()
+
+
+def run(manager, capture, seconds, work):
+    """Capture steps for `seconds`; returns (true waits, estimated waits, frames read, frames drained)"""
+    from camera_module import FRAMES_DRAINED
+    manager.camera = capture
+    manager._capture_buffer = None
+    manager._last_read_time = None
+    manager.source_staleness.reset()
+    manager._apply_camera_settings()
+    drained_before = FRAMES_DRAINED.totals()[0]
+
+    true_waits, estimated = [], []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        seq = manager.frame_ring.latest_seq
+        manager._capture_step()
+        if manager.frame_ring.latest_seq != seq:
+            true_waits.append(time.monotonic() - capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+            if manager.capture_staleness is not None:
+                estimated.append(manager.capture_staleness)
+        time.sleep(work)
+    return true_waits, estimated, len(true_waits), FRAMES_DRAINED.totals()[0] - drained_before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('video', nargs='?', help='Video file (default: a generated test clip)')
+    parser.add_argument('--seconds', type=float, default=5.0, help='Capture time per mode')
+    parser.add_argument('--work', type=float, default=0.045,
+                        help='Extra seconds per captured frame (more than the frame interval = falling behind)')
+    parser.add_argument('--buffer', type=int, default=4, help='Frames the simulated driver buffer holds')
+    parser.add_argument('--fixed-buffer', action='store_true', help='Source ignores CAP_PROP_BUFFERSIZE')
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(sys.stderr):   # MediaPipe start-up chatter
+        from camera_module import CameraManager
+        manager = CameraManager()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.video
+        if path is None:
+            path = os.path.join(tmp, 'clip.avi')
+            write_test_clip(path)
+        fps = FileCapture(path).fps
+        print(f"Source: {path} at {fps:.0f} fps, buffer {args.buffer} frames"
+              f"{' (size fixed)' if args.fixed_buffer else ''}; "
+              f"{args.work * 1000:.0f} ms extra work per frame (frame interval {1000 / fps:.0f} ms)\n")
+        print(f"{'mode':<14} {'read/s':>7} {'drained':>8} {'waited median':>14} {'p90':>7} {'estimated median':>17}")
+
+        for mode, label in ((0, 'read()'), (1, 'low-latency')):
+            runtime_config.reload(settings={'capture_low_latency': mode, 'camera_fps': int(round(fps))})
+            capture = FileCapture(path, buffer_size=args.buffer, buffer_control=not args.fixed_buffer)
+            true_waits, estimated, frames, drained = run(manager, capture, args.seconds, args.work)
+            capture.release()
+            skip = len(true_waits) // 5                 # Buffer filling up at the start
+            true_waits, estimated = true_waits[skip:], estimated[skip:]
+            print(f"{label:<14} {frames / args.seconds:>7.1f} {drained:>8} "
+                  f"{np.median(true_waits) * 1000:>11.1f} ms {np.percentile(true_waits, 90) * 1000:>4.0f} ms "
+                  f"{np.median(estimated) * 1000 if estimated else float('nan'):>14.1f} ms")
+    runtime_config.reload(reset=True)
+
+
+if __name__ == '__main__':
+    main()
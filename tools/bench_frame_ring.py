@@ -0,0 +1,144 @@
+"""
+Benchmark: per-frame allocations of the old copy-based capture path versus the
+preallocated FrameRing path used by CameraManager.
+
+Runs both paths against a fake camera (no webcam needed) and reports time per
+frame, bytes allocated per frame (tracemalloc peak growth, a lower bound), the
+implied allocation rate at the camera FPS, and garbage collector activity.
+
+Usage:
+    python tools/bench_frame_ring.py [--frames 600] [--width 640] [--height 480]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from frame_ring import FrameRing  # noqa: E402
+
+
+class FakeCapture:
+    """Minimal stand-in for cv2.VideoCapture that returns a fixed frame"""
+
+    def __init__(self, width, height):
+        rng = np.random.default_rng(0)
+        self.source = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+
+    def read(self, image=None):
+        if image is None or image.shape != self.source.shape:
+            return True, self.source.copy()
+        np.copyto(image, self.source)
+        return True, image
+
+
+def old_path(cap, state):
+    """The capture -> queue -> reader path as it was before the ring buffer"""
+    ret, frame = cap.read()
+    frame = cv2.flip(frame, 1)
+    state['latest_frame'] = frame.copy()
+    state['frame_queue'].append(frame.copy())
+
+    queued = state['frame_queue'].popleft()
+    state['rgb'] = cv2.cvtColor(queued, cv2.COLOR_BGR2RGB)
+
+    state['reader'] = state['latest_frame'].copy()
+
+
+def ring_path(cap, state):
+    """The same work using FrameRing slots and reused buffers"""
+    ring = state['ring']
+    buf = state.get('capture_buffer')
+    if buf is None:
+        ret, frame = cap.read()
+    else:
+        ret, frame = cap.read(image=buf)
+    if frame is not buf:
+        state['capture_buffer'] = frame
+        ring.ensure_shape(frame.shape, frame.dtype)
+
+    index, slot = ring.begin_write()
+    if index is not None:
+        cv2.flip(frame, 1, dst=slot)
+        ring.commit_write(index, time.time())
+
+    with ring.borrow(after_seq=state['last_seq']) as view:
+        if view is not None:
+            state['last_seq'] = view.seq
+            rgb = state.get('rgb')
+            if rgb is None or rgb.shape != view.frame.shape:
+                rgb = state['rgb'] = np.empty_like(view.frame)
+            cv2.cvtColor(view.frame, cv2.COLOR_BGR2RGB, dst=rgb)
+
+    with ring.borrow() as view:
+        scratch = state.get('scratch')
+        if scratch is None or scratch.shape != view.frame.shape:
+            scratch = state['scratch'] = np.empty_like(view.frame)
+        np.copyto(scratch, view.frame)
+
+
+def run(name, step, state, cap, frames, fps):
+    """Run one path and print its statistics"""
+    # Warm up (first frame allocates the ring and scratch buffers)
+    for _ in range(5):
+        step(cap, state)
+
+    gc_events = {'count': 0, 'seconds': 0.0, 'start': 0.0}
+
+    def on_gc(phase, info):
+        if phase == 'start':
+            gc_events['start'] = time.perf_counter()
+        else:
+            gc_events['count'] += 1
+            gc_events['seconds'] += time.perf_counter() - gc_events['start']
+
+    gc.callbacks.append(on_gc)
+    tracemalloc.start()
+    allocated = 0
+    t0 = time.perf_counter()
+    try:
+        for _ in range(frames):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            step(cap, state)
+            _, peak = tracemalloc.get_traced_memory()
+            allocated += max(0, peak - before)
+    finally:
+        elapsed = time.perf_counter() - t0
+        tracemalloc.stop()
+        gc.callbacks.remove(on_gc)
+
+    per_frame = allocated / frames
+    print(f"{name:<10} {elapsed / frames * 1000:8.3f} ms/frame  "
+          f"{per_frame / 1024:10.1f} KB alloc/frame  "
+          f"{per_frame * fps / (1024 * 1024):8.1f} MB/s @ {fps} FPS  "
+          f"gc runs: {gc_events['count']:4d} ({gc_events['seconds'] * 1000:.2f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--fps', type=int, default=30)
+    args = parser.parse_args()
+
+    cap = FakeCapture(args.width, args.height)
+    print(f"Frame {args.width}x{args.height}, {args.frames} frames "
+          f"({args.width * args.height * 3 / 1024:.0f} KB per frame)")
+
+    run('copy', old_path, {'frame_queue': deque(maxlen=2)}, cap, args.frames, args.fps)
+    ring_state = {'ring': FrameRing(slot_count=4), 'last_seq': 0}
+    run('ring', ring_path, ring_state, cap, args.frames, args.fps)
+    print(f"ring stats: {ring_state['ring'].stats()}")
+
+
+if __name__ == '__main__':
+    main()
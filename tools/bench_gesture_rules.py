@@ -0,0 +1,128 @@
+"""
+Benchmark and consistency check for the compiled gesture rule table.
+
+1. Prints what the rule compiler reports for ISL_RULES.
+2. Checks the compiled table gives exactly the same answers as the old
+   if-chain detector on random hands.
+3. Compares per-hand classification time of an ordered if-chain and the
+   compiled finger-state lookup as the vocabulary grows.
+
+Usage:
+    python tools/bench_gesture_rules.py [--hands 20000]
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gesture_rules import (  # noqa: E402
+    ISL_RULES, LANDMARK_NAMES, CompiledPredicate, Rule, compile_rules, expand_pattern, finger_bits
+)
+
+
+def legacy_detect(p):
+    """The original chain of if blocks from GestureRecognizer.detect_gesture
+    (minus the STOP and HELP branches, which could never fire)"""
+    thumb = p[4][0] < p[3][0]
+    index = p[8][1] < p[6][1]
+    middle = p[12][1] < p[10][1]
+    ring = p[16][1] < p[14][1]
+    pinky = p[20][1] < p[18][1]
+    wrist = p[0]
+    if not index and not middle and not ring and not pinky and not thumb:
+        return "YES"
+    pinch = math.dist(p[4], p[8])
+    if pinch < 0.05 and not middle and not ring and not pinky:
+        return "NO"
+    if thumb and not index and not middle and not ring and not pinky and p[4][1] < p[3][1]:
+        return "GOOD"
+    if thumb and not index and not middle and not ring and not pinky and p[4][1] > p[3][1]:
+        return "BAD"
+    if pinch < 0.05 and middle and ring and pinky:
+        return "OK"
+    all_open = thumb and index and middle and ring and pinky
+    if all_open and p[8][1] < wrist[1] and p[12][1] < wrist[1]:
+        return "HELLO"
+    if all_open and wrist[1] < 0.5:
+        return "THANK YOU"
+    if all_open and 0.3 < wrist[1] < 0.7:
+        return "PLEASE"
+    return None
+
+
+def random_hand(rng):
+    points = [(rng.random(), rng.random(), rng.uniform(-0.1, 0.1)) for _ in range(21)]
+    if rng.random() < 0.3:
+        # Put the index tip right next to the thumb tip (pinch / OK shapes)
+        x, y, z = points[4]
+        points[8] = (x + rng.uniform(-0.02, 0.02), y + rng.uniform(-0.02, 0.02), z)
+    return points
+
+
+def synthetic_vocabulary(size, rng):
+    """size rules spread over all finger states, each with two predicates"""
+    coords = [f"{name}.{c}" for name in LANDMARK_NAMES for c in 'xy']
+    rules = []
+    for i in range(size):
+        pattern = ''.join(rng.choice('01') for _ in range(5))
+        predicates = [(rng.choice(coords), '<', rng.choice(coords)),
+                      (rng.choice(coords), '>', round(rng.random(), 2))]
+        rules.append(Rule(f"SIGN_{i}", pattern, predicates, priority=i))
+    return rules
+
+
+def linear_classifier(rules):
+    """Check rules one by one in priority order (what an if-chain does)"""
+    flat = [(rule.name, set(expand_pattern(rule.fingers)), [CompiledPredicate(p) for p in rule.predicates])
+            for rule in rules]
+
+    def classify(points):
+        bits = finger_bits(points)
+        for name, masks, predicates in flat:
+            if bits in masks and all(pred(points) for pred in predicates):
+                return name
+        return None
+    return classify
+
+
+def timed(fn, hands):
+    t0 = time.perf_counter()
+    for h in hands:
+        fn(h)
+    return (time.perf_counter() - t0) / len(hands) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hands', type=int, default=20000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    compiled = compile_rules(ISL_RULES)
+    print("Compiler report for ISL_RULES:")
+    for issue in compiled.issues:
+        print(f"  {issue}")
+
+    hands = [random_hand(rng) for _ in range(args.hands)]
+    mismatches = sum(1 for h in hands if compiled.classify(h) != legacy_detect(h))
+    print(f"\nAgreement with the old if-chain on {len(hands)} random hands: "
+          f"{len(hands) - mismatches}/{len(hands)}")
+    print(f"ISL table: legacy {timed(legacy_detect, hands):.2f} us/hand, "
+          f"compiled {timed(compiled.classify, hands):.2f} us/hand")
+
+    print("\nVocabulary size vs classification time (us/hand):")
+    print(f"{'rules':>7} {'if-chain':>10} {'compiled':>10}")
+    for size in (10, 50, 100, 500, 1000):
+        rules = synthetic_vocabulary(size, rng)
+        table = compile_rules(rules)
+        chain = linear_classifier(rules)
+        sample = hands[:5000]
+        print(f"{size:>7} {timed(chain, sample):>10.2f} {timed(table.classify, sample):>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: capture-to-result latency of the processing handoff.
+
+Compares the old polling processing loop (check for a new frame, otherwise
+sleep 50 ms) with the event-driven loop (sleep on FrameRing.wait_for_frame).
+A fake capture thread commits frames at the camera FPS, a fake recognizer
+"infers" for a fixed time, and latency is measured from frame capture to the
+moment its results are published. The camera then goes idle to count how
+often each loop wakes up with nothing to do.
+
+Usage:
+    python tools/bench_handoff_latency.py [--seconds 10] [--fps 30] [--infer-ms 15]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from frame_ring import FrameRing  # noqa: E402
+
+
+def capture_loop(ring, fps, stop_event, pause_event):
+    """Commit a (tiny) frame every 1/fps seconds until stopped"""
+    ring.ensure_shape((4, 4, 3))
+    interval = 1.0 / fps
+    next_time = time.time()
+    while not stop_event.is_set():
+        if pause_event.is_set():
+            time.sleep(0.01)
+            next_time = time.time()
+            continue
+        index, slot = ring.begin_write()
+        if index is not None:
+            ring.commit_write(index, time.time())
+        next_time += interval
+        time.sleep(max(0.0, next_time - time.time()))
+
+
+def polling_loop(ring, infer_seconds, stop_event, latencies, wakeups):
+    """The processing loop as it was: poll, sleep 50 ms when nothing is new"""
+    last_seq = 0
+    while not stop_event.is_set():
+        wakeups[0] += 1
+        with ring.borrow(after_seq=last_seq) as view:
+            if view is not None:
+                last_seq = view.seq
+                time.sleep(infer_seconds)
+                latencies.append(time.time() - view.timestamp)
+                continue
+        time.sleep(0.05)
+
+
+def event_loop(ring, infer_seconds, stop_event, latencies, wakeups):
+    """The event-driven loop: block until a newer frame is committed"""
+    last_seq = 0
+    while not stop_event.is_set():
+        if not ring.wait_for_frame(last_seq):
+            continue
+        wakeups[0] += 1
+        with ring.borrow(after_seq=last_seq) as view:
+            if view is None:
+                continue
+            last_seq = view.seq
+            time.sleep(infer_seconds)
+            latencies.append(time.time() - view.timestamp)
+
+
+def run(name, loop, args):
+    ring = FrameRing(slot_count=4)
+    stop_event = threading.Event()
+    pause_event = threading.Event()
+    latencies = []
+    wakeups = [0]
+
+    threads = [
+        threading.Thread(target=capture_loop, args=(ring, args.fps, stop_event, pause_event), daemon=True),
+        threading.Thread(target=loop, args=(ring, args.infer_ms / 1000.0, stop_event, latencies, wakeups), daemon=True),
+    ]
+    for t in threads:
+        t.start()
+
+    time.sleep(args.seconds)
+
+    # Idle phase: camera stops delivering frames
+    pause_event.set()
+    time.sleep(0.2)
+    idle_start = wakeups[0]
+    time.sleep(args.idle_seconds)
+    idle_wakeups = (wakeups[0] - idle_start) / args.idle_seconds
+
+    stop_event.set()
+    ring.close()
+    for t in threads:
+        t.join(timeout=1.0)
+
+    ms = np.array(latencies) * 1000.0
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    print(f"{name:<8} results: {len(ms):5d}  latency ms  p50 {p50:6.1f}  p90 {p90:6.1f}  "
+          f"p99 {p99:6.1f}  max {ms.max():6.1f}  idle wakeups/s {idle_wakeups:6.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--idle-seconds', type=float, default=2.0)
+    parser.add_argument('--fps', type=float, default=30.0)
+    parser.add_argument('--infer-ms', type=float, default=15.0)
+    args = parser.parse_args()
+
+    print(f"{args.fps:.0f} FPS capture, {args.infer_ms:.0f} ms simulated inference, {args.seconds:.0f}s per mode")
+    run('polling', polling_loop, args)
+    run('event', event_loop, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Benchmark: CPU and memory of the headless daemon (headless.py) versus the
+web app (app.py) recognizing the same camera source.
+
+Each mode runs as its own process on the same input (SIGNLANG_CAMERA_SOURCE:
+'synthetic' by default, or file:VIDEO). After --warmup seconds the process's
+CPU time is sampled from /proc, again after --seconds, and its resident
+memory is read at the end (Linux only). The web app is measured with
+--viewers dashboards open: each reads the /video_feed MJPEG stream and
+long-polls /api/state like the page does (--viewers 0: camera running,
+nobody watching). Both use a temporary database.
+
+Reports CPU (% of one core), RSS at the end and peak RSS per mode.
+
+Usage:
+    python tools/bench_headless.py [--source synthetic|file:VIDEO] [--seconds 30] [--warmup 8] [--viewers 1]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WEB_APP_CODE = ("import sys, app; "
+                "app.app.run(host='127.0.0.1', port=int(sys.argv[1]), debug=False, threaded=True)")
+
+
+def cpu_seconds(pid):
+    """User + system CPU time of a process (all threads) from /proc/PID/stat"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def memory_mb(pid):
+    """(current RSS, peak RSS) in MB from /proc/PID/status"""
+    values = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'VmHWM'):
+                values[key] = int(value.split()[0]) / 1024
+    return values.get('VmRSS', 0.0), values.get('VmHWM', 0.0)
+
+
+def request(port, method, path, timeout=10):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    try:
+        conn.request(method, path)
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def dashboard(port, stop, counts):
+    """One open page: read the MJPEG stream and long-poll /api/state until stop is set"""
+    def stream():
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        try:
+            conn.request('GET', '/video_feed?tier=auto')
+            response = conn.getresponse()
+            while not stop.is_set():
+                data = response.read1(65536)
+                if not data:
+                    break
+                counts['stream_bytes'] += len(data)
+        except (OSError, http.client.HTTPException):
+            pass                      # Server shutting down
+        finally:
+            conn.close()
+
+    def state():
+        version = 0
+        while not stop.is_set():
+            try:
+                status, body = request(port, 'GET', f'/api/state?since={version}&timeout=5')
+            except (OSError, http.client.HTTPException):
+                return                # Server shutting down
+            if status == 200:
+                version = json.loads(body)['version']
+            counts['state_requests'] += 1
+            time.sleep(0.25)          # The page's minimum interval
+
+    threads = [threading.Thread(target=stream, daemon=True), threading.Thread(target=state, daemon=True)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def measure(process, warmup, seconds):
+    """(CPU % of one core, RSS MB, peak RSS MB) over the measurement window"""
+    time.sleep(warmup)
+    cpu_before, started = cpu_seconds(process.pid), time.monotonic()
+    time.sleep(seconds)
+    cpu = (cpu_seconds(process.pid) - cpu_before) / (time.monotonic() - started) * 100
+    rss, peak = memory_mb(process.pid)
+    return cpu, rss, peak
+
+
+def stop_process(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        return process.wait(20)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        return process.wait()
+
+
+def run_headless(env, tmp, args):
+    output = os.path.join(tmp, 'signs.jsonl')
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'headless.py'), '--sink', f'file:{output}'],
+                               cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        result = measure(process, args.warmup, args.seconds)
+    finally:
+        code = stop_process(process)
+    return result, f"exit code {code} after SIGTERM"
+
+
+def run_web_app(env, args):
+    process = subprocess.Popen([sys.executable, '-c', WEB_APP_CODE, str(args.port)],
+                               cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    stop = threading.Event()
+    counts = {'stream_bytes': 0, 'state_requests': 0}
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                request(args.port, 'GET', '/api/camera_status')
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    sys.exit("Web app did not start")
+                time.sleep(0.5)
+        status, body = request(args.port, 'POST', '/start_camera', timeout=30)
+        if json.loads(body).get('status') != 'success':
+            sys.exit(f"Web app could not start the camera: {body!r}")
+        for _ in range(args.viewers):
+            dashboard(args.port, stop, counts)
+        result = measure(process, args.warmup, args.seconds)
+    finally:
+        stop.set()
+        stop_process(process)
+    window = args.warmup + args.seconds
+    return result, (f"{args.viewers} viewer(s): {counts['stream_bytes'] / window / 1e6:.2f} MB/s stream, "
+                    f"{counts['state_requests'] / window * 60:.0f} state requests/min")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', default='synthetic', help="Camera source: 'synthetic' or file:VIDEO")
+    parser.add_argument('--seconds', type=float, default=30.0, help='Measurement window per mode')
+    parser.add_argument('--warmup', type=float, default=8.0, help='Seconds before measuring (model loading)')
+    parser.add_argument('--viewers', type=int, default=1, help='Dashboards open on the web app')
+    parser.add_argument('--port', type=int, default=5077, help='Port for the web app')
+    args = parser.parse_args()
+    if not os.path.exists('/proc/self/stat'):
+        sys.exit("This benchmark reads /proc (Linux only)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, SIGNLANG_CAMERA_SOURCE=args.source,
+                   SIGNLANG_DATABASE=os.path.join(tmp, 'bench.db'))
+        print(f"Source {args.source}: {args.warmup:.0f} s warm-up, {args.seconds:.0f} s measured per mode\n")
+        print(f"{'mode':<10} {'CPU':>8} {'RSS':>9} {'peak RSS':>9}  notes")
+        for label, run in (('headless', lambda: run_headless(env, tmp, args)),
+                           ('web app', lambda: run_web_app(env, args))):
+            (cpu, rss, peak), notes = run()
+            print(f"{label:<10} {cpu:>7.1f}% {rss:>6.0f} MB {peak:>6.0f} MB  {notes}")
+
+
+if __name__ == '__main__':
+    main()
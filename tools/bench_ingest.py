@@ -0,0 +1,106 @@
+"""
+Benchmark: bulk ingestion of edge device events (POST /api/ingest) versus
+saving the same signs one by one with save_prediction().
+
+Works on a temporary database (SIGNLANG_DATABASE), never the real one.
+For each way of writing it reports rows per second:
+- save_prediction: one connection and one commit per row (--single rows)
+- ingest NDJSON / binary: the whole route through Flask's test client
+  (parse + executemany in chunked transactions)
+- re-upload: the binary batch again; every row must come back as a duplicate
+
+Usage:
+    python tools/bench_ingest.py [--events 50000] [--devices 4] [--single 500]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_events(count, devices, seed=0):
+    """(device_id, event_id, epoch seconds, gesture, confidence) rows, like devices buffering a day"""
+    from config import GESTURE_LIST
+    rng = np.random.default_rng(seed)
+    start = time.time() - 86400
+    stamps = start + np.sort(rng.uniform(0, 86400, count))
+    gestures = rng.integers(0, len(GESTURE_LIST), count)
+    confidences = np.round(rng.uniform(0.5, 1.0, count), 3)
+    return [(f"unit-{i % devices}", i // devices, float(stamps[i]), GESTURE_LIST[gestures[i]],
+             float(confidences[i])) for i in range(count)]
+
+
+def timed(label, count, call):
+    started = time.perf_counter()
+    result = call()
+    seconds = time.perf_counter() - started
+    print(f"{label:<24} {count:>8} rows {seconds:>8.3f} s {count / seconds:>10,.0f} rows/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=50000, help='Events per bulk upload')
+    parser.add_argument('--devices', type=int, default=4, help='Edge devices the events come from')
+    parser.add_argument('--single', type=int, default=500, help='Rows saved one by one with save_prediction')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['SIGNLANG_DATABASE'] = os.path.join(tmp, 'bench.db')
+        os.environ.pop('SIGNLANG_INGEST_TOKEN', None)
+        import database
+        from flask import Flask
+        from ingest import encode_binary
+        from web_routes import bp
+
+        database.initialize_database()
+        app = Flask(__name__)
+        app.register_blueprint(bp)
+        client = app.test_client()
+
+        events = make_events(args.events, args.devices)
+        ndjson = '\n'.join(json.dumps({'device_id': device, 'event_id': event_id, 'gesture': gesture,
+                                       'timestamp': stamp, 'confidence': confidence})
+                           for device, event_id, stamp, gesture, confidence in events).encode()
+        batches = {}
+        for device, event_id, stamp, gesture, confidence in events:
+            batches.setdefault(device, []).append((event_id + 1_000_000, stamp, gesture, confidence))
+        binary = [encode_binary(device, rows) for device, rows in batches.items()]
+        print(f"{args.events} events from {args.devices} devices: NDJSON {len(ndjson) / 1e6:.1f} MB, "
+              f"binary {sum(map(len, binary)) / 1e6:.1f} MB\n")
+
+        def upload(bodies):
+            totals = {'inserted': 0, 'duplicates': 0, 'rejected': 0}
+            for body in bodies:
+                response = client.post('/api/ingest', data=body)
+                if response.status_code != 200:
+                    sys.exit(f"Upload failed: {response.status_code} {response.get_data(as_text=True)}")
+                for key in totals:
+                    totals[key] += response.get_json()[key]
+            return totals
+
+        timed('save_prediction', args.single,
+              lambda: [database.save_prediction(gesture, confidence)
+                       for _, _, _, gesture, confidence in events[:args.single]])
+        results = [
+            ('ingest NDJSON', timed('ingest NDJSON', args.events, lambda: upload([ndjson]))),
+            ('ingest binary', timed('ingest binary', args.events, lambda: upload(binary))),
+            ('re-upload binary', timed('re-upload binary', args.events, lambda: upload(binary))),
+        ]
+        print()
+        for label, totals in results:
+            print(f"{label:<24} inserted {totals['inserted']:>8} duplicates {totals['duplicates']:>8} "
+                  f"rejected {totals['rejected']}")
+        stored = len(database.get_recent_predictions(limit=10 * args.events))
+        print(f"\nRows in the database: {stored} (expected {args.single + 2 * args.events})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: JPEG encoder backends (jpeg_encoder.py) across qualities,
+chroma subsampling and frame sizes.
+
+Encodes a synthetic camera-like frame (smooth gradients, shapes, sensor
+noise - pure random noise would make every encoder look slow) with every
+backend available here: OpenCV always, TurboJPEG when PyTurboJPEG and
+libturbojpeg are installed. Reports milliseconds per frame, output size and
+frames per second, then the throughput of the encode thread pool
+(JPEG_ENCODER_THREADS) for 1..N threads.
+
+Usage:
+    python tools/bench_jpeg_encoder.py [--frames 200] [--qualities 50 70 90]
+                                       [--sizes 640x480 1920x1080] [--threads 4]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from jpeg_encoder import JpegEncoder, create_backend, SUBSAMPLING_MODES  # noqa: E402
+
+
+def synthetic_frame(width, height, seed=0):
+    """Camera-like BGR frame: gradient background, a few shapes, mild noise"""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 1, width, dtype=np.float32)
+    y = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    frame = np.empty((height, width, 3), np.float32)
+    frame[..., 0] = 60 + 120 * x
+    frame[..., 1] = 80 + 90 * y
+    frame[..., 2] = 140 + 60 * (x * y)
+    frame = frame.astype(np.uint8)
+    for _ in range(12):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        radius = int(rng.integers(height // 20, height // 5))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        cv2.circle(frame, center, radius, color, -1, cv2.LINE_AA)
+    cv2.putText(frame, 'HELLO', (width // 10, height // 2), cv2.FONT_HERSHEY_SIMPLEX,
+                height / 160, (255, 255, 255), max(1, height // 160), cv2.LINE_AA)
+    noise = rng.normal(0, 4, frame.shape)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+
+def available_backends():
+    names = ['opencv']
+    try:
+        create_backend('turbojpeg')
+        names.append('turbojpeg')
+    except RuntimeError as e:
+        print(f"(turbojpeg skipped: {e})")
+    return names
+
+
+def measure(backend, frame, quality, frames):
+    backend.encode(frame, quality)      # Warm up
+    start = time.perf_counter()
+    for _ in range(frames):
+        data = backend.encode(frame, quality)
+    elapsed = time.perf_counter() - start
+    return elapsed / frames, len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--qualities', type=int, nargs='+', default=[50, 70, 90])
+    parser.add_argument('--sizes', nargs='+', default=['640x480', '1920x1080'])
+    parser.add_argument('--threads', type=int, default=4, help='Largest encode pool size to try')
+    args = parser.parse_args()
+
+    backends = available_backends()
+    sizes = [tuple(int(v) for v in size.split('x')) for size in args.sizes]
+
+    print(f"{'size':>10} {'backend':>10} {'sub':>4} {'fast':>5} {'q':>4} {'ms/frame':>9} {'KB':>7} {'fps':>7}")
+    for width, height in sizes:
+        frame = synthetic_frame(width, height)
+        for name in backends:
+            for subsampling in SUBSAMPLING_MODES:
+                for fast_dct in ((False, True) if name == 'turbojpeg' else (False,)):
+                    backend = create_backend(name, subsampling, fast_dct)
+                    for quality in args.qualities:
+                        seconds, size = measure(backend, frame, quality, args.frames)
+                        print(f"{f'{width}x{height}':>10} {name:>10} {subsampling:>4} {'yes' if fast_dct else 'no':>5} "
+                              f"{quality:>4} {seconds * 1000:>9.2f} {size / 1024:>7.1f} {1 / seconds:>7.0f}")
+
+    # Pool throughput: many viewers' encodes at once (default backend and settings)
+    width, height = sizes[0]
+    frame = synthetic_frame(width, height)
+    print(f"\nEncode pool, {width}x{height} q70, {args.frames} frames submitted together "
+          f"({os.cpu_count()} CPUs)")
+    for threads in range(0, args.threads + 1):
+        encoder = JpegEncoder('auto', threads=threads)
+        encoder.encode_many([(frame, 70)] * 4)      # Warm up (and start the pool)
+        start = time.perf_counter()
+        encoder.encode_many([(frame, 70)] * args.frames)
+        elapsed = time.perf_counter() - start
+        encoder.close()
+        label = f"{threads} threads" if threads else "caller thread"
+        print(f"  {label:>14} ({encoder.name}): {args.frames / elapsed:7.0f} frames/s")
+
+
+if __name__ == '__main__':
+    main()
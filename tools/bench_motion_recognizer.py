@@ -0,0 +1,197 @@
+"""
+Benchmark and sanity check for motion (dynamic) sign recognition.
+
+Builds a synthetic vocabulary of motion signs (smooth wrist paths combined
+with a changing hand shape), then:
+
+1. Streams 30 fps landmarks of random performances (different speeds and
+   noise, separated by idle movement) through MotionRecognizer, and reports
+   recognition accuracy, false events and per-frame cost.
+2. Times one template match three ways: plain Python DTW per template,
+   vectorized DTW over all templates, and vectorized DTW with LB_Keogh
+   pruning and early abandoning (what the recognizer uses).
+
+Usage:
+    python tools/bench_motion_recognizer.py [--signs 20] [--examples 3] [--performances 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from motion_recognizer import (  # noqa: E402
+    MotionRecognizer, MotionTemplateLibrary, dtw_banded, lb_keogh, trajectory_features
+)
+
+FPS = 30
+
+
+def base_hand(rng):
+    """A plausible open hand (wrist at the bottom, fingers pointing up)"""
+    hand = np.zeros((21, 3), np.float32)
+    for finger in range(5):
+        angle = -0.6 + 0.3 * finger
+        for joint in range(4):
+            r = 0.04 + 0.025 * joint
+            hand[1 + finger * 4 + joint] = (r * np.sin(angle), -r * np.cos(angle), 0.0)
+    return hand + rng.normal(0, 0.003, hand.shape).astype(np.float32)
+
+
+class SyntheticSign:
+    """Wrist path and finger curl as smooth functions of phase (0..1)"""
+
+    def __init__(self, name, rng):
+        self.name = name
+        self.duration = rng.uniform(0.8, 1.6)
+        self.path = rng.normal(0, 0.08, (3, 2))         # Fourier terms of the wrist path
+        self.curl = rng.uniform(0, 1, 5)                 # Per-finger curl at the end
+
+    def frame(self, hand, phase, origin):
+        k = np.arange(1, 4)[:, None]
+        offset = (self.path * np.sin(np.pi * k * phase)).sum(axis=0)
+        pts = hand.copy()
+        for finger in range(5):
+            tip = 1 + finger * 4 + 3
+            pts[tip, 1] *= 1.0 - 0.7 * self.curl[finger] * phase
+        pts[:, :2] += origin + offset
+        return pts
+
+    def perform(self, hand, speed, start_time, origin, rng, noise=0.004):
+        duration = self.duration / speed
+        count = max(2, int(duration * FPS))
+        times = start_time + np.arange(count) / FPS
+        points = np.array([self.frame(hand, i / (count - 1), origin) for i in range(count)])
+        points += rng.normal(0, noise, points.shape).astype(np.float32)
+        return points, times
+
+
+def build(signs, examples, rng, length):
+    hand = base_hand(rng)
+    vocabulary = [SyntheticSign(f"MOTION_{i}", rng) for i in range(signs)]
+    library = MotionTemplateLibrary(length=length)
+    for sign in vocabulary:
+        for _ in range(examples):
+            points, times = sign.perform(hand, rng.uniform(0.9, 1.1), 0.0, np.array([0.5, 0.6]), rng)
+            library.add(sign.name, points, times)
+    return hand, vocabulary, library
+
+
+def stream(recognizer, hand, vocabulary, performances, rng):
+    """Feed performances separated by idle drift; returns accuracy statistics"""
+    now = 0.0
+    correct = wrong = missed = 0
+    frame_costs = []
+    for _ in range(performances):
+        # Idle: hand resting with small drift
+        origin = np.array([rng.uniform(0.3, 0.7), rng.uniform(0.4, 0.7)])
+        idle_frames = int(rng.uniform(0.6, 1.2) * FPS)
+        idle_events = []
+        for i in range(idle_frames):
+            pts = hand + rng.normal(0, 0.004, hand.shape).astype(np.float32)
+            pts[:, :2] += origin
+            t0 = time.perf_counter()
+            idle_events += recognizer.update([('Right', pts)], now)
+            frame_costs.append(time.perf_counter() - t0)
+            now += 1.0 / FPS
+        wrong += len(idle_events)
+
+        sign = vocabulary[rng.integers(len(vocabulary))]
+        points, times = sign.perform(hand, rng.uniform(0.75, 1.3), now, origin, rng)
+        events = []
+        for pts, t in zip(points, times):
+            t0 = time.perf_counter()
+            events += recognizer.update([('Right', pts)], t)
+            frame_costs.append(time.perf_counter() - t0)
+        # Hold the final pose briefly so the last match attempts can run
+        for i in range(1, 8):
+            t0 = time.perf_counter()
+            events += recognizer.update([('Right', points[-1])], times[-1] + i / FPS)
+            frame_costs.append(time.perf_counter() - t0)
+        now = times[-1] + 8 / FPS
+
+        names = [e.gesture for e in events]
+        if sign.name in names:
+            correct += 1
+            wrong += len(names) - 1
+        else:
+            missed += 1
+            wrong += len(names)
+    return correct, missed, wrong, np.array(frame_costs)
+
+
+def python_dtw(a, b, band):
+    """Reference DTW, one template at a time in plain Python"""
+    n = len(a)
+    inf = float('inf')
+    prev = [0.0] + [inf] * n
+    for i in range(1, n + 1):
+        cur = [inf] * (n + 1)
+        for j in range(max(1, i - band), min(n, i + band) + 1):
+            d = float(((a[i - 1] - b[j - 1]) ** 2).sum())
+            cur[j] = d + min(prev[j - 1], prev[j], cur[j - 1])
+        prev = cur
+    return prev[n]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--signs', type=int, default=20)
+    parser.add_argument('--examples', type=int, default=3, help='Templates per sign')
+    parser.add_argument('--performances', type=int, default=200)
+    parser.add_argument('--length', type=int, default=32)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    hand, vocabulary, library = build(args.signs, args.examples, rng, args.length)
+    recognizer = MotionRecognizer(library)
+    print(f"{len(library)} templates ({args.signs} signs x {args.examples}), length {library.length}, "
+          f"band {recognizer.band}, {len(recognizer.window_seconds)} query windows")
+
+    correct, missed, wrong, costs = stream(recognizer, hand, vocabulary, args.performances, rng)
+    print(f"\nStreaming {args.performances} performances at {FPS} fps (speed 0.75x-1.3x):")
+    print(f"  recognized {correct}/{args.performances}, missed {missed}, wrong/extra events {wrong}")
+    print(f"  per-frame cost: mean {costs.mean() * 1e3:.3f} ms, p99 {np.percentile(costs, 99) * 1e3:.3f} ms, "
+          f"max {costs.max() * 1e3:.2f} ms (budget at {FPS} fps: {1000 / FPS:.1f} ms)")
+    pruned = recognizer.templates_pruned / max(1, recognizer.templates_checked)
+    print(f"  templates skipped by LB_Keogh: {pruned:.1%}")
+
+    # One match, three ways
+    sign = vocabulary[0]
+    points, times = sign.perform(hand, 1.1, 0.0, np.array([0.5, 0.6]), rng)
+    query = trajectory_features(points, times, library.length).astype(np.float64)
+    templates = recognizer.templates
+    band = recognizer.band
+
+    t0 = time.perf_counter()
+    reference = [python_dtw(query, tpl, band) for tpl in templates]
+    python_time = time.perf_counter() - t0
+
+    repeats = 20
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        full = dtw_banded(query, templates, band)
+    vector_time = (time.perf_counter() - t0) / repeats
+
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        bounds = lb_keogh(query, recognizer.upper, recognizer.lower)
+        candidates = np.flatnonzero(bounds <= recognizer.max_cost)
+        pruned_costs = dtw_banded(query, templates[candidates], band, abandon_above=recognizer.max_cost)
+    pruned_time = (time.perf_counter() - t0) / repeats
+
+    assert np.allclose(full, reference)
+    best = int(np.argmin(full))
+    assert full[best] > recognizer.max_cost or candidates[int(np.argmin(pruned_costs))] == best
+    print(f"\nOne match against all {len(templates)} templates:")
+    print(f"  python DTW per template     {python_time * 1e3:8.2f} ms")
+    print(f"  vectorized DTW              {vector_time * 1e3:8.2f} ms")
+    print(f"  + LB_Keogh + early abandon  {pruned_time * 1e3:8.2f} ms "
+          f"({len(candidates)} templates left after the bound)")
+
+
+if __name__ == '__main__':
+    main()
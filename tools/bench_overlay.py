@@ -0,0 +1,94 @@
+"""
+Benchmark: cost of annotating one frame, old inline drawing versus the cached
+OverlayRenderer, and a pixel-exact comparison of their output.
+
+Uses a synthetic 21-point hand so no camera or MediaPipe inference is needed.
+
+Usage:
+    python tools/bench_overlay.py [--frames 500] [--width 640] [--height 480]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from overlay import OverlayRenderer, mp_drawing, mp_hands  # noqa: E402
+
+
+def synthetic_hand(low=0.3, high=0.7):
+    """An open hand in the middle of the frame (or spread wider with low/high)"""
+    hand = landmark_pb2.NormalizedLandmarkList()
+    rng = np.random.default_rng(1)
+    for x, y in rng.uniform(low, high, size=(21, 2)):
+        hand.landmark.add(x=float(x), y=float(y), z=0.0)
+    return hand
+
+
+def old_annotate(frame, detection_results, gesture):
+    """The inline drawing code as it was in get_frame_with_gesture"""
+    for hand_landmarks in detection_results['hand_landmarks']:
+        mp_drawing.draw_landmarks(
+            frame, hand_landmarks, mp_hands.HAND_CONNECTIONS,
+            mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2),
+            mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2)
+        )
+    if gesture:
+        cv2.putText(frame, f"ISL: {gesture}", (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 2)
+    else:
+        cv2.putText(frame, "No ISL gesture detected", (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 255), 2)
+    cv2.putText(frame, "Make hand gestures in front of camera", (20, frame.shape[0] - 20),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+    return frame
+
+
+def measure(name, annotate, base, results, gestures, frames):
+    frame = np.empty_like(base)
+    t0 = time.perf_counter()
+    for i in range(frames):
+        np.copyto(frame, base)
+        annotate(frame, results, gestures[i % len(gestures)])
+    per_frame = (time.perf_counter() - t0) / frames * 1000
+    print(f"{name:<10} {per_frame:7.3f} ms/frame (includes a {base.nbytes // 1024} KB frame copy)")
+
+
+def compare(renderer, base, results, gestures):
+    """Report any pixel where the renderer's output differs from the inline code"""
+    for gesture in gestures:
+        a = old_annotate(base.copy(), results, gesture)
+        b = renderer.render(base.copy(), results, gesture)
+        if not np.array_equal(a, b):
+            print(f"  output differs for gesture={gesture!r}: {(a != b).any(axis=2).sum()} pixels")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=500)
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    args = parser.parse_args()
+
+    base = np.random.default_rng(0).integers(0, 256, size=(args.height, args.width, 3), dtype=np.uint8)
+    gestures = ['HELLO', 'YES', None, 'THANK YOU']
+    renderer = OverlayRenderer()
+
+    for hands in (0, 1, 2):
+        results = {'hand_landmarks': [synthetic_hand() for _ in range(hands)]}
+        print(f"--- {hands} hand(s)")
+        measure('inline', old_annotate, base, results, gestures, args.frames)
+        measure('renderer', renderer.render, base, results, gestures, args.frames)
+
+        compare(renderer, base, results, gestures)
+
+    # Landmarks on (and past) the frame edge take the renderer's slower path
+    print("--- hand touching the frame edge")
+    compare(renderer, base, {'hand_landmarks': [synthetic_hand(-0.05, 1.05)]}, gestures)
+
+
+if __name__ == '__main__':
+    main()
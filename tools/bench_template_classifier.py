@@ -0,0 +1,85 @@
+"""
+Benchmark: template-matching classification time versus vocabulary size.
+
+Builds synthetic template libraries from 10 to 5,000 templates (random
+hands grouped into gestures), saves and reloads each one through the .npz
+format, and times single-hand classification with the flat NumPy index and
+the SciPy KD-tree index (if SciPy is installed). The rule engine is shown
+for scale.
+
+Usage:
+    python tools/bench_template_classifier.py [--queries 2000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gesture_rules import ISL_RULES, compile_rules  # noqa: E402
+from template_classifier import TemplateClassifier, TemplateLibrary  # noqa: E402
+
+SIZES = (10, 100, 500, 1000, 2000, 5000)
+
+
+def random_hands(rng, count):
+    """Hand-like points: a wrist plus 20 landmarks spread above it"""
+    wrist = rng.uniform(0.3, 0.7, size=(count, 1, 3))
+    offsets = rng.normal(0.0, 0.08, size=(count, 20, 3))
+    offsets[..., 1] -= np.linspace(0.02, 0.2, 20)
+    return np.concatenate([wrist, wrist + offsets], axis=1).astype(np.float32)
+
+
+def build_library(rng, size, per_gesture=5):
+    """size templates, per_gesture noisy examples of size/per_gesture gestures"""
+    library = TemplateLibrary()
+    prototypes = random_hands(rng, max(1, size // per_gesture))
+    for g, proto in enumerate(prototypes):
+        noise = rng.normal(0.0, 0.005, size=(per_gesture, 21, 3)).astype(np.float32)
+        library.add(f"SIGN_{g}", proto + noise)
+    return library
+
+
+def time_per_query(fn, queries):
+    t0 = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - t0) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    queries = random_hands(rng, args.queries)
+
+    rules = compile_rules(ISL_RULES)
+    print(f"rule engine (10 signs): {time_per_query(rules.classify, queries.tolist()):.1f} us/hand\n")
+
+    try:
+        TemplateClassifier(build_library(rng, 10), index='kdtree')
+        kdtree_available = True
+    except ValueError:
+        kdtree_available = False
+    print(f"{'templates':>9} {'file KB':>8} {'kdtree us':>10} {'numpy us':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            path = os.path.join(tmp, f"templates_{size}.npz")
+            build_library(rng, size).save(path)
+            library = TemplateLibrary.load(path)
+
+            kd = '-'
+            if kdtree_available:
+                kd = f"{time_per_query(TemplateClassifier(library, index='kdtree').classify, queries):.1f}"
+            np_time = time_per_query(TemplateClassifier(library, index='numpy').classify, queries)
+
+            print(f"{len(library):>9} {os.path.getsize(path) / 1024:>8.1f} {kd:>10} {np_time:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Consistency check and benchmark for two-hand gesture classification.
+
+1. Builds synthetic STOP and HELP poses (plus single-hand look-alikes) and
+   checks the joint classifier finds them whichever hand is listed first.
+2. Times one joint classification (both role assignments, all rules) per
+   frame, and the batched match over many pairs at once.
+
+Usage:
+    python tools/bench_two_hand.py [--pairs 20000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import GESTURE_LIST  # noqa: E402
+from two_hand_rules import TWO_HAND_RULES, compile_two_hand_rules  # noqa: E402
+
+
+def make_hand(rng, angle=0.0, curl=0.0, thumb_up=False, palm=0.09, center=(0.5, 0.5), noise=0.002):
+    """
+    Synthetic hand: fingers pointing up (before rotation) from the wrist.
+
+    - angle: pointing direction in degrees (0 = up, 90 = right)
+    - curl: 0 = flat hand, 1 = fist
+    - thumb_up: thumb sticks up out of the fist
+    """
+    hand = np.zeros((21, 3))
+    bases = [-0.45, -0.15, 0.05, 0.25, 0.45]
+    flat = np.array([1.0, 1.3, 1.6, 1.9])     # MCP, PIP, DIP, tip heights in palm sizes
+    fist = np.array([1.0, 1.15, 0.95, 0.8])   # Folded fingers: tips end up below the PIP
+    reach = palm * ((1.0 - curl) * flat + curl * fist)
+    for finger in range(1, 5):
+        x0 = bases[finger] * palm
+        for joint in range(4):
+            hand[1 + finger * 4 + joint] = (x0, -reach[joint], 0.0)
+    for joint in range(4):
+        if thumb_up:
+            hand[1 + joint] = (-0.5 * palm, -palm * (0.4 + 0.35 * joint), 0.0)
+        else:
+            hand[1 + joint] = (-palm * (0.3 + 0.25 * joint), -palm * (0.3 + 0.1 * joint), 0.0)
+    theta = np.radians(angle)
+    rotation = np.array([[np.cos(theta), -np.sin(theta)], [np.sin(theta), np.cos(theta)]])
+    hand[:, :2] = hand[:, :2] @ rotation.T
+    hand[:, :2] += np.array(center) - hand[[0, 5, 17], :2].mean(axis=0)
+    return hand + rng.normal(0, noise, hand.shape)
+
+
+def cases(rng):
+    """(expected joint gesture, hand A, hand B)"""
+    support = make_hand(rng, angle=90, center=(0.5, 0.6))
+    return [
+        ('STOP', make_hand(rng, angle=0, center=(0.5, 0.48)), support),
+        ('HELP', make_hand(rng, angle=0, curl=1.0, thumb_up=True, center=(0.5, 0.53)), support),
+        (None, make_hand(rng, angle=0, center=(0.3, 0.5)), make_hand(rng, angle=0, center=(0.7, 0.5))),
+        (None, make_hand(rng, angle=0, center=(0.5, 0.48)), make_hand(rng, angle=0, curl=1.0, center=(0.5, 0.6))),
+        (None, make_hand(rng, angle=0, center=(0.5, 0.2)), make_hand(rng, angle=90, center=(0.5, 0.8))),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pairs', type=int, default=20000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    table = compile_two_hand_rules(TWO_HAND_RULES, known_gestures=GESTURE_LIST)
+    for issue in table.issues:
+        print(f"  {issue}")
+
+    failures = 0
+    for expected, a, b in cases(rng):
+        forward = table.classify(a, b).gesture
+        backward = table.classify(b, a).gesture
+        ok = forward == expected and backward == expected
+        failures += not ok
+        print(f"{str(expected):>6}: A-first {str(forward):>6}, B-first {str(backward):>6} {'ok' if ok else 'MISMATCH'}")
+    print(f"{'all cases match' if not failures else f'{failures} mismatches'}")
+
+    hands = [make_hand(rng, angle=rng.uniform(-180, 180), curl=rng.random(),
+                       center=rng.uniform(0.2, 0.8, 2)) for _ in range(200)]
+    t0 = time.perf_counter()
+    for i in range(args.pairs):
+        table.classify(hands[i % 200], hands[(i * 7 + 1) % 200])
+    per_frame = (time.perf_counter() - t0) / args.pairs
+
+    dominant = np.array([hands[i % 200] for i in range(args.pairs)])
+    support = np.array([hands[(i * 7 + 1) % 200] for i in range(args.pairs)])
+    t0 = time.perf_counter()
+    table.match_pairs(dominant, support)
+    batched = (time.perf_counter() - t0) / args.pairs
+
+    print(f"\nJoint classification ({len(table)} rules, both role assignments): {per_frame * 1e6:.1f} us/frame")
+    print(f"Batched match_pairs over {args.pairs} pairs: {batched * 1e6:.2f} us/pair")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Build a motion template library for motion (dynamic) sign recognition.
+
+Expects one folder per motion sign containing short video clips, each
+holding exactly one performance of the sign:
+
+    motion_examples/
+        COME/001.mp4, 002.mp4, ...
+        GO/001.mp4, ...
+
+Every frame is mirrored (like live webcam frames) and run through MediaPipe
+Hands; the first detected hand's trajectory becomes one template.
+
+Usage:
+    python tools/build_motion_templates.py motion_examples/ [--out motion_templates.npz] [--append]
+"""
+
+import argparse
+import os
+import sys
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import MOTION_TEMPLATE_PATH  # noqa: E402
+from gesture_rules import as_points  # noqa: E402
+from motion_recognizer import MotionTemplateLibrary  # noqa: E402
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+
+
+def clip_trajectory(hands, path, flip=True):
+    """(points (N, 21, 3), timestamps (N,)) of the first hand in a clip"""
+    capture = cv2.VideoCapture(path)
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    points, times = [], []
+    index = 0
+    while True:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        if flip:
+            frame = cv2.flip(frame, 1)
+        results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if results.multi_hand_landmarks:
+            points.append(as_points(results.multi_hand_landmarks[0].landmark))
+            times.append(index / fps)
+        index += 1
+    capture.release()
+    return np.array(points, dtype=np.float32), np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('examples', help='Folder with one sub-folder of clips per motion sign')
+    parser.add_argument('--out', default=MOTION_TEMPLATE_PATH)
+    parser.add_argument('--append', action='store_true', help='Add to an existing library file')
+    parser.add_argument('--no-flip', action='store_true', help='Clips are already mirrored')
+    parser.add_argument('--length', type=int, default=32, help='Steps per resampled template')
+    args = parser.parse_args()
+
+    if args.append and os.path.exists(args.out):
+        library = MotionTemplateLibrary.load(args.out)
+    else:
+        library = MotionTemplateLibrary(length=args.length)
+
+    hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1)
+    for gesture in sorted(os.listdir(args.examples)):
+        folder = os.path.join(args.examples, gesture)
+        if not os.path.isdir(folder):
+            continue
+        added = skipped = 0
+        for filename in sorted(os.listdir(folder)):
+            if not filename.lower().endswith(VIDEO_EXTENSIONS):
+                continue
+            points, times = clip_trajectory(hands, os.path.join(folder, filename), not args.no_flip)
+            if len(times) < 5:
+                skipped += 1
+                continue
+            library.add(gesture, points, times)
+            added += 1
+        print(f"{gesture:<20} {added:5d} templates ({skipped} clips without a usable hand track)")
+    hands.close()
+
+    library.save(args.out)
+    print(f"Saved {len(library)} motion templates for {len(set(library.names))} signs to {args.out} "
+          f"({os.path.getsize(args.out) / 1024:.1f} KB)")
+
+
+if __name__ == '__main__':
+    main()
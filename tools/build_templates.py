@@ -0,0 +1,77 @@
+"""
+Build a gesture template library for the template-matching engine.
+
+Expects one folder per gesture containing example photos:
+
+    examples/
+        HELLO/001.jpg, 002.jpg, ...
+        THANK YOU/001.jpg, ...
+
+Every photo is mirrored (like live webcam frames), run through MediaPipe
+Hands, and each detected hand becomes one template.
+
+Usage:
+    python tools/build_templates.py examples/ [--out gesture_templates.npz] [--append]
+"""
+
+import argparse
+import os
+import sys
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import TEMPLATE_LIBRARY_PATH  # noqa: E402
+from gesture_rules import as_points  # noqa: E402
+from template_classifier import TemplateLibrary  # noqa: E402
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('examples', help='Folder with one sub-folder of photos per gesture')
+    parser.add_argument('--out', default=TEMPLATE_LIBRARY_PATH)
+    parser.add_argument('--append', action='store_true', help='Add to an existing library file')
+    parser.add_argument('--no-flip', action='store_true', help='Photos are already mirrored')
+    args = parser.parse_args()
+
+    if args.append and os.path.exists(args.out):
+        library = TemplateLibrary.load(args.out)
+    else:
+        library = TemplateLibrary()
+
+    hands = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=2)
+    for gesture in sorted(os.listdir(args.examples)):
+        folder = os.path.join(args.examples, gesture)
+        if not os.path.isdir(folder):
+            continue
+        added = skipped = 0
+        for filename in sorted(os.listdir(folder)):
+            if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            image = cv2.imread(os.path.join(folder, filename))
+            if image is None:
+                skipped += 1
+                continue
+            if not args.no_flip:
+                image = cv2.flip(image, 1)
+            results = hands.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+            if not results.multi_hand_landmarks:
+                skipped += 1
+                continue
+            for hand_landmarks in results.multi_hand_landmarks:
+                library.add(gesture, np.array(as_points(hand_landmarks.landmark)))
+                added += 1
+        print(f"{gesture:<20} {added:5d} templates ({skipped} photos without a hand)")
+    hands.close()
+
+    library.save(args.out)
+    print(f"Saved {len(library)} templates for {len(library.names)} gestures to {args.out} "
+          f"({os.path.getsize(args.out) / 1024:.1f} KB)")
+
+
+if __name__ == '__main__':
+    main()
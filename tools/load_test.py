@@ -0,0 +1,402 @@
+"""
+Load test: N simulated browser clients against a running server, ramped
+until the server saturates.
+
+Each simulated client does what static/js/script.js does on a kiosk:
+  - GET /api/frame every 150 ms (or, with --mjpeg, a share of the clients
+    keeps one /video_feed MJPEG stream open instead)
+  - POST /api/detect_gesture every 200 ms; after a saved sign,
+    GET /api/predictions?limit=10
+  - GET /api/statistics every 3 s (with If-None-Match, like the browser cache)
+Like setInterval, polls are scheduled at fixed periods; a tick that is due
+while the previous request still runs is skipped (the browser would overlap
+them - a skipped tick shows up as a lower achieved rate).
+
+Every step runs N clients for --duration seconds and reports request rates,
+latency percentiles, errors, MJPEG frame rates and (with --server-pid) the
+server's CPU use. N is ramped (doubling by default) until a step is
+saturated: error rate above --max-errors, /api/frame or detect p95 above
+the poll period, or less than 90% of the offered poll rate achieved.
+
+Run the server on the synthetic frame source so no camera is needed:
+    SIGNLANG_CAMERA_SOURCE=synthetic python app.py &
+    python tools/load_test.py --server-pid $!
+
+The load generator itself is Python threads (about 3 per client); for large
+N run it on another machine and watch the "late" column (tick lateness of
+the generator) - if it grows, the generator, not the server, is the limit.
+
+Usage:
+    python tools/load_test.py [--url http://127.0.0.1:5000] [--clients 1 2 4 ...]
+                              [--start 1] [--max 256] [--duration 20] [--warmup 3]
+                              [--mjpeg 0.25] [--tier full] [--server-pid PID ...]
+                              [--json results.json]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+FRAME_PERIOD = 0.150
+DETECT_PERIOD = 0.200
+STATISTICS_PERIOD = 3.0
+TIMEOUT = 10.0
+
+
+# ======================== MEASUREMENTS =============================
+
+class Stats:
+    """Latencies, errors and bytes per endpoint (shared by all client threads)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.latencies = {}
+            self.errors = {}
+            self.bytes = 0
+            self.lateness = []
+            self.mjpeg_frames = {}      # consumer id -> frames received
+            self.started = time.perf_counter()
+
+    def record(self, endpoint, seconds, size=0, error=False):
+        with self._lock:
+            if error:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+            else:
+                self.latencies.setdefault(endpoint, []).append(seconds)
+                self.bytes += size
+
+    def late(self, seconds):
+        with self._lock:
+            self.lateness.append(seconds)
+
+    def mjpeg_frame(self, consumer, size):
+        with self._lock:
+            self.mjpeg_frames[consumer] = self.mjpeg_frames.get(consumer, 0) + 1
+            self.bytes += size
+
+    def snapshot(self):
+        with self._lock:
+            return (time.perf_counter() - self.started, {k: list(v) for k, v in self.latencies.items()},
+                    dict(self.errors), self.bytes, list(self.lateness), dict(self.mjpeg_frames))
+
+
+def percentile(values, q):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+class CpuSampler:
+    """CPU seconds used by server processes, from /proc (Linux)"""
+
+    def __init__(self, pids):
+        self.pids = pids
+        self.ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+    def cpu_seconds(self):
+        total = 0.0
+        for pid in self.pids:
+            try:
+                with open(f'/proc/{pid}/stat') as f:
+                    fields = f.read().rsplit(')', 1)[1].split()
+                total += (int(fields[11]) + int(fields[12])) / self.ticks    # utime + stime
+            except (OSError, IndexError, ValueError):
+                pass
+        return total
+
+
+# ======================== SIMULATED CLIENT =============================
+
+class Client:
+    """One simulated kiosk browser"""
+
+    def __init__(self, number, base, stats, stop, mjpeg=False, tier='full'):
+        self.number = number
+        self.host, self.port = base.hostname, base.port or 80
+        self.stats = stats
+        self.stop = stop
+        self.mjpeg = mjpeg
+        self.tier = tier
+        self.commit_seq = None
+        self.statistics_etag = None
+        self.threads = []
+
+    def start(self):
+        loops = [self._detect_loop, self._statistics_loop]
+        loops.append(self._mjpeg_loop if self.mjpeg else self._frame_loop)
+        for loop in loops:
+            thread = threading.Thread(target=loop, name=f'client-{self.number}', daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def join(self):
+        for thread in self.threads:
+            thread.join(TIMEOUT)
+
+    def _request(self, connection, endpoint, method, path, headers=None):
+        """One request on a keep-alive connection; RETURNS (status, headers, body) or None on error"""
+        started = time.perf_counter()
+        try:
+            connection.request(method, path, headers=headers or {})
+            response = connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self.stats.record(endpoint, 0.0, error=True)
+            return None
+        elapsed = time.perf_counter() - started
+        self.stats.record(endpoint, elapsed, len(body), error=response.status >= 400)
+        return response.status, response.headers, body
+
+    def _periodic(self, period, step):
+        """Call step() every period seconds (first call after a random offset) until stopped"""
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=TIMEOUT)
+        due = time.perf_counter() + random.uniform(0, period)
+        while not self.stop.is_set():
+            now = time.perf_counter()
+            if now < due:
+                self.stop.wait(due - now)
+                continue
+            self.stats.late(now - due)
+            step(connection)
+            due += period
+            now = time.perf_counter()
+            if due < now:
+                due += ((now - due) // period + 1) * period     # Skip ticks missed while busy
+        connection.close()
+
+    def _frame_loop(self):
+        self._periodic(FRAME_PERIOD, lambda c: self._request(c, '/api/frame', 'GET', '/api/frame'))
+
+    def _detect_loop(self):
+        def step(connection):
+            path = '/api/detect_gesture'
+            if self.commit_seq is not None:
+                path += f'?after_commit={self.commit_seq}'
+            result = self._request(connection, '/api/detect_gesture', 'POST', path)
+            if result is None or result[0] != 200:
+                return
+            try:
+                data = json.loads(result[2])
+            except ValueError:
+                return
+            self.commit_seq = data.get('commit_seq', self.commit_seq)
+            if data.get('saved'):
+                self._request(connection, '/api/predictions', 'GET', '/api/predictions?limit=10')
+        self._periodic(DETECT_PERIOD, step)
+
+    def _statistics_loop(self):
+        def step(connection):
+            headers = {'Accept-Encoding': 'gzip'}
+            if self.statistics_etag:
+                headers['If-None-Match'] = self.statistics_etag
+            result = self._request(connection, '/api/statistics', 'GET', '/api/statistics', headers)
+            if result is not None and result[0] == 200:
+                self.statistics_etag = result[1].get('ETag')
+        self._periodic(STATISTICS_PERIOD, step)
+
+    def _mjpeg_loop(self):
+        """Keep a /video_feed stream open and count the frames received"""
+        while not self.stop.is_set():
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=TIMEOUT)
+            try:
+                connection.request('GET', f'/video_feed?tier={self.tier}')
+                response = connection.getresponse()
+                if response.status != 200:
+                    response.read()
+                    self.stats.record('/video_feed', 0.0, error=True)
+                    self.stop.wait(1.0)
+                    continue
+                last = None
+                while not self.stop.is_set():
+                    length = None
+                    while True:             # Part headers up to the blank line
+                        line = response.readline()
+                        if not line:
+                            raise http.client.IncompleteRead(b'')
+                        line = line.strip()
+                        if not line and length is not None:
+                            break
+                        if line.lower().startswith(b'content-length:'):
+                            length = int(line.split(b':', 1)[1])
+                    data = response.read(length)
+                    response.readline()
+                    now = time.perf_counter()
+                    self.stats.mjpeg_frame(self.number, len(data))
+                    if last is not None:
+                        self.stats.record('/video_feed interval', now - last)
+                    last = now
+            except (OSError, ValueError, http.client.HTTPException):
+                if not self.stop.is_set():
+                    self.stats.record('/video_feed', 0.0, error=True)
+                    self.stop.wait(0.5)
+            finally:
+                connection.close()
+
+
+# ======================== LOAD STEPS =============================
+
+def post(base, path):
+    connection = http.client.HTTPConnection(base.hostname, base.port or 80, timeout=TIMEOUT)
+    try:
+        connection.request('POST', path)
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+
+def run_step(base, clients, args, cpu):
+    """Run `clients` clients; RETURNS dict of results for this step"""
+    stats = Stats()
+    stop = threading.Event()
+    mjpeg_count = round(clients * args.mjpeg)
+    simulated = [Client(i, base, stats, stop, mjpeg=i < mjpeg_count, tier=args.tier) for i in range(clients)]
+    for client in simulated:
+        client.start()
+    time.sleep(args.warmup)
+    stats.reset()
+    cpu_before = cpu.cpu_seconds() if cpu else None
+    time.sleep(args.duration)
+    elapsed, latencies, errors, sent_bytes, lateness, mjpeg_frames = stats.snapshot()
+    cpu_used = cpu.cpu_seconds() - cpu_before if cpu else None
+    stop.set()
+    for client in simulated:
+        client.join()
+
+    requests = sum(len(v) for k, v in latencies.items() if k != '/video_feed interval')
+    failed = sum(errors.values())
+    endpoints = {}
+    for endpoint in sorted(set(latencies) | set(errors)):
+        values = latencies.get(endpoint, [])
+        endpoints[endpoint] = {
+            'count': len(values),
+            'errors': errors.get(endpoint, 0),
+            'rate': len(values) / elapsed,
+            'p50_ms': percentile(values, 50) * 1000,
+            'p95_ms': percentile(values, 95) * 1000,
+            'p99_ms': percentile(values, 99) * 1000,
+        }
+    polling = clients - mjpeg_count
+    offered = polling / FRAME_PERIOD + clients / DETECT_PERIOD
+    achieved = (endpoints.get('/api/frame', {}).get('count', 0)
+                + endpoints.get('/api/detect_gesture', {}).get('count', 0)) / elapsed
+    return {
+        'clients': clients,
+        'mjpeg_clients': mjpeg_count,
+        'seconds': elapsed,
+        'requests_per_second': requests / elapsed,
+        'error_rate': failed / max(1, requests + failed),
+        'offered_polls_per_second': offered,
+        'achieved_polls_per_second': achieved,
+        'megabytes_per_second': sent_bytes / elapsed / 1e6,
+        'mjpeg_fps': (sum(mjpeg_frames.values()) / elapsed / mjpeg_count) if mjpeg_count else None,
+        'generator_late_ms': percentile(lateness, 95) * 1000,
+        'server_cpu_percent': cpu_used / elapsed * 100 if cpu_used is not None else None,
+        'endpoints': endpoints,
+    }
+
+
+def saturated(result, args):
+    """RETURNS: Reason this step counts as saturated, or None"""
+    endpoints = result['endpoints']
+    if result['error_rate'] > args.max_errors:
+        return f"error rate {result['error_rate']:.1%}"
+    for endpoint, period in (('/api/frame', FRAME_PERIOD), ('/api/detect_gesture', DETECT_PERIOD)):
+        p95 = endpoints.get(endpoint, {}).get('p95_ms', 0)
+        if p95 > period * 1000:
+            return f"{endpoint} p95 {p95:.0f} ms > {period * 1000:.0f} ms poll period"
+    if result['achieved_polls_per_second'] < 0.9 * result['offered_polls_per_second']:
+        return (f"only {result['achieved_polls_per_second']:.0f} of "
+                f"{result['offered_polls_per_second']:.0f} polls/s served")
+    return None
+
+
+def print_step(result):
+    cpu = result['server_cpu_percent']
+    fps = result['mjpeg_fps']
+    print(f"\n=== {result['clients']} clients ({result['mjpeg_clients']} MJPEG): "
+          f"{result['requests_per_second']:.0f} req/s, {result['megabytes_per_second']:.2f} MB/s, "
+          f"errors {result['error_rate']:.2%}, polls {result['achieved_polls_per_second']:.0f}/"
+          f"{result['offered_polls_per_second']:.0f}/s"
+          + (f", MJPEG {fps:.1f} fps/client" if fps is not None else '')
+          + (f", server CPU {cpu:.0f}%" if cpu is not None else '')
+          + f", late {result['generator_late_ms']:.0f} ms")
+    print(f"  {'endpoint':<22} {'count':>7} {'err':>5} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint, e in result['endpoints'].items():
+        print(f"  {endpoint:<22} {e['count']:>7} {e['errors']:>5} {e['rate']:>7.1f} "
+              f"{e['p50_ms']:>8.1f} {e['p95_ms']:>8.1f} {e['p99_ms']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--clients', type=int, nargs='+', help='Client counts to run (default: ramp)')
+    parser.add_argument('--start', type=int, default=1, help='Ramp: first client count')
+    parser.add_argument('--max', type=int, default=256, help='Ramp: largest client count')
+    parser.add_argument('--factor', type=float, default=2.0, help='Ramp: growth per step')
+    parser.add_argument('--duration', type=float, default=20.0, help='Measured seconds per step')
+    parser.add_argument('--warmup', type=float, default=3.0, help='Unmeasured seconds before each step')
+    parser.add_argument('--mjpeg', type=float, default=0.0, help='Share of clients using /video_feed')
+    parser.add_argument('--tier', default='full', help='Stream tier of MJPEG clients')
+    parser.add_argument('--max-errors', type=float, default=0.01, help='Saturated above this error rate')
+    parser.add_argument('--server-pid', type=int, nargs='+', help='Server process id(s) for CPU use')
+    parser.add_argument('--no-start-camera', action='store_true', help='Do not POST /start_camera first')
+    parser.add_argument('--json', help='Also write all results to this file')
+    args = parser.parse_args()
+
+    base = urlsplit(args.url)
+    cpu = CpuSampler(args.server_pid) if args.server_pid else None
+    if not args.no_start_camera:
+        try:
+            print("start_camera:", post(base, '/start_camera').get('status'))
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            sys.exit(f"Server not reachable at {args.url}: {e}")
+
+    if args.clients:
+        counts = args.clients
+    else:
+        counts, n = [], args.start
+        while n <= args.max:
+            counts.append(n)
+            n = max(n + 1, int(n * args.factor))
+
+    results = []
+    last_good = None
+    for clients in counts:
+        result = run_step(base, clients, args, cpu)
+        reason = saturated(result, args)
+        result['saturated'] = reason
+        results.append(result)
+        print_step(result)
+        if reason:
+            print(f"  SATURATED: {reason}")
+            if not args.clients:
+                break
+        else:
+            last_good = clients
+
+    print()
+    if last_good is None:
+        print("Saturated at the first step")
+    elif results[-1]['saturated']:
+        print(f"Saturation point: between {last_good} and {results[-1]['clients']} clients")
+    else:
+        print(f"Not saturated up to {last_good} clients")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""
+Replay landmark recordings through the classifier and the stabilizer.
+
+Recordings (landmark_recording.py) hold what MediaPipe saw in a live
+session, so a classifier or stabilizer change can be checked against real
+sessions without the hand model: an hour of landmarks replays in seconds.
+
+1. Replays each recording with the current GestureRecognizer (rules or
+   templates engine) and GestureStabilizer settings.
+2. --compare counts frames whose gesture differs from the one recorded
+   live, broken down by (recorded -> replayed); --fail-on-change makes
+   that a regression test (exit code 1).
+3. --synthetic SECONDS writes a synthetic recording first (random held
+   hand poses at 30 fps, one or two hands, gestures from the live code
+   path), to measure replay speed and check replay matches live frames.
+4. --latency measures sign-to-text latency: every run of frames with the
+   same recorded gesture is one held sign; each committed static sign is
+   checked against the sign held at its commit time (or released less
+   than --grace seconds before). Reports median/p90 time from the start of
+   the sign to its commit, false commits and signs never committed, with
+   the current settings and with early commit off (hold time only).
+   --jitter adds landmark noise so classification flickers like a live
+   hand model does.
+
+Usage:
+    python tools/replay_landmarks.py recordings/20240101_120000 [--compare] [--transcript out.json]
+    python tools/replay_landmarks.py --synthetic 3600 /tmp/synthetic_hour
+    python tools/replay_landmarks.py recordings/20240101_120000 --latency [--jitter 0.01]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from landmark_recording import LandmarkRecorder, LandmarkRecording, replay  # noqa: E402
+from stabilizer import GestureStabilizer, TranscriptBuilder  # noqa: E402
+from runtime_config import runtime_config  # noqa: E402
+
+FPS = 30
+
+
+# ======================== SYNTHETIC RECORDING =============================
+
+def synthetic_hand(rng, bits, center, palm=0.09):
+    """(21, 3) hand with fingers extended where bits are set (bit 0 = thumb)"""
+    hand = np.zeros((21, 3), np.float32)
+    for finger in range(5):
+        extended = bits & (1 << finger)
+        x0 = (-0.45 + 0.225 * finger) * palm
+        for joint in range(4):
+            if finger == 0:
+                # Thumb opens sideways (tip left of its IP joint when extended)
+                step = -1.0 if extended else (1.0 if joint == 3 else -0.5)
+                hand[1 + joint] = (x0 + step * 0.25 * palm * joint, -0.3 * palm * (1 + joint * 0.3), 0.0)
+            else:
+                heights = (1.0, 1.3, 1.6, 1.9) if extended else (1.0, 1.15, 0.95, 0.8)
+                hand[1 + finger * 4 + joint] = (x0, -heights[joint] * palm, 0.0)
+    hand[:, :2] += np.asarray(center, np.float32)
+    return hand + rng.normal(0, 0.002, hand.shape).astype(np.float32)
+
+
+def write_synthetic(path, seconds, recognizer, seed=0):
+    """Random poses held 0.5-3 s each, sometimes with a second hand"""
+    rng = np.random.default_rng(seed)
+    frames = int(seconds * FPS)
+    with LandmarkRecorder(path, metadata={'synthetic': True, 'fps': FPS}, flush_every=5000) as recorder:
+        index = 0
+        while index < frames:
+            held = int(rng.uniform(0.5, 3.0) * FPS)
+            count = int(rng.choice([0, 1, 1, 1, 2]))
+            poses = [(int(rng.integers(32)), rng.uniform(0.25, 0.75, 2)) for _ in range(count)]
+            labels = ['Right', 'Left'][:count]
+            for _ in range(min(held, frames - index)):
+                hands = []
+                for label, (bits, center) in zip(labels, poses):
+                    points = synthetic_hand(rng, bits, center)
+                    hands.append({'handedness': label, 'points': points,
+                                  'gesture': recognizer.detect_gesture(points), 'role': None})
+                # Same steps as GestureRecognizer.process_frame after MediaPipe
+                hands = [hands[i] for i in recognizer.order_hands(hands)]
+                recorder.add_results(index / FPS, recognizer.combine_hands(hands))
+                index += 1
+    return LandmarkRecording(path)
+
+
+# ======================== COMPARISON =============================
+
+def compare(recording, result):
+    """(frames changed, Counter of (recorded, replayed) pairs)"""
+    recorded = [recording.gesture_name(code) for code in recording.gestures.tolist()]
+    changes = Counter((old, new) for old, new in zip(recorded, result.gestures) if old != new)
+    return sum(changes.values()), changes
+
+
+# ======================== COMMIT LATENCY =============================
+
+def held_signs(recording, min_seconds=0.0):
+    """[(gesture, start, end)] runs of the same recorded gesture (None runs skipped)"""
+    times = recording.times[:].tolist()
+    codes = recording.gestures[:].tolist()
+    signs = []
+    start = 0
+    for i in range(1, len(codes) + 1):
+        if i == len(codes) or codes[i] != codes[start]:
+            end = times[i] if i < len(codes) else times[-1]
+            if codes[start] >= 0 and end - times[start] >= min_seconds:
+                signs.append((recording.gesture_name(codes[start]), times[start], end))
+            start = i
+    return signs
+
+
+def commit_latency(signs, transcript, grace=0.5):
+    """
+    Match committed static signs to held signs.
+
+    RETURNS: dict with commits, false commits, latencies (seconds from the
+             start of the held sign to its commit) and missed signs
+    """
+    starts = np.array([start for _, start, _ in signs])
+    latencies, false_commits, committed = [], 0, set()
+    for entry in transcript:
+        if entry['kind'] != 'static':
+            continue
+        t = entry['committed']
+        i = int(np.searchsorted(starts, t, side='right')) - 1
+        # The sign held at commit time, else one released less than `grace` ago
+        candidates = [j for j in (i, i - 1) if 0 <= j < len(signs) and signs[j][1] <= t <= signs[j][2] + grace]
+        match = next((j for j in candidates if signs[j][0] == entry['gesture']), None)
+        if match is None:
+            false_commits += 1
+        else:
+            latencies.append(t - signs[match][1])
+            committed.add(match)
+    return {
+        'commits': len(latencies) + false_commits,
+        'false': false_commits,
+        'latencies': latencies,
+        'missed': len(signs) - len(committed),
+    }
+
+
+def print_latency(label, stats, held):
+    commits = max(1, stats['commits'])
+    latencies = stats['latencies']
+    median = np.median(latencies) if latencies else float('nan')
+    p90 = np.percentile(latencies, 90) if latencies else float('nan')
+    print(f"  {label:<22} {stats['commits']:>6} commits, {stats['false']:>4} false "
+          f"({stats['false'] / commits:.1%}), latency median {median:.2f} s, p90 {p90:.2f} s, "
+          f"{stats['missed']} of {held} signs missed")
+
+
+# ======================== MAIN =============================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('recordings', nargs='+', help='Recording directories')
+    parser.add_argument('--engine', choices=['rules', 'templates'], default=None,
+                        help='Classifier engine (default: CLASSIFIER_ENGINE in config.py)')
+    parser.add_argument('--motion', action='store_true', help='Also run motion sign recognition (slower)')
+    parser.add_argument('--sample-interval', type=float, default=0.2, help='Stabilizer sampling period (s)')
+    parser.add_argument('--compare', action='store_true', help='Report frames whose gesture changed')
+    parser.add_argument('--fail-on-change', action='store_true', help='Exit with code 1 if any gesture changed')
+    parser.add_argument('--transcript', help='Write committed signs of all recordings to this JSON file')
+    parser.add_argument('--latency', action='store_true',
+                        help='Report commit latency and false commits, with and without early commit')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Landmark noise (std dev) added on replay')
+    parser.add_argument('--grace', type=float, default=0.5,
+                        help='--latency: a commit this soon after its sign was released still counts')
+    parser.add_argument('--min-hold', type=float, default=1.0,
+                        help='--latency: only runs held this long count as signs (shorter ones may go uncommitted)')
+    parser.add_argument('--synthetic', type=float, metavar='SECONDS',
+                        help='First write a synthetic recording of this length to the (single) path')
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        from gesture_model import GestureRecognizer
+        from motion_recognizer import load_motion_recognizer
+        from config import MOTION_TEMPLATE_PATH
+        recognizer = GestureRecognizer(engine=args.engine, detect_hands=False)
+
+    if args.synthetic:
+        if len(args.recordings) != 1:
+            sys.exit("--synthetic needs exactly one recording path")
+        shutil.rmtree(args.recordings[0], ignore_errors=True)
+        t0 = time.perf_counter()
+        write_synthetic(args.recordings[0], args.synthetic, recognizer)
+        print(f"Wrote {args.synthetic:.0f} s synthetic recording in {time.perf_counter() - t0:.1f} s")
+
+    changed_total = 0
+    transcripts = {}
+    for path in args.recordings:
+        recording = LandmarkRecording(path)
+        motion = None
+        if args.motion:
+            with contextlib.redirect_stdout(sys.stderr):
+                motion = load_motion_recognizer(MOTION_TEMPLATE_PATH, fps=recording.metadata.get('fps', FPS))
+        options = runtime_config.settings.stabilizer_options()
+        builder = TranscriptBuilder(GestureStabilizer(**options), sample_interval=args.sample_interval)
+        result = replay(recording, recognizer, builder=builder, motion=motion, jitter=args.jitter)
+        transcripts[path] = result.transcript
+
+        size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        speed = recording.duration / result.seconds if result.seconds else float('inf')
+        print(f"\n{path}: {len(recording)} frames, {result.hands} hands, {recording.duration:.1f} s "
+              f"({size / 1e6:.1f} MB)")
+        print(f"  replayed in {result.seconds:.2f} s ({speed:.0f}x real time, "
+              f"{result.seconds / max(1, len(recording)) * 1e6:.1f} us/frame), "
+              f"{len(result.transcript)} signs committed")
+
+        if args.compare:
+            changed, changes = compare(recording, result)
+            changed_total += changed
+            print(f"  {changed} of {len(recording)} frames changed gesture")
+            for (old, new), count in changes.most_common(10):
+                print(f"    {str(old):>12} -> {str(new):<12} {count}")
+
+        if args.latency:
+            signs = held_signs(recording, args.min_hold)
+            hold_only = TranscriptBuilder(GestureStabilizer(**dict(options, early_commit_evidence=0.0)),
+                                          sample_interval=args.sample_interval)
+            baseline = replay(recording, recognizer, builder=hold_only, jitter=args.jitter)
+            print(f"  commit latency over {len(signs)} signs held >= {args.min_hold:g} s"
+                  + (f" (landmark jitter {args.jitter:g})" if args.jitter else ''))
+            print_latency('hold time only', commit_latency(signs, baseline.transcript, args.grace), len(signs))
+            print_latency(f"early commit ({options['early_commit_evidence']:g})",
+                          commit_latency(signs, result.transcript, args.grace), len(signs))
+
+    if args.transcript:
+        with open(args.transcript, 'w', encoding='utf-8') as f:
+            json.dump(transcripts, f, indent=2)
+    if args.fail_on_change and changed_total:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
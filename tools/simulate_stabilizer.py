@@ -0,0 +1,332 @@
+"""
+Simulate the gesture stabilizer on labeled sign sequences and grid-search its settings.
+
+The stabilizer settings (detection_buffer_size, buffer_min_confidence,
+min_sign_stable_seconds, min_no_gesture_seconds, early_commit_evidence,
+stabilizer_sample_seconds) trade time-to-commit against missed and
+repeated signs. Live, that can only be judged in front of a camera; here
+the stabilizer runs on a virtual clock (GestureStabilizer(clock=...)) over
+labeled sequences, so an hour of signing takes milliseconds per setting.
+
+1. Labeled sequence: the signer holds random signs (--hold seconds) with
+   rests between them (--rest), sometimes repeating the previous sign. Or
+   --recording uses the gestures recorded live in a landmark recording
+   (landmark_recording.py) as labels.
+2. Detector: per camera frame (--camera-fps) the label is seen correctly,
+   except for flicker runs (--flicker per frame, --flicker-frames long on
+   average) showing no gesture or a different sign. Correct frames score
+   high, flicker low (see GestureStabilizer.update); --no-scores leaves
+   scores out (time rule only, like two-hand signs). Every setting sees
+   the same frames.
+3. The stabilizer samples the latest frame every stabilizer_sample_seconds,
+   like the web page's polls or capture_service.py.
+4. Each grid point reports signs missed, false commits (a sign that was
+   not held), duplicates (one held sign committed twice) and median/p90
+   time from the start of a sign to its commit. Settings within
+   --max-errors are listed fastest first; the rest follow by error rate.
+
+Grid points run in parallel worker processes (--workers).
+
+Usage:
+    python tools/simulate_stabilizer.py                 # Default grid around the current settings
+    python tools/simulate_stabilizer.py --grid detection_buffer_size=5,10 --grid early_commit_evidence=0,3,4.5
+    python tools/simulate_stabilizer.py --recording recordings/20240101_120000 --csv grid.csv
+"""
+
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import GESTURE_LIST  # noqa: E402
+from runtime_config import RuntimeConfigError, runtime_config, validate  # noqa: E402
+from stabilizer import GestureStabilizer  # noqa: E402
+
+# Settings a grid may vary (RuntimeSettings names)
+GRID_SETTINGS = ('detection_buffer_size', 'buffer_min_confidence', 'min_sign_stable_seconds',
+                 'min_no_gesture_seconds', 'early_commit_evidence', 'stabilizer_sample_seconds')
+
+DEFAULT_GRID = {
+    'detection_buffer_size': [5, 8, 10, 15],
+    'buffer_min_confidence': [0.5, 0.6, 0.7],
+    'min_sign_stable_seconds': [0.5, 1.0, 1.5],
+    'min_no_gesture_seconds': [0.2, 0.3, 0.5],
+    'early_commit_evidence': [0.0, 3.0, 4.5, 6.0],
+    'stabilizer_sample_seconds': [0.1, 0.2],
+}
+
+
+class VirtualClock:
+    """Clock for GestureStabilizer(clock=...) that only moves when told to"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+# ======================== LABELED SEQUENCES =============================
+
+def synthetic_labels(rng, seconds, fps, hold, rest, repeat):
+    """
+    Frame times and labels of a signer holding random signs with rests between.
+
+    RETURNS: (times array, labels list: gesture name or None per frame)
+    """
+    labels = []
+    previous = None
+    while len(labels) < seconds * fps:
+        if previous is not None and rng.random() < repeat:
+            gesture = previous
+        else:
+            gesture = GESTURE_LIST[rng.integers(len(GESTURE_LIST))]
+        labels += [gesture] * int(rng.uniform(*hold) * fps)
+        labels += [None] * int(rng.uniform(*rest) * fps)
+        previous = gesture
+    return np.arange(len(labels)) / fps, labels
+
+
+def recording_labels(path):
+    """Frame times and live gestures of a landmark recording"""
+    from landmark_recording import LandmarkRecording
+    recording = LandmarkRecording(path)
+    names = {code: recording.gesture_name(code) for code in np.unique(recording.gestures[:]).tolist()}
+    return np.asarray(recording.times[:], np.float64), [names[code] for code in recording.gestures[:].tolist()]
+
+
+def detect(rng, labels, flicker, flicker_frames, no_scores):
+    """
+    Simulated detector output for labeled frames.
+
+    RETURNS: (detections list, scores list) - per frame
+    """
+    detections, scores = [], []
+    remaining = 0
+    shown = None
+    for label in labels:
+        if remaining == 0 and rng.random() < flicker:
+            remaining = int(rng.geometric(1.0 / flicker_frames))
+            # Half the flicker loses the hand, half is read as another sign
+            shown = None if rng.random() < 0.5 else GESTURE_LIST[rng.integers(len(GESTURE_LIST))]
+        if remaining:
+            remaining -= 1
+            detections.append(shown)
+            scores.append(None if no_scores or shown is None else float(rng.beta(2, 5)))
+        else:
+            detections.append(label)
+            scores.append(None if no_scores or label is None else float(rng.beta(5, 2)))
+    return detections, scores
+
+
+def held_runs(times, labels):
+    """[(gesture, start, end)] runs of the same label (rests skipped)"""
+    runs = []
+    start = 0
+    for i in range(1, len(labels) + 1):
+        if i == len(labels) or labels[i] != labels[start]:
+            if labels[start] is not None:
+                end = times[i] if i < len(labels) else times[-1]
+                runs.append((labels[start], float(times[start]), float(end)))
+            start = i
+    return runs
+
+
+# ======================== SIMULATION (WORKER PROCESSES) =============================
+
+_timeline = None
+
+
+def _init_worker(timeline):
+    global _timeline
+    _timeline = timeline
+
+
+def simulate(settings):
+    """
+    Run one grid point over the whole sequence on a virtual clock.
+
+    PARAMETER: settings - {grid setting: value}
+    RETURNS: dict of the settings plus scores (see score_commits)
+    """
+    times, detections, scores, runs, args = _timeline
+    options = runtime_config.settings._replace(**settings)
+    clock = VirtualClock()
+    stabilizer = GestureStabilizer(**options.stabilizer_options(), clock=clock)
+
+    sample_times = np.arange(times[0], times[-1], options.stabilizer_sample_seconds)
+    frames = np.searchsorted(times, sample_times, side='right') - 1
+    commits = []
+    early = 0
+    for now, i in zip(sample_times.tolist(), frames.tolist()):
+        clock.now = now
+        update = stabilizer.update(detections[i], score=scores[i])
+        if update.saved:
+            commits.append((update.stable_gesture, now))
+            early += update.early
+    result = dict(settings)
+    result.update(score_commits(runs, commits, args.grace, args.min_hold))
+    result['early'] = early
+    return result
+
+
+def score_commits(runs, commits, grace, min_hold):
+    """
+    Match commits to held signs.
+
+    A commit belongs to the sign held at its time, or one released less than
+    `grace` seconds before; it is false if that sign is a different one, and
+    a duplicate if the sign was already committed. Signs held shorter than
+    `min_hold` are not counted as missed.
+    """
+    starts = np.array([start for _, start, _ in runs])
+    committed = set()
+    latencies, false_commits, duplicates = [], 0, 0
+    for gesture, t in commits:
+        i = int(np.searchsorted(starts, t, side='right')) - 1
+        candidates = [j for j in (i, i - 1) if 0 <= j and runs[j][1] <= t <= runs[j][2] + grace]
+        match = next((j for j in candidates if runs[j][0] == gesture), None)
+        if match is None:
+            false_commits += 1
+        elif match in committed:
+            duplicates += 1
+        else:
+            committed.add(match)
+            latencies.append(t - runs[match][1])
+    counted = [j for j, (_, start, end) in enumerate(runs) if end - start >= min_hold]
+    signs = max(1, len(counted))
+    missed = sum(1 for j in counted if j not in committed)
+    return {
+        'commits': len(commits),
+        'missed': missed / signs,
+        'false': false_commits / signs,
+        'duplicate': duplicates / signs,
+        'errors': (missed + false_commits + duplicates) / signs,
+        'median': float(np.median(latencies)) if latencies else float('nan'),
+        'p90': float(np.percentile(latencies, 90)) if latencies else float('nan'),
+    }
+
+
+# ======================== GRID =============================
+
+def parse_grid(specs, parser):
+    """{setting: [values]} from --grid NAME=V1,V2 options (DEFAULT_GRID if none)"""
+    if not specs:
+        return dict(DEFAULT_GRID)
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition('=')
+        if name not in GRID_SETTINGS or not values:
+            parser.error(f"--grid expects NAME=V1,V2,... with NAME one of {', '.join(GRID_SETTINGS)}: {spec!r}")
+        grid[name] = [float(value) for value in values.split(',')]
+    return grid
+
+
+def grid_points(grid, parser):
+    """Every combination of the grid, plus the current settings; checked like runtime settings"""
+    current = runtime_config.settings
+    points = [{name: getattr(current, name) for name in grid}]
+    for values in itertools.product(*grid.values()):
+        points.append(dict(zip(grid, values)))
+    checked = []
+    for point in points:
+        try:
+            settings = validate(dict(current._asdict(), **point))
+        except RuntimeConfigError as e:
+            parser.error(str(e))
+        point = {name: getattr(settings, name) for name in grid}
+        if point not in checked:
+            checked.append(point)
+    return checked
+
+
+def print_results(results, grid, current, max_errors, top):
+    usable = sorted((r for r in results if r['errors'] <= max_errors), key=lambda r: r['median'])
+    rest = sorted((r for r in results if r['errors'] > max_errors), key=lambda r: r['errors'])
+    rows = (usable + rest)[:top]
+    if not any(all(row[name] == current[name] for name in grid) for row in rows):
+        rows.append(next(r for r in results if all(r[name] == current[name] for name in grid)))
+
+    short = {'detection_buffer_size': 'buffer', 'buffer_min_confidence': 'vote',
+             'min_sign_stable_seconds': 'hold', 'min_no_gesture_seconds': 'rest',
+             'early_commit_evidence': 'evidence', 'stabilizer_sample_seconds': 'sample'}
+    names = list(grid)
+    header = ''.join(f"{short[name]:>9}" for name in names)
+    print(f"{header}   median    p90  missed  false   dupl  errors  early")
+    for row in rows:
+        marker = '  <- current' if all(row[name] == current[name] for name in names) else ''
+        values = ''.join(f"{row[name]:>9g}" for name in names)
+        print(f"{values}  {row['median']:6.2f}s {row['p90']:5.2f}s {row['missed']:6.1%} {row['false']:6.1%} "
+              f"{row['duplicate']:6.1%} {row['errors']:6.1%} {row['early']:6d}{marker}")
+    print(f"({len(usable)} of {len(results)} settings within {max_errors:.0%} errors; "
+          f"errors = missed + false + duplicate commits per held sign)")
+
+
+# ======================== MAIN =============================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--grid', action='append', metavar='NAME=V1,V2',
+                        help=f"Values to try for one setting (repeatable; others keep their current value). "
+                             f"Settings: {', '.join(GRID_SETTINGS)}")
+    parser.add_argument('--recording', help='Use the live gestures of a landmark recording as labels')
+    parser.add_argument('--seconds', type=float, default=1800, help='Length of the synthetic sequence')
+    parser.add_argument('--camera-fps', type=float, default=30, help='Detector frame rate (synthetic sequence)')
+    parser.add_argument('--hold', type=float, nargs=2, default=(1.0, 3.0), metavar=('MIN', 'MAX'),
+                        help='Seconds a sign is held (synthetic sequence)')
+    parser.add_argument('--rest', type=float, nargs=2, default=(0.3, 1.5), metavar=('MIN', 'MAX'),
+                        help='Seconds between signs (synthetic sequence)')
+    parser.add_argument('--repeat', type=float, default=0.15, help='Chance the next sign repeats the last one')
+    parser.add_argument('--flicker', type=float, default=0.05, help='Chance per frame that a flicker run starts')
+    parser.add_argument('--flicker-frames', type=float, default=3, help='Average flicker run length in frames')
+    parser.add_argument('--no-scores', action='store_true', help='Detector gives no scores (no early commit)')
+    parser.add_argument('--grace', type=float, default=0.5,
+                        help='A commit this soon after its sign was released still counts')
+    parser.add_argument('--min-hold', type=float, default=0.5, help='Shorter signs are not counted as missed')
+    parser.add_argument('--max-errors', type=float, default=0.05, help='Error rate for the fastest-first list')
+    parser.add_argument('--top', type=int, default=15, help='Rows to print')
+    parser.add_argument('--csv', help='Write every grid point to this CSV file')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    grid = parse_grid(args.grid, parser)
+    points = grid_points(grid, parser)
+    rng = np.random.default_rng(args.seed)
+    if args.recording:
+        times, labels = recording_labels(args.recording)
+    else:
+        times, labels = synthetic_labels(rng, args.seconds, args.camera_fps, args.hold, args.rest, args.repeat)
+    detections, scores = detect(rng, labels, args.flicker, args.flicker_frames, args.no_scores)
+    runs = held_runs(times, labels)
+    duration = float(times[-1] - times[0])
+    print(f"[SIMULATE] {len(runs)} signs over {duration:.0f} s ({len(times)} frames), "
+          f"{len(points)} settings on {args.workers} workers")
+
+    started = time.perf_counter()
+    timeline = (times, detections, scores, runs, args)
+    with multiprocessing.Pool(args.workers, initializer=_init_worker, initargs=(timeline,)) as pool:
+        results = pool.map(simulate, points, chunksize=max(1, len(points) // (args.workers * 8)))
+    wall = time.perf_counter() - started
+    print(f"[SIMULATE] {len(points)} settings in {wall:.1f} s "
+          f"({wall / len(points) * 1000:.0f} ms each, {len(points) * duration / wall:.0f}x real time)\n")
+
+    print_results(results, grid, {name: getattr(runtime_config.settings, name) for name in grid},
+                  args.max_errors, args.top)
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"Wrote {len(results)} rows to {args.csv}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+"""
+Transcribe a recorded video into a timed list of signs.
+
+Runs the video through the same GestureRecognizer, motion recognizer and
+GestureStabilizer as the live app, but on the video's own clock instead
+of the wall clock.
+
+HOW IT SCALES:
+1. The video is split into chunks that worker processes decode and run
+   through MediaPipe in parallel (the expensive part).
+2. MediaPipe tracks hands from frame to frame, so each worker starts
+   `--preroll` seconds before its chunk and throws those results away;
+   tracking is warmed up by the time the chunk starts.
+3. Workers only return per-frame detections (gesture + hand landmarks).
+   The stabilizer and the motion recognizer run once, in order, over all
+   chunks in this process, so chunk boundaries never split a sign.
+
+The stabilizer is fed every `--sample-interval` seconds of video time
+(0.2 s is how often the web page polls /api/detect_gesture, see
+stabilizer.TranscriptBuilder), so its timing thresholds mean the same as
+in the live app.
+
+Usage:
+    python tools/transcribe_video.py session.mp4 [--workers 8] [--chunk-seconds 60]
+        [--analysis-fps 15] [--format json|csv|srt] [--out transcript.json]
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import MOTION_TEMPLATE_PATH  # noqa: E402
+from stabilizer import TranscriptBuilder  # noqa: E402
+
+# ======================== WORKER PROCESSES =============================
+
+_recognizer = None
+
+
+def _init_worker():
+    """Create one GestureRecognizer per worker process"""
+    global _recognizer
+    cv2.setNumThreads(1)   # Parallelism comes from processes, not OpenCV threads
+    with contextlib.redirect_stdout(sys.stderr):   # stdout may carry the transcript
+        from gesture_model import GestureRecognizer
+        _recognizer = GestureRecognizer()
+
+
+def process_chunk(task):
+    """
+    Run MediaPipe over one chunk of the video.
+
+    PARAMETER: task - (path, first frame, end frame, pre-roll frames, frame step, fps)
+    RETURNS: dict with per-analyzed-frame times, gestures, scores and hands, plus counters
+    """
+    path, first, end, preroll, step, fps = task
+    _recognizer.reset_tracking()
+
+    capture = cv2.VideoCapture(path)
+    start = max(0, first - preroll)
+    capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+
+    times, gestures, scores, hands = [], [], [], []
+    decoded = analyzed = 0
+    started = time.perf_counter()
+    for index in range(start, end):
+        # Skipped frames are only grabbed (no pixel conversion)
+        if (index - first) % step:
+            if not capture.grab():
+                break
+            continue
+        ok, frame = capture.read()
+        if not ok:
+            break
+        decoded += 1
+
+        frame = cv2.flip(frame, 1)   # Mirror like live webcam frames
+        results = _recognizer.process_frame(frame)
+        if index < first:
+            continue   # Pre-roll: only warms up hand tracking
+        analyzed += 1
+        times.append(index / fps)
+        gestures.append(results['gesture'])
+        scores.append(results['score'])
+        hands.append([(hand['handedness'], hand['points']) for hand in results['hands']])
+    capture.release()
+
+    return {
+        'first': first,
+        'times': times,
+        'gestures': gestures,
+        'scores': scores,
+        'hands': hands,
+        'decoded': decoded,
+        'analyzed': analyzed,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+# ======================== TRANSCRIPT =============================
+
+def srt_time(seconds):
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+def format_transcript(entries, fmt, info):
+    """Render the transcript as json, csv or srt text"""
+    if fmt == 'json':
+        return json.dumps({'video': info, 'transcript': entries}, indent=2)
+    if fmt == 'csv':
+        out = io.StringIO()
+        # Static signs also say when they were committed and whether early (empty for motion signs)
+        writer = csv.DictWriter(out, fieldnames=['gesture', 'start', 'end', 'committed', 'confidence',
+                                                 'kind', 'early'])
+        writer.writeheader()
+        writer.writerows(entries)
+        return out.getvalue()
+    cues = []
+    for number, entry in enumerate(entries, 1):
+        end = max(entry['end'], entry['start'] + 0.5)   # Keep every cue readable
+        cues.append(f"{number}\n{srt_time(entry['start'])} --> {srt_time(end)}\n{entry['gesture']}\n")
+    return '\n'.join(cues)
+
+
+# ======================== MAIN =============================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('video')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-seconds', type=float, default=60.0)
+    parser.add_argument('--preroll', type=float, default=1.0, help='Seconds of tracking warm-up before each chunk')
+    parser.add_argument('--analysis-fps', type=float, default=15.0, help='Frames per second sent to MediaPipe')
+    parser.add_argument('--sample-interval', type=float, default=0.2, help='Stabilizer sampling period (s)')
+    parser.add_argument('--format', choices=['json', 'csv', 'srt'], default=None,
+                        help='Default: from --out extension, else json')
+    parser.add_argument('--out', help='Output file (default: print to stdout)')
+    parser.add_argument('--no-motion', action='store_true', help='Skip motion (dynamic) sign recognition')
+    args = parser.parse_args()
+
+    capture = cv2.VideoCapture(args.video)
+    if not capture.isOpened():
+        sys.exit(f"Cannot open video: {args.video}")
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    capture.release()
+    if frame_count <= 0:
+        sys.exit(f"Video does not report its frame count (needed for chunking): {args.video}")
+    duration = frame_count / fps
+
+    step = max(1, int(round(fps / args.analysis_fps)))
+    chunk_frames = max(step, int(args.chunk_seconds * fps) // step * step)
+    preroll = int(args.preroll * fps) // step * step
+    tasks = [(args.video, first, min(first + chunk_frames, frame_count), preroll, step, fps)
+             for first in range(0, frame_count, chunk_frames)]
+
+    motion = None
+    if not args.no_motion:
+        from motion_recognizer import load_motion_recognizer
+        with contextlib.redirect_stdout(sys.stderr):
+            motion = load_motion_recognizer(MOTION_TEMPLATE_PATH, fps=fps / step)
+    builder = TranscriptBuilder(sample_interval=args.sample_interval)
+
+    print(f"[TRANSCRIBE] {args.video}: {duration:.1f} s at {fps:.1f} fps, {len(tasks)} chunks, "
+          f"{args.workers} workers, analyzing every {step} frame(s)", file=sys.stderr)
+
+    started = time.perf_counter()
+    decoded = analyzed = 0
+    worker_seconds = 0.0
+    with multiprocessing.Pool(args.workers, initializer=_init_worker) as pool:
+        # Chunks come back in order, so stabilization can start before all are done
+        for done, chunk in enumerate(pool.imap(process_chunk, tasks), 1):
+            for t, gesture, score, hands in zip(chunk['times'], chunk['gestures'], chunk['scores'],
+                                                chunk['hands']):
+                events = motion.update(hands, t) if motion is not None and hands else ()
+                builder.add_frame(t, gesture, events, score=score)
+            decoded += chunk['decoded']
+            analyzed += chunk['analyzed']
+            worker_seconds += chunk['seconds']
+            print(f"[TRANSCRIBE] chunk {done}/{len(tasks)} done", file=sys.stderr)
+    wall = time.perf_counter() - started
+
+    entries = builder.transcript()
+    stats = {
+        'duration_seconds': round(duration, 2),
+        'wall_seconds': round(wall, 2),
+        'speed_vs_realtime': round(duration / wall, 2) if wall else None,
+        'frames_decoded': decoded,
+        'frames_analyzed': analyzed,
+        'analysis_fps_per_worker': round(decoded / worker_seconds, 1) if worker_seconds else None,
+        'preroll_overhead': round((decoded - analyzed) / max(1, analyzed), 3),
+        'workers': args.workers,
+        'chunks': len(tasks),
+        'signs': len(entries),
+    }
+    info = {'path': args.video, 'fps': fps, 'frames': frame_count, 'stats': stats}
+
+    fmt = args.format
+    if fmt is None:
+        ext = os.path.splitext(args.out or '')[1].lower().lstrip('.')
+        fmt = ext if ext in ('json', 'csv', 'srt') else 'json'
+    text = format_transcript(entries, fmt, info)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    print(f"[TRANSCRIBE] {len(entries)} signs; {duration:.1f} s of video in {wall:.1f} s "
+          f"({stats['speed_vs_realtime']}x real time, {analyzed} frames analyzed)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Two-Hand Gesture Rules
+# PURPOSE: Recognize signs made with both hands together (e.g. STOP, HELP)
+# EXPLANATION: Single-hand rules look at each hand on its own, so a sign
+#              like STOP (a vertical hand standing on a horizontal hand) can
+#              never be recognized. Here:
+#              1. Both hands' landmarks are combined into a few joint
+#                 features (where one hand is relative to the other, how
+#                 each hand is tilted, how open each hand is)
+#              2. Two-hand rules are intervals on those features plus finger
+#                 patterns for the dominant and the supporting hand
+#              3. Both role assignments (A dominant / B dominant) are checked
+#                 against all rules in one NumPy pass
+# ============================================================================
+
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from gesture_rules import LANDMARK_INDEX, expand_pattern
+
+# ======================== JOINT FEATURES =============================
+# All distances are in palm sizes of the dominant hand (wrist -> middle MCP),
+# so the features do not depend on how far the signer stands from the camera.
+#
+# dx, dy          Support palm center minus dominant palm center
+#                 (dy > 0 means the support hand is lower in the image)
+# distance        Distance between the two palm centers
+# dom_angle       Direction the dominant hand points, in degrees
+#                 (0 = fingers up, 90 = right, -90 = left, +-180 = down)
+# sup_angle       Same for the support hand
+# dom_tilt        Tilt from vertical, 0..90 (0 = vertical, 90 = horizontal)
+# sup_tilt        Same for the support hand
+# dom_open        Mean fingertip distance from the wrist, in the hand's own
+# sup_open        palm sizes (about 1.8 for a flat hand, about 1.0 for a fist)
+# dom_thumb_lift  Thumb tip height above the thumb IP joint (> 0 = thumb up)
+
+PAIR_FEATURES = ['dx', 'dy', 'distance', 'dom_angle', 'sup_angle', 'dom_tilt', 'sup_tilt',
+                 'dom_open', 'sup_open', 'dom_thumb_lift']
+FEATURE_INDEX = {name: i for i, name in enumerate(PAIR_FEATURES)}
+
+WRIST = LANDMARK_INDEX['WRIST']
+MIDDLE_MCP = LANDMARK_INDEX['MIDDLE_MCP']
+PALM_POINTS = [LANDMARK_INDEX[name] for name in ('WRIST', 'INDEX_MCP', 'PINKY_MCP')]
+FINGER_TIPS = [LANDMARK_INDEX[name] for name in ('INDEX_TIP', 'MIDDLE_TIP', 'RING_TIP', 'PINKY_TIP')]
+THUMB_TIP = LANDMARK_INDEX['THUMB_TIP']
+THUMB_IP = LANDMARK_INDEX['THUMB_IP']
+
+# Tip / PIP pairs used for the finger state (same test as gesture_rules.finger_bits)
+_TIPS = np.array([4, 8, 12, 16, 20])
+_PIPS = np.array([3, 6, 10, 14, 18])
+_AXES = np.array([0, 1, 1, 1, 1])    # Thumb compares x, the other fingers y
+
+
+def finger_bits_array(hands):
+    """
+    Finger states for several hands at once (same bits as finger_bits).
+
+    PARAMETER: hands - (N, 21, 3) landmarks
+    RETURNS: int array (N,), bit 0 = thumb ... bit 4 = pinky
+    """
+    extended = hands[:, _TIPS, _AXES] < hands[:, _PIPS, _AXES]
+    return extended @ (1 << np.arange(5))
+
+
+def hand_geometry(hands):
+    """
+    Per-hand values the joint features are built from.
+
+    PARAMETER: hands - (N, 21, 3) landmarks
+    RETURNS: float array (N, 7): palm size, palm center x, y, pointing angle,
+             tilt, openness, thumb lift (in palm sizes)
+    """
+    wrist = hands[:, WRIST, :]
+    to_middle = hands[:, MIDDLE_MCP, :] - wrist
+    palm = np.maximum(np.sqrt((to_middle * to_middle).sum(axis=1)), 1e-6)
+
+    geometry = np.empty((len(hands), 7))
+    geometry[:, 0] = palm
+    geometry[:, 1:3] = hands[:, PALM_POINTS, :2].mean(axis=1)
+
+    # Image y grows downwards, so "up" is -y
+    angle = np.degrees(np.arctan2(to_middle[:, 0], -to_middle[:, 1]))
+    tilt = np.abs(angle)
+    geometry[:, 3] = angle
+    geometry[:, 4] = np.where(tilt > 90.0, 180.0 - tilt, tilt)
+
+    reach = hands[:, FINGER_TIPS, :] - wrist[:, None, :]
+    geometry[:, 5] = np.sqrt((reach * reach).sum(axis=2)).mean(axis=1) / palm
+    geometry[:, 6] = (hands[:, THUMB_IP, 1] - hands[:, THUMB_TIP, 1]) / palm
+    return geometry
+
+
+def pair_features(dominant, support):
+    """
+    Joint features for (dominant, support) hand pairs.
+
+    PARAMETERS:
+    - dominant, support: (P, 21, 3) landmark arrays, or (P, 7) hand_geometry rows
+    RETURNS: float array (P, len(PAIR_FEATURES))
+    """
+    dom = dominant if dominant.ndim == 2 else hand_geometry(dominant)
+    sup = support if support.ndim == 2 else hand_geometry(support)
+    offset = (sup[:, 1:3] - dom[:, 1:3]) / dom[:, :1]
+
+    features = np.empty((len(dom), len(PAIR_FEATURES)))
+    features[:, 0:2] = offset                                            # dx, dy
+    features[:, 2] = np.sqrt((offset * offset).sum(axis=1))              # distance
+    features[:, 3] = dom[:, 3]                                           # dom_angle
+    features[:, 4] = sup[:, 3]                                           # sup_angle
+    features[:, 5] = dom[:, 4]                                           # dom_tilt
+    features[:, 6] = sup[:, 4]                                           # sup_tilt
+    features[:, 7] = dom[:, 5]                                           # dom_open
+    features[:, 8] = sup[:, 5]                                           # sup_open
+    features[:, 9] = dom[:, 6]                                           # dom_thumb_lift
+    return features
+
+
+# ======================== RULE TABLE FORMAT =============================
+# TwoHandRule(name, dominant, support, conditions, priority)
+# - dominant / support: 5-character finger patterns (T I M R P; '1', '0', '?').
+#   Finger states are measured with "tip above PIP", which only makes sense
+#   for an upright hand; use '?' and the *_open features for tilted hands.
+# - conditions: (feature, op, number) with a feature from PAIR_FEATURES
+# - priority: lower number wins when several two-hand rules match
+
+TwoHandRule = namedtuple('TwoHandRule', ['name', 'dominant', 'support', 'conditions', 'priority'],
+                         defaults=('?????', '?????', (), 100))
+
+# Indian Sign Language (ISL) two-hand signs
+TWO_HAND_RULES = [
+    # STOP: Flat vertical hand standing on a flat horizontal hand
+    TwoHandRule('STOP', conditions=[('dom_tilt', '<', 30), ('dom_open', '>', 1.4),
+                                    ('sup_tilt', '>', 60), ('sup_open', '>', 1.4),
+                                    ('dy', '>', 0), ('distance', '<', 2.5)], priority=10),
+    # HELP: Thumbs-up fist resting on a flat, horizontal open palm
+    TwoHandRule('HELP', dominant='?0000',
+                conditions=[('dom_thumb_lift', '>', 0.2), ('sup_tilt', '>', 60),
+                            ('sup_open', '>', 1.4), ('dy', '>', 0), ('distance', '<', 2.5)], priority=20),
+]
+
+
+# ======================== COMPILED TWO-HAND TABLE =============================
+
+JointMatch = namedtuple('JointMatch', ['gesture', 'dominant', 'support'])
+
+
+class CompiledTwoHandRules:
+    """
+    Two-hand rules compiled into arrays.
+
+    ARRAYS (R rules, F features):
+    - lower, upper: (R, F) open interval each feature must fall in
+    - dominant_ok, support_ok: (R, 32) which finger states each pattern allows
+    Rules are stored in priority order, so the first matching row wins.
+    """
+
+    def __init__(self, names, lower, upper, dominant_ok, support_ok, issues):
+        self.names = names
+        self.lower = lower
+        self.upper = upper
+        self.dominant_ok = dominant_ok
+        self.support_ok = support_ok
+        self.issues = issues
+
+    def __len__(self):
+        return len(self.names)
+
+    def match_pairs(self, dominant, support, dominant_bits=None, support_bits=None):
+        """
+        Evaluate every rule on every (dominant, support) pair in one pass.
+
+        PARAMETERS:
+        - dominant, support: (P, 21, 3) landmark arrays (or hand_geometry rows,
+          together with dominant_bits and support_bits)
+        - dominant_bits, support_bits: finger states if already known
+
+        RETURNS: int array (P,) index of the winning rule, -1 if none
+        """
+        if not len(self.names):
+            return np.full(len(dominant), -1)
+        if dominant_bits is None:
+            dominant_bits = finger_bits_array(dominant)
+        if support_bits is None:
+            support_bits = finger_bits_array(support)
+
+        features = pair_features(dominant, support)[:, None, :]
+        inside = ((features > self.lower) & (features < self.upper)).all(axis=2)
+        matches = inside & self.dominant_ok[:, dominant_bits].T & self.support_ok[:, support_bits].T
+        return np.where(matches.any(axis=1), matches.argmax(axis=1), -1)
+
+    def classify_many(self, first, second):
+        """
+        Joint gestures of many hand pairs, trying both role assignments.
+
+        PARAMETERS:
+        - first, second: (P, 21, 3) landmark arrays; on a tie the first hand
+          is taken as the dominant one, so pass the signer's dominant hand first
+
+        RETURNS: (rule index (P,) or -1, dominant index (P,) with 0 = first, 1 = second)
+        """
+        first = np.asarray(first, np.float64)
+        count = len(first)
+        hands = np.concatenate([first, np.asarray(second, np.float64)])
+        bits = finger_bits_array(hands)
+        geometry = hand_geometry(hands)
+        swap = np.concatenate([np.arange(count, 2 * count), np.arange(count)])
+
+        # Row p: first hand dominant; row count + p: second hand dominant
+        winners = self.match_pairs(geometry, geometry[swap], bits, bits[swap]).reshape(2, count)
+        ranked = np.where(winners >= 0, winners, len(self.names))
+        dominant = (ranked[1] < ranked[0]).astype(int)
+        rules = ranked[dominant, np.arange(count)]
+        return np.where(rules < len(self.names), rules, -1), dominant
+
+    def classify(self, first, second):
+        """
+        Joint gesture of two hands (see classify_many).
+
+        RETURNS: JointMatch(gesture, dominant index, support index) with
+                 indices 0 = first, 1 = second; gesture None if nothing matches
+        """
+        rules, dominant = self.classify_many(np.asarray(first)[None], np.asarray(second)[None])
+        if rules[0] < 0:
+            return JointMatch(None, None, None)
+        return JointMatch(self.names[rules[0]], int(dominant[0]), 1 - int(dominant[0]))
+
+
+def compile_two_hand_rules(rules, known_gestures=None):
+    """
+    Compile a two-hand rule table.
+
+    STEPS:
+    1. Sort rules by priority (table order breaks ties)
+    2. Turn conditions into per-feature intervals ('>=' / '<=' become the
+       next representable float so every check is a strict comparison)
+    3. Expand finger patterns into allowed-state masks
+    4. Report rules whose conditions can never all be true
+
+    RETURNS: CompiledTwoHandRules
+    """
+    issues = []
+    names = []
+    lowers, uppers, dominant_ok, support_ok = [], [], [], []
+    ordered = sorted(enumerate(rules), key=lambda item: (item[1].priority, item[0]))
+
+    for _, rule in ordered:
+        if known_gestures is not None and rule.name not in known_gestures:
+            issues.append(f"{rule.name}: not listed in GESTURE_LIST")
+        lower = np.full(len(PAIR_FEATURES), -math.inf)
+        upper = np.full(len(PAIR_FEATURES), math.inf)
+        for feature, op, value in rule.conditions:
+            if feature not in FEATURE_INDEX:
+                raise ValueError(f"Unknown two-hand feature {feature!r} in rule {rule.name}")
+            i = FEATURE_INDEX[feature]
+            value = float(value)
+            if op == '>':
+                lower[i] = max(lower[i], value)
+            elif op == '>=':
+                lower[i] = max(lower[i], np.nextafter(value, -math.inf))
+            elif op == '<':
+                upper[i] = min(upper[i], value)
+            elif op == '<=':
+                upper[i] = min(upper[i], np.nextafter(value, math.inf))
+            else:
+                raise ValueError(f"Unknown operator {op!r} in rule {rule.name}")
+
+        empty = [PAIR_FEATURES[i] for i in np.flatnonzero(lower >= upper)]
+        if empty:
+            issues.append(f"{rule.name}: unreachable, '{empty[0]}' has no allowed values")
+            continue
+
+        masks = []
+        for pattern in (rule.dominant, rule.support):
+            allowed = np.zeros(32, bool)
+            allowed[expand_pattern(pattern)] = True
+            masks.append(allowed)
+
+        names.append(rule.name)
+        lowers.append(lower)
+        uppers.append(upper)
+        dominant_ok.append(masks[0])
+        support_ok.append(masks[1])
+
+    return CompiledTwoHandRules(
+        names,
+        np.array(lowers, dtype=float).reshape(-1, len(PAIR_FEATURES)),
+        np.array(uppers, dtype=float).reshape(-1, len(PAIR_FEATURES)),
+        np.array(dominant_ok, dtype=bool).reshape(-1, 32),
+        np.array(support_ok, dtype=bool).reshape(-1, 32),
+        issues
+    )
@@ -0,0 +1,293 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Shared Web Routes
+# PURPOSE: Routes that only need the database, used by every server variant
+# EXPLANATION: The page, history and statistics routes read and write the
+#              database only - they never touch the camera. They live in a
+#              Flask Blueprint so both servers register the same code:
+#              - app.py: single process, camera in the same process
+#              - web_worker.py: any number of worker processes that read the
+#                camera's frames and results from shared memory
+#                (capture_service.py publishes them)
+# ============================================================================
+
+import hmac
+import sqlite3
+import time
+from datetime import datetime
+from functools import wraps
+
+from flask import Blueprint, current_app, render_template, jsonify, request, g
+
+from config import GESTURE_LIST, ADMIN_TOKEN, INGEST_TOKEN, INGEST_MAX_BYTES, STATE_POLL_TIMEOUT
+from database import (get_all_predictions, get_recent_predictions, get_prediction_statistics,
+                      clear_all_predictions, ingest_events)
+from http_cache import cached_by_data_version, static_assets_token
+from ingest import IngestError, MAX_ERRORS_REPORTED, parse_batch
+from metrics import REQUEST_SECONDS, EVENTS_INGESTED
+from app_logging import get_logger
+
+log = get_logger('app')
+data_log = get_logger('clear_data')
+
+bp = Blueprint('web', __name__)
+
+# Static files index.html links (its ETag changes with them)
+PAGE_ASSETS = ('css/style.css', 'js/script.js', 'placeholder.svg')
+
+
+# ======================== HOME PAGE ROUTE =============================
+
+@bp.route('/')
+@cached_by_data_version(extra=lambda: static_assets_token(*PAGE_ASSETS))
+def index():
+    """
+    Main page route.
+    When user visits http://localhost:5000/ this function runs.
+
+    PROCESS:
+    1. Render the HTML template (index.html)
+    2. Pass gesture list to template (for display)
+    3. Send HTML to browser
+
+    RETURNS: Rendered HTML page
+    """
+    # Get statistics to show on dashboard
+    stats = get_prediction_statistics()
+
+    # Render index.html template and pass data
+    return render_template('index.html',
+                         gestures=GESTURE_LIST,
+                         stats=stats)
+
+
+# ======================== DATA RETRIEVAL ROUTES =============================
+
+@bp.route('/api/predictions', methods=['GET'])
+@cached_by_data_version()
+def get_predictions():
+    """
+    API endpoint to get all stored predictions.
+    Called by JavaScript to display history on webpage.
+
+    QUERY PARAMETERS:
+    - limit (optional): Number of recent predictions to retrieve
+    - device_id (optional): Only signs uploaded by this edge device
+      (with limit; default limit 100)
+
+    RETURNS: JSON array of predictions; 304 Not Modified while the
+             database is unchanged
+    """
+    try:
+        # Get limit from query parameters (default = all)
+        limit = request.args.get('limit', type=int)
+        device_id = request.args.get('device_id')
+
+        if device_id:
+            predictions = get_recent_predictions(limit=limit or 100, device_id=device_id)
+        elif limit:
+            predictions = get_recent_predictions(limit=limit)
+        else:
+            predictions = get_all_predictions()
+
+        return jsonify({
+            'status': 'success',
+            'predictions': predictions
+        }), 200
+
+    except Exception as e:
+        log.error(f"Error retrieving predictions: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@bp.route('/api/statistics', methods=['GET'])
+@cached_by_data_version()
+def get_stats():
+    """
+    API endpoint to get prediction statistics.
+    Called by JavaScript to update dashboard.
+
+    RETURNS: JSON with statistics (total, unique, most detected);
+             304 Not Modified while the database is unchanged
+    """
+    try:
+        stats = get_prediction_statistics()
+
+        return jsonify({
+            'status': 'success',
+            'statistics': stats
+        }), 200
+
+    except Exception as e:
+        log.error(f"Error retrieving statistics: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+# ======================== DASHBOARD STATE ROUTE =============================
+
+@bp.route('/api/state', methods=['GET'])
+def get_state():
+    """
+    Long-poll for the dashboard (state_feed.py): answers as soon as the
+    camera status, gesture, history or statistics differ from the client's
+    version, or after the timeout with nothing changed.
+
+    QUERY PARAMETERS:
+    - since (optional): version of the previous answer ('<live>.<data>';
+      missing = everything). Versions are the same in every worker process.
+    - timeout (optional): seconds to wait, at most STATE_POLL_TIMEOUT
+
+    RETURNS: JSON with version, changed (only the sections that changed)
+             and the latest frame's frame_seq / frame_age_ms / result_*
+    """
+    feed = current_app.extensions.get('state_feed')
+    if feed is None:
+        return jsonify({'status': 'error', 'message': 'State feed not available'}), 404
+    since = request.args.get('since', default='')
+    timeout = request.args.get('timeout', default=STATE_POLL_TIMEOUT, type=float)
+    state = feed.changes(since, min(max(timeout, 0.0), STATE_POLL_TIMEOUT))
+    response = jsonify({'status': 'success', **state})
+    response.headers['Cache-Control'] = 'no-store'
+    return response, 200
+
+
+# ======================== BULK INGESTION ROUTE =============================
+
+@bp.route('/api/ingest', methods=['POST'])
+def ingest():
+    """
+    Bulk upload of signs committed on edge devices (formats: ingest.py).
+
+    Requests must carry INGEST_TOKEN in the X-Ingest-Token header (without
+    a configured token only this machine may upload). Events already stored
+    (same device_id and event_id) are skipped, so a batch can be retried.
+
+    RETURNS: JSON with received, inserted, duplicates, rejected and the
+             first rejected events (position = NDJSON line or binary
+             event number, from 1); 400 unreadable batch, 403 bad token,
+             413 body larger than INGEST_MAX_BYTES, 503 database busy
+             (nothing lost: retry the batch)
+    """
+    if INGEST_TOKEN:
+        allowed = token_matches('X-Ingest-Token', INGEST_TOKEN)
+    else:
+        allowed = request.remote_addr in ('127.0.0.1', '::1')
+    if not allowed:
+        return jsonify({'status': 'error', 'message': 'Ingest token required'}), 403
+
+    if request.content_length is not None and request.content_length > INGEST_MAX_BYTES:
+        return jsonify({'status': 'error', 'message': f'Batch larger than {INGEST_MAX_BYTES} bytes'}), 413
+    body = request.stream.read(INGEST_MAX_BYTES + 1)
+    if len(body) > INGEST_MAX_BYTES:
+        return jsonify({'status': 'error', 'message': f'Batch larger than {INGEST_MAX_BYTES} bytes'}), 413
+
+    try:
+        rows, errors, received = parse_batch(body)
+    except IngestError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    try:
+        inserted = ingest_events(rows)
+    except sqlite3.Error as e:
+        return jsonify({'status': 'error', 'message': f'Database error, retry the batch: {e}'}), 503
+
+    EVENTS_INGESTED.labels('inserted').inc(inserted)
+    EVENTS_INGESTED.labels('duplicate').inc(len(rows) - inserted)
+    EVENTS_INGESTED.labels('rejected').inc(len(errors))
+    log.info("Ingested %d events (%d new, %d rejected)", received, inserted, len(errors))
+    return jsonify({
+        'status': 'success',
+        'received': received,
+        'inserted': inserted,
+        'duplicates': len(rows) - inserted,
+        'rejected': len(errors),
+        'errors': [{'position': position, 'message': message}
+                   for position, message in errors[:MAX_ERRORS_REPORTED]]
+    }), 200
+
+
+# ======================== CLEAR DATA ROUTE =============================
+
+@bp.route('/api/clear_data', methods=['POST'])
+def clear_data():
+    """
+    API endpoint to clear all predictions from database.
+    Called when user clicks "Clear History" button.
+
+    RETURNS: JSON with status (always 200 for consistency)
+    """
+    try:
+        data_log.info("Request to clear all predictions...")
+        success = clear_all_predictions()
+
+        if success:
+            data_log.info("Data cleared successfully!")
+            return jsonify({
+                'status': 'success',
+                'message': 'All data cleared!',
+                'timestamp': datetime.now().isoformat()
+            }), 200
+        else:
+            data_log.error("Failed to clear data - database error")
+            return jsonify({
+                'status': 'error',
+                'message': 'Failed to clear data - database error',
+                'timestamp': datetime.now().isoformat()
+            }), 200  # Return 200 to be consistent with other endpoints
+
+    except Exception as e:
+        log.exception("Exception clearing data: %s", e)
+        return jsonify({
+            'status': 'error',
+            'message': f'Exception: {str(e)}',
+            'timestamp': datetime.now().isoformat()
+        }), 200  # Return 200 to be consistent with other endpoints
+
+
+# ======================== REQUEST METRICS =============================
+
+def register_request_metrics(app):
+    """Time every request of this app into the REQUEST_SECONDS histogram"""
+
+    @app.before_request
+    def start_request_timer():
+        """Remember when the request started (for the latency histogram)"""
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_latency(response):
+        """
+        Record request latency per route pattern (e.g. '/api/frame').
+        Unknown URLs share one 'unmatched' series so scanners cannot create
+        unlimited series. Streams are timed until the response starts.
+        """
+        started = g.pop('request_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            REQUEST_SECONDS.labels(route, request.method).observe(time.perf_counter() - started)
+        return response
+
+
+# ======================== ADMIN ACCESS =============================
+
+def token_matches(header, token):
+    """Constant-time check of a request header against a configured secret"""
+    return hmac.compare_digest(request.headers.get(header, '').encode('utf-8'), token.encode('utf-8'))
+
+
+def admin_required(view):
+    """
+    Allow a route only for administrators: requests carrying ADMIN_TOKEN
+    in the X-Admin-Token header, or (if no token is configured) requests
+    from this machine.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if ADMIN_TOKEN:
+            allowed = token_matches('X-Admin-Token', ADMIN_TOKEN)
+        else:
+            allowed = request.remote_addr in ('127.0.0.1', '::1')
+        if not allowed:
+            return jsonify({'status': 'error', 'message': 'Admin access required'}), 403
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,439 @@
+# ============================================================================
+# PROJECT: Sign Language to Text Converter (Web-based)
+# MODULE: Web Worker (App Factory)
+# PURPOSE: Stateless Flask app that serves the camera from shared memory
+# EXPLANATION: app.py runs camera, recognition and web server in ONE
+#              process, so it cannot use more than one worker process.
+#              Here the camera side runs once in capture_service.py, and
+#              this app only reads what it publishes (shared_state.py):
+#              - /api/frame and /video_feed send the already encoded JPEG
+#                (smaller preview tiers are scaled and encoded once per frame);
+#                asking for frames is what keeps the service encoding them
+#              - /api/detect_gesture reads the latest results and commits
+#              - /start_camera and /stop_camera ask the capture service
+#              - /api/state long-polls the shared results and the database
+#                (state_feed.py; one watcher thread per worker)
+#              - history and statistics come from the database (web_routes.py)
+#              Nothing here imports OpenCV capture code or MediaPipe, and a
+#              worker holds no state, so any number of them can run.
+#
+# NOT IN WORKER MODE: these app.py routes need the camera's process and
+#              answer 501 here:
+#              - /admin/runtime_config: edit the runtime config file, then
+#                send SIGHUP to capture_service.py and to the gunicorn master
+#                (which restarts the workers with the new settings)
+#              - /admin/profile: profile capture_service.py itself
+#              - /api/recording/start and /api/recording/stop
+#
+# USAGE:
+#     python capture_service.py &
+#     gunicorn -w 4 -k gthread --threads 8 -b 0.0.0.0:5000 'web_worker:create_app()'
+#     python web_worker.py          (single worker, for development)
+# ============================================================================
+
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+from flask import Flask, Response, jsonify, request
+
+from config import DEBUG, SECRET_KEY, SHARED_STATE_NAME, SHARED_VIEWER_IDLE_SECONDS
+from app_logging import setup_logging, get_logger
+
+setup_logging()
+
+from database import initialize_database
+from frame_ring import frame_ages
+from shared_state import SharedState
+from state_feed import StateFeed
+from metrics import (CONTENT_TYPE, REGISTRY, REQUEST_SECONDS, STREAM_BYTES_SENT, JPEG_ENCODE_SECONDS,
+                     FRAME_AGE_SECONDS, STREAM_FRAMES_STALE, merge_texts)
+from runtime_config import runtime_config
+from stream_tiers import EncodedFrameCache, TierAdapter, resolve_tier, tier_from_args
+from http_cache import register_http_caching
+from web_routes import bp as web_routes, register_request_metrics, admin_required
+
+log = get_logger('web_worker')
+
+CAMERA_REQUEST_TIMEOUT = 5.0    # Seconds to wait for the capture service to start/stop the camera
+SERVICE_STALE_SECONDS = 2.0     # No heartbeat for this long = capture service is down
+SAVED_WINDOW_SECONDS = 0.3      # Without after_commit: commits this recent count as "saved"
+STATE_WATCH_SECONDS = 0.05      # /api/state: how often shared results are checked for a new gesture
+FIRST_FRAME_TIMEOUT = 0.5       # After an idle period: longest wait for the service to encode a fresh frame
+
+
+# ======================== SHARED STATE CONNECTION =============================
+
+class _Connection:
+    """Attaches to the capture service's shared memory on first use (it may start later)"""
+
+    def __init__(self, name):
+        self.name = name
+        self.shared = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        RETURNS: SharedState, or None if no live capture service is publishing
+        """
+        shared = self.shared
+        if shared is None:
+            with self._lock:
+                if self.shared is None:
+                    try:
+                        self.shared = SharedState.attach(self.name)
+                    except (FileNotFoundError, ValueError) as e:
+                        log.warning("Capture service not available: %s", e)
+                        return None
+                shared = self.shared
+        if shared.service_age() > SERVICE_STALE_SECONDS:
+            # Restarted services create a new block; attach again next time
+            with self._lock:
+                if self.shared is shared:
+                    self.shared = None
+            return None
+        return shared
+
+
+def _read_state(shared):
+    value = shared.read_state() if shared is not None else None
+    return json.loads(value.payload) if value is not None else None
+
+
+def _frame_stamp(shared, state):
+    """
+    (seq, capture time) of the newest frame: the shared one while viewers
+    keep the service encoding, otherwise the newest recognized one (the
+    shared frame stopped updating)
+    """
+    if shared.viewer_age() < SHARED_VIEWER_IDLE_SECONDS:
+        return shared.frame_stamp()
+    return state.get('result_seq'), state.get('result_timestamp', 0.0)
+
+
+# ======================== APP FACTORY =============================
+
+def create_app(state_name=None):
+    """
+    Build a web worker app.
+
+    PARAMETER: state_name - Shared memory name of the capture service
+               (default SHARED_STATE_NAME in config.py)
+    RETURNS: Flask app
+    """
+    app = Flask(__name__)
+    app.config['DEBUG'] = DEBUG
+    app.config['SECRET_KEY'] = SECRET_KEY
+    app.register_blueprint(web_routes)
+    register_request_metrics(app)
+    register_http_caching(app)
+
+    initialize_database()
+    connection = _Connection(state_name or SHARED_STATE_NAME)
+    app.extensions['shared_state'] = connection
+
+    # ======================== CAMERA ROUTES =============================
+
+    @app.route('/api/camera_status')
+    def camera_status():
+        """Diagnostic endpoint: capture service and camera status"""
+        shared = connection.get()
+        running, index = shared.camera_status() if shared is not None else (False, None)
+        return jsonify({
+            'camera_active': running,
+            'camera_is_running': running,
+            'camera_index': index,
+            'capture_service': shared is not None,
+            'frame_seq': shared.frame_seq() if shared is not None else None
+        }), 200
+
+    def _set_camera(start):
+        """Ask the capture service to start/stop the camera and wait for it"""
+        shared = connection.get()
+        if shared is None:
+            return None
+        shared.request_camera(start)
+        deadline = time.monotonic() + CAMERA_REQUEST_TIMEOUT
+        while time.monotonic() < deadline:
+            running, index = shared.camera_status()
+            if running == start:
+                return running, index
+            time.sleep(0.02)
+        return shared.camera_status()
+
+    @app.route('/start_camera', methods=['POST'])
+    def start_camera_route():
+        """Start the camera in the capture service (idempotent)"""
+        status = _set_camera(True)
+        if status is None:
+            return jsonify({'status': 'error', 'message': 'Capture service not running',
+                            'hint': 'Start it with: python capture_service.py'}), 200
+        running, index = status
+        if running:
+            return jsonify({'status': 'success', 'message': 'Camera started!', 'camera_index': index}), 200
+        return jsonify({'status': 'error', 'message': 'Failed to start camera',
+                        'hint': 'Check if camera is connected or already in use', 'camera_index': index}), 200
+
+    @app.route('/stop_camera', methods=['POST'])
+    def stop_camera_route():
+        """Stop the camera in the capture service (idempotent)"""
+        _set_camera(False)
+        return jsonify({
+            'status': 'success',
+            'message': 'Camera stopped!',
+            'timestamp': datetime.now().isoformat()
+        }), 200
+
+    # ======================== FRAME ROUTES =============================
+
+    # Smaller tiers are decoded from the shared JPEG (at reduced scale where
+    # possible) and re-encoded once per frame per tier in this worker
+    frame_cache = EncodedFrameCache()
+    decoded_width = [None]              # Width of the shared frames, known after one full decode
+    cached_for = [None]                 # SharedState the cached encodings come from
+
+    def decode(jpeg, width):
+        flag = cv2.IMREAD_COLOR
+        if width and decoded_width[0]:
+            for factor, reduced in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                                    (2, cv2.IMREAD_REDUCED_COLOR_2)):
+                if decoded_width[0] // factor >= width:
+                    flag = reduced
+                    break
+        image = cv2.imdecode(np.frombuffer(jpeg, np.uint8), flag)
+        if image is not None and flag == cv2.IMREAD_COLOR:
+            decoded_width[0] = image.shape[1]
+        return image
+
+    def encoded_frame(shared, tier, passthrough, after_seq=None):
+        """(frame seq, capture time, JPEG bytes) in the tier, or None if no (newer) frame"""
+        frame = shared.read_frame(after_seq)
+        if frame is None:
+            return None
+        if passthrough:
+            return frame.id, frame.timestamp, frame.payload
+        if cached_for[0] is not shared:
+            frame_cache.clear()         # Restarted capture service: frame numbers start again
+            cached_for[0] = shared
+        data = frame_cache.get(frame.id, tier, lambda width: decode(frame.payload, width))
+        return (frame.id, frame.timestamp, data) if data is not None else None
+
+    @app.route('/api/frame')
+    def get_current_frame():
+        """
+        Latest frame as base64 JPEG. The full tier is the capture service's
+        encoding as is; ?tier= / ?width= / ?quality= as in app.py.
+        """
+        shared = connection.get()
+        if shared is None or not shared.camera_status()[0]:
+            return jsonify({'frame': None, 'status': 'no_camera'}), 200
+        try:
+            tier, _ = tier_from_args(request.args, runtime_config.settings.frame_jpeg_quality)
+        except ValueError as e:
+            return jsonify({'frame': None, 'status': 'error', 'message': str(e)}), 400
+        if shared.viewer_heartbeat() > SHARED_VIEWER_IDLE_SECONDS:
+            # Nobody watched, so the service was not encoding: the shared frame is old
+            shared.wait_for_frame(shared.frame_seq(), FIRST_FRAME_TIMEOUT)
+        encoded = encoded_frame(shared, tier, tier.width is None and 'quality' not in request.args)
+        if encoded is None:
+            return jsonify({'frame': None, 'status': 'no_frame'}), 200
+        seq, captured, frame_bytes = encoded
+        STREAM_BYTES_SENT.labels(tier.name).inc(len(frame_bytes))
+        state = _read_state(shared) or {}
+        ages = frame_ages(seq, captured, state.get('result_seq'), state.get('result_timestamp', 0.0))
+        FRAME_AGE_SECONDS.labels('api_frame').observe(ages['frame_age_ms'] / 1000.0)
+        return jsonify({
+            'frame': base64.b64encode(frame_bytes).decode('ascii'),
+            'status': 'success',
+            'gesture': state.get('gesture'),
+            **ages
+        }), 200
+
+    @app.route('/video_feed')
+    def video_feed():
+        """
+        MJPEG stream of the shared frames (?tier=, ?width=, ?quality=, ?tier=auto
+        as in app.py). Like app.py's stream: at most stream_fps per viewer,
+        frames older than stream_max_frame_age skipped, and each loop waits
+        for the next frame's sequence number.
+        """
+        shared = connection.get()
+        if shared is None or not shared.camera_status()[0]:
+            return "Camera not active", 400
+        try:
+            tier, auto = tier_from_args(request.args, runtime_config.settings.stream_jpeg_quality)
+        except ValueError as e:
+            return str(e), 400
+        explicit_quality = 'quality' in request.args
+        adapter = TierAdapter(largest=tier.name) if auto else None
+
+        def stream():
+            current = tier
+            last_seq = 0
+            last_sent_time = 0.0
+            while shared.camera_status()[0] and shared.service_age() < SERVICE_STALE_SECONDS:
+                # FPS control: ensure we don't exceed target frame rate
+                settings = runtime_config.settings
+                elapsed = time.time() - last_sent_time
+                if elapsed < 1.0 / settings.stream_fps:
+                    time.sleep(1.0 / settings.stream_fps - elapsed)
+
+                if shared.frame_seq() < last_seq:
+                    last_seq = 0        # Camera restarted: sequence numbers start again
+                if shared.viewer_heartbeat() > SHARED_VIEWER_IDLE_SECONDS:
+                    last_seq = max(last_seq, shared.frame_seq())   # Encoded before the idle period: old
+                if not shared.wait_for_frame(last_seq, timeout=1.0):
+                    continue            # Re-check the camera and the service
+                encoded = encoded_frame(shared, current, current.width is None and not explicit_quality,
+                                        after_seq=last_seq)
+                if encoded is None:
+                    continue
+                last_seq, captured, frame_bytes = encoded
+                last_sent_time = time.time()
+                max_age = settings.stream_max_frame_age
+                age = time.time() - captured
+                if max_age and age > max_age:
+                    STREAM_FRAMES_STALE.inc()      # Too old to show; wait for the next one
+                    continue
+                FRAME_AGE_SECONDS.labels('stream').observe(age)
+                STREAM_BYTES_SENT.labels(current.name).inc(len(frame_bytes))
+                sent = time.perf_counter()
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n'
+                       b'Content-Length: ' + str(len(frame_bytes)).encode() + b'\r\n\r\n'
+                       + frame_bytes + b'\r\n')
+                if adapter is not None:
+                    name = adapter.record(time.perf_counter() - sent, 1.0 / settings.stream_fps)
+                    if name != current.name:
+                        current = resolve_tier(name, default_quality=runtime_config.settings.stream_jpeg_quality)
+
+        return Response(stream(), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+    # ======================== GESTURE DETECTION =============================
+
+    @app.route('/api/detect_gesture', methods=['POST'])
+    def detect_gesture_route():
+        """
+        Latest gesture and whether a sign was committed since the last poll.
+
+        OPTIONAL (query or JSON): after_commit - commit_seq of the previous
+        response; without it, commits in the last SAVED_WINDOW_SECONDS count.
+        The stabilizer runs in the capture service, not per request.
+        Reports frame/result ages like app.py (capture times come from the service).
+        """
+        shared = connection.get()
+        state = _read_state(shared)
+        if state is None or not state['camera_running']:
+            return jsonify({
+                'status': 'success',
+                'gesture': None,
+                'saved': False,
+                'message': 'Camera not active',
+                'timestamp': datetime.now().isoformat()
+            }), 200
+
+        after = request.args.get('after_commit', type=int)
+        if after is None:
+            after = (request.get_json(silent=True) or {}).get('after_commit')
+        if isinstance(after, int):
+            new_commits = [c for c in state['commits'] if c['id'] > after]
+        else:
+            recent = time.time() - SAVED_WINDOW_SECONDS
+            new_commits = [c for c in state['commits'] if c['time'] >= recent]
+
+        return jsonify({
+            'status': 'success',
+            'gesture': state['gesture'],
+            'saved': bool(new_commits),
+            'motion_signs': [c['gesture'] for c in new_commits if c['kind'] == 'motion'],
+            'commit_seq': state['commit_seq'],
+            **frame_ages(*_frame_stamp(shared, state), state['result_seq'], state.get('result_timestamp', 0.0)),
+            'timestamp': datetime.now().isoformat()
+        }), 200
+
+    # ======================== DASHBOARD STATE FEED =============================
+
+    def read_live_state():
+        """
+        Camera status and latest gesture from the capture service, for
+        /api/state, versioned with the shared state's id so that every
+        worker reports the same version for the same results
+        """
+        shared = connection.get()
+        value = shared.read_state() if shared is not None else None
+        if value is None:
+            # No capture service: versioned by the time, like its state ids
+            return int(time.time() * 1000), {'camera': {'running': False, 'index': None},
+                                              'gesture': {'gesture': None}}
+        state = json.loads(value.payload)
+        running = state['camera_running']
+        return value.id, {
+            'camera': {'running': running, 'index': state['camera_index']},
+            'gesture': {'gesture': state['gesture'] if running else None}
+        }
+
+    def read_frame_ages():
+        shared = connection.get()
+        if shared is None:
+            return {}
+        state = _read_state(shared) or {}
+        return frame_ages(*_frame_stamp(shared, state), state.get('result_seq'), state.get('result_timestamp', 0.0))
+
+    app.extensions['state_feed'] = StateFeed(read_live_state,
+                                             lambda timeout: time.sleep(min(timeout, STATE_WATCH_SECONDS)),
+                                             read_frame=read_frame_ages)
+
+    # ======================== NOT IN WORKER MODE =============================
+
+    def not_in_worker_mode(hint):
+        return jsonify({'status': 'error', 'message': 'Not available in worker mode', 'hint': hint}), 501
+
+    @app.route('/admin/runtime_config', methods=['GET', 'POST'])
+    @admin_required
+    def runtime_config_route():
+        """Runtime settings live in each process: change the file and signal them"""
+        return not_in_worker_mode('Edit the runtime config file, then send SIGHUP to capture_service.py '
+                                  'and to the gunicorn master')
+
+    @app.route('/admin/profile', methods=['GET', 'POST'])
+    @admin_required
+    def profile_route():
+        """The pipeline runs in capture_service.py, not in this worker"""
+        return not_in_worker_mode('Profile capture_service.py (e.g. python app.py for /admin/profile)')
+
+    @app.route('/api/recording/start', methods=['POST'])
+    @app.route('/api/recording/stop', methods=['POST'])
+    def recording_route():
+        """Landmarks are recorded where the camera runs"""
+        return not_in_worker_mode('Record landmarks with python app.py')
+
+    # ======================== METRICS =============================
+
+    @app.route('/metrics')
+    def metrics():
+        """
+        Capture service metrics (pipeline stages) merged with this worker's
+        own (request latencies, stream bytes, preview tier encoding).
+        Each worker reports its own requests.
+        """
+        shared = connection.get()
+        pipeline = shared.read_metrics().decode('utf-8') if shared is not None else ''
+        own = REGISTRY.render(names=(REQUEST_SECONDS.name, STREAM_BYTES_SENT.name, JPEG_ENCODE_SECONDS.name))
+        return Response(merge_texts(pipeline, own), content_type=CONTENT_TYPE)
+
+    @app.errorhandler(404)
+    def not_found(error):
+        """Handle 404 errors (page not found)"""
+        return jsonify({'status': 'error', 'message': 'Route not found'}), 404
+
+    return app
+
+
+# ======================== DEVELOPMENT SERVER =============================
+
+if __name__ == '__main__':
+    create_app().run(host='0.0.0.0', port=5000, debug=False, threaded=True)